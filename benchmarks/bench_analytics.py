@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark analytique — agrégat xG par équipe sur tout l'historique.
+
+Base SQLite temporaire remplie de matchs synthétiques (5 ligues × 3 saisons),
+puis xG pour / contre et nombre de matchs par (ligue, saison, équipe) par
+deux chemins :
+
+    sqlite  db.get_xg_by_team pour chaque ligue × saison (une requête
+            GROUP BY SQLite par ligue × saison) — chemin de la commande xg
+    duckdb  une requête GROUP BY sur la vue team_matches (analytics.connect :
+            base SQLite attachée, scan colonnaire vectorisé)
+
+Meilleur temps sur --repeat passes, débit en matchs scannés par seconde ;
+les sommes de contrôle doivent être identiques. À titre indicatif, la
+requête xg_trend (moyennes glissantes, fenêtre 5) est aussi chronométrée.
+Échec si DuckDB n'est pas au moins --min-speedup fois plus rapide que SQLite.
+Ignoré (code 0) si duckdb n'est pas installé.
+
+Usage :
+  python3 benchmarks/bench_analytics.py
+  python3 benchmarks/bench_analytics.py --matches 500000 --repeat 5
+"""
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+LEAGUES = (61, 39, 140, 135, 78)
+SEASONS = (2023, 2024, 2025)
+
+_DUCKDB_XG = """
+    SELECT league_id, season, team,
+           round(sum(xg_for), 2) AS xg_for, round(sum(xg_against), 2) AS xg_against,
+           count(*) AS matches
+    FROM team_matches
+    WHERE xg_for IS NOT NULL
+    GROUP BY league_id, season, team
+"""
+
+
+def _populate(db, n: int, seed: int = 42):
+    from sqlalchemy import insert
+    from euro_top.db import Match
+    rng = random.Random(seed)
+    start = date(2023, 8, 1)
+    batch = []
+    for i in range(1, n + 1):
+        league = LEAGUES[i % len(LEAGUES)]
+        batch.append({
+            "id": i, "league_id": league, "season": SEASONS[i % len(SEASONS)],
+            "match_date": start + timedelta(days=i % 900), "status": "FT",
+            "home_team": f"T{league}_{rng.randrange(20)}",
+            "away_team": f"T{league}_{rng.randrange(20)}",
+            "home_goals": rng.randrange(5), "away_goals": rng.randrange(5),
+            "home_xg": round(rng.uniform(0, 3.5), 2), "away_xg": round(rng.uniform(0, 3.5), 2),
+        })
+        if len(batch) == 10000:
+            db.execute(insert(Match), batch)
+            batch = []
+    if batch:
+        db.execute(insert(Match), batch)
+    db.commit()
+
+
+# ── Chemins ───────────────────────────────────────────────────────────────────
+
+def _sqlite(con) -> list[tuple]:
+    from euro_top.db import get_session, get_xg_by_team
+    db = get_session()
+    try:
+        return [(lg, season, r.team, r.xg_for, r.xg_against, r.matches)
+                for lg in LEAGUES for season in SEASONS
+                for r in get_xg_by_team(db, lg, season)]
+    finally:
+        db.close()
+
+
+def _duckdb(con) -> list[tuple]:
+    from euro_top.analytics import sql
+    return sql(con, _DUCKDB_XG)[1]
+
+
+def _checksum(rows: list[tuple]) -> tuple:
+    return (len(rows), sum(r[5] for r in rows),
+            round(sum(r[3] for r in rows), 2), round(sum(r[4] for r in rows), 2))
+
+
+def _best(fn, con, repeat: int) -> tuple[float, tuple]:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        rows = fn(con)
+        times.append(time.perf_counter() - t0)
+    return min(times), _checksum(rows)
+
+
+# ── Main ──────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark agrégats DuckDB vs SQLite")
+    parser.add_argument("--matches", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-speedup", type=float, default=2.0,
+                        help="Gain minimal DuckDB vs SQLite")
+    args = parser.parse_args()
+
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        print("⏭️  duckdb non installé (pip install duckdb) — benchmark ignoré")
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'analytics.db')}"
+        from euro_top.analytics import connect, run_query
+        from euro_top.db import get_session, init_db
+        init_db()
+        db = get_session()
+        _populate(db, args.matches)
+        db.close()
+
+        t0 = time.perf_counter()
+        con = connect(data_dir=tmp)
+        t_connect = time.perf_counter() - t0
+        print(f"\n── {args.matches:,} matchs, {len(LEAGUES)} ligues × {len(SEASONS)} saisons "
+              f"(connexion DuckDB {t_connect * 1000:.0f} ms)")
+
+        results = {name: _best(fn, con, args.repeat)
+                   for name, fn in (("sqlite", _sqlite), ("duckdb", _duckdb))}
+        t0 = time.perf_counter()
+        trend = run_query(con, "xg_trend", window=5)[1]
+        t_trend = time.perf_counter() - t0
+        con.close()
+
+    base = results["sqlite"][0]
+    for name, (elapsed, _) in results.items():
+        print(f"  {name:<8} {elapsed * 1000:9.1f} ms   "
+              f"{args.matches / elapsed:>13,.0f} matchs/s   ×{base / elapsed:6.1f} vs sqlite")
+    print(f"  xg_trend {t_trend * 1000:9.1f} ms   {len(trend):>13,} lignes (fenêtre 5)")
+
+    ok = True
+    if len({check for _, check in results.values()}) != 1:
+        print(f"❌ sommes de contrôle divergentes : {results}")
+        ok = False
+    speedup = base / results["duckdb"][0]
+    if speedup < args.min_speedup:
+        print(f"❌ duckdb ×{speedup:.1f} < ×{args.min_speedup:g} vs sqlite")
+        ok = False
+    print(f"\n{'✅ OK' if ok else '❌ ÉCHEC'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
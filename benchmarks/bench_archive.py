@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Benchmark archive colonnaire — chargement de tout l'historique des matchs.
+
+Base SQLite temporaire remplie de matchs synthétiques (5 ligues × 3 saisons),
+archivée en Arrow IPC et en Parquet, puis chargée entièrement en colonnes
+NumPy (buts, xG, dates, équipes) par quatre chemins :
+
+    orm      session.query(Match).all() puis colonnes Python → NumPy
+    core     select des colonnes (SQLAlchemy Core) → NumPy
+    parquet  archive.read_columns sur les fichiers .parquet
+    arrow    archive.read_columns sur les fichiers .arrow (mmap, zéro copie)
+
+Meilleur temps sur --repeat passes ; les sommes de contrôle doivent être
+identiques. Échec si Arrow n'est pas au moins --min-speedup fois plus rapide
+que Core. Ignoré (code 0) si pyarrow n'est pas installé.
+
+Usage :
+  python3 benchmarks/bench_archive.py
+  python3 benchmarks/bench_archive.py --matches 500000 --repeat 5
+"""
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+LEAGUES = (61, 39, 140, 135, 78)
+SEASONS = (2023, 2024, 2025)
+COLUMNS = ["match_date", "home_team", "away_team", "home_goals", "away_goals",
+           "home_xg", "away_xg"]
+
+
+def _populate(db, n: int, seed: int = 42):
+    from sqlalchemy import insert
+    from euro_top.db import Match
+    rng = random.Random(seed)
+    start = date(2023, 8, 1)
+    batch = []
+    for i in range(1, n + 1):
+        league = LEAGUES[i % len(LEAGUES)]
+        batch.append({
+            "id": i, "league_id": league, "season": SEASONS[i % len(SEASONS)],
+            "match_date": start + timedelta(days=i % 900), "status": "FT",
+            "home_team": f"T{league}_{rng.randrange(20)}",
+            "away_team": f"T{league}_{rng.randrange(20)}",
+            "home_goals": rng.randrange(5), "away_goals": rng.randrange(5),
+            "home_xg": round(rng.uniform(0, 3.5), 2), "away_xg": round(rng.uniform(0, 3.5), 2),
+        })
+        if len(batch) == 10000:
+            db.execute(insert(Match), batch)
+            batch = []
+    if batch:
+        db.execute(insert(Match), batch)
+    db.commit()
+
+
+# ── Chargeurs ─────────────────────────────────────────────────────────────────
+
+def _load_orm(root):
+    from euro_top.db import Match, get_session
+    db = get_session()
+    try:
+        rows = db.query(Match).all()
+        return {c: np.array([getattr(r, c) for r in rows]) for c in COLUMNS}
+    finally:
+        db.close()
+
+
+def _load_core(root):
+    from sqlalchemy import select
+    from euro_top.db import Match, get_session
+    db = get_session()
+    try:
+        rows = db.execute(select(*(getattr(Match, c) for c in COLUMNS))).all()
+        return {c: np.array(values) for c, values in zip(COLUMNS, zip(*rows))}
+    finally:
+        db.close()
+
+
+def _load_archive(root):
+    from euro_top.archive import read_columns
+    return read_columns("matches", COLUMNS, root=root)
+
+
+def _checksum(cols: dict) -> tuple:
+    return (len(cols["home_goals"]), int(cols["home_goals"].sum() + cols["away_goals"].sum()),
+            round(float(cols["home_xg"].sum() + cols["away_xg"].sum()), 4))
+
+
+def _best(fn, root, repeat: int) -> tuple[float, tuple]:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        cols = fn(root)
+        times.append(time.perf_counter() - t0)
+    return min(times), _checksum(cols)
+
+
+# ── Main ──────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark archive colonnaire vs SQLite")
+    parser.add_argument("--matches", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-speedup", type=float, default=5.0,
+                        help="Gain minimal Arrow vs Core")
+    args = parser.parse_args()
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("⏭️  pyarrow non installé (pip install pyarrow) — benchmark ignoré")
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'archive.db')}"
+        from euro_top.archive import write_archive
+        from euro_top.db import get_session, init_db
+        init_db()
+        db = get_session()
+        _populate(db, args.matches)
+        arrow_root, parquet_root = Path(tmp) / "arrow", Path(tmp) / "parquet"
+        t0 = time.perf_counter()
+        files = write_archive(db, tables=["matches"], fmt="arrow", root=arrow_root)
+        t_write = time.perf_counter() - t0
+        write_archive(db, tables=["matches"], fmt="parquet", root=parquet_root)
+        db.close()
+
+        size = lambda root: sum(p.stat().st_size for p in root.rglob("*") if p.is_file())
+        print(f"\n── {args.matches:,} matchs, {len(files)} fichiers "
+              f"(arrow {size(arrow_root) / 1e6:.1f} Mo, parquet {size(parquet_root) / 1e6:.1f} Mo, "
+              f"écriture arrow {t_write:.2f} s)")
+
+        results = {}
+        for name, fn, root in (("orm", _load_orm, None), ("core", _load_core, None),
+                               ("parquet", _load_archive, parquet_root),
+                               ("arrow", _load_archive, arrow_root)):
+            results[name] = _best(fn, root, args.repeat)
+
+    core = results["core"][0]
+    for name, (elapsed, _) in results.items():
+        print(f"  {name:<8} {elapsed * 1000:9.1f} ms   "
+              f"{args.matches / elapsed:>13,.0f} lignes/s   ×{core / elapsed:6.1f} vs core")
+
+    ok = True
+    if len({check for _, check in results.values()}) != 1:
+        print(f"❌ sommes de contrôle divergentes : {results}")
+        ok = False
+    speedup = core / results["arrow"][0]
+    if speedup < args.min_speedup:
+        print(f"❌ arrow ×{speedup:.1f} < ×{args.min_speedup:g} vs core")
+        ok = False
+    print(f"\n{'✅ OK' if ok else '❌ ÉCHEC'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark export en flux — débit (lignes/s) et mémoire de pointe.
+
+Base SQLite temporaire remplie de matchs synthétiques, exportée entièrement
+(toutes ligues, toutes saisons) via iter_rows + write_rows vers un puits qui
+ne garde rien. La mémoire de pointe (tracemalloc, passe séparée non
+chronométrée) est mesurée à N puis 4×N matchs : elle doit rester ~constante
+(écart < --max-growth).
+
+Usage :
+  python3 benchmarks/bench_export.py
+  python3 benchmarks/bench_export.py --matches 200000 --formats ndjson csv
+"""
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+LEAGUES = (61, 39, 140, 135, 78)
+SEASONS = (2023, 2024, 2025)
+
+
+class _Sink:
+    """Flux de sortie qui compte les octets sans les conserver."""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, s: str) -> int:
+        self.bytes += len(s)
+        return len(s)
+
+
+def _populate(db, n: int, seed: int = 42):
+    from sqlalchemy import insert
+    from euro_top.db import Match
+    rng = random.Random(seed)
+    start = date(2023, 8, 1)
+    batch = []
+    for i in range(1, n + 1):
+        league = LEAGUES[i % len(LEAGUES)]
+        batch.append({
+            "id": i, "league_id": league, "season": SEASONS[i % len(SEASONS)],
+            "match_date": start + timedelta(days=i % 900), "status": "FT",
+            "home_team": f"T{league}_{rng.randrange(20)}",
+            "away_team": f"T{league}_{rng.randrange(20)}",
+            "home_goals": rng.randrange(5), "away_goals": rng.randrange(5),
+            "home_xg": round(rng.uniform(0, 3.5), 2), "away_xg": round(rng.uniform(0, 3.5), 2),
+        })
+        if len(batch) == 10000:
+            db.execute(insert(Match), batch)
+            batch = []
+    if batch:
+        db.execute(insert(Match), batch)
+    db.commit()
+
+
+def _export(db, fmt: str, trace: bool = False) -> tuple[int, float, int]:
+    """Exporte tous les matchs → (lignes, secondes, octets ou pic mémoire si trace)."""
+    from euro_top.db import iter_rows, select_recent_matches
+    from euro_top.export import write_rows
+    sink = _Sink()
+    if trace:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    n = write_rows(iter_rows(db, select_recent_matches(None, None)), fmt, sink)
+    elapsed = time.perf_counter() - t0
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return n, elapsed, peak
+    return n, elapsed, sink.bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark export en flux")
+    parser.add_argument("--matches", type=int, default=50000)
+    parser.add_argument("--formats", nargs="+", default=["json", "ndjson", "csv"])
+    parser.add_argument("--max-growth", type=float, default=1.5,
+                        help="Ratio max du pic mémoire entre 4×N et N")
+    args = parser.parse_args()
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        peaks = {}
+        for scale in (1, 4):
+            n = args.matches * scale
+            os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, f'export_{scale}.db')}"
+            import euro_top.db
+            euro_top.db.DATABASE_URL = os.environ["DATABASE_URL"]
+            euro_top.db._engine = None
+            euro_top.db.init_db()
+            db = euro_top.db.get_session()
+            _populate(db, n)
+            print(f"\n── {n:,} matchs")
+            for fmt in args.formats:
+                rows, secs, size = _export(db, fmt)
+                _, _, peak = _export(db, fmt, trace=True)
+                peaks.setdefault(fmt, []).append(peak)
+                print(f"  {fmt:7s} {rows / secs:>12,.0f} lignes/s   "
+                      f"{size / 1e6:7.1f} Mo   pic {peak / 1e6:6.2f} Mo")
+            db.close()
+            euro_top.db.get_engine().dispose()
+
+    print()
+    for fmt, (small, large) in peaks.items():
+        growth = large / small
+        flag = "✅" if growth <= args.max_growth else "❌"
+        ok &= growth <= args.max_growth
+        print(f"{flag} {fmt:7s} pic mémoire ×{growth:.2f} pour ×4 lignes")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
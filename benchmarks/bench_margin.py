@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark + contrôle de précision — suppression de marge (euro_top.margin).
+
+1. Précision : cotes générées à partir de probabilités connues via le modèle
+   direct de chaque méthode (Shin z, power k, odds-ratio c) ; le solveur doit
+   retrouver les probabilités d'origine à la tolérance près.
+2. Débit : dé-margeage de N events × 3 issues par méthode.
+
+Usage :
+  python3 benchmarks/bench_margin.py
+  python3 benchmarks/bench_margin.py --events 20000 --repeat 5
+"""
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+
+import numpy as np
+
+from euro_top.margin import METHODS, remove_margin, shin_z
+
+ACCURACY_TOL = 1e-8
+
+
+# ── Générateurs (modèles directs) ─────────────────────────────────────────────
+
+def _true_probs(rng: np.random.Generator, n: int) -> np.ndarray:
+    """Probabilités 1X2 réalistes (nul entre 20 et 32 %)."""
+    draw = rng.uniform(0.20, 0.32, n)
+    home_share = rng.uniform(0.15, 0.85, n)
+    home = (1 - draw) * home_share
+    return np.column_stack([home, draw, 1 - draw - home])
+
+
+def shin_odds(p: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """π_i = sqrt(z·p_i + (1-z)·p_i²) · Σ_j sqrt(z·p_j + (1-z)·p_j²)."""
+    s = np.sqrt(z[:, None] * p + (1 - z[:, None]) * p ** 2)
+    return 1 / (s * s.sum(axis=1, keepdims=True))
+
+
+def power_odds(p: np.ndarray, k: np.ndarray) -> np.ndarray:
+    """π_i = p_i^(1/k)."""
+    return 1 / p ** (1 / k[:, None])
+
+
+def odds_ratio_odds(p: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """π_i = c·p_i / (1 - p_i + c·p_i)."""
+    c = c[:, None]
+    return 1 / (c * p / (1 - p + c * p))
+
+
+# ── Contrôles ─────────────────────────────────────────────────────────────────
+
+def check_accuracy(n: int = 2000, seed: int = 7) -> bool:
+    rng = np.random.default_rng(seed)
+    p = _true_probs(rng, n)
+    cases = {
+        "shin":       shin_odds(p, rng.uniform(0.005, 0.08, n)),
+        "power":      power_odds(p, rng.uniform(1.01, 1.10, n)),
+        "odds_ratio": odds_ratio_odds(p, rng.uniform(1.02, 1.30, n)),
+    }
+    ok = True
+    for method, odds in cases.items():
+        err = np.abs(remove_margin(odds, method=method) - p).max()
+        status = "OK " if err < ACCURACY_TOL else "KO "
+        ok &= err < ACCURACY_TOL
+        print(f"  {status} {method:<14} erreur max {err:.2e}")
+
+    # Cas connu : z retrouvé exactement
+    z = np.array([0.03])
+    ref = np.array([[0.5, 0.3, 0.2]])
+    z_err = abs(shin_z(shin_odds(ref, z))[0] - 0.03)
+    ok &= z_err < 1e-6
+    print(f"  {'OK ' if z_err < 1e-6 else 'KO '} shin z         erreur {z_err:.2e}")
+
+    # Sans marge : toutes les méthodes laissent les probabilités inchangées
+    fair = np.array([[2.0, 4.0, 4.0]])
+    for method in METHODS:
+        err = np.abs(remove_margin(fair, method=method) - [0.5, 0.25, 0.25]).max()
+        ok &= err < ACCURACY_TOL
+    print(f"  {'OK ' if ok else 'KO '} marge nulle    invariance {'vérifiée' if ok else 'KO'}")
+    return ok
+
+
+def bench(events: int, repeat: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    odds = shin_odds(_true_probs(rng, events), rng.uniform(0.01, 0.06, events))
+    print(f"\nDébit — {events} events × 3 issues, meilleur de {repeat}")
+    for method in METHODS:
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            remove_margin(odds, method=method)
+            best = min(best, time.perf_counter() - t0)
+        print(f"  {method:<14} {best * 1000:8.2f} ms  "
+              f"({events / best:,.0f} events/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suppression de marge")
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("Précision (solutions connues)")
+    ok = check_accuracy()
+    bench(args.events, args.repeat)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
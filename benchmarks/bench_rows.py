@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Benchmark lectures — objets ORM hydratés vs tuples nommés (select Core).
+
+Base SQLite temporaire remplie de matchs synthétiques (une ligue × saison),
+lus par deux chemins :
+
+    orm   session.query(Match)…all() — ancien chemin des commandes
+          resultats / xg (identity map, état d'instance par objet) ; pour
+          xg_by_team, agrégation en Python sur les objets
+    rows  db.get_recent_matches / db.get_xg_by_team — select Core,
+          MatchRow / TeamXgRow (GROUP BY SQL pour l'agrégat)
+
+Temps (meilleur sur --repeat passes, session neuve à chaque passe) et
+mémoire (tracemalloc, passe séparée non chronométrée : pointe et mémoire
+retenue par le résultat) ramenés à 10 000 lignes ; les sommes de contrôle
+doivent être identiques. Échec si le chemin rows n'est pas au moins
+--min-speedup fois plus rapide et --min-memory fois plus léger (mémoire
+retenue) que l'ORM sur la lecture de matchs.
+
+Usage :
+  python3 benchmarks/bench_rows.py
+  python3 benchmarks/bench_rows.py --matches 200000 --repeat 5
+"""
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+LEAGUE, SEASON = 61, 2024
+
+
+def _populate(db, n: int, seed: int = 42):
+    from sqlalchemy import insert
+    from euro_top.db import Match
+    rng = random.Random(seed)
+    start = date(2000, 8, 1)
+    batch = []
+    for i in range(1, n + 1):
+        batch.append({
+            "id": i, "league_id": LEAGUE, "season": SEASON,
+            "match_date": start + timedelta(days=i), "status": "FT",
+            "home_team": f"T{rng.randrange(20)}", "away_team": f"T{rng.randrange(20)}",
+            "home_goals": rng.randrange(5), "away_goals": rng.randrange(5),
+            "home_xg": round(rng.uniform(0, 3.5), 2), "away_xg": round(rng.uniform(0, 3.5), 2),
+        })
+        if len(batch) == 10000:
+            db.execute(insert(Match), batch)
+            batch = []
+    if batch:
+        db.execute(insert(Match), batch)
+    db.commit()
+
+
+# ── Chemins ───────────────────────────────────────────────────────────────────
+
+def _orm_matches(db, n: int) -> list:
+    from sqlalchemy import desc
+    from euro_top.db import Match
+    return (
+        db.query(Match)
+        .filter_by(league_id=LEAGUE, season=SEASON, status="FT")
+        .order_by(desc(Match.match_date))
+        .limit(n)
+        .all()
+    )
+
+
+def _rows_matches(db, n: int) -> list:
+    from euro_top.db import get_recent_matches
+    return get_recent_matches(db, LEAGUE, SEASON, n)
+
+
+def _orm_xg(db, n: int) -> list:
+    from euro_top.db import Match
+    teams: dict[str, list] = {}
+    for m in (db.query(Match)
+              .filter_by(league_id=LEAGUE, season=SEASON, status="FT")
+              .filter(Match.home_xg != None).all()):
+        for team, xg_for, xg_against in ((m.home_team, m.home_xg, m.away_xg),
+                                         (m.away_team, m.away_xg, m.home_xg)):
+            t = teams.setdefault(team, [team, 0, 0.0, 0.0])
+            t[1] += 1
+            t[2] += xg_for or 0
+            t[3] += xg_against or 0
+    rows = [(team, n, round(xg_for, 2), round(xg_against, 2))     # Arrondi de select_xg_by_team
+            for team, n, xg_for, xg_against in teams.values()]
+    return sorted(rows, key=lambda t: t[2], reverse=True)
+
+
+def _rows_xg(db, n: int) -> list:
+    from euro_top.db import get_xg_by_team
+    return get_xg_by_team(db, LEAGUE, SEASON)
+
+
+def _checksum(rows: list) -> tuple:
+    if rows and hasattr(rows[0], "home_goals"):
+        return (len(rows), sum(r.home_goals + r.away_goals for r in rows),
+                round(sum(r.home_xg + r.away_xg for r in rows), 2))
+    return (len(rows), sum(r[1] for r in rows),
+            round(sum(r[2] for r in rows), 2), round(sum(r[3] for r in rows), 2))
+
+
+def _measure(fn, n: int, repeat: int) -> tuple[float, int, int, tuple]:
+    """(meilleur temps, pointe mémoire, mémoire retenue, somme de contrôle)."""
+    from euro_top.db import get_session
+    times = []
+    for _ in range(repeat):
+        db = get_session()
+        t0 = time.perf_counter()
+        rows = fn(db, n)
+        times.append(time.perf_counter() - t0)
+        db.close()
+    db = get_session()
+    tracemalloc.start()
+    rows = fn(db, n)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    check = _checksum(rows)
+    db.close()
+    return min(times), peak, retained, check
+
+
+# ── Main ──────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lectures ORM vs tuples nommés")
+    parser.add_argument("--matches", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-speedup", type=float, default=2.0,
+                        help="Gain de temps minimal rows vs ORM (lecture de matchs)")
+    parser.add_argument("--min-memory", type=float, default=2.0,
+                        help="Gain de mémoire retenue minimal rows vs ORM (lecture de matchs)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'rows.db')}"
+        from euro_top.db import get_session, init_db
+        init_db()
+        db = get_session()
+        _populate(db, args.matches)
+        db.close()
+
+        print(f"\n── {args.matches:,} matchs (valeurs pour 10 000 lignes lues)")
+        results = {}
+        for read, paths in (("matches", (("orm", _orm_matches), ("rows", _rows_matches))),
+                            ("xg_by_team", (("orm", _orm_xg), ("rows", _rows_xg)))):
+            for name, fn in paths:
+                results[read, name] = _measure(fn, args.matches, args.repeat)
+
+    per10k = 10000 / args.matches
+    for (read, name), (elapsed, peak, retained, _) in results.items():
+        base = results[read, "orm"]
+        print(f"  {read:<11} {name:<5} {elapsed * per10k * 1000:8.1f} ms   "
+              f"pointe {peak * per10k / 1e6:7.2f} Mo   retenue {retained * per10k / 1e6:7.2f} Mo   "
+              f"×{base[0] / elapsed:5.1f} temps  ×{base[2] / max(retained, 1):6.1f} mémoire")
+
+    ok = True
+    for read in ("matches", "xg_by_team"):
+        if results[read, "orm"][3] != results[read, "rows"][3]:
+            print(f"❌ {read} : sommes de contrôle divergentes "
+                  f"{results[read, 'orm'][3]} ≠ {results[read, 'rows'][3]}")
+            ok = False
+    orm, rows = results["matches", "orm"], results["matches", "rows"]
+    if orm[0] / rows[0] < args.min_speedup:
+        print(f"❌ matches : rows ×{orm[0] / rows[0]:.1f} < ×{args.min_speedup:g} (temps)")
+        ok = False
+    if orm[2] / max(rows[2], 1) < args.min_memory:
+        print(f"❌ matches : rows ×{orm[2] / max(rows[2], 1):.1f} < ×{args.min_memory:g} (mémoire)")
+        ok = False
+    print(f"\n{'✅ OK' if ok else '❌ ÉCHEC'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Test de charge — service HTTP ``euro-top serve`` (latences p50 / p99).
+
+Base SQLite temporaire (classements, joueurs, matchs synthétiques), serveur
+lancé dans un sous-processus épinglé sur un cœur (sched_setaffinity si dispo).
+Client asyncio en boucle ouverte : les requêtes partent à cadence fixe
+(``--rps``) sur des connexions keep-alive, la latence est comptée depuis
+l'heure d'envoi prévue (pas d'omission coordonnée). Mélange de routes ;
+une part des requêtes est conditionnelle (If-None-Match → 304).
+
+Vérifie aussi l'invalidation : après écriture en base (fetched_at modifié),
+l'ETag de /standings doit changer.
+
+Usage :
+  python3 benchmarks/bench_server.py
+  python3 benchmarks/bench_server.py --rps 500 --duration 10 --p99-ms 30
+"""
+import sys, os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import argparse
+import asyncio
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+LEAGUES = ("ligue1", "pl", "laliga", "seriea", "bundesliga")
+PATHS = ("/standings?league={l}", "/scorers?league={l}", "/assisters?league={l}",
+         "/xg?league={l}", "/xg/teams?league={l}", "/distance?league={l}")
+
+
+# ── Données ───────────────────────────────────────────────────────────────────
+
+def _populate(seed: int = 7):
+    from sqlalchemy import insert
+    from euro_top.config import SEASON, resolve_league
+    from euro_top.db import Match, Player, Standing, get_session, init_db
+    init_db()
+    rng = random.Random(seed)
+    db = get_session()
+    standings, players, matches = [], [], []
+    for key in LEAGUES:
+        lid = resolve_league(key).id
+        teams = [f"{key}-{i}" for i in range(20)]
+        for i, t in enumerate(teams):
+            standings.append({"league_id": lid, "season": SEASON, "rank": i + 1,
+                              "team": t, "played": 30, "points": 75 - 2 * i})
+        for k in range(300):
+            players.append({"api_id": k, "league_id": lid, "season": SEASON,
+                            "name": f"P{k}", "team": rng.choice(teams),
+                            "goals": rng.randrange(20), "assists": rng.randrange(12)})
+        for k in range(380):
+            h, a = rng.sample(teams, 2)
+            matches.append({
+                "id": lid * 10000 + k, "league_id": lid, "season": SEASON, "status": "FT",
+                "match_date": date(SEASON, 8, 1) + timedelta(days=k // 10),
+                "home_team": h, "away_team": a,
+                "home_goals": rng.randrange(5), "away_goals": rng.randrange(5),
+                "home_xg": rng.uniform(0, 3), "away_xg": rng.uniform(0, 3),
+                "home_km": rng.uniform(100, 120), "away_km": rng.uniform(100, 120),
+            })
+    for model, rows in ((Standing, standings), (Player, players), (Match, matches)):
+        db.execute(insert(model), rows)
+    db.commit()
+    db.close()
+
+
+def _touch_standings():
+    from sqlalchemy import update
+    from euro_top.db import Standing, get_session
+    db = get_session()
+    db.execute(update(Standing).where(Standing.rank == 1)
+               .values(points=Standing.points + 3, fetched_at=datetime.utcnow()))
+    db.commit()
+    db.close()
+
+
+# ── Client ────────────────────────────────────────────────────────────────────
+
+async def _request(reader, writer, path: str, etag: str | None = None) -> tuple[int, dict]:
+    extra = f"If-None-Match: {etag}\r\n" if etag else ""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\n{extra}\r\n".encode())
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {k.lower(): v.strip() for k, _, v in
+               (line.partition(":") for line in lines[1:] if line)}
+    await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers
+
+
+async def _wait_ready(port: int, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            await _request(reader, writer, "/health")
+            writer.close()
+            return
+        except (OSError, asyncio.IncompleteReadError):
+            await asyncio.sleep(0.1)
+    raise RuntimeError("Serveur injoignable")
+
+
+async def _load(port: int, rps: float, duration: float, conns: int,
+                conditional: float, seed: int = 1) -> tuple[list[float], dict, float]:
+    rng = random.Random(seed)
+    n = int(rps * duration)
+    plan = [(i / rps, rng.choice(PATHS).format(l=rng.choice(LEAGUES)),
+             rng.random() < conditional) for i in range(n)]
+    queue: asyncio.Queue = asyncio.Queue()
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    etags: dict[str, str] = {}
+
+    async def worker():
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            due, path, cond = item
+            status, headers = await _request(reader, writer, path,
+                                             etags.get(path) if cond else None)
+            latencies.append(time.perf_counter() - due)
+            statuses[status] = statuses.get(status, 0) + 1
+            if "etag" in headers:
+                etags[path] = headers["etag"]
+        writer.close()
+
+    workers = [asyncio.create_task(worker()) for _ in range(conns)]
+    t0 = time.perf_counter()
+    for offset, path, cond in plan:
+        delay = t0 + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        queue.put_nowait((t0 + offset, path, cond))
+    for _ in workers:
+        queue.put_nowait(None)
+    await asyncio.gather(*workers)
+    return latencies, statuses, time.perf_counter() - t0
+
+
+async def _etag(port: int, path: str) -> str:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    _, headers = await _request(reader, writer, path)
+    writer.close()
+    return headers["etag"]
+
+
+# ── Main ──────────────────────────────────────────────────────────────────────
+
+def _pct(values: list[float], q: float) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else values[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge euro-top serve")
+    parser.add_argument("--rps", type=float, default=300)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--conns", type=int, default=16)
+    parser.add_argument("--conditional", type=float, default=0.5,
+                        help="Part des requêtes avec If-None-Match")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--p99-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'serve.db')}"
+        _populate()
+
+        pin = (lambda: os.sched_setaffinity(0, {0})) if hasattr(os, "sched_setaffinity") else None
+        server = subprocess.Popen(
+            [sys.executable, "-m", "cli.main", "serve", "--port", str(args.port)],
+            cwd=ROOT, env={**os.environ, "PYTHONPATH": ROOT},
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, preexec_fn=pin,
+        )
+        try:
+            asyncio.run(_wait_ready(args.port))
+            latencies, statuses, elapsed = asyncio.run(_load(
+                args.port, args.rps, args.duration, args.conns, args.conditional))
+
+            before = asyncio.run(_etag(args.port, "/standings?league=ligue1"))
+            _touch_standings()
+            time.sleep(1.1)   # > STAMP_TTL
+            after = asyncio.run(_etag(args.port, "/standings?league=ligue1"))
+        finally:
+            server.terminate()
+            server.wait()
+
+    ms = [x * 1000 for x in latencies]
+    p50, p99 = _pct(ms, 50), _pct(ms, 99)
+    print(f"\n── {len(ms)} requêtes en {elapsed:.1f} s → {len(ms) / elapsed:,.0f} req/s "
+          f"(cible {args.rps:.0f}, {args.conns} connexions)")
+    print(f"  statuts : {dict(sorted(statuses.items()))}")
+    print(f"  p50 {p50:6.2f} ms   p99 {p99:6.2f} ms   max {max(ms):6.2f} ms")
+
+    ok = True
+    if p99 > args.p99_ms:
+        print(f"❌ p99 {p99:.2f} ms > {args.p99_ms:.0f} ms")
+        ok = False
+    if set(statuses) - {200, 304}:
+        print("❌ statuts inattendus")
+        ok = False
+    if before == after:
+        print("❌ ETag inchangé après écriture en base (cache non invalidé)")
+        ok = False
+    else:
+        print("  invalidation : ETag /standings renouvelé après écriture ✅")
+    print(f"\n{'✅ OK' if ok else '❌ ÉCHEC'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
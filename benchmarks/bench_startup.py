@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark démarrage à froid de la CLI — basé sur ``python -X importtime``.
+
+Deux scénarios, chacun lancé dans un interpréteur neuf :
+1. ``import cli.main`` (chemin de --help) : le surcoût par rapport à un simple
+   ``import typer`` (framework + interpréteur, incompressibles) doit tenir sous
+   ``--cli-budget-ms`` et aucun module lourd (sqlalchemy, httpx, requests,
+   understatapi, numpy) ne doit être chargé.
+2. ``euro-top classement --league ligue1`` sur une base vide temporaire :
+   temps d'import total sous ``--budget-ms`` ; seul sqlalchemy est autorisé
+   parmi les modules lourds (pas de client HTTP ni numpy).
+
+Code de sortie 1 si un budget est dépassé ou si un module interdit est importé.
+
+Usage :
+  python3 benchmarks/bench_startup.py
+  python3 benchmarks/bench_startup.py --repeat 7 --budget-ms 400 --top 15
+"""
+import sys, os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import statistics
+import subprocess
+import tempfile
+import time
+
+HEAVY = ("sqlalchemy", "httpx", "requests", "understatapi", "numpy")
+
+
+# ── Mesure ────────────────────────────────────────────────────────────────────
+
+def _run(args: list[str], env: dict) -> tuple[float, list[tuple[str, int, int]]]:
+    """Lance ``python -X importtime <args>`` → (durée murale s, [(module, self µs, cumul µs)])."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} → code {proc.returncode}\n{proc.stderr[-2000:]}")
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumul_us, name = line[len("import time:"):].split("|")
+        imports.append((name[1:].rstrip(), int(self_us), int(cumul_us)))
+    return wall, imports
+
+
+def _top_level(imports):
+    """Imports de premier niveau (non imbriqués) : leur cumul somme au total."""
+    return [(n.strip(), s, c) for n, s, c in imports if not n.startswith(" ")]
+
+
+def _root(name: str) -> str:
+    return name.strip().split(".")[0]
+
+
+def _summary(label: str, runs) -> tuple[float, set[str]]:
+    """Affiche les médianes ; retourne (ms d'import médian, modules racine importés)."""
+    totals = [sum(s for _, s, _ in imports) / 1000 for _, imports in runs]
+    walls = [wall for wall, _ in runs]
+    print(f"\n── {label}")
+    print(f"  imports : {statistics.median(totals):8.1f} ms (médiane, min {min(totals):.1f})")
+    print(f"  mural   : {statistics.median(walls) * 1000:8.1f} ms")
+    return statistics.median(totals), {_root(n) for n, _, _ in runs[0][1]}
+
+
+def _print_top(imports, top: int):
+    for name, _, cumul in sorted(_top_level(imports), key=lambda r: -r[2])[:top]:
+        print(f"    {cumul / 1000:8.1f} ms  {name}")
+
+
+# ── Main ──────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark démarrage CLI (importtime)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=450.0,
+                        help="Budget imports de `classement` (total, ms)")
+    parser.add_argument("--cli-budget-ms", type=float, default=100.0,
+                        help="Budget surcoût d'import de cli.main vs typer seul (ms)")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "PYTHONPATH": ROOT,
+               "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'bench.db')}"}
+        # Base vide + compilation des .pyc (hors mesure)
+        subprocess.run([sys.executable, "-c", "from euro_top.db import init_db; init_db()"],
+                       cwd=ROOT, env=env, check=True)
+
+        ref_runs = [_run(["-c", "import typer"], env) for _ in range(args.repeat)]
+        cli_runs = [_run(["-c", "import cli.main"], env) for _ in range(args.repeat)]
+        cls_runs = [_run(["-m", "cli.main", "classement", "--league", "ligue1"], env)
+                    for _ in range(args.repeat)]
+
+    ok = True
+    ref_ms, _ = _summary("import typer (référence)", ref_runs)
+    cli_ms, cli_mods = _summary("import cli.main", cli_runs)
+    _print_top(cli_runs[len(cli_runs) // 2][1], args.top)
+    cli_ms -= ref_ms
+    print(f"  surcoût CLI : {cli_ms:.1f} ms")
+    leaked = sorted(cli_mods & set(HEAVY))
+    if leaked:
+        print(f"  ❌ modules lourds importés : {', '.join(leaked)}")
+        ok = False
+    if cli_ms > args.cli_budget_ms:
+        print(f"  ❌ budget dépassé : {cli_ms:.1f} > {args.cli_budget_ms:.0f} ms")
+        ok = False
+
+    cls_ms, cls_mods = _summary("euro-top classement", cls_runs)
+    _print_top(cls_runs[len(cls_runs) // 2][1], args.top)
+    leaked = sorted(cls_mods & (set(HEAVY) - {"sqlalchemy"}))
+    if leaked:
+        print(f"  ❌ modules inutiles importés : {', '.join(leaked)}")
+        ok = False
+    if cls_ms > args.budget_ms:
+        print(f"  ❌ budget dépassé : {cls_ms:.1f} > {args.budget_ms:.0f} ms")
+        ok = False
+
+    print(f"\n{'✅ OK' if ok else '❌ RÉGRESSION'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
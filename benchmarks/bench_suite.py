@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks des chemins chauds — données synthétiques déterministes.
+
+Génère ``--seasons`` saisons × ``--leagues`` ligues (euro_top/synthetic.py),
+les charge dans une base SQLite temporaire puis chronomètre :
+
+    upsert_standings / upsert_players / upsert_matches   insertion, puis mise à jour
+    get_xg_by_team / get_distance_by_team                toutes ligues × saisons
+    get_league_report                                    rapport, toutes ligues
+    compute_team_xg_probs / xg_to_prob                   modèle xG (value_bets.py)
+    parse_h2h / find_value_bets                          cotes à venir
+
+Meilleur temps sur ``--repeat`` passes (les insertions : une passe, base vide).
+Résultats écrits en JSON (``--output``) ; ``--baseline`` compare à une
+référence enregistrée (``--save-baseline``) et échoue si un cas ralentit
+de plus de ``--tolerance`` (même échelle et même graine requises).
+
+Usage :
+  python3 benchmarks/bench_suite.py
+  python3 benchmarks/bench_suite.py --seasons 10 --output /tmp/run.json
+  python3 benchmarks/bench_suite.py --save-baseline benchmarks/baseline.json
+  python3 benchmarks/bench_suite.py --baseline benchmarks/baseline.json --tolerance 0.3
+"""
+import sys, os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import argparse
+import importlib.util
+import json
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+
+
+def _value_bets_module():
+    """scripts/value_bets.py n'est pas un paquet : import par chemin."""
+    spec = importlib.util.spec_from_file_location(
+        "value_bets", os.path.join(ROOT, "scripts", "value_bets.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Suite:
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        self.results: dict[str, dict] = {}
+
+    def time(self, name: str, fn, items: int, repeat: int | None = None):
+        times = []
+        for _ in range(repeat or self.repeat):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+        best = min(times)
+        self.results[name] = {
+            "best_s": round(best, 6), "median_s": round(statistics.median(times), 6),
+            "runs": len(times), "items": items,
+            "us_per_item": round(best / items * 1e6, 3) if items else None,
+        }
+        print(f"  {name:<28} {best * 1000:10.2f} ms   {items:>9,} él.   "
+              f"{self.results[name]['us_per_item'] or 0:9.2f} µs/él.")
+
+
+def run(args) -> dict:
+    suite = Suite(args.repeat)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Avant tout import d'euro_top : config lit DATABASE_URL à l'import
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'suite.db')}"
+        from euro_top.synthetic import generate
+        t0 = time.perf_counter()
+        data = generate(seasons=args.seasons, leagues=args.leagues, seed=args.seed)
+        t_gen = time.perf_counter() - t0
+        counts = {k: len(v) for k, v in data.items()}
+        print(f"\n── {args.seasons} saison(s) × {args.leagues} ligues, graine {args.seed} : "
+              + ", ".join(f"{v:,} {k}" for k, v in counts.items()) + f" (généré en {t_gen:.1f} s)")
+
+        from euro_top.collectors.odds import parse_h2h
+        from euro_top.db import (
+            get_distance_by_team, get_league_report, get_session, get_xg_by_team, init_db,
+            upsert_matches, upsert_players, upsert_standings,
+        )
+        vb = _value_bets_module()
+        init_db()
+        db = get_session()
+        copy = lambda rows: [dict(r) for r in rows]   # les upserts peuvent muter les lignes
+
+        # 1. Écritures (insertion sur base vide, puis mise à jour à l'identique)
+        for name, fn, rows in (("upsert_standings", upsert_standings, data["standings"]),
+                               ("upsert_players", upsert_players, data["players"]),
+                               ("upsert_matches", upsert_matches, data["matches"])):
+            suite.time(f"{name}.insert", lambda: fn(db, copy(rows)), len(rows), repeat=1)
+            suite.time(f"{name}.update", lambda: fn(db, copy(rows)), len(rows))
+
+        # 2. Lectures agrégées
+        scopes = sorted({(m["league_id"], m["season"]) for m in data["matches"]})
+        suite.time("get_xg_by_team",
+                   lambda: [get_xg_by_team(db, lid, s) for lid, s in scopes], len(scopes))
+        suite.time("get_distance_by_team",
+                   lambda: [get_distance_by_team(db, lid, s) for lid, s in scopes], len(scopes))
+        league_ids = sorted({lid for lid, _ in scopes})
+        last_season = max(s for _, s in scopes)
+        suite.time("get_league_report",
+                   lambda: get_league_report(db, league_ids, last_season), len(league_ids))
+        db.close()
+
+        # 3. Modèle xG et cotes (sans base)
+        played = [m for m in data["matches"] if m["status"] == "FT"]
+        suite.time("compute_team_xg_probs", lambda: vb.compute_team_xg_probs(played), len(played))
+        team_stats = vb.compute_team_xg_probs(
+            [m for m in played if m["season"] == last_season])
+        events = data["odds_events"]
+        pairs = [(team_stats[e["home_team"]], team_stats[e["away_team"]]) for e in events
+                 if e["home_team"] in team_stats and e["away_team"] in team_stats]
+        suite.time("xg_to_prob", lambda: [
+            vb.xg_to_prob(h["xg_for"], h["xg_against"], a["xg_for"], a["xg_against"])
+            for h, a in pairs], len(pairs))
+        suite.time("parse_h2h", lambda: [parse_h2h(e) for e in events], len(events))
+        suite.time("find_value_bets", lambda: vb.find_value_bets(
+            events, team_stats, min_value_pct=0.0, markets=["h2h", "totals"]), len(events))
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "python": platform.python_version(), "machine": platform.machine(),
+            "seasons": args.seasons, "leagues": args.leagues, "seed": args.seed,
+            "repeat": args.repeat, "rows": counts,
+        },
+        "results": suite.results,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> bool:
+    scale = ("seasons", "leagues", "seed")
+    if any(report["meta"][k] != baseline["meta"].get(k) for k in scale):
+        print("⚠️  Référence à une autre échelle ("
+              + ", ".join(f"{k}={baseline['meta'].get(k)}" for k in scale) + ") — comparaison ignorée")
+        return True
+    ok = True
+    print(f"\n── Comparaison à la référence du {baseline['meta'].get('created_at')} "
+          f"(tolérance +{tolerance:.0%})")
+    for name, res in report["results"].items():
+        ref = baseline["results"].get(name)
+        if not ref:
+            print(f"  {name:<28} (nouveau)")
+            continue
+        ratio = res["best_s"] / ref["best_s"] if ref["best_s"] else 1.0
+        flag = "❌" if ratio > 1 + tolerance else "✅"
+        ok &= ratio <= 1 + tolerance
+        print(f"  {flag} {name:<26} {ref['best_s'] * 1000:9.2f} → {res['best_s'] * 1000:9.2f} ms  ×{ratio:.2f}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks euro-top")
+    parser.add_argument("--seasons", type=int, default=1, help="1 à 50")
+    parser.add_argument("--leagues", type=int, default=8, help="1 à 8 (championnats d'abord)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Écrit les résultats JSON dans ce fichier")
+    parser.add_argument("--baseline", help="Référence JSON à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Ralentissement toléré vs référence (0.25 = +25 %%)")
+    parser.add_argument("--save-baseline", metavar="FICHIER",
+                        help="Enregistre ce run comme référence")
+    args = parser.parse_args()
+    if not 1 <= args.seasons <= 50 or not 1 <= args.leagues <= 8:
+        parser.error("--seasons entre 1 et 50, --leagues entre 1 et 8")
+
+    report = run(args)
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n  → {path}")
+
+    ok = True
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            ok = compare(report, json.load(f), args.tolerance)
+    print(f"\n{'✅ OK' if ok else '❌ ÉCHEC'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,29 +6,35 @@ Usage :
     euro-top passeurs --league pl
     euro-top xg --league laliga --last 10
     euro-top distance --league bundesliga --last 5
+    euro-top stats --league pl --keys ball_possession,total_shots --team
+    euro-top elo --league pl --date 2025-01-01
     euro-top rapport
+    euro-top sql "SELECT team, avg(xg_for) FROM team_matches GROUP BY 1"
+    euro-top analyze xg_trend --league pl --window 5
     euro-top collect --league all
+    euro-top collect --league ligue1 --sofascore
+    euro-top live --league pl
+    euro-top serve --port 8765
+    euro-top mock --latency 80 --error-rate 0.05
+    euro-top daemon start | status
+    euro-top backfill run --seasons 2021-2025 | status
+    euro-top perf --hours 24
+    euro-top --profile rapport           (profilage : cProfile + requêtes SQL)
 """
 import os, sys
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if not __package__:  # Lancé directement (python cli/main.py), hors entry point
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from typing import Optional
 import typer
 from rich.console import Console
 from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 from rich.panel import Panel
 from rich.text import Text
 from rich import box
 
 from euro_top.config import resolve_league, all_leagues, domestic_leagues, SEASON
-from euro_top.db import (
-    init_db, get_session,
-    get_standings, get_top_scorers, get_top_assisters,
-    get_recent_matches, get_matches_with_xg, get_xg_by_team,
-    get_matches_with_distance, get_distance_by_team,
-    count_api_calls_today,
-)
+from euro_top.export import FORMATS
 
 app = typer.Typer(
     name="euro-top",
@@ -42,6 +48,33 @@ app = typer.Typer(
 console = Console()
 
 
+@app.callback()
+def _global_options(
+    ctx: typer.Context,
+    profile: bool = typer.Option(False, "--profile",
+                                 help="Profile la commande (fonctions, requêtes SQL, N+1) → stderr"),
+    profile_mode: str = typer.Option("cprofile", "--profile-mode",
+                                     help="cprofile (déterministe) ou sample (échantillonnage)"),
+    profile_out: Optional[str] = typer.Option(None, "--profile-out",
+                                              help="Répertoire : pstats / piles + queries.json"),
+):
+    """Options communes à toutes les commandes (EURO_TOP_PROFILE=1 équivaut à --profile)."""
+    mode = profile_mode if profile else None
+    if not mode and os.getenv("EURO_TOP_PROFILE"):
+        from euro_top.profiling import env_mode
+        mode = env_mode()
+    if not mode:
+        return
+    from euro_top.profiling import MODES, Profiler
+    if mode not in MODES:
+        raise typer.BadParameter(f"'{mode}' — choix : {', '.join(MODES)}",
+                                 param_hint="--profile-mode")
+    profiler = Profiler(mode, profile_out or os.getenv("EURO_TOP_PROFILE_OUT"),
+                        label=ctx.invoked_subcommand or "")
+    profiler.start()
+    ctx.call_on_close(profiler.stop)
+
+
 def _get_league_or_exit(league_str: str):
     league = resolve_league(league_str)
     if not league:
@@ -51,6 +84,53 @@ def _get_league_or_exit(league_str: str):
     return league
 
 
+def _check_format(value: str) -> str:
+    if value not in FORMATS:
+        raise typer.BadParameter(f"'{value}' — choix : {', '.join(FORMATS)}")
+    return value
+
+
+def _format_option():
+    return typer.Option("table", "--format", "-f", callback=_check_format,
+                        help="Sortie : table, json, ndjson, csv (flux, sans tableau)")
+
+
+def _season_option():
+    return typer.Option(str(SEASON), "--season", "-s",
+                        help="Saison (ex: 2024) ; 'all' = toutes (formats json, ndjson, csv)")
+
+
+def _season_scope(season_str: str, fmt: str) -> int | None:
+    """Saison ciblée ; 'all' (toutes les saisons → None) accepté hors format table."""
+    if season_str.lower() == "all":
+        if fmt == "table":
+            console.print("[red]--season all : uniquement avec --format json, ndjson ou csv[/red]")
+            raise typer.Exit(1)
+        return None
+    try:
+        return int(season_str)
+    except ValueError:
+        raise typer.BadParameter(f"'{season_str}' — saison attendue (ex: 2024) ou 'all'")
+
+
+def _league_scope(league_str: str, fmt: str):
+    """Ligue ciblée ; 'all' (toutes les ligues → None) accepté hors format table."""
+    if fmt != "table" and league_str.lower() == "all":
+        return None
+    return _get_league_or_exit(league_str)
+
+
+def _stream(fmt: str, stmt) -> None:
+    """Écrit le résultat d'une requête Core sur stdout, ligne par ligne."""
+    from euro_top.db import get_session, iter_rows
+    from euro_top.export import write_rows
+    db = get_session()
+    try:
+        write_rows(iter_rows(db, stmt), fmt, sys.stdout)
+    finally:
+        db.close()
+
+
 def _form_colored(form: str | None) -> str:
     if not form:
         return ""
@@ -82,10 +162,15 @@ def _xg_bar(xg: float, max_xg: float = 3.5, width: int = 12) -> str:
 @app.command()
 def classement(
     league: str = typer.Option(..., "--league", "-l", help="Ligue (ligue1, pl, laliga…)"),
-    season: int = typer.Option(SEASON, "--season", "-s", help="Saison (ex: 2024)"),
+    season: str = _season_option(),
+    fmt: str = _format_option(),
 ):
     """🏆 Classement d'une ligue."""
-    lg = _get_league_or_exit(league)
+    from euro_top.db import get_session, get_standings, select_standings
+    lg = _league_scope(league, fmt)
+    season = _season_scope(season, fmt)
+    if fmt != "table":
+        return _stream(fmt, select_standings(lg.id if lg else None, season))
     db = get_session()
     rows = get_standings(db, lg.id, season)
     db.close()
@@ -129,11 +214,16 @@ def classement(
 @app.command()
 def resultats(
     league: str = typer.Option(..., "--league", "-l"),
-    season: int = typer.Option(SEASON, "--season", "-s"),
+    season: str = _season_option(),
     last:   int = typer.Option(10, "--last", "-n", help="Nombre de matchs à afficher"),
+    fmt: str = _format_option(),
 ):
     """📋 Résultats récents."""
-    lg = _get_league_or_exit(league)
+    from euro_top.db import get_session, get_recent_matches, select_recent_matches
+    lg = _league_scope(league, fmt)
+    season = _season_scope(season, fmt)
+    if fmt != "table":
+        return _stream(fmt, select_recent_matches(lg.id if lg else None, season, last))
     db = get_session()
     matches = get_recent_matches(db, lg.id, season, last)
     db.close()
@@ -168,11 +258,16 @@ def resultats(
 @app.command()
 def buteurs(
     league: str = typer.Option(..., "--league", "-l"),
-    season: int = typer.Option(SEASON, "--season", "-s"),
+    season: str = _season_option(),
     top:    int = typer.Option(20, "--top", "-n"),
+    fmt: str = _format_option(),
 ):
     """⚽ Top buteurs."""
-    lg = _get_league_or_exit(league)
+    from euro_top.db import get_session, get_top_scorers, select_top_players
+    lg = _league_scope(league, fmt)
+    season = _season_scope(season, fmt)
+    if fmt != "table":
+        return _stream(fmt, select_top_players(lg.id if lg else None, season, "goals", top))
     db = get_session()
     players = get_top_scorers(db, lg.id, season, top)
     db.close()
@@ -193,14 +288,16 @@ def buteurs(
     t.add_column("Passes D.", justify="right", style="cyan", width=9)
     t.add_column("Matchs",  justify="right", style="dim", width=7)
     t.add_column("xG",      justify="right", style="magenta", width=7)
+    t.add_column("xA",      justify="right", style="blue", width=7)
 
     for i, p in enumerate(players, 1):
         pen = f"({p.penalties})" if p.penalties else "—"
-        xg  = f"{p.xg:.2f}" if p.xg else "—"
+        xg  = f"{p.xg:.2f}" if p.xg is not None else "—"
+        xa  = f"{p.xa:.2f}" if p.xa is not None else "—"
         t.add_row(
             str(i), p.name or "—", p.team or "—",
             str(p.goals), pen,
-            str(p.assists), str(p.matches_played), xg,
+            str(p.assists), str(p.matches_played), xg, xa,
         )
 
     console.print(t)
@@ -211,11 +308,16 @@ def buteurs(
 @app.command()
 def passeurs(
     league: str = typer.Option(..., "--league", "-l"),
-    season: int = typer.Option(SEASON, "--season", "-s"),
+    season: str = _season_option(),
     top:    int = typer.Option(15, "--top", "-n"),
+    fmt: str = _format_option(),
 ):
     """🎯 Top passeurs décisifs."""
-    lg = _get_league_or_exit(league)
+    from euro_top.db import get_session, get_top_assisters, select_top_players
+    lg = _league_scope(league, fmt)
+    season = _season_scope(season, fmt)
+    if fmt != "table":
+        return _stream(fmt, select_top_players(lg.id if lg else None, season, "assists", top))
     db = get_session()
     players = get_top_assisters(db, lg.id, season, top)
     db.close()
@@ -234,11 +336,15 @@ def passeurs(
     t.add_column("Passes D.", justify="right", style="cyan bold", width=9)
     t.add_column("Buts",     justify="right", style="green", width=6)
     t.add_column("Matchs",   justify="right", style="dim", width=7)
+    t.add_column("xA",       justify="right", style="blue", width=7)
+    t.add_column("xG",       justify="right", style="magenta", width=7)
 
     for i, p in enumerate(players, 1):
         t.add_row(
             str(i), p.name or "—", p.team or "—",
             str(p.assists), str(p.goals), str(p.matches_played),
+            f"{p.xa:.2f}" if p.xa is not None else "—",
+            f"{p.xg:.2f}" if p.xg is not None else "—",
         )
 
     console.print(t)
@@ -249,12 +355,22 @@ def passeurs(
 @app.command()
 def xg(
     league: str = typer.Option(..., "--league", "-l"),
-    season: int = typer.Option(SEASON, "--season", "-s"),
+    season: str = _season_option(),
     last:   int = typer.Option(10, "--last", "-n", help="Derniers N matchs avec xG"),
     by_team: bool = typer.Option(False, "--team", "-t", help="Vue par équipe (saison entière)"),
+    fmt: str = _format_option(),
 ):
     """📊 Expected Goals (xG) — par match ou par équipe."""
-    lg = _get_league_or_exit(league)
+    from euro_top.db import (
+        get_session, get_matches_with_xg, get_xg_by_team,
+        select_recent_matches, select_xg_by_team,
+    )
+    lg = _league_scope(league, fmt)
+    season = _season_scope(season, fmt)
+    if fmt != "table":
+        league_id = lg.id if lg else None
+        return _stream(fmt, select_xg_by_team(league_id, season) if by_team
+                       else select_recent_matches(league_id, season, last, with_xg=True))
     db = get_session()
 
     if by_team:
@@ -278,15 +394,15 @@ def xg(
         t.add_column("Diff xG",    justify="right", style="bold", width=9)
 
         for i, row in enumerate(data, 1):
-            diff = row.get("xg_diff", 0)
+            diff = row.xg_diff
             diff_str = f"+{diff:.2f}" if diff >= 0 else f"{diff:.2f}"
             diff_color = "green" if diff >= 0 else "red"
             t.add_row(
-                str(i), row["team"], str(row["matches"]),
-                f"{row['xg_for']:.2f}",
-                f"{row.get('xg_for_avg', 0):.2f}",
-                f"{row['xg_against']:.2f}",
-                f"{row.get('xg_against_avg', 0):.2f}",
+                str(i), row.team, str(row.matches),
+                f"{row.xg_for:.2f}",
+                f"{row.xg_for_avg:.2f}",
+                f"{row.xg_against:.2f}",
+                f"{row.xg_against_avg:.2f}",
                 f"[{diff_color}]{diff_str}[/{diff_color}]",
             )
     else:
@@ -320,16 +436,135 @@ def xg(
     console.print(t)
 
 
+# ── stats ────────────────────────────────────────────────────────────────────
+
+@app.command()
+def stats(
+    league: str = typer.Option(..., "--league", "-l"),
+    season: str = _season_option(),
+    keys: Optional[str] = typer.Option(None, "--keys", "-k",
+                                       help="Statistiques, séparées par des virgules "
+                                            "(sans : liste des clés disponibles)"),
+    by_team: bool = typer.Option(False, "--team", "-t", help="Moyennes par équipe"),
+    club: Optional[str] = typer.Option(None, "--club", help="Matchs d'une seule équipe"),
+    last: int = typer.Option(20, "--last", "-n", help="Nombre de lignes (vue par match)"),
+    fmt: str = _format_option(),
+):
+    """📈 Statistiques complètes de match (Sofascore) : possession, tirs, corners…"""
+    from euro_top.db import (
+        get_session, iter_rows, select_match_stats, select_stat_keys, select_team_stats,
+    )
+    if not keys:
+        if fmt != "table":
+            return _stream(fmt, select_stat_keys())
+        db = get_session()
+        rows = list(iter_rows(db, select_stat_keys()))
+        db.close()
+        if not rows:
+            console.print("[yellow]Aucune statistique. "
+                          "Lance : euro-top collect --league ligue1 --sofascore[/yellow]")
+            raise typer.Exit()
+        t = Table(title="Statistiques disponibles (--keys)", box=box.ROUNDED, header_style="bold cyan")
+        t.add_column("Clé", style="bold")
+        t.add_column("Libellé Sofascore")
+        t.add_column("Matchs", justify="right")
+        for r in rows:
+            t.add_row(r["key"], r["name"] or "—", str(r["matches"]))
+        console.print(t)
+        return
+
+    key_list = [k.strip() for k in keys.split(",") if k.strip()]
+    lg = _league_scope(league, fmt)
+    season = _season_scope(season, fmt)
+    league_id = lg.id if lg else None
+    stmt = (select_team_stats(league_id, season, key_list) if by_team
+            else select_match_stats(league_id, season, key_list, club,
+                                    None if fmt != "table" else last))
+    if fmt != "table":
+        return _stream(fmt, stmt)
+    db = get_session()
+    rows = list(iter_rows(db, stmt))
+    db.close()
+    if not rows:
+        console.print(f"[yellow]Aucune statistique ({', '.join(key_list)}) pour {lg.name}. "
+                      f"Lance : euro-top collect --league {lg.short} --sofascore[/yellow]")
+        raise typer.Exit()
+
+    t = Table(
+        title=f"{lg.flag} Stats {'par équipe (moy./match)' if by_team else 'par match'} — "
+              f"{lg.name} {season}/{season+1}",
+        box=box.ROUNDED, header_style="bold green",
+    )
+    fixed = ["team", "matches"] if by_team else ["match_date", "team", "opponent"]
+    for c in fixed:
+        t.add_column(c, style="bold" if c == "team" else "dim")
+    for k in key_list:
+        t.add_column(k, justify="right")
+    for r in rows:
+        t.add_row(*(str(r[c]) for c in fixed),
+                  *("—" if r[k] is None else f"{r[k]:g}" for k in key_list))
+    console.print(t)
+
+
+# ── forme ────────────────────────────────────────────────────────────────────
+
+@app.command()
+def forme(
+    league: str = typer.Option(..., "--league", "-l"),
+    season: int = typer.Option(SEASON, "--season", "-s"),
+    last:   int = typer.Option(5, "--last", "-n", help="Derniers N matchs par joueur"),
+    top:    int = typer.Option(20, "--top"),
+):
+    """🔥 Forme joueurs — xG + xA sur les N derniers matchs (Understat)."""
+    from euro_top.db import get_session, get_player_form
+    lg = _get_league_or_exit(league)
+    db = get_session()
+    rows = get_player_form(db, lg.id, season, last, top)
+    db.close()
+
+    if not rows:
+        console.print(f"[yellow]Aucun xG joueur. "
+                      f"Lance : euro-top collect --league {lg.short} --xg[/yellow]")
+        raise typer.Exit()
+
+    t = Table(
+        title=f"{lg.flag} Forme — {lg.name} ({last} derniers matchs par joueur)",
+        box=box.ROUNDED, header_style="bold red",
+    )
+    t.add_column("#",       width=4, style="dim", justify="right")
+    t.add_column("Joueur",  style="bold", min_width=22)
+    t.add_column("Club",    min_width=18)
+    t.add_column("Min.",    justify="right", style="dim", width=6)
+    t.add_column("xG",      justify="right", style="magenta", width=7)
+    t.add_column("xA",      justify="right", style="blue", width=7)
+    t.add_column("xG+xA /90", justify="right", style="bold", width=10)
+
+    for i, r in enumerate(rows, 1):
+        xg_, xa_ = r["xg"] or 0, r["xa"] or 0
+        per90 = (xg_ + xa_) * 90 / r["minutes"] if r["minutes"] else 0
+        t.add_row(
+            str(i), r["player_name"] or "—", r["team"] or "—",
+            str(r["minutes"]), f"{xg_:.2f}", f"{xa_:.2f}", f"{per90:.2f}",
+        )
+
+    console.print(t)
+
+
 # ── distance ─────────────────────────────────────────────────────────────────
 
 @app.command()
 def distance(
     league: str = typer.Option(..., "--league", "-l"),
-    season: int = typer.Option(SEASON, "--season", "-s"),
+    season: str = _season_option(),
     last:   int = typer.Option(10, "--last", "-n", help="Fenêtre derniers matchs"),
+    fmt: str = _format_option(),
 ):
     """🏃 Distance couverte (km) par équipe par match."""
-    lg = _get_league_or_exit(league)
+    from euro_top.db import get_session, get_distance_by_team, select_distance_by_team
+    lg = _league_scope(league, fmt)
+    season = _season_scope(season, fmt)
+    if fmt != "table":
+        return _stream(fmt, select_distance_by_team(lg.id if lg else None, season, last))
     db = get_session()
     data = get_distance_by_team(db, lg.id, season, last)
     db.close()
@@ -350,16 +585,16 @@ def distance(
     t.add_column("Total km", justify="right", style="dim", width=10)
     t.add_column("Intensité", width=16)
 
-    max_km = max((r["avg_km"] for r in data), default=120)
+    max_km = max((r.avg_km for r in data), default=120)
     for i, row in enumerate(data, 1):
-        avg = row["avg_km"]
+        avg = row.avg_km
         bar_len = int((avg / max_km) * 12)
         bar = "█" * bar_len + "░" * (12 - bar_len)
         t.add_row(
-            str(i), row["team"],
-            str(row["matches"]),
+            str(i), row.team,
+            str(row.matches),
             f"{avg:.1f}",
-            f"{row['total_km']:.0f}",
+            f"{row.total_km:.0f}",
             bar,
         )
 
@@ -371,31 +606,35 @@ def distance(
 @app.command()
 def rapport(
     season: int = typer.Option(SEASON, "--season", "-s"),
+    fmt: str = _format_option(),
 ):
     """📰 Rapport récap — toutes ligues (classement + buteur #1 + xG top)."""
+    from euro_top.db import get_session, get_league_report
+    leagues = all_leagues()
     db = get_session()
+    report = get_league_report(db, [lg.id for lg in leagues], season)
+    db.close()
+
+    if fmt != "table":
+        from euro_top.export import write_rows
+        write_rows(_report_rows(leagues, report, season), fmt, sys.stdout)
+        return
 
     console.print(Panel(
         f"⚽ [bold white]euro-top rapport — Saison {season}/{season+1}[/bold white]",
         style="bold blue"
     ))
 
-    for league in all_leagues():
-        standings = get_standings(db, league.id, season)
-        if not standings:
+    for league in leagues:
+        data = report.get(league.id)
+        if not data:
             continue
 
-        top3 = standings[:3]
+        standings = data["standings"]
         leader = standings[0]
-
-        scorers = get_top_scorers(db, league.id, season, 1)
-        top_scorer = scorers[0] if scorers else None
-
-        assisters = get_top_assisters(db, league.id, season, 1)
-        top_assister = assisters[0] if assisters else None
-
-        xg_data = get_xg_by_team(db, league.id, season)
-        top_xg = xg_data[0] if xg_data else None
+        top_scorer = data["top_scorer"]
+        top_assister = data["top_assister"]
+        top_xg = data["top_xg"]
 
         t = Table(
             title=f"{league.flag} {league.name}",
@@ -405,28 +644,227 @@ def rapport(
         t.add_column("", style="dim", width=20)
         t.add_column("", style="bold")
 
-        t.add_row("🥇 Leader", f"{leader.team} ({leader.points} pts, {leader.played} J)")
+        t.add_row("🥇 Leader", f"{leader['team']} ({leader['points']} pts, {leader['played']} J)")
         if len(standings) >= 2:
-            t.add_row("🥈 2e", f"{standings[1].team} ({standings[1].points} pts)")
+            t.add_row("🥈 2e", f"{standings[1]['team']} ({standings[1]['points']} pts)")
         if len(standings) >= 3:
-            t.add_row("🥉 3e", f"{standings[2].team} ({standings[2].points} pts)")
+            t.add_row("🥉 3e", f"{standings[2]['team']} ({standings[2]['points']} pts)")
 
         if top_scorer:
             t.add_row("⚽ Top buteur",
-                      f"{top_scorer.name} ({top_scorer.team}) — {top_scorer.goals} buts")
+                      f"{top_scorer['name']} ({top_scorer['team']}) — {top_scorer['goals']} buts")
         if top_assister:
             t.add_row("🎯 Top passeur",
-                      f"{top_assister.name} ({top_assister.team}) — {top_assister.assists} PD")
+                      f"{top_assister['name']} ({top_assister['team']}) — "
+                      f"{top_assister['assists']} PD")
         if top_xg:
             t.add_row("📊 Top xG",
                       f"{top_xg['team']} — {top_xg['xg_for']:.1f} xGF "
-                      f"({top_xg.get('xg_for_avg', 0):.2f}/match)")
+                      f"({top_xg['xg_for_avg']:.2f}/match)")
 
         console.print(t)
         console.print()
 
+
+def _report_rows(leagues, report: dict, season: int):
+    """Une ligne à plat par ligue (formats machine du rapport)."""
+    for league in leagues:
+        data = report.get(league.id)
+        if not data:
+            continue
+        row = {"league_id": league.id, "league": league.short, "season": season}
+        podium = data["standings"] + [{}] * (3 - len(data["standings"]))
+        for i, st in enumerate(podium[:3], 1):
+            row[f"rank{i}_team"], row[f"rank{i}_points"] = st.get("team"), st.get("points")
+        for key, stat in (("top_scorer", "goals"), ("top_assister", "assists")):
+            p = data[key] or {}
+            row[key], row[f"{key}_team"], row[f"{key}_{stat}"] = (
+                p.get("name"), p.get("team"), p.get(stat))
+        top_xg = data["top_xg"] or {}
+        xg_for = top_xg.get("xg_for")
+        row["top_xg_team"] = top_xg.get("team")
+        row["top_xg"] = round(xg_for, 2) if xg_for is not None else None
+        yield row
+
+
+# ── elo ──────────────────────────────────────────────────────────────────────
+
+@app.command()
+def elo(
+    league: str = typer.Option(..., "--league", "-l",
+                               help="Ligue (cl/el/ecl → pool européen commun)"),
+    as_of: Optional[str] = typer.Option(None, "--date", "-d",
+                                        help="Ratings à cette date (AAAA-MM-JJ)"),
+    use_xg: bool = typer.Option(False, "--xg", help="Variante xG au lieu des buts"),
+    top: int = typer.Option(25, "--top", "-n"),
+    rebuild: bool = typer.Option(False, "--rebuild",
+                                 help="Rejoue tout l'historique du pool avant affichage"),
+):
+    """📈 Ratings Elo des équipes (buts ou xG), à n'importe quelle date."""
+    from datetime import date as _date
+    from euro_top.db import init_db, get_session
+    from euro_top.ratings import get_ratings, rating_pool, rebuild_ratings
+
+    lg = _get_league_or_exit(league)
+    pool = rating_pool(lg.id)
+    variant = "xg" if use_xg else "goals"
+    try:
+        day = _date.fromisoformat(as_of) if as_of else None
+    except ValueError:
+        console.print(f"[red]Date invalide : '{as_of}' (format AAAA-MM-JJ)[/red]")
+        raise typer.Exit(1)
+
+    init_db()
+    db = get_session()
+    if rebuild:
+        n = rebuild_ratings(db, pool, variant)
+        console.print(f"[dim]Pool {pool} rejoué : {n} matchs[/dim]")
+    rows = get_ratings(db, pool, variant, as_of=day)[:top]
     db.close()
 
+    if not rows:
+        console.print(f"[yellow]Aucun rating. Lance : euro-top collect --league {lg.short}[/yellow]")
+        raise typer.Exit()
+
+    scope = "Europe (CL/EL/ECL)" if pool == "europe" else lg.name
+    t = Table(
+        title=f"{lg.flag} Elo {'xG' if use_xg else 'buts'} — {scope}"
+              + (f" au {day.strftime('%d/%m/%Y')}" if day else ""),
+        box=box.ROUNDED, header_style="bold green",
+    )
+    t.add_column("#",        width=4, style="dim", justify="right")
+    t.add_column("Équipe",   style="bold", min_width=22)
+    t.add_column("Elo",      justify="right", style="green bold", width=8)
+    t.add_column("Matchs",   justify="right", style="dim", width=7)
+    t.add_column("Dernier match", style="dim", width=13)
+
+    for i, r in enumerate(rows, 1):
+        t.add_row(
+            str(i), r["team"], f"{r['rating']:.0f}", str(r["matches"]),
+            r["last_match"].strftime("%d/%m/%Y") if r["last_match"] else "—",
+        )
+
+    console.print(t)
+
+
+# ── archive ──────────────────────────────────────────────────────────────────
+
+@app.command()
+def archive(
+    league: str = typer.Option("all", "--league", "-l", help="Ligue ou 'all'"),
+    season: Optional[int] = typer.Option(None, "--season", "-s",
+                                         help="Saison (défaut : toutes)"),
+    fmt: str = typer.Option("arrow", "--format", "-f",
+                            help="arrow (IPC, mmap zéro copie) ou parquet (zstd)"),
+):
+    """🗄️  Archive colonnaire par ligue × saison (data/archive/, pyarrow requis)."""
+    from euro_top.archive import ARCHIVE_DIR, FORMATS, write_archive
+    from euro_top.db import init_db, get_session
+    if fmt not in FORMATS:
+        console.print(f"[red]Format inconnu : '{fmt}' ({', '.join(FORMATS)})[/red]")
+        raise typer.Exit(1)
+    league_ids = None if league.lower() == "all" else [_get_league_or_exit(league).id]
+
+    init_db()
+    db = get_session()
+    try:
+        paths = write_archive(db, league_ids, [season] if season else None, fmt=fmt)
+    except ImportError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+    finally:
+        db.close()
+
+    size = sum(p.stat().st_size for p in paths)
+    console.print(f"[green]{len(paths)} fichier(s) {fmt}[/green] → {ARCHIVE_DIR} "
+                  f"[dim]({size / 1024:,.0f} Ko)[/dim]")
+
+
+# ── sql / analyze (DuckDB) ───────────────────────────────────────────────────
+
+def _duckdb_or_exit():
+    from euro_top.analytics import connect
+    try:
+        return connect()
+    except (ImportError, ValueError) as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+
+
+def _print_result(title: str, columns: list[str], rows: list[tuple], fmt: str, limit: int):
+    if fmt != "table":
+        from euro_top.export import write_rows
+        write_rows((dict(zip(columns, r)) for r in rows), fmt, sys.stdout)
+        return
+    if not rows:
+        console.print("[yellow]Aucune ligne.[/yellow]")
+        return
+    t = Table(title=title, box=box.ROUNDED, header_style="bold cyan")
+    for c in columns:
+        t.add_column(c)
+    for r in rows[:limit]:
+        t.add_row(*("—" if v is None else f"{v:g}" if isinstance(v, float) else str(v)
+                    for v in r))
+    console.print(t)
+    if len(rows) > limit:
+        console.print(f"[dim]{limit} / {len(rows)} lignes affichées (--limit)[/dim]")
+
+
+@app.command("sql")
+def sql_query(
+    query: str = typer.Argument(..., help="Requête DuckDB (vues : matches, team_matches, "
+                                          "players, standings, exports…)"),
+    fmt: str = _format_option(),
+    limit: int = typer.Option(50, "--limit", "-n", help="Lignes affichées (format table)"),
+):
+    """🦆 Requête SQL DuckDB sur la base et les exports data/ (duckdb requis)."""
+    from euro_top.analytics import sql, views
+    con = _duckdb_or_exit()
+    try:
+        columns, rows = sql(con, query)
+    except Exception as e:          # Erreur de syntaxe / catalogue DuckDB
+        console.print(f"[red]{e}[/red]\n[dim]Vues : {', '.join(views(con))}[/dim]")
+        raise typer.Exit(1)
+    finally:
+        con.close()
+    _print_result("🦆 SQL", columns, rows, fmt, limit)
+
+
+@app.command()
+def analyze(
+    name: Optional[str] = typer.Argument(None, help="Analyse (sans argument : liste)"),
+    league: str = typer.Option("all", "--league", "-l", help="Ligue ou 'all'"),
+    season: Optional[int] = typer.Option(None, "--season", "-s",
+                                         help="Saison (défaut : toutes)"),
+    window: int = typer.Option(5, "--window", "-w", help="Fenêtre glissante (matchs)"),
+    fmt: str = _format_option(),
+    limit: int = typer.Option(50, "--limit", "-n", help="Lignes affichées (format table)"),
+):
+    """📐 Analyses vectorisées DuckDB : tendances xG, efficacité, forme (duckdb requis)."""
+    from euro_top.analytics import QUERIES, run_query
+    if name is None:
+        t = Table(title="📐 Analyses disponibles", box=box.ROUNDED, header_style="bold cyan")
+        t.add_column("Nom", style="bold")
+        t.add_column("Description")
+        for key, (description, _) in QUERIES.items():
+            t.add_row(key, description)
+        console.print(t)
+        return
+    if name not in QUERIES:
+        console.print(f"[red]Analyse inconnue : '{name}' ({', '.join(QUERIES)})[/red]")
+        raise typer.Exit(1)
+    league_id = None if league.lower() == "all" else _get_league_or_exit(league).id
+
+    con = _duckdb_or_exit()
+    try:
+        columns, rows = run_query(con, name, league_id, season, window)
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+    finally:
+        con.close()
+    _print_result(f"📐 {QUERIES[name][0]}", columns, rows, fmt, limit)
+
 
 # ── collect ──────────────────────────────────────────────────────────────────
 
@@ -440,9 +878,23 @@ def collect(
     match_stats: bool = typer.Option(False, "--stats",
                                      help="Récupère stats par match (xG + km, coûte 1 req/match)"),
     last: int = typer.Option(5, "--last",
-                             help="Nb matchs récents pour --stats"),
+                             help="Nb matchs récents pour --stats / --sofascore"),
+    sofascore: bool = typer.Option(False, "--sofascore",
+                                   help="Stats complètes Sofascore des derniers matchs (table match_stats)"),
+    force: bool = typer.Option(False, "--force",
+                               help="Ignore la fraîcheur : appelle tous les endpoints"),
 ):
-    """📥 Collecte les données depuis l'API et Understat."""
+    """📥 Collecte les données depuis l'API et Understat (endpoints déjà à jour sautés)."""
+    from euro_top import metrics
+    with metrics.run("collect"):
+        _collect(league, season, xg_stats, match_stats, last, force, sofascore)
+
+
+def _collect(league: str, season: int, xg_stats: bool, match_stats: bool, last: int,
+             force: bool = False, sofascore: bool = False):
+    from euro_top import metrics
+    from euro_top.db import init_db, get_session, count_api_calls_today
+    from euro_top.telemetry import flush
     init_db()
     db = get_session()
 
@@ -464,9 +916,10 @@ def collect(
         leagues = [lg]
 
     from euro_top.collectors.api_football import ApiFootballClient, RateLimitError
-    from euro_top.collectors.understat import scrape_league_xg
+    from euro_top.collectors.understat import scrape_league_xg, load_player_xg
+    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 
-    client = ApiFootballClient(db)
+    client = ApiFootballClient(db, force=force)
 
     with Progress(
         SpinnerColumn(),
@@ -478,58 +931,460 @@ def collect(
             task = progress.add_task(f"{lg.flag} {lg.name}", total=4)
 
             try:
-                # 1. Classement
-                progress.update(task, description=f"{lg.flag} {lg.name} — classement")
-                client.fetch_standings(lg.id, season)
+                # 1. Résultats (d'abord : ils disent si le reste a changé)
+                progress.update(task, description=f"{lg.flag} {lg.name} — résultats")
+                with metrics.stage("fixtures", lg.short):
+                    fixtures = client.fetch_fixtures(lg.id, season)
                 progress.advance(task)
 
-                # 2. Résultats
-                progress.update(task, description=f"{lg.flag} {lg.name} — résultats")
-                fixtures = client.fetch_fixtures(lg.id, season)
+                # 2. Classement
+                progress.update(task, description=f"{lg.flag} {lg.name} — classement")
+                with metrics.stage("standings", lg.short):
+                    client.fetch_standings(lg.id, season)
                 progress.advance(task)
 
                 # 3. Buteurs
                 progress.update(task, description=f"{lg.flag} {lg.name} — buteurs")
-                client.fetch_top_scorers(lg.id, season)
+                with metrics.stage("topscorers", lg.short):
+                    client.fetch_top_scorers(lg.id, season)
                 progress.advance(task)
 
                 # 4. Passeurs
                 progress.update(task, description=f"{lg.flag} {lg.name} — passeurs")
-                client.fetch_top_assisters(lg.id, season)
+                with metrics.stage("topassists", lg.short):
+                    client.fetch_top_assisters(lg.id, season)
                 progress.advance(task)
 
                 # 5. xG via Understat (top 5 ligues uniquement)
                 if xg_stats and lg.understat_slug:
                     progress.update(task, description=f"{lg.flag} {lg.name} — xG Understat")
-                    scrape_league_xg(lg.understat_slug, lg.id, season, db)
+                    with metrics.stage("understat", lg.short):
+                        load_player_xg(lg.understat_slug, lg.id, season, db)
+                        scrape_league_xg(lg.understat_slug, lg.id, season, db)
 
                 # 6. Stats par match via API (coûteux)
                 if match_stats:
+                    if not fixtures:            # Résultats à jour : derniers matchs en base
+                        from euro_top.db import iter_rows, select_recent_matches
+                        fixtures = [{**r, "status": "FT"} for r in
+                                    iter_rows(db, select_recent_matches(lg.id, season, last))]
                     ft_fixtures = [f for f in fixtures if f.get("status") == "FT"][:last]
                     for fx in ft_fixtures:
                         try:
-                            client.fetch_fixture_stats(
-                                fx["id"], lg.id,
-                                fx.get("home_team", ""),
-                                fx.get("away_team", ""),
-                                season
-                            )
-                        except RateLimitError:
+                            with metrics.stage("fixture_stats", lg.short):
+                                client.fetch_fixture_stats(
+                                    fx["id"], lg.id,
+                                    fx.get("home_team", ""),
+                                    fx.get("away_team", ""),
+                                    season
+                                )
+                        except RateLimitError as e:
+                            metrics.failure(lg.short, e)
                             console.print("[yellow]Quota atteint, arrêt des stats par match.[/yellow]")
                             break
 
+                # 7. Stats complètes Sofascore (journées des matchs sans stats)
+                if sofascore:
+                    from euro_top.collectors.sofascore import TOURNAMENT_IDS, fetch_round_stats
+                    from euro_top.db import missing_stats_days
+                    days = missing_stats_days(db, lg.id, season, last)
+                    if days and lg.short in TOURNAMENT_IDS:
+                        progress.update(task, description=f"{lg.flag} {lg.name} — stats Sofascore")
+                        with metrics.stage("sofascore", lg.short):
+                            fetch_round_stats(db, lg.id, lg.short, days)
+
             except RateLimitError as e:
+                metrics.failure(lg.short, e)
                 console.print(f"\n[red]{e}[/red]")
                 break
             except Exception as e:
+                metrics.failure(lg.short, e)
                 console.print(f"\n[red]Erreur [{lg.name}]: {e}[/red]")
                 continue
 
     client.close()
     db.close()
+    flush()
 
     used_after = count_api_calls_today(get_session())
     console.print(f"\n[green]✅ Collecte terminée. Quota utilisé : {used_after}/90[/green]")
+    if client.skipped:
+        console.print(f"[dim]{client.skipped} requête(s) évitée(s), données à jour "
+                      "(--force pour tout recollecter)[/dim]")
+
+
+# ── live ─────────────────────────────────────────────────────────────────────
+
+_PHASE_LABEL = {"pre": "[dim]à venir[/dim]", "live": "[bold green]LIVE[/bold green]",
+                "halftime": "[yellow]MT[/yellow]", "finished": "[bold]FT[/bold]"}
+
+
+def _live_table(title: str, watcher, event_ids, changes: dict) -> Table:
+    t = Table(title=title, box=box.SIMPLE_HEAD, header_style="bold white")
+    t.add_column("État", width=8)
+    t.add_column("Domicile", style="bold", min_width=20)
+    t.add_column("Score", justify="center", width=7)
+    t.add_column("Extérieur", min_width=20)
+    t.add_column("xG", justify="center", width=11)
+    t.add_column("Tirs", justify="center", width=7)
+    t.add_column("Poss.", justify="center", width=9)
+
+    def cell(text: str, fields: set, changed: set) -> str:
+        return f"[reverse]{text}[/reverse]" if fields & changed else text
+
+    def pair(snap, field, fmt):
+        h, a = snap[f"home_{field}"], snap[f"away_{field}"]
+        return "—" if h is None or a is None else f"{fmt(h)} | {fmt(a)}"
+
+    for eid in event_ids:
+        ev, snap = watcher.events[eid], watcher.snapshots[eid]
+        changed = changes.get(eid, set())
+        score = ("— - —" if snap["home_goals"] is None
+                 else f"{snap['home_goals']} - {snap['away_goals']}")
+        t.add_row(
+            _PHASE_LABEL[snap["phase"]], ev["home_team"],
+            cell(score, {"home_goals", "away_goals"}, changed), ev["away_team"],
+            cell(pair(snap, "xg", lambda v: f"{v:.2f}"), {"home_xg", "away_xg"}, changed),
+            cell(pair(snap, "shots", str), {"home_shots", "away_shots"}, changed),
+            cell(pair(snap, "possession", lambda v: f"{v}%"),
+                 {"home_possession", "away_possession"}, changed),
+        )
+    return t
+
+
+@app.command()
+def live(
+    league: str = typer.Option(..., "--league", "-l"),
+    day: Optional[str] = typer.Option(None, "--date", "-d",
+                                      help="Journée (AAAA-MM-JJ, défaut : aujourd'hui)"),
+    once: bool = typer.Option(False, "--once", help="Un seul relevé puis sortie"),
+):
+    """🔴 Suivi live d'une journée (Sofascore) — polling adaptatif, diff des lignes."""
+    import time as _time
+    from datetime import date as _date, datetime as _dt
+    from euro_top.collectors.sofascore import TOURNAMENT_IDS
+    from euro_top.db import init_db, get_session
+    from euro_top.live import LiveWatcher
+
+    lg = _get_league_or_exit(league)
+    if lg.short not in TOURNAMENT_IDS:
+        console.print(f"[red]Pas de tournoi Sofascore pour {lg.name}.[/red]")
+        raise typer.Exit(1)
+    try:
+        match_day = _date.fromisoformat(day) if day else _date.today()
+    except ValueError:
+        console.print(f"[red]Date invalide : '{day}' (format AAAA-MM-JJ)[/red]")
+        raise typer.Exit(1)
+
+    init_db()
+    db = get_session()
+    watcher = LiveWatcher(lg.short, lg.id, match_day)
+    first = True
+    try:
+        while True:
+            changes = watcher.poll()
+            if first and not watcher.snapshots:
+                console.print(f"[yellow]Aucun match {lg.name} le {match_day:%d/%m/%Y}.[/yellow]")
+                break
+            stamp = _dt.now().strftime("%H:%M:%S")
+            if first:
+                console.print(_live_table(f"{lg.flag} {lg.name} — {match_day:%d/%m/%Y}",
+                                          watcher, list(watcher.snapshots), {}))
+                first = False
+            elif changes:
+                console.print(_live_table(f"{stamp} — {len(changes)} match(s) modifié(s)",
+                                          watcher, list(changes), changes))
+
+            written = watcher.flush_finished(db)
+            if written:
+                console.print(f"[green]{stamp} — {written} match(s) terminé(s) enregistré(s)[/green]")
+
+            wait = watcher.interval()
+            if once or wait is None:
+                break
+            console.print(f"[dim]{stamp} — prochain relevé dans {wait:.0f} s "
+                          f"({watcher.requests} requêtes)[/dim]")
+            _time.sleep(wait)
+    except KeyboardInterrupt:
+        watcher.flush_finished(db)
+    finally:
+        db.close()
+    if watcher.done:
+        console.print("[bold]Tous les matchs sont terminés.[/bold]")
+
+
+# ── serve ────────────────────────────────────────────────────────────────────
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host"),
+    port: int = typer.Option(8765, "--port", "-p"),
+    pool: int = typer.Option(4, "--pool", help="Connexions SQLite lecture seule"),
+):
+    """🌐 Service HTTP JSON (lecture seule, cache + ETag)."""
+    import logging
+    from euro_top.server import run
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    console.print(f"[green]euro-top serve → http://{host}:{port}[/green]  "
+                  "[dim]/standings /scorers /assisters /xg /xg/teams /distance /value-bets[/dim]")
+    try:
+        run(host, port, pool)
+    except KeyboardInterrupt:
+        pass
+
+
+# ── mock ─────────────────────────────────────────────────────────────────────
+
+@app.command()
+def mock(
+    host: str = typer.Option("127.0.0.1", "--host"),
+    port: int = typer.Option(8799, "--port", "-p"),
+    seasons: int = typer.Option(1, "--seasons", help="Saisons générées"),
+    leagues: int = typer.Option(8, "--leagues", help="Ligues générées (championnats d'abord)"),
+    seed: int = typer.Option(42, "--seed"),
+    latency: float = typer.Option(0.0, "--latency", help="Latence ajoutée (ms)"),
+    jitter: float = typer.Option(0.0, "--jitter", help="Gigue aléatoire (ms)"),
+    error_rate: float = typer.Option(0.0, "--error-rate", help="Part de réponses en erreur (0–1)"),
+    api_daily: int = typer.Option(100, "--api-daily", help="Quota journalier API-Football"),
+    odds_monthly: int = typer.Option(500, "--odds-monthly", help="Quota mensuel The Odds API"),
+):
+    """🧪 Serveurs locaux API-Football / Odds API / Sofascore / Understat (données synthétiques)."""
+    import logging
+    from euro_top.mockapi import MockConfig, base_urls, run
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    config = MockConfig(latency_ms=latency, jitter_ms=jitter, error_rate=error_rate,
+                        api_football_daily=api_daily, odds_monthly=odds_monthly,
+                        seasons=seasons, leagues=leagues, seed=seed)
+    console.print(f"[green]euro-top mock → http://{host}:{port}[/green]  "
+                  "[dim]variables pour les collecteurs :[/dim]")
+    for env, url in base_urls(host, port).items():
+        console.print(f"  export {env}={url}", highlight=False)
+    console.print("  [dim]API_FOOTBALL_KEY / ODDS_API_KEY : n'importe quelle valeur non vide[/dim]")
+    try:
+        run(config, host, port)
+    except KeyboardInterrupt:
+        pass
+
+
+# ── daemon ────────────────────────────────────────────────────────────────────
+
+daemon_app = typer.Typer(help="🛰️  Démon de collecte (jobs planifiés, un seul processus).")
+app.add_typer(daemon_app, name="daemon")
+
+
+@daemon_app.command("start")
+def daemon_start(
+    season: int = typer.Option(SEASON, "--season", "-s"),
+    api_hour: int = typer.Option(7, "--api-hour",
+                                 help="Heure de la collecte API-Football quotidienne"),
+    jobs: Optional[str] = typer.Option(None, "--jobs",
+                                       help="Jobs à activer, ex. 'api_football,odds' (défaut : tous)"),
+):
+    """▶️  Démarre le démon au premier plan (Ctrl+C / SIGTERM = arrêt propre)."""
+    import logging
+    from euro_top.daemon import JOB_NAMES, DaemonAlreadyRunning, run
+    only = [j.strip() for j in jobs.split(",")] if jobs else None
+    unknown = set(only or ()) - set(JOB_NAMES)
+    if unknown:
+        console.print(f"[red]Job(s) inconnu(s) : {', '.join(sorted(unknown))}[/red]  "
+                      f"[dim]({', '.join(JOB_NAMES)})[/dim]")
+        raise typer.Exit(1)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    try:
+        run(season, api_hour, only)
+    except DaemonAlreadyRunning as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+
+
+def _hm(value: Optional[str]) -> str:
+    return value.replace("T", " ")[5:16] if value else "—"
+
+
+@daemon_app.command("status")
+def daemon_status():
+    """📋 File des jobs, prochains passages et durée des derniers runs."""
+    from euro_top.daemon import STATE_PATH
+    from euro_top.scheduler import read_state
+    state = read_state(STATE_PATH)
+    if state is None:
+        console.print("[yellow]Aucun état : le démon n'a jamais tourné "
+                      "(euro-top daemon start).[/yellow]")
+        raise typer.Exit(1)
+
+    if state["alive"]:
+        head = f"[green]● actif[/green] pid {state['pid']}"
+    else:
+        head = "[red]● arrêté[/red]" + ("" if state["stopped"] else " [dim](sans arrêt propre)[/dim]")
+    console.print(f"{head}  [dim]démarré {_hm(state['started_at'])} — "
+                  f"état du {_hm(state['updated_at'])}[/dim]")
+
+    colors = {"ok": "green", "error": "red", "skipped": "dim"}
+    table = Table(box=box.SIMPLE_HEAD)
+    table.add_column("Job", style="bold")
+    table.add_column("Source", style="dim")
+    table.add_column("Runs", justify="right")
+    table.add_column("Dernier run")
+    table.add_column("Durée", justify="right")
+    table.add_column("Statut")
+    table.add_column("Prochain")
+    table.add_column("Résultat", overflow="fold")
+    for job in state["jobs"]:
+        status = "[cyan]en cours[/cyan]" if job["running"] else (
+            f"[{colors.get(job['last_status'], 'white')}]{job['last_status'] or '—'}[/]")
+        duration = job["last_duration"]
+        table.add_row(
+            job["name"], job["source"], str(job["runs"]), _hm(job["last_start"]),
+            "—" if duration is None else f"{duration:.1f} s", status,
+            _hm(job["next_run"]) if state["alive"] else "—", job["last_result"] or "",
+        )
+    console.print(table)
+
+
+# ── backfill ─────────────────────────────────────────────────────────────────
+
+backfill_app = typer.Typer(help="⏳ Backfill historique multi-saisons (reprise sur checkpoint).")
+app.add_typer(backfill_app, name="backfill")
+
+
+@backfill_app.command("run")
+def backfill_run(
+    seasons: str = typer.Option(f"{SEASON - 4}-{SEASON}", "--seasons",
+                                help="Ex. 2021-2025 ou 2019,2021"),
+    league: str = typer.Option("all", "--league", "-l", help="Ligue ou 'all'"),
+    sources: Optional[str] = typer.Option(None, "--sources",
+                                          help="api_football,understat (défaut : les deux)"),
+    workers: int = typer.Option(3, "--workers", help="Threads Understat"),
+    reserve: Optional[int] = typer.Option(None, "--reserve",
+                                          help="Requêtes API-Football laissées à la collecte du jour"),
+    retry_failed: bool = typer.Option(False, "--retry-failed",
+                                      help="Remet en attente les tâches en échec"),
+):
+    """▶️  Planifie puis exécute ce qui reste (relancer chaque jour, ou job démon)."""
+    import logging
+    from euro_top import backfill, metrics
+    from euro_top.db import get_session, init_db
+    from euro_top.telemetry import flush
+    try:
+        season_list = backfill.parse_seasons(seasons)
+    except ValueError:
+        console.print(f"[red]Saisons invalides : {seasons}[/red]")
+        raise typer.Exit(1)
+    source_list = [s.strip() for s in sources.split(",")] if sources else list(backfill.SOURCES)
+    unknown = set(source_list) - set(backfill.SOURCES)
+    if unknown:
+        console.print(f"[red]Source(s) inconnue(s) : {', '.join(sorted(unknown))}[/red]  "
+                      f"[dim]({', '.join(backfill.SOURCES)})[/dim]")
+        raise typer.Exit(1)
+    league_ids = None if league.lower() == "all" else [_get_league_or_exit(league).id]
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s] %(message)s")
+    init_db()
+    db = get_session()
+    created = backfill.plan(db, season_list, league_ids, source_list)
+    reset = backfill.retry_failed(db) if retry_failed else 0
+    db.close()
+    console.print(f"[dim]{created} nouvelle(s) tâche(s)"
+                  + (f", {reset} échec(s) remis en attente" if reset else "") + "[/dim]")
+
+    with metrics.run("backfill"):
+        summary = backfill.run(source_list, workers,
+                               backfill.DAILY_RESERVE if reserve is None else reserve)
+    flush()
+    for source, c in summary.items():
+        line = f"{source:<13} {c['done']} faite(s), {c['error']} échec(s), {c['left']} restante(s)"
+        if "days_left" in c:
+            line += f"  [dim](budget du jour : {c['budget']} req"
+            line += f" ; ~{c['days_left']} jour(s) restant(s))[/dim]" if c["left"] else ")[/dim]"
+        console.print(line)
+    if not summary:
+        console.print("[green]Rien à faire : tout est collecté.[/green]")
+
+
+@backfill_app.command("status")
+def backfill_status():
+    """📋 Avancement par source et saison."""
+    from euro_top.backfill import progress
+    from euro_top.db import get_session, init_db
+    init_db()
+    db = get_session()
+    rows = progress(db)
+    db.close()
+    if not rows:
+        console.print("[yellow]Aucune tâche (euro-top backfill run --seasons …).[/yellow]")
+        raise typer.Exit(1)
+    table = Table(box=box.SIMPLE_HEAD)
+    table.add_column("Source", style="bold")
+    table.add_column("Saison", justify="right")
+    table.add_column("Faites", justify="right", style="green")
+    table.add_column("En attente", justify="right")
+    table.add_column("Échecs", justify="right", style="red")
+    table.add_column("Lignes", justify="right", style="dim")
+    for r in rows:
+        table.add_row(r["source"], str(r["season"]), str(r["done"]), str(r["pending"]),
+                      str(r["failed"] or ""), f"{r['rows']:,}")
+    console.print(table)
+
+
+# ── perf ─────────────────────────────────────────────────────────────────────
+
+def _ms(value: Optional[float]) -> str:
+    return "—" if value is None else f"{value:,.0f}" if value >= 100 else f"{value:.1f}"
+
+
+@app.command()
+def perf(
+    hours: float = typer.Option(24, "--hours", "-H", help="Fenêtre (heures)"),
+    source: Optional[str] = typer.Option(None, "--source",
+                                         help="api_football, odds, sofascore ou understat"),
+    fmt: str = _format_option(),
+):
+    """⏱️  Latences des requêtes sortantes par source et endpoint (p50 / p90 / p99)."""
+    from datetime import timedelta
+    from euro_top.db import init_db, get_session
+    from euro_top.telemetry import SOURCES, perf_summary
+    if source and source not in SOURCES:
+        console.print(f"[red]Source inconnue : '{source}' ({', '.join(SOURCES)})[/red]")
+        raise typer.Exit(1)
+
+    init_db()
+    db = get_session()
+    rows = perf_summary(db, timedelta(hours=hours), source)
+    db.close()
+
+    if fmt != "table":
+        from euro_top.export import write_rows
+        write_rows(rows, fmt, sys.stdout)
+        return
+    if not rows:
+        console.print(f"[yellow]Aucune requête enregistrée sur les {hours:g} dernières heures.[/yellow]")
+        raise typer.Exit()
+
+    t = Table(title=f"⏱️  Requêtes sortantes — {hours:g} dernières heures (ms)",
+              box=box.ROUNDED, header_style="bold cyan")
+    # Cache / tentatives : colonnes affichées seulement si utilisées
+    extra = [k for k in ("cache_hits", "retries") if any(r[k] for r in rows)]
+    t.add_column("Source", style="bold")
+    t.add_column("Endpoint", min_width=20)
+    t.add_column("N", justify="right")
+    t.add_column("Err.", justify="right")
+    for col in ("p50", "p90", "p99", "max"):
+        t.add_column(col, justify="right", style="green" if col == "p50" else None)
+    t.add_column("DNS", justify="right", style="dim")
+    t.add_column("Conn.", justify="right", style="dim")
+    t.add_column("Parse", justify="right", style="dim")
+    t.add_column("Ko", justify="right", style="dim")
+    for k in extra:
+        t.add_column({"cache_hits": "Cache", "retries": "Retry"}[k], justify="right", style="dim")
+    for r in rows:
+        t.add_row(
+            r["source"], r["endpoint"], str(r["calls"]),
+            f"[red]{r['errors']}[/red]" if r["errors"] else "0",
+            *(_ms(r[k]) for k in ("p50", "p90", "p99", "max", "dns", "connect", "parse")),
+            "—" if r["kb"] is None else f"{r['kb']:,.0f}",
+            *(str(r[k]) for k in extra),
+        )
+    console.print(t)
 
 
 # ── status ────────────────────────────────────────────────────────────────────
@@ -537,6 +1392,7 @@ def collect(
 @app.command()
 def status():
     """ℹ️  Statut de la base de données et quota API."""
+    from euro_top.db import init_db, get_session, count_api_calls_today
     init_db()
     db = get_session()
     used = count_api_calls_today(db)
@@ -553,5 +1409,4 @@ def status():
 
 
 if __name__ == "__main__":
-    init_db()
     app()
@@ -0,0 +1,223 @@
+"""
+Moteur analytique DuckDB — base SQLite et exports ``data/`` en lecture seule.
+
+    con = connect()
+    columns, rows = run_query(con, "xg_trend", league_id=39, window=5)
+    columns, rows = sql(con, "SELECT team, avg(xg_for) FROM team_matches GROUP BY 1")
+
+``connect`` ouvre DuckDB en mémoire et expose :
+    matches, players, standings, player_matches, team_ratings,
+    match_stats, stat_keys
+                    tables de la base SQLite (ATTACH, extension sqlite)
+    team_matches    un match terminé vu de chaque équipe (buts, xG, km pour /
+                    contre, points) — base des requêtes par équipe
+    exports         data/*_latest.csv (colonne ``league`` tirée du nom)
+    exports_json    matchs des data/*_latest.json, dépliés
+    archive_<table> data/archive/<table>/*.parquet (euro-top archive), si présents
+
+Requêtes vectorisées prêtes à l'emploi (QUERIES) : tendance xG glissante,
+efficacité par ligue, finition par équipe, forme glissante, évolution d'une
+saison à l'autre, distance × résultat. Toutes filtrables par ligue / saison.
+
+Lecture colonnaire et exécution vectorisée : un agrégat sur tout
+l'historique est un seul scan, sans hydrater d'objets ORM (voir
+benchmarks/bench_analytics.py).
+
+Dépendance optionnelle : duckdb (pip install duckdb).
+"""
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+TABLES = ("matches", "players", "standings", "player_matches", "team_ratings",
+          "match_stats", "stat_keys")
+
+_TEAM_MATCHES = """
+CREATE VIEW team_matches AS
+SELECT *, CASE WHEN goals_for > goals_against THEN 3
+               WHEN goals_for = goals_against THEN 1 ELSE 0 END AS points
+FROM (
+    SELECT id AS match_id, league_id, season, match_date, 'home' AS side,
+           home_team AS team, away_team AS opponent,
+           home_goals AS goals_for, away_goals AS goals_against,
+           home_xg AS xg_for, away_xg AS xg_against, home_km AS km, away_km AS km_against
+    FROM matches WHERE status = 'FT'
+    UNION ALL
+    SELECT id, league_id, season, match_date, 'away',
+           away_team, home_team, away_goals, home_goals,
+           away_xg, home_xg, away_km, home_km
+    FROM matches WHERE status = 'FT'
+)
+"""
+
+# nom → (description, SQL) ; {scope} = filtre ligue / saison ({league} / {season} séparés),
+# {window} = fenêtre glissante
+QUERIES: dict[str, tuple[str, str]] = {
+    "xg_trend": ("xG par match et moyennes glissantes sur N matchs, par équipe", """
+        SELECT league_id, season, team, match_date, side, opponent, xg_for, xg_against,
+               round(avg(xg_for) OVER w, 2)     AS xg_for_rolling,
+               round(avg(xg_against) OVER w, 2) AS xg_against_rolling
+        FROM team_matches
+        WHERE xg_for IS NOT NULL AND {scope}
+        WINDOW w AS (PARTITION BY league_id, season, team ORDER BY match_date
+                     ROWS BETWEEN {window} PRECEDING AND CURRENT ROW)
+        ORDER BY league_id, season, team, match_date
+    """),
+    "efficiency": ("Buts par xG, xG et buts moyens, corrélation xG/buts, par ligue × saison", """
+        SELECT league_id, season, count(DISTINCT team) AS teams, count(*) // 2 AS matches,
+               round(avg(xg_for), 2)                    AS xg_per_match,
+               round(avg(goals_for), 2)                 AS goals_per_match,
+               round(sum(goals_for) / sum(xg_for), 3)   AS goals_per_xg,
+               round(corr(xg_for, goals_for), 3)        AS corr_xg_goals,
+               round(avg(CASE WHEN side = 'home' THEN points END), 2) AS home_ppg
+        FROM team_matches
+        WHERE xg_for IS NOT NULL AND {scope}
+        GROUP BY league_id, season
+        ORDER BY league_id, season
+    """),
+    "finishing": ("Buts − xG marqués et encaissés par équipe (sur / sous-performance)", """
+        SELECT league_id, season, team, count(*) AS matches,
+               sum(goals_for) AS goals, round(sum(xg_for), 2) AS xg,
+               round(sum(goals_for) - sum(xg_for), 2)         AS finishing,
+               sum(goals_against) AS conceded, round(sum(xg_against), 2) AS xga,
+               round(sum(xg_against) - sum(goals_against), 2) AS keeping
+        FROM team_matches
+        WHERE xg_for IS NOT NULL AND {scope}
+        GROUP BY league_id, season, team
+        ORDER BY finishing DESC
+    """),
+    "form": ("Forme : points et différence de xG sur les N derniers matchs (dernière valeur)", """
+        SELECT league_id, season, team, match_date AS last_match,
+               sum(points) OVER w                          AS points_last_n,
+               round(avg(xg_for - xg_against) OVER w, 2)   AS xg_diff_last_n,
+               count(*) OVER w                             AS n
+        FROM team_matches
+        WHERE {scope}
+        WINDOW w AS (PARTITION BY league_id, season, team ORDER BY match_date
+                     ROWS BETWEEN {window} PRECEDING AND CURRENT ROW)
+        QUALIFY row_number() OVER (PARTITION BY league_id, season, team
+                                   ORDER BY match_date DESC) = 1
+        ORDER BY league_id, season, points_last_n DESC, xg_diff_last_n DESC
+    """),
+    "season_trend": ("xG pour / contre par équipe et par saison, écart à la saison précédente", """
+        SELECT league_id, team, season, matches, xg_for, xg_against,
+               round(xg_for - lag(xg_for) OVER s, 2)         AS xg_for_delta,
+               round(xg_against - lag(xg_against) OVER s, 2) AS xg_against_delta
+        FROM (
+            SELECT league_id, team, season, count(*) AS matches,
+                   round(avg(xg_for), 2) AS xg_for, round(avg(xg_against), 2) AS xg_against
+            FROM team_matches
+            WHERE xg_for IS NOT NULL AND {league}
+            GROUP BY league_id, team, season
+        )
+        WINDOW s AS (PARTITION BY league_id, team ORDER BY season)
+        QUALIFY {season}   -- Après lag() : la saison précédente reste visible
+        ORDER BY league_id, team, season
+    """),
+    "distance_results": ("Distance moyenne (km) selon le résultat, par ligue", """
+        SELECT league_id,
+               CASE points WHEN 3 THEN 'victoire' WHEN 1 THEN 'nul' ELSE 'défaite' END AS result,
+               count(*) AS matches, round(avg(km), 1) AS km,
+               round(avg(km - km_against), 2) AS km_diff
+        FROM team_matches
+        WHERE km IS NOT NULL AND {scope}
+        GROUP BY ALL
+        ORDER BY league_id, result
+    """),
+}
+
+
+def _duckdb():
+    """Import paresseux de duckdb (dépendance optionnelle)."""
+    try:
+        import duckdb
+        return duckdb
+    except ImportError as e:
+        raise ImportError("Installe duckdb : pip install duckdb") from e
+
+
+def _sqlite_path() -> str:
+    from sqlalchemy.engine import make_url
+    from .config import DATABASE_URL
+    url = make_url(DATABASE_URL)
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        raise ValueError(f"Base SQLite sur fichier requise (DATABASE_URL={DATABASE_URL})")
+    return str(Path(url.database).resolve())
+
+
+def _quote(path: Path | str) -> str:
+    return "'" + str(path).replace("'", "''") + "'"
+
+
+def connect(database: str | None = None, data_dir: Path = DATA_DIR):
+    """Connexion DuckDB en mémoire, base SQLite attachée en lecture seule, vues créées."""
+    duckdb = _duckdb()
+    con = duckdb.connect()
+    con.execute("SET python_enable_replacements = false")   # pas de variables Python en tables
+    con.execute("INSTALL sqlite; LOAD sqlite;")
+    con.execute(f"ATTACH {_quote(database or _sqlite_path())} AS euro (TYPE sqlite, READ_ONLY)")
+    existing = {r[0] for r in con.execute(
+        "SELECT table_name FROM information_schema.tables WHERE table_catalog = 'euro'").fetchall()}
+    for table in TABLES:
+        if table in existing:
+            con.execute(f"CREATE VIEW {table} AS SELECT * FROM euro.{table}")
+    if "matches" in existing:
+        con.execute(_TEAM_MATCHES)
+
+    data_dir = Path(data_dir)
+    if any(data_dir.glob("*_latest.csv")):
+        con.execute(f"""
+            CREATE VIEW exports AS
+            SELECT regexp_extract(filename, '([^/]+)_latest\\.csv$', 1) AS league, * EXCLUDE (filename)
+            FROM read_csv_auto({_quote(data_dir / '*_latest.csv')}, union_by_name = true, filename = true)
+        """)
+    if any(data_dir.glob("*_latest.json")):
+        con.execute(f"""
+            CREATE VIEW exports_json AS
+            SELECT unnest(matches, recursive := true)
+            FROM read_json_auto({_quote(data_dir / '*_latest.json')}, union_by_name = true)
+        """)
+    archive = data_dir / "archive"
+    for table in TABLES:
+        if any((archive / table).glob("*.parquet")):
+            con.execute(f"CREATE VIEW archive_{table} AS SELECT * FROM "
+                        f"read_parquet({_quote(archive / table / '*.parquet')}, union_by_name = true)")
+    return con
+
+
+def sql(con, statement: str, params: dict | None = None) -> tuple[list[str], list[tuple]]:
+    """Exécute une requête ; retourne (colonnes, lignes)."""
+    cursor = con.execute(statement, params or {})
+    columns = [d[0] for d in cursor.description] if cursor.description else []
+    return columns, cursor.fetchall()
+
+
+def run_query(con, name: str, league_id: int | None = None, season: int | None = None,
+              window: int = 5) -> tuple[list[str], list[tuple]]:
+    """Requête nommée de QUERIES, filtrée par ligue / saison ; ``window`` = N matchs."""
+    if name not in QUERIES:
+        raise ValueError(f"Analyse inconnue : {name} ({', '.join(QUERIES)})")
+    if window < 1:
+        raise ValueError("window doit être ≥ 1")
+    league, season_filter, params = "TRUE", "TRUE", {}
+    if league_id is not None:
+        league = "league_id = $league_id"
+        params["league_id"] = league_id
+    if season is not None:
+        season_filter = "season = $season"
+        params["season"] = season
+    statement = QUERIES[name][1].format(
+        scope=f"{league} AND {season_filter}", league=league, season=season_filter,
+        window=int(window) - 1)
+    return sql(con, statement, params)
+
+
+def views(con) -> list[str]:
+    """Tables et vues interrogeables (schéma principal)."""
+    return [r[0] for r in con.execute(
+        "SELECT table_name FROM information_schema.tables "
+        "WHERE table_catalog = current_database() ORDER BY 1").fetchall()]
@@ -0,0 +1,206 @@
+"""
+Archive colonnaire des saisons — Arrow IPC (mmap, zéro copie) ou Parquet.
+
+Un fichier par table et par (ligue, saison) :
+
+    data/archive/<table>/<league_id>_<season>.arrow      (IPC non compressé)
+    data/archive/<table>/<league_id>_<season>.parquet    (zstd, plus compact)
+
+Tables : matches, players, standings, player_matches. Le schéma Arrow est
+dérivé des colonnes SQLAlchemy (types stables même pour une colonne vide).
+
+Lecture : ``read_table`` ouvre les fichiers .arrow en mémoire mappée — les
+buffers pointent directement dans le fichier, sans copie ni désérialisation ;
+``read_columns`` en tire des tableaux NumPy (zéro copie pour les colonnes
+numériques sans valeur nulle d'un seul fichier). ``.to_pandas()`` sur la table
+retournée suffit pour pandas.
+
+Dépendance optionnelle : pyarrow (pip install pyarrow).
+"""
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import Date, DateTime, Float, Integer, String, select
+
+from .db import Match, Player, PlayerMatch, Session, Standing
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = Path(__file__).parent.parent / "data" / "archive"
+FORMATS = ("arrow", "parquet")
+
+TABLES = {
+    "matches":        Match,
+    "players":        Player,
+    "standings":      Standing,
+    "player_matches": PlayerMatch,
+}
+
+# Tri des lignes dans chaque fichier (lecture chronologique / par rang)
+_ORDER = {
+    "matches":        ("match_date", "id"),
+    "players":        ("id",),
+    "standings":      ("rank",),
+    "player_matches": ("match_date", "player_id"),
+}
+
+
+def _pyarrow():
+    """Import paresseux de pyarrow (dépendance optionnelle)."""
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        return pyarrow
+    except ImportError as e:
+        raise ImportError("Installe pyarrow : pip install pyarrow") from e
+
+
+def _schema(model):
+    pa = _pyarrow()
+    fields = []
+    for col in model.__table__.columns:
+        if isinstance(col.type, Integer):
+            typ = pa.int64()
+        elif isinstance(col.type, Float):
+            typ = pa.float64()
+        elif isinstance(col.type, DateTime):
+            typ = pa.timestamp("us")
+        elif isinstance(col.type, Date):
+            typ = pa.date32()
+        elif isinstance(col.type, String):
+            typ = pa.string()
+        else:
+            raise TypeError(f"Type non géré pour l'archive : {col.name} ({col.type})")
+        fields.append(pa.field(col.name, typ, nullable=bool(col.nullable)))
+    return pa.schema(fields)
+
+
+def archive_path(table: str, league_id: int, season: int, fmt: str = "arrow",
+                 root: Path = ARCHIVE_DIR) -> Path:
+    return root / table / f"{league_id}_{season}.{fmt}"
+
+
+# ── Écriture ──────────────────────────────────────────────────────────────────
+
+def _write_file(table, path: Path, fmt: str):
+    pa = _pyarrow()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, tmp, compression="zstd")
+    else:
+        # Non compressé : condition du mmap zéro copie
+        with pa.OSFile(str(tmp), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def write_archive(
+    session: Session,
+    league_ids: list[int] | None = None,
+    seasons: list[int] | None = None,
+    tables: list[str] | None = None,
+    fmt: str = "arrow",
+    root: Path = ARCHIVE_DIR,
+) -> list[Path]:
+    """
+    Exporte chaque table par (ligue, saison) ; None = toutes les ligues /
+    saisons présentes en base. Retourne les fichiers écrits.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Format inconnu : {fmt} ({', '.join(FORMATS)})")
+    pa = _pyarrow()
+    written = []
+    for name in tables or TABLES:
+        model = TABLES[name]
+        schema = _schema(model)
+        cols = [model.__table__.c[f.name] for f in schema]
+        scope = []
+        if league_ids is not None:
+            scope.append(model.league_id.in_(league_ids))
+        if seasons is not None:
+            scope.append(model.season.in_(seasons))
+        groups = session.execute(
+            select(model.league_id, model.season).where(*scope).distinct()
+        ).all()
+        for league_id, season in groups:
+            rows = session.execute(
+                select(*cols)
+                .where(model.league_id == league_id, model.season == season)
+                .order_by(*(model.__table__.c[c] for c in _ORDER[name]))
+            ).all()
+            columns = list(zip(*rows))
+            arrays = [pa.array(values, type=f.type) for values, f in zip(columns, schema)]
+            path = archive_path(name, league_id, season, fmt, root)
+            _write_file(pa.Table.from_arrays(arrays, schema=schema), path, fmt)
+            written.append(path)
+        logger.info(f"Archive {name} : {len(groups)} fichier(s) {fmt}")
+    return written
+
+
+# ── Lecture ───────────────────────────────────────────────────────────────────
+
+def list_archive(table: str, root: Path = ARCHIVE_DIR) -> dict[tuple[int, int], Path]:
+    """{(league_id, season): fichier} ; .arrow prioritaire sur .parquet."""
+    found: dict[tuple[int, int], Path] = {}
+    for fmt in reversed(FORMATS):
+        for path in sorted((root / table).glob(f"*_*.{fmt}")):
+            league_id, _, season = path.stem.partition("_")
+            found[(int(league_id), int(season))] = path
+    return found
+
+
+def _read_file(path: Path, columns: list[str] | None):
+    pa = _pyarrow()
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(path, columns=columns, memory_map=True)
+    # Les buffers référencent la zone mappée : pas de copie
+    table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    return table.select(columns) if columns else table
+
+
+def read_table(
+    table: str,
+    league_ids: list[int] | None = None,
+    seasons: list[int] | None = None,
+    columns: list[str] | None = None,
+    root: Path = ARCHIVE_DIR,
+):
+    """Table Arrow (un chunk par fichier) ; None = toutes les ligues / saisons."""
+    if table not in TABLES:
+        raise ValueError(f"Table inconnue : {table} ({', '.join(TABLES)})")
+    pa = _pyarrow()
+    parts = [
+        _read_file(path, columns)
+        for (league_id, season), path in sorted(list_archive(table, root).items())
+        if (league_ids is None or league_id in league_ids)
+        and (seasons is None or season in seasons)
+    ]
+    if not parts:
+        empty = _schema(TABLES[table]).empty_table()
+        return empty.select(columns) if columns else empty
+    return pa.concat_tables(parts)
+
+
+def read_columns(table: str, columns: list[str], league_ids: list[int] | None = None,
+                 seasons: list[int] | None = None, root: Path = ARCHIVE_DIR) -> dict[str, np.ndarray]:
+    """
+    Colonnes en tableaux NumPy. Entiers avec nulls → float (NaN) ;
+    dates : datetime64[D] ; textes : tableaux d'objets.
+    """
+    data = read_table(table, league_ids, seasons, columns, root)
+    out = {}
+    for name in columns:
+        col = data.column(name)
+        if col.num_chunks == 1 and col.null_count == 0:
+            out[name] = col.chunk(0).to_numpy(zero_copy_only=False)
+        else:
+            out[name] = col.to_numpy()
+    return out
@@ -0,0 +1,227 @@
+"""
+Backfill historique multi-saisons — reprise exacte sur checkpoint.
+
+    plan(db, seasons=range(2021, 2026))     # tâches pending (idempotent)
+    run()                                    # exécute ce qui reste ; relançable
+
+Une tâche = (source, ligue, saison, endpoint), persistée dans
+``backfill_tasks`` et marquée ``done`` dans sa propre transaction juste
+après l'écriture de ses lignes : un crash ou un Ctrl+C ne perd au plus que
+la tâche en cours, rejouée à l'identique (upserts idempotents) au run
+suivant.
+
+Sources :
+    api_football  standings / fixtures / topscorers / topassists — 1 requête
+                  chacune, quota journalier : séquentiel, dans le budget du
+                  jour (API_DAILY_LIMIT − appels du jour − réserve) ; le reste
+                  attend le lendemain (``euro-top backfill run`` ou job
+                  ``backfill`` du démon, chaque jour)
+    understat     player_xg — sans quota : en parallèle (``workers`` threads,
+                  une session chacun) pendant les appels API-Football
+
+Échecs : ``attempts`` + dernière erreur ; retentée aux runs suivants, puis
+``failed`` après MAX_ATTEMPTS (``--retry-failed`` les remet en attente).
+Quota atteint ou circuit ouvert : la tâche reste ``pending`` sans tentative
+comptée, et la source s'arrête pour ce run.
+"""
+from __future__ import annotations
+
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Iterable
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .config import API_DAILY_LIMIT, LEAGUES, all_leagues
+from .db import BackfillTask, Session, count_api_calls_today, get_session
+from .resilience import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+ENDPOINTS = {
+    "api_football": ("standings", "fixtures", "topscorers", "topassists"),
+    "understat":    ("player_xg",),
+}
+SOURCES = tuple(ENDPOINTS)
+MAX_ATTEMPTS = 3
+WORKERS = 3
+DAILY_RESERVE = 4 * len(LEAGUES)   # Collecte quotidienne toujours possible
+
+
+def parse_seasons(value: str) -> list[int]:
+    """« 2021-2025 », « 2019,2021 » ou « 2024 » → liste triée."""
+    seasons: set[int] = set()
+    for part in value.split(","):
+        lo, _, hi = part.strip().partition("-")
+        seasons.update(range(int(lo), int(hi or lo) + 1))
+    return sorted(seasons)
+
+
+def _understat_slug(league_id: int) -> str | None:
+    return next((lg.understat_slug for lg in LEAGUES.values() if lg.id == league_id), None)
+
+
+# ── Plan ──────────────────────────────────────────────────────────────────────
+
+def plan(session: Session, seasons: Iterable[int], league_ids: Iterable[int] | None = None,
+         sources: Iterable[str] = SOURCES) -> int:
+    """Crée les tâches manquantes ; retourne le nombre de nouvelles tâches."""
+    leagues = [lg for lg in all_leagues() if league_ids is None or lg.id in set(league_ids)]
+    rows = [
+        {"source": source, "league_id": lg.id, "season": season, "endpoint": endpoint,
+         "status": "pending", "attempts": 0}
+        for source in sources
+        for lg in leagues if source != "understat" or lg.understat_slug
+        for season in seasons
+        for endpoint in ENDPOINTS[source]
+    ]
+    if not rows:
+        return 0
+    before = session.scalar(select(func.count(BackfillTask.id)))
+    session.execute(sqlite_insert(BackfillTask).on_conflict_do_nothing(), rows)
+    session.commit()
+    return session.scalar(select(func.count(BackfillTask.id))) - before
+
+
+def retry_failed(session: Session) -> int:
+    result = session.execute(update(BackfillTask).where(BackfillTask.status == "failed")
+                             .values(status="pending", attempts=0))
+    session.commit()
+    return result.rowcount
+
+
+def _pending(session: Session, source: str) -> list[tuple]:
+    """(id, league_id, season, endpoint) en attente, saisons récentes d'abord."""
+    return list(session.execute(
+        select(BackfillTask.id, BackfillTask.league_id, BackfillTask.season,
+               BackfillTask.endpoint)
+        .where(BackfillTask.source == source, BackfillTask.status == "pending")
+        .order_by(BackfillTask.season.desc(), BackfillTask.league_id, BackfillTask.id)
+    ))
+
+
+def _finish(session: Session, task_id: int, rows: int | None = None,
+            error: str | None = None):
+    """Checkpoint d'une tâche, dans sa propre transaction."""
+    task = session.get(BackfillTask, task_id)
+    task.attempts += 1
+    task.updated_at = datetime.utcnow()
+    if error is None:
+        task.status, task.rows, task.error = "done", rows, None
+    else:
+        task.error = error[:200]
+        task.status = "failed" if task.attempts >= MAX_ATTEMPTS else "pending"
+    session.commit()
+
+
+# ── Exécution ─────────────────────────────────────────────────────────────────
+
+def _run_understat(task: tuple, stop: Callable[[], bool]) -> str:
+    from .collectors.understat import load_player_xg
+    task_id, league_id, season, _ = task
+    if stop():
+        return "skipped"
+    db = get_session()
+    try:
+        rows = load_player_xg(_understat_slug(league_id), league_id, season, db)
+        # scrape_player_xg journalise et avale les erreurs réseau : 0 ligne = échec
+        _finish(db, task_id, rows, None if rows else "aucune ligne Understat")
+        return "done" if rows else "error"
+    except Exception as e:
+        db.rollback()
+        _finish(db, task_id, error=f"{type(e).__name__}: {e}")
+        return "error"
+    finally:
+        db.close()
+
+
+def _run_api_football(session: Session, tasks: list[tuple], reserve: int,
+                      stop: Callable[[], bool], client=None) -> dict:
+    from .collectors.api_football import ApiFootballClient, RateLimitError
+    own = client is None
+    client = client or ApiFootballClient(session)
+    # Tâche = appel voulu : un client partagé (démon) ignore aussi la fraîcheur le temps du run
+    force, client.force = client.force, True
+    out = {"done": 0, "error": 0, "budget": 0}
+    try:
+        budget = out["budget"] = max(0, API_DAILY_LIMIT - reserve - count_api_calls_today(session))
+        fetch = {"standings": client.fetch_standings, "fixtures": client.fetch_fixtures,
+                 "topscorers": client.fetch_top_scorers, "topassists": client.fetch_top_assisters}
+        for task_id, league_id, season, endpoint in tasks:
+            if stop() or budget <= 0:
+                break
+            try:
+                rows = fetch[endpoint](league_id, season)
+            except (RateLimitError, CircuitOpenError) as e:
+                client.session.rollback()
+                logger.warning(f"Backfill API-Football interrompu : {e}")
+                break
+            except Exception as e:
+                client.session.rollback()
+                _finish(session, task_id, error=f"{type(e).__name__}: {e}")
+                out["error"] += 1
+            else:
+                # Saison hors plan gratuit : réponse vide, rejouer ne changerait rien
+                _finish(session, task_id, len(rows))
+                out["done"] += 1
+            budget -= 1
+    finally:
+        client.force = force
+        if own:
+            client.close()
+    return out
+
+
+def run(sources: Iterable[str] = SOURCES, workers: int = WORKERS,
+        reserve: int = DAILY_RESERVE, stop: Callable[[], bool] = lambda: False,
+        client=None) -> dict:
+    """
+    Exécute les tâches en attente : Understat en parallèle, API-Football
+    dans le budget du jour. Retourne {source: {done, error, left, …}}.
+    """
+    sources = set(sources)
+    db = get_session()
+    summary: dict[str, dict] = {}
+    try:
+        free = _pending(db, "understat") if "understat" in sources else []
+        quota = _pending(db, "api_football") if "api_football" in sources else []
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="backfill") as pool:
+            futures = [pool.submit(_run_understat, t, stop) for t in free]
+            if quota:
+                summary["api_football"] = _run_api_football(db, quota, reserve, stop, client)
+            results = [f.result() for f in futures]
+        if free:
+            summary["understat"] = {"done": results.count("done"), "error": results.count("error")}
+        for source, counts in summary.items():
+            counts["left"] = len(_pending(db, source))
+        if "api_football" in summary:
+            counts = summary["api_football"]
+            daily = max(1, API_DAILY_LIMIT - reserve)
+            counts["days_left"] = math.ceil(counts["left"] / daily)
+    finally:
+        db.close()
+    return summary
+
+
+# ── Lecture ───────────────────────────────────────────────────────────────────
+
+def progress(session: Session) -> list[dict]:
+    """Avancement par (source, saison) : done / pending / failed, lignes écrites."""
+    T = BackfillTask
+    stmt = (select(T.source, T.season, T.status, func.count(T.id), func.sum(T.rows))
+            .group_by(T.source, T.season, T.status).order_by(T.source, T.season))
+    out: dict[tuple, dict] = {}
+    for source, season, status, count, rows in session.execute(stmt):
+        entry = out.setdefault((source, season), {
+            "source": source, "season": season, "done": 0, "pending": 0, "failed": 0, "rows": 0})
+        entry[status] = count
+        entry["rows"] += rows or 0
+    return list(out.values())
+
+
+def has_pending(session: Session) -> bool:
+    return session.scalar(select(func.count(BackfillTask.id))
+                          .where(BackfillTask.status == "pending")) > 0
@@ -1,16 +1,18 @@
 """Collecteur API-Football (api-sports.io) — free tier 100 req/jour."""
 from __future__ import annotations
 import logging
-import time
 from datetime import datetime, date
 
 import httpx
 
 from ..config import API_FOOTBALL_KEY, API_FOOTBALL_BASE, API_DAILY_LIMIT, SEASON
 from ..db import (
-    Session, count_api_calls_today, log_api_call,
-    upsert_standings, upsert_players, upsert_matches,
+    Session, count_api_calls_today,
+    upsert_standings, upsert_players, upsert_matches, rollup_player_xg,
 )
+from .. import freshness, metrics
+from ..resilience import request
+from ..telemetry import parsing, track
 
 logger = logging.getLogger(__name__)
 
@@ -26,10 +28,13 @@ class RateLimitError(Exception):
 class ApiFootballClient:
     """Client HTTP pour API-Football."""
 
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, base_url: str | None = None, force: bool = False):
         self.session = session
+        self.force = force            # Ignore les politiques de fraîcheur (freshness.py)
+        self.skipped = 0              # Requêtes évitées (données à jour)
+        self._base = base_url or API_FOOTBALL_BASE
         self._client = httpx.Client(
-            base_url=API_FOOTBALL_BASE,
+            base_url=self._base,
             headers=HEADERS,
             timeout=15,
         )
@@ -42,19 +47,30 @@ class ApiFootballClient:
                 "Réessaie demain ou augmente ton plan."
             )
 
+    def _stale(self, endpoint: str, league_id: int, season: int, fixture_id: int | None = None) -> bool:
+        """Politique de fraîcheur consultée avant chaque requête (sauf ``force``)."""
+        if self.force:
+            return True
+        decision = (freshness.check_fixture_stats(self.session, fixture_id) if fixture_id
+                    else freshness.check(self.session, endpoint, league_id, season))
+        if not decision:
+            self.skipped += 1
+            metrics.inc("euro_top_requests_skipped_total", source="api_football", endpoint=endpoint)
+            logger.info(f"{endpoint} [{fixture_id or league_id}] saison {season} : "
+                        f"requête évitée — {decision.reason}")
+        return decision.fetch
+
     def _get(self, endpoint: str, params: dict, league_id: int | None = None) -> dict:
         self._check_rate_limit()
-        resp = self._client.get(endpoint, params=params)
-        log_api_call(
-            self.session,
-            endpoint=f"{endpoint}?{resp.request.url.query}",
-            league_id=league_id,
-            season=params.get("season"),
-            status=resp.status_code,
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        time.sleep(0.3)  # Politesse
+        with track("api_football", endpoint, league_id, params.get("season")) as call:
+            resp = request(lambda: self._client.get(endpoint, params=params),
+                           "api_football", self._base)
+            call.endpoint = f"{endpoint}?{resp.request.url.query.decode()}"
+            call.done(resp)
+            metrics.quota("api_football", resp.headers.get("x-ratelimit-requests-remaining"))
+            resp.raise_for_status()
+            with parsing():
+                data = resp.json()
         return data
 
     def close(self):
@@ -63,35 +79,38 @@ class ApiFootballClient:
     # ── Standings ─────────────────────────────────────────────────────────────
 
     def fetch_standings(self, league_id: int, season: int = SEASON) -> list[dict]:
-        """Récupère le classement d'une ligue."""
+        """Récupère le classement d'une ligue ([] si déjà à jour)."""
+        if not self._stale("standings", league_id, season):
+            return []
         data = self._get("/standings", {"league": league_id, "season": season}, league_id)
         rows = []
-        for entry in data.get("response", []):
-            league_data = entry.get("league", {})
-            for group in league_data.get("standings", []):
-                for team_entry in group:
-                    team = team_entry.get("team", {})
-                    all_ = team_entry.get("all", {})
-                    goals = all_.get("goals", {})
-                    rows.append({
-                        "league_id": league_id,
-                        "season": season,
-                        "rank": team_entry.get("rank"),
-                        "team": team.get("name"),
-                        "team_short": (team.get("name") or "")[:20],
-                        "played": all_.get("played", 0),
-                        "won": all_.get("win", 0),
-                        "drawn": all_.get("draw", 0),
-                        "lost": all_.get("lose", 0),
-                        "goals_for": goals.get("for", 0),
-                        "goals_against": goals.get("against", 0),
-                        "goal_diff": team_entry.get("goalsDiff", 0),
-                        "points": team_entry.get("points", 0),
-                        "form": team_entry.get("form"),
-                        "fetched_at": datetime.utcnow(),
-                    })
-        upsert_standings(self.session, rows)
-        logger.info(f"Standings [{league_id}] saison {season} : {len(rows)} équipes")
+        with parsing():
+            for entry in data.get("response", []):
+                league_data = entry.get("league", {})
+                for group in league_data.get("standings", []):
+                    for team_entry in group:
+                        team = team_entry.get("team", {})
+                        all_ = team_entry.get("all", {})
+                        goals = all_.get("goals", {})
+                        rows.append({
+                            "league_id": league_id,
+                            "season": season,
+                            "rank": team_entry.get("rank"),
+                            "team": team.get("name"),
+                            "team_short": (team.get("name") or "")[:20],
+                            "played": all_.get("played", 0),
+                            "won": all_.get("win", 0),
+                            "drawn": all_.get("draw", 0),
+                            "lost": all_.get("lose", 0),
+                            "goals_for": goals.get("for", 0),
+                            "goals_against": goals.get("against", 0),
+                            "goal_diff": team_entry.get("goalsDiff", 0),
+                            "points": team_entry.get("points", 0),
+                            "form": team_entry.get("form"),
+                            "fetched_at": datetime.utcnow(),
+                        })
+        written = upsert_standings(self.session, rows)
+        logger.info(f"Standings [{league_id}] saison {season} : {len(rows)} équipes ({written})")
         return rows
 
     # ── Top scorers / assisters ───────────────────────────────────────────────
@@ -103,68 +122,74 @@ class ApiFootballClient:
         return self._fetch_players("/players/topassists", league_id, season)
 
     def _fetch_players(self, endpoint: str, league_id: int, season: int) -> list[dict]:
+        if not self._stale(endpoint.rsplit("/", 1)[1], league_id, season):
+            return []
         data = self._get(endpoint, {"league": league_id, "season": season}, league_id)
         rows = []
-        for entry in data.get("response", []):
-            player = entry.get("player", {})
-            stats_list = entry.get("statistics", [{}])
-            stats = stats_list[0] if stats_list else {}
-            goals_ = stats.get("goals", {})
-            games_ = stats.get("games", {})
-            rows.append({
-                "api_id": player.get("id", 0),
-                "name": player.get("name"),
-                "team": (stats.get("team") or {}).get("name"),
-                "league_id": league_id,
-                "season": season,
-                "goals": goals_.get("total") or 0,
-                "assists": goals_.get("assists") or 0,
-                "matches_played": games_.get("appearences") or 0,
-                "minutes": games_.get("minutes") or 0,
-                "penalties": (stats.get("penalty") or {}).get("scored") or 0,
-                "xg": None,   # Pas dispo dans ce endpoint
-                "xa": None,
-                "fetched_at": datetime.utcnow(),
-            })
-        upsert_players(self.session, rows)
-        logger.info(f"Players [{endpoint}] ligue {league_id} : {len(rows)} joueurs")
+        with parsing():
+            for entry in data.get("response", []):
+                player = entry.get("player", {})
+                stats_list = entry.get("statistics", [{}])
+                stats = stats_list[0] if stats_list else {}
+                goals_ = stats.get("goals", {})
+                games_ = stats.get("games", {})
+                rows.append({
+                    "api_id": player.get("id", 0),
+                    "name": player.get("name"),
+                    "team": (stats.get("team") or {}).get("name"),
+                    "league_id": league_id,
+                    "season": season,
+                    "goals": goals_.get("total") or 0,
+                    "assists": goals_.get("assists") or 0,
+                    "matches_played": games_.get("appearences") or 0,
+                    "minutes": games_.get("minutes") or 0,
+                    "penalties": (stats.get("penalty") or {}).get("scored") or 0,
+                    # xg / xa : non fournis ici, reportés depuis player_matches (Understat)
+                    "fetched_at": datetime.utcnow(),
+                })
+        written = upsert_players(self.session, rows)
+        rollup_player_xg(self.session, league_id, season)
+        logger.info(f"Players [{endpoint}] ligue {league_id} : {len(rows)} joueurs ({written})")
         return rows
 
     # ── Fixtures (résultats) ──────────────────────────────────────────────────
 
     def fetch_fixtures(self, league_id: int, season: int = SEASON,
                        last: int | None = None) -> list[dict]:
-        """Récupère les résultats terminés."""
+        """Récupère les résultats terminés ([] si déjà à jour)."""
+        if not self._stale("fixtures", league_id, season):
+            return []
         params: dict = {"league": league_id, "season": season, "status": "FT"}
         if last:
             params["last"] = last
         data = self._get("/fixtures", params, league_id)
         rows = []
-        for f in data.get("response", []):
-            fixture = f.get("fixture", {})
-            teams = f.get("teams", {})
-            goals = f.get("goals", {})
-            league = f.get("league", {})
-            score = f.get("score", {}).get("fulltime", {})
-            rows.append({
-                "id": fixture.get("id"),
-                "league_id": league_id,
-                "league_name": league.get("name"),
-                "season": season,
-                "match_date": _parse_date(fixture.get("date")),
-                "home_team": teams.get("home", {}).get("name"),
-                "away_team": teams.get("away", {}).get("name"),
-                "home_goals": score.get("home"),
-                "away_goals": score.get("away"),
-                "status": "FT",
-                "home_xg": None,
-                "away_xg": None,
-                "home_km": None,
-                "away_km": None,
-                "fetched_at": datetime.utcnow(),
-            })
-        upsert_matches(self.session, rows)
-        logger.info(f"Fixtures ligue {league_id} : {len(rows)} matchs")
+        with parsing():
+            for f in data.get("response", []):
+                fixture = f.get("fixture", {})
+                teams = f.get("teams", {})
+                goals = f.get("goals", {})
+                league = f.get("league", {})
+                score = f.get("score", {}).get("fulltime", {})
+                rows.append({
+                    "id": fixture.get("id"),
+                    "league_id": league_id,
+                    "league_name": league.get("name"),
+                    "season": season,
+                    "match_date": _parse_date(fixture.get("date")),
+                    "home_team": teams.get("home", {}).get("name"),
+                    "away_team": teams.get("away", {}).get("name"),
+                    "home_goals": score.get("home"),
+                    "away_goals": score.get("away"),
+                    "status": "FT",
+                    "home_xg": None,
+                    "away_xg": None,
+                    "home_km": None,
+                    "away_km": None,
+                    "fetched_at": datetime.utcnow(),
+                })
+        written = upsert_matches(self.session, rows)
+        logger.info(f"Fixtures ligue {league_id} : {len(rows)} matchs ({written})")
         return rows
 
     # ── Fixture statistics (xG + distance) ───────────────────────────────────
@@ -173,38 +198,51 @@ class ApiFootballClient:
                             home_team: str, away_team: str, season: int = SEASON):
         """
         Récupère les stats d'un match (xG, distance) et met à jour la DB.
-        Coûte 1 requête API par match — à utiliser avec parcimonie.
+        Coûte 1 requête API par match — à utiliser avec parcimonie ; une
+        seule fois par match (None si déjà collecté).
         """
+        if not self._stale("fixture_stats", league_id, season, fixture_id):
+            return None
         data = self._get("/fixtures/statistics", {"fixture": fixture_id}, league_id)
         home_xg = away_xg = home_km = away_km = None
 
-        for team_stats in data.get("response", []):
-            team_name = team_stats.get("team", {}).get("name", "")
-            stats = {s["type"]: s["value"] for s in team_stats.get("statistics", [])}
-            xg = _safe_float(stats.get("expected_goals") or stats.get("Expected Goals"))
-            km = _safe_float(stats.get("Distance Covered") or stats.get("distance_covered"))
+        with parsing():
+            for team_stats in data.get("response", []):
+                team_name = team_stats.get("team", {}).get("name", "")
+                stats = {s["type"]: s["value"] for s in team_stats.get("statistics", [])}
+                xg = _safe_float(stats.get("expected_goals") or stats.get("Expected Goals"))
+                km = _safe_float(stats.get("Distance Covered") or stats.get("distance_covered"))
 
-            # Certaines APIs retournent km * 1000 (en mètres), on normalise en km
-            if km and km > 500:
-                km = km / 1000.0
+                # Certaines APIs retournent km * 1000 (en mètres), on normalise en km
+                if km and km > 500:
+                    km = km / 1000.0
 
-            if team_name == home_team or (home_team and home_team in team_name):
-                home_xg, home_km = xg, km
-            elif team_name == away_team or (away_team and away_team in team_name):
-                away_xg, away_km = xg, km
+                if team_name == home_team or (home_team and home_team in team_name):
+                    home_xg, home_km = xg, km
+                elif team_name == away_team or (away_team and away_team in team_name):
+                    away_xg, away_km = xg, km
 
         # Mise à jour du match en DB
-        from sqlalchemy import update
-        from ..db import Match, engine
-        with engine.connect() as conn:
+        from sqlalchemy import select, update
+        from ..db import Match, get_engine
+        with get_engine().connect() as conn:
             conn.execute(
                 update(Match)
                 .where(Match.id == fixture_id)
                 .values(home_xg=home_xg, away_xg=away_xg,
-                        home_km=home_km, away_km=away_km)
+                        home_km=home_km, away_km=away_km,
+                        fetched_at=datetime.utcnow())
             )
             conn.commit()
 
+        # xG connu → rating Elo variante xG
+        from ..ratings import update_ratings
+        row = self.session.execute(
+            select(Match.__table__).where(Match.id == fixture_id)
+        ).mappings().first()
+        if row:
+            update_ratings(self.session, [dict(row)])
+
         logger.debug(f"  Fixture {fixture_id}: xG {home_xg}/{away_xg}, km {home_km}/{away_km}")
         return home_xg, away_xg, home_km, away_km
 
@@ -12,17 +12,21 @@ Documentation : https://the-odds-api.com/liveapi/guides/v4/
 from __future__ import annotations
 
 import logging
+import re
 import time
 from datetime import datetime, timezone
 from typing import Optional
 
 import requests
 
-from ..config import ODDS_API_KEY
+from .. import metrics
+from ..config import ODDS_API_BASE, ODDS_API_KEY
+from ..resilience import CircuitOpenError, request
+from ..telemetry import parsing, track
 
 logger = logging.getLogger(__name__)
 
-_BASE = "https://api.the-odds-api.com/v4"
+_BASE = ODDS_API_BASE
 
 # Mapping league_key → sport key The Odds API
 ODDS_SPORT_KEYS: dict[str, str] = {
@@ -36,6 +40,9 @@ ODDS_SPORT_KEYS: dict[str, str] = {
     "ecl":        "soccer_uefa_europa_conference_league",
 }
 
+# Score exact "2-1" / "2:1" (éventuellement préfixé du nom d'équipe)
+_SCORE_RE = re.compile(r"(\d+)\s*[-:]\s*(\d+)")
+
 # Bookmakers européens pertinents (filtrés depuis la réponse)
 EU_BOOKMAKERS = {
     "unibet_eu", "betclic", "winamax", "pinnacle",
@@ -51,7 +58,7 @@ class OddsQuotaError(Exception):
 class OddsClient:
     """Client The Odds API — lecture seule."""
 
-    def __init__(self):
+    def __init__(self, base_url: str | None = None):
         if not ODDS_API_KEY:
             raise ValueError(
                 "ODDS_API_KEY non définie. "
@@ -59,26 +66,33 @@ class OddsClient:
             )
         self._session = requests.Session()
         self._session.params = {"apiKey": ODDS_API_KEY}  # type: ignore
+        self._base = (base_url or _BASE).rstrip("/")
         self._remaining: Optional[int] = None
         self._used: Optional[int] = None
 
-    def _get(self, path: str, params: dict | None = None) -> dict | list:
-        url = f"{_BASE}{path}"
-        r = self._session.get(url, params=params or {}, timeout=15)
-
-        # Quota dans les headers
-        self._remaining = int(r.headers.get("x-requests-remaining", -1))
-        self._used = int(r.headers.get("x-requests-used", -1))
-
-        if r.status_code == 401:
-            raise ValueError("ODDS_API_KEY invalide")
-        if r.status_code == 429:
-            raise OddsQuotaError(
-                f"Quota mensuel The Odds API épuisé "
-                f"({self._used} req utilisées)"
-            )
-        r.raise_for_status()
-        return r.json()
+    def _get(self, path: str, params: dict | None = None,
+             endpoint: str | None = None) -> dict | list:
+        url = f"{self._base}{path}"
+        with track("odds", endpoint or path) as call:
+            r = request(lambda: self._session.get(url, params=params or {}, timeout=15),
+                        "odds", self._base)
+            call.done(r)
+
+            # Quota dans les headers
+            self._remaining = int(r.headers.get("x-requests-remaining", -1))
+            self._used = int(r.headers.get("x-requests-used", -1))
+            metrics.quota("odds", self._remaining)
+
+            if r.status_code == 401:
+                raise ValueError("ODDS_API_KEY invalide")
+            if r.status_code == 429:
+                raise OddsQuotaError(
+                    f"Quota mensuel The Odds API épuisé "
+                    f"({self._used} req utilisées)"
+                )
+            r.raise_for_status()
+            with parsing():
+                return r.json()
 
     @property
     def quota_remaining(self) -> Optional[int]:
@@ -105,7 +119,8 @@ class OddsClient:
 
         Args:
             league_key   : Ex. "ligue1", "cl"
-            markets      : ["h2h"] (1X2), ["totals"] (o/u), ["spreads"]
+            markets      : ["h2h"] (1X2), ["totals"] (o/u), ["spreads"], ["btts"]
+                           — plusieurs marchés dans un seul appel
             regions      : "eu" (Europe), "uk", "us", "au"
             bookmakers   : Filtrer sur certains bookmakers (None = tous)
             days_from_now: Horizon en jours (approximatif, dépend du schedule)
@@ -138,7 +153,7 @@ class OddsClient:
             f"The Odds API [{league_key}] {sport_key} — marchés: {markets}"
         )
         try:
-            data = self._get(f"/sports/{sport_key}/odds", params)
+            data = self._get(f"/sports/{sport_key}/odds", params, "/sports/{sport}/odds")
             logger.info(
                 f"  → {len(data)} matchs | "  # type: ignore
                 f"quota restant: {self._remaining} req"
@@ -147,7 +162,7 @@ class OddsClient:
         except OddsQuotaError:
             logger.error("Quota mensuel épuisé — 500 req/mois max (free)")
             return []
-        except Exception as e:
+        except (CircuitOpenError, requests.RequestException) as e:
             logger.error(f"Erreur Odds API [{league_key}]: {e}")
             return []
 
@@ -164,10 +179,11 @@ class OddsClient:
         try:
             data = self._get(
                 f"/sports/{sport_key}/scores",
-                {"daysOld": days_old, "dateFormat": "iso"}
+                {"daysOld": days_old, "dateFormat": "iso"},
+                "/sports/{sport}/scores",
             )
             return data  # type: ignore
-        except Exception as e:
+        except (OddsQuotaError, CircuitOpenError, requests.RequestException) as e:
             logger.error(f"Erreur scores Odds API [{league_key}]: {e}")
             return []
 
@@ -184,7 +200,10 @@ def parse_h2h(event: dict, preferred_books: set[str] | None = None) -> dict | No
          best_home_book, best_draw_book, best_away_book,
          avg_home_odds, avg_draw_odds, avg_away_odds,
          implied_home_prob, implied_draw_prob, implied_away_prob,
-         market_margin}
+         market_margin, book_odds}
+
+    ``book_odds`` liste les cotes 1X2 complètes de chaque bookmaker
+    [(book, home, draw, away), …] pour dé-marger bookmaker par bookmaker.
     """
     books = event.get("bookmakers", [])
     if not books:
@@ -199,6 +218,7 @@ def parse_h2h(event: dict, preferred_books: set[str] | None = None) -> dict | No
         "away": (0.0, ""),
     }
     sums: dict[str, list[float]] = {"home": [], "draw": [], "away": []}
+    book_odds: list[tuple[str, float, float, float]] = []
 
     for book in books:
         bname = book["key"]
@@ -207,21 +227,27 @@ def parse_h2h(event: dict, preferred_books: set[str] | None = None) -> dict | No
         for market in book.get("markets", []):
             if market["key"] != "h2h":
                 continue
+            prices: dict[str, float] = {}
             for outcome in market.get("outcomes", []):
                 oname = outcome["name"]
                 price = float(outcome["price"])
                 if oname == home:
+                    prices["home"] = price
                     sums["home"].append(price)
                     if price > best["home"][0]:
                         best["home"] = (price, bname)
                 elif oname == away:
+                    prices["away"] = price
                     sums["away"].append(price)
                     if price > best["away"][0]:
                         best["away"] = (price, bname)
                 elif oname == "Draw":
+                    prices["draw"] = price
                     sums["draw"].append(price)
                     if price > best["draw"][0]:
                         best["draw"] = (price, bname)
+            if len(prices) == 3:
+                book_odds.append((bname, prices["home"], prices["draw"], prices["away"]))
 
     if not sums["home"]:
         return None
@@ -258,19 +284,87 @@ def parse_h2h(event: dict, preferred_books: set[str] | None = None) -> dict | No
         "implied_away_prob":  round(ia, 4) if ia else None,
         "market_margin_pct":  margin,
         "bookmakers_count":   len(books),
+        "book_odds":          book_odds,
     }
 
 
-def implied_to_fair(home_odds: float, draw_odds: float, away_odds: float) -> tuple[float, float, float]:
+def parse_quotes(
+    event: dict,
+    markets: set[str] | None = None,
+    preferred_books: set[str] | None = None,
+) -> list[tuple[str, str, str, float | None, float]]:
+    """
+    Aplatit toutes les cotes d'un event Odds API, tous marchés confondus.
+
+    Retourne [(book, market, outcome, point, price), …] avec :
+        h2h           outcome home / draw / away
+        totals        outcome over / under, point = ligne de buts
+        btts          outcome yes / no
+        spreads       outcome home / away, point = handicap côté domicile
+        correct_score outcome "i-j" (buts domicile - buts extérieur)
+    """
+    home = event.get("home_team")
+    away = event.get("away_team")
+    quotes = []
+    for book in event.get("bookmakers", []):
+        bname = book["key"]
+        if preferred_books and bname not in preferred_books:
+            continue
+        for market in book.get("markets", []):
+            mkey = market["key"]
+            if markets and mkey not in markets:
+                continue
+            for outcome in market.get("outcomes", []):
+                oname = outcome["name"]
+                point = outcome.get("point")
+                price = float(outcome["price"])
+                side = {home: "home", away: "away"}.get(oname)
+                if mkey == "h2h":
+                    key = side or ("draw" if oname == "Draw" else None)
+                elif mkey == "totals":
+                    key = oname.lower() if oname in ("Over", "Under") else None
+                elif mkey == "btts":
+                    key = oname.lower() if oname in ("Yes", "No") else None
+                elif mkey == "spreads":
+                    key = side
+                    if point is not None and side == "away":
+                        point = -float(point)
+                elif mkey == "correct_score":
+                    score = _SCORE_RE.search(oname)
+                    key = f"{score[1]}-{score[2]}" if score else None
+                    point = None
+                else:
+                    key = None
+                if key is None:
+                    continue
+                quotes.append((bname, mkey, key,
+                               None if point is None else float(point), price))
+    return quotes
+
+
+def implied_to_fair(
+    home_odds: float,
+    draw_odds: float,
+    away_odds: float,
+    method: str = "multiplicative",
+) -> tuple[float, float, float]:
     """
     Supprime la marge bookmaker et retourne les probabilités équitables.
-    (normalisation de Shin simplifiée)
+
+    Par défaut : normalisation proportionnelle (1/cote ÷ Σ 1/cote).
+    ``method`` accepte aussi "shin", "power" et "odds_ratio"
+    (voir ``euro_top.margin``).
     """
-    ih = 1 / home_odds
-    id_ = 1 / draw_odds
-    ia = 1 / away_odds
-    total = ih + id_ + ia
-    return ih / total, id_ / total, ia / total
+    if method == "multiplicative":
+        ih = 1 / home_odds
+        id_ = 1 / draw_odds
+        ia = 1 / away_odds
+        total = ih + id_ + ia
+        return ih / total, id_ / total, ia / total
+
+    from ..margin import remove_margin
+    p = remove_margin([home_odds, draw_odds, away_odds], method=method)
+    return float(p[0]), float(p[1]), float(p[2])
 
 
 def _avg(lst: list[float]) -> float | None:
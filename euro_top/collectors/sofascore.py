@@ -13,20 +13,27 @@ Sources alternatives :
     - Sofascore  → xG + stats match, toutes compétitions, plus réactif
 
 ⚠️  Cette API est non officielle et peut changer sans préavis.
-    Ne pas abuser : ajouter un délai entre les requêtes (sleep inclus).
+    Ne pas abuser : cadence, reprises et disjoncteur via ``resilience``
+    (0,5 s entre deux requêtes ; 3 refus 403 d'affilée → appels coupés
+    5 min, sans attente).
 """
 from __future__ import annotations
 
 import logging
+import re
 import time
 from datetime import date, datetime
 from typing import Optional
 
 import requests
 
+from ..config import SOFASCORE_BASE
+from ..resilience import CircuitOpenError, available, request
+from ..telemetry import parsing, track
+
 logger = logging.getLogger(__name__)
 
-_BASE = "https://api.sofascore.com/api/v1"
+_BASE = SOFASCORE_BASE.rstrip("/")
 _HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
@@ -58,12 +65,18 @@ TOURNAMENT_IDS = {
 }
 
 
-def _get(url: str, timeout: int = 10) -> Optional[dict]:
-    """Requête GET via session persistante (cookies conservés)."""
+def _get(url: str, endpoint: str, timeout: int = 10) -> Optional[dict]:
+    """Requête GET via session persistante (cookies conservés) ; ``endpoint`` = gabarit."""
     try:
-        r = _session.get(url, timeout=timeout)
-        r.raise_for_status()
-        return r.json()
+        with track("sofascore", endpoint) as call:
+            r = request(lambda: _session.get(url, timeout=timeout), "sofascore", _BASE)
+            call.done(r)
+            r.raise_for_status()
+            with parsing():
+                return r.json()
+    except CircuitOpenError as e:
+        logger.debug(f"Sofascore GET {url}: {e}")
+        return None
     except requests.exceptions.RequestException as e:
         logger.warning(f"Sofascore GET {url}: {e}")
         return None
@@ -71,7 +84,7 @@ def _get(url: str, timeout: int = 10) -> Optional[dict]:
 
 # ── Stats d'un match ──────────────────────────────────────────────────────────
 
-def fetch_match_stats(match_id: int) -> Optional[dict]:
+def fetch_match_stats(match_id: int, names: Optional[dict] = None) -> Optional[dict]:
     """
     Récupère les statistiques d'un match Sofascore.
 
@@ -80,25 +93,29 @@ def fetch_match_stats(match_id: int) -> Optional[dict]:
             "home": {"xg": float, "possession": int, "shots": int, ...},
             "away": {"xg": float, ...},
         }
-    ou None si indisponible.
+    ou None si indisponible. ``names``, si fourni, reçoit {clé: libellé
+    Sofascore} (dictionnaire stat_keys).
     """
-    data = _get(f"{_BASE}/event/{match_id}/statistics")
+    data = _get(f"{_BASE}/event/{match_id}/statistics", "/event/{id}/statistics")
     if not data or "statistics" not in data:
         return None
 
     result: dict[str, dict] = {"home": {}, "away": {}}
 
-    for period in data["statistics"]:
-        if period.get("period") != "ALL":
-            continue
-        for group in period.get("groups", []):
-            for item in group.get("statisticsItems", []):
-                key = _normalize_stat_key(item["name"])
-                try:
-                    result["home"][key] = _parse_stat_value(item.get("home"))
-                    result["away"][key] = _parse_stat_value(item.get("away"))
-                except Exception:
-                    pass
+    with parsing():
+        for period in data["statistics"]:
+            if period.get("period") != "ALL":
+                continue
+            for group in period.get("groups", []):
+                for item in group.get("statisticsItems", []):
+                    key = _normalize_stat_key(item["name"])
+                    if names is not None:
+                        names[key] = item["name"]
+                    try:
+                        result["home"][key] = _parse_stat_value(item.get("home"))
+                        result["away"][key] = _parse_stat_value(item.get("away"))
+                    except Exception:
+                        pass
 
     return result or None
 
@@ -123,45 +140,55 @@ def fetch_matches_by_date(match_date: date, league_key: str) -> list[dict]:
     Récupère les matchs d'une ligue pour une date donnée.
 
     Retourne une liste de dicts :
-        {id, home_team, away_team, home_goals, away_goals, status, match_date}
+        {id, home_team, away_team, home_goals, away_goals, status,
+         status_code, status_desc, start_ts, match_date}
+
+    status = type Sofascore (notstarted, inprogress, finished, postponed…) ;
+    status_code 31 = mi-temps ; start_ts = coup d'envoi (timestamp Unix).
     """
     tournament_id = TOURNAMENT_IDS.get(league_key)
     date_str = match_date.strftime("%Y-%m-%d")
-    data = _get(f"{_BASE}/sport/football/scheduled-events/{date_str}")
+    data = _get(f"{_BASE}/sport/football/scheduled-events/{date_str}",
+                "/sport/football/scheduled-events/{date}")
     if not data:
         return []
 
     results = []
-    for event in data.get("events", []):
-        ut = event.get("tournament", {}).get("uniqueTournament", {})
-        if tournament_id and ut.get("id") != tournament_id:
-            continue
-        try:
-            results.append({
-                "id":          event["id"],
-                "home_team":   event["homeTeam"]["name"],
-                "away_team":   event["awayTeam"]["name"],
-                "home_goals":  event.get("homeScore", {}).get("current"),
-                "away_goals":  event.get("awayScore", {}).get("current"),
-                "status":      event.get("status", {}).get("type"),
-                "match_date":  match_date,
-            })
-        except KeyError:
-            continue
+    with parsing():
+        for event in data.get("events", []):
+            ut = event.get("tournament", {}).get("uniqueTournament", {})
+            if tournament_id and ut.get("id") != tournament_id:
+                continue
+            try:
+                results.append({
+                    "id":          event["id"],
+                    "home_team":   event["homeTeam"]["name"],
+                    "away_team":   event["awayTeam"]["name"],
+                    "home_goals":  event.get("homeScore", {}).get("current"),
+                    "away_goals":  event.get("awayScore", {}).get("current"),
+                    "status":      event.get("status", {}).get("type"),
+                    "status_code": event.get("status", {}).get("code"),
+                    "status_desc": event.get("status", {}).get("description"),
+                    "start_ts":    event.get("startTimestamp"),
+                    "match_date":  match_date,
+                })
+            except KeyError:
+                continue
 
     return results
 
 
 def fetch_round_xg(
     match_ids: list[int],
-    delay: float = 0.5,
+    delay: float = 0.0,
 ) -> dict[int, tuple[Optional[float], Optional[float]]]:
     """
     Récupère les xG pour une liste de match IDs Sofascore.
 
     Args:
         match_ids : Liste d'IDs Sofascore
-        delay     : Délai en secondes entre chaque requête (politesse)
+        delay     : Délai supplémentaire entre requêtes (la cadence de base
+                    est appliquée par resilience ; aucun délai circuit ouvert)
 
     Retourne :
         {match_id: (home_xg, away_xg)}
@@ -169,13 +196,87 @@ def fetch_round_xg(
     results = {}
     for mid in match_ids:
         results[mid] = fetch_match_xg(mid)
-        if delay > 0:
+        if delay > 0 and available(_BASE):
             time.sleep(delay)
     return results
 
 
+def fetch_round_stats(session, league_id: int, league_key: str, days: list[date],
+                      delay: float = 0.0):
+    """
+    Statistiques complètes des matchs terminés d'une journée (``days`` =
+    ses dates) → table ``match_stats``, en un seul chargement.
+
+    Appariement avec ``matches`` par ligue, date et noms d'équipes ; un match
+    déjà présent dans ``match_stats`` n'est pas redemandé (statistiques
+    définitives), une date sans match à compléter ne coûte aucune requête.
+    Retourne le bilan ``Upserted``.
+    """
+    from sqlalchemy import select
+    from ..db import Match, matches_with_stats, upsert_match_stats
+    from ..live import find_match
+
+    candidates = session.execute(
+        select(Match.id, Match.home_team, Match.away_team, Match.match_date)
+        .where(Match.league_id == league_id, Match.match_date.in_(days))
+    ).all()
+    done = matches_with_stats(session, [c.id for c in candidates])
+    stats: dict[int, dict] = {}
+    names: dict[str, str] = {}
+    for day in days:
+        pending = [c for c in candidates if c.match_date == day and c.id not in done]
+        if not pending:
+            continue
+        for ev in fetch_matches_by_date(day, league_key):
+            if ev["status"] != "finished":
+                continue
+            found = find_match(pending, ev["home_team"], ev["away_team"])
+            if found is None:
+                continue
+            match_stats = fetch_match_stats(ev["id"], names)
+            if match_stats:
+                stats[found.id] = numeric_stats(match_stats, names)
+            if delay > 0 and available(_BASE):
+                time.sleep(delay)
+    written = upsert_match_stats(session, stats, names)
+    logger.info(f"Sofascore stats ligue {league_id} {', '.join(map(str, days))} : "
+                f"{len(stats)} matchs ({written})")
+    return written
+
+
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
+# "412 (85%)", "12/20 (60%)" : réussis, tentés, pourcentage
+_RATIO = re.compile(r"^(\d+(?:\.\d+)?)(?:/(\d+))?\s*\((\d+)%\)$")
+
+
+def numeric_stats(stats: dict, names: Optional[dict] = None) -> dict:
+    """
+    Stats de fetch_match_stats réduites à des nombres : une valeur composée
+    "12/20 (60%)" devient <clé> = 12, <clé>_total = 20, <clé>_pct = 60
+    (libellés complétés dans ``names``) ; les autres textes sont ignorés.
+    """
+    result: dict[str, dict] = {}
+    for side in ("home", "away"):
+        out = result[side] = {}
+        for key, value in (stats.get(side) or {}).items():
+            if isinstance(value, (int, float)):
+                out[key] = value
+                continue
+            m = _RATIO.match(str(value).strip()) if value is not None else None
+            if not m:
+                continue
+            done, total, pct = m.groups()
+            out[key] = float(done)
+            out[f"{key}_pct"] = int(pct)
+            if total is not None:
+                out[f"{key}_total"] = int(total)
+            if names is not None and key in names:
+                names.setdefault(f"{key}_pct", f"{names[key]} (%)")
+                names.setdefault(f"{key}_total", f"{names[key]} (total)")
+    return result
+
+
 def _normalize_stat_key(name: str) -> str:
     """Normalise les noms de stats Sofascore en snake_case."""
     return (
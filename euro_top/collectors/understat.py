@@ -10,15 +10,21 @@ Installation :
     pip install understatapi
 
 Pas de clé API requise. Pas de quota. 100 % gratuit.
+
+UNDERSTAT_BASE (config) non vide : understatapi est remplacé par un client
+HTTP minimal qui lit ``{base}/getLeagueData/<ligue>/<saison>`` (serveur local
+``euro-top mock``), mêmes structures de données en sortie.
 """
 from __future__ import annotations
 
 import logging
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from typing import Optional
 
-from ..config import SEASON
-from ..db import Session, upsert_matches
+from ..config import SEASON, UNDERSTAT_BASE, domestic_leagues
+from ..db import Session, update_match_results, upsert_player_matches, rollup_player_xg
+from ..resilience import request
+from ..telemetry import current, parsing, track
 
 logger = logging.getLogger(__name__)
 
@@ -32,11 +38,54 @@ UNDERSTAT_LEAGUES = {
     "Bundesliga",
 }
 
+_HOST = UNDERSTAT_BASE or "https://understat.com"   # Clé du disjoncteur
+
 
 # ── Client understatapi ───────────────────────────────────────────────────────
 
+class _HttpLeague:
+    def __init__(self, client: "_HttpClient", league: str):
+        self._client = client
+        self._league = league
+
+    def _data(self, season: str) -> dict:
+        r = self._client.session.get(
+            f"{self._client.base}/getLeagueData/{self._league}/{season}", timeout=15)
+        if call := current():
+            call.done(r)
+        r.raise_for_status()
+        with parsing():
+            return r.json()
+
+    def get_match_data(self, season: str) -> list[dict]:
+        return self._data(season)["dates"]
+
+    def get_player_data(self, season: str) -> dict:
+        return self._data(season)["players"]
+
+
+class _HttpClient:
+    """Sous-ensemble d'UnderstatClient sur une URL de base (UNDERSTAT_BASE)."""
+
+    def __init__(self, base: str):
+        import requests
+        self.base = base.rstrip("/")
+        self.session = requests.Session()
+
+    def league(self, league: str) -> _HttpLeague:
+        return _HttpLeague(self, league)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.session.close()
+
+
 def _get_client():
     """Retourne un UnderstatClient (synchrone)."""
+    if UNDERSTAT_BASE:
+        return _HttpClient(UNDERSTAT_BASE)
     try:
         from understatapi import UnderstatClient
         return UnderstatClient()
@@ -61,7 +110,8 @@ def fetch_league_xg(
     Args:
         understat_slug : Ex. "Ligue_1", "EPL", "La_liga"
         season         : Année de début de saison (ex. 2025 pour 2025-2026)
-        session        : Session SQLAlchemy optionnelle pour upsert en DB
+        session        : Session SQLAlchemy optionnelle : xG reportés sur les
+                         matchs déjà en base (voir _store_match_xg)
     """
     if understat_slug not in UNDERSTAT_LEAGUES:
         logger.warning(
@@ -73,43 +123,88 @@ def fetch_league_xg(
     logger.info(f"Understat [{understat_slug} {season}] : récupération matchs xG…")
 
     try:
-        with _get_client() as understat:
-            raw_matches = understat.league(league=understat_slug).get_match_data(
-                season=str(season)
+        with _get_client() as understat, track(
+                "understat", "league.get_match_data", _league_id(understat_slug), season):
+            raw_matches = request(
+                lambda: understat.league(league=understat_slug).get_match_data(
+                    season=str(season)),
+                "understat", _HOST,
             )
     except Exception as e:
         logger.error(f"Understat [{understat_slug}]: erreur réseau : {e}")
         return []
 
     results = []
-    for m in raw_matches:
-        if not m.get("isResult"):
-            continue
-        try:
-            row = {
-                "home_team":  m["h"]["title"],
-                "away_team":  m["a"]["title"],
-                "home_goals": _safe_int(m.get("goals", {}).get("h")),
-                "away_goals": _safe_int(m.get("goals", {}).get("a")),
-                "home_xg":    _safe_float(m.get("xG", {}).get("h")),
-                "away_xg":    _safe_float(m.get("xG", {}).get("a")),
-                "home_npxg":  _safe_float(m.get("npxG", {}).get("h")),
-                "away_npxg":  _safe_float(m.get("npxG", {}).get("a")),
-                "match_date": _parse_date(m.get("datetime")),
-                "understat_id": m.get("id"),
-            }
-            results.append(row)
-        except (KeyError, TypeError):
-            continue
+    with parsing():
+        for m in raw_matches:
+            if not m.get("isResult"):
+                continue
+            try:
+                row = {
+                    "home_team":  m["h"]["title"],
+                    "away_team":  m["a"]["title"],
+                    "home_goals": _safe_int(m.get("goals", {}).get("h")),
+                    "away_goals": _safe_int(m.get("goals", {}).get("a")),
+                    "home_xg":    _safe_float(m.get("xG", {}).get("h")),
+                    "away_xg":    _safe_float(m.get("xG", {}).get("a")),
+                    "home_npxg":  _safe_float(m.get("npxG", {}).get("h")),
+                    "away_npxg":  _safe_float(m.get("npxG", {}).get("a")),
+                    "match_date": _parse_date(m.get("datetime")),
+                    "understat_id": m.get("id"),
+                }
+                results.append(row)
+            except (KeyError, TypeError):
+                continue
 
     logger.info(f"Understat [{understat_slug} {season}] : {len(results)} matchs récupérés")
 
     if session and results:
-        upsert_matches(session, results)
+        _store_match_xg(session, _league_id(understat_slug), season, results)
 
     return results
 
 
+def _store_match_xg(session: Session, league_id: Optional[int], season: int,
+                    results: list[dict]):
+    """
+    Reporte home_xg / away_xg sur les lignes ``matches`` existantes (ID
+    API-Football) : appariement par ligue, saison, date (± 1 jour, fuseaux)
+    et noms d'équipes. Un match absent de la base est ignoré.
+    """
+    from sqlalchemy import select
+    from ..db import Match
+    from ..live import find_match
+
+    if league_id is None:
+        return
+    candidates = session.execute(
+        select(Match.id, Match.home_team, Match.away_team, Match.match_date)
+        .where(Match.league_id == league_id, Match.season == season)
+    ).all()
+    by_day: dict[date, list] = {}
+    for c in candidates:
+        by_day.setdefault(c.match_date, []).append(c)
+
+    rows, missing = [], 0
+    for m in results:
+        if m["match_date"] is None:
+            continue
+        found = None
+        for delta in (0, -1, 1):
+            day = m["match_date"] + timedelta(days=delta)
+            found = find_match(by_day.get(day, []), m["home_team"], m["away_team"])
+            if found is not None:
+                break
+        if found is None:
+            missing += 1
+            continue
+        rows.append({"id": found.id, "home_xg": m["home_xg"], "away_xg": m["away_xg"]})
+
+    written = update_match_results(session, rows)
+    logger.info(f"Understat ligue {league_id} {season} : xG de {len(rows)} matchs "
+                f"({written}), {missing} sans correspondance en base")
+
+
 def fetch_last_round_xg(
     understat_slug: str,
     season: int = SEASON,
@@ -210,33 +305,80 @@ def scrape_player_xg(understat_slug: str, season: int = SEASON) -> list[dict]:
     """xG joueur par match depuis Understat."""
     logger.info(f"Understat [{understat_slug} {season}] : récupération xG joueurs…")
     try:
-        with _get_client() as understat:
-            data = understat.league(league=understat_slug).get_player_data(
-                season=str(season)
+        with _get_client() as understat, track(
+                "understat", "league.get_player_data", _league_id(understat_slug), season):
+            data = request(
+                lambda: understat.league(league=understat_slug).get_player_data(
+                    season=str(season)),
+                "understat", _HOST,
             )
         players = []
-        for player_id, info in data.items():
-            h = info.get("history", [])
-            for match in h:
-                players.append({
-                    "player_id": player_id,
-                    "player_name": info.get("player_name"),
-                    "team": info.get("team_title"),
-                    "xg": _safe_float(match.get("xG")),
-                    "xa": _safe_float(match.get("xA")),
-                    "goals": _safe_int(match.get("goals")),
-                    "assists": _safe_int(match.get("assists")),
-                    "match_date": _parse_date(match.get("date")),
-                    "minutes": _safe_int(match.get("time")),
-                })
+        with parsing():
+            for player_id, info in data.items():
+                h = info.get("history", [])
+                for match in h:
+                    players.append({
+                        "player_id": player_id,
+                        "player_name": info.get("player_name"),
+                        "team": info.get("team_title"),
+                        "xg": _safe_float(match.get("xG")),
+                        "xa": _safe_float(match.get("xA")),
+                        "goals": _safe_int(match.get("goals")),
+                        "assists": _safe_int(match.get("assists")),
+                        "match_date": _parse_date(match.get("date")),
+                        "minutes": _safe_int(match.get("time")),
+                    })
         return players
     except Exception as e:
         logger.error(f"Understat player xG [{understat_slug}]: {e}")
         return []
 
 
+def load_player_xg(
+    understat_slug: str,
+    league_id: int,
+    season: int = SEASON,
+    session: Optional[Session] = None,
+) -> int:
+    """
+    Charge les xG / xA joueur × match d'une ligue/saison dans player_matches,
+    puis reporte les cumuls saison dans players.xg / players.xa.
+
+    Une seule requête Understat par ligue/saison. Retourne le nombre de lignes.
+    """
+    rows = [
+        {
+            "player_id":   int(r["player_id"]),
+            "player_name": r["player_name"],
+            "team":        r["team"],
+            "league_id":   league_id,
+            "season":      season,
+            "match_date":  r["match_date"],
+            "minutes":     r["minutes"] or 0,
+            "goals":       r["goals"] or 0,
+            "assists":     r["assists"] or 0,
+            "xg":          r["xg"],
+            "xa":          r["xa"],
+        }
+        for r in scrape_player_xg(understat_slug, season)
+        if r.get("match_date")
+    ]
+    if session and rows:
+        written = upsert_player_matches(session, rows)
+        updated = rollup_player_xg(session, league_id, season)
+        logger.info(
+            f"Understat [{understat_slug} {season}] : {len(rows)} lignes joueur × match "
+            f"({written}), xG/xA modifiés pour {updated} joueurs"
+        )
+    return len(rows)
+
+
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
+def _league_id(understat_slug: str) -> Optional[int]:
+    return next((lg.id for lg in domestic_leagues() if lg.understat_slug == understat_slug), None)
+
+
 def _parse_date(date_str: Optional[str]) -> Optional[date]:
     if not date_str:
         return None
@@ -6,13 +6,18 @@ from dotenv import load_dotenv
 load_dotenv()
 
 API_FOOTBALL_KEY = os.getenv("API_FOOTBALL_KEY", "")
-API_FOOTBALL_BASE = "https://v3.football.api-sports.io"
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./euro_top.db")
 SEASON = int(os.getenv("SEASON", "2025"))
 
 # The Odds API — https://the-odds-api.com (free: 500 req/mois)
 ODDS_API_KEY = os.getenv("ODDS_API_KEY", "")
 
+# URLs des sources — surchargeables, ex. serveurs locaux (euro-top mock)
+API_FOOTBALL_BASE = os.getenv("API_FOOTBALL_BASE", "https://v3.football.api-sports.io")
+ODDS_API_BASE = os.getenv("ODDS_API_BASE", "https://api.the-odds-api.com/v4")
+SOFASCORE_BASE = os.getenv("SOFASCORE_BASE", "https://api.sofascore.com/api/v1")
+UNDERSTAT_BASE = os.getenv("UNDERSTAT_BASE", "")   # vide = understatapi (understat.com)
+
 # Limite journalière API-Football (free = 100, on prend de la marge)
 API_DAILY_LIMIT = 90
 
@@ -0,0 +1,317 @@
+"""
+Démon de collecte — un seul processus, clients HTTP et connexions DB partagés.
+
+Remplace les appels cron à ``scripts/collect.py`` (un processus froid par
+collecte). Quatre jobs, cadencés par ``scheduler.Scheduler`` :
+
+    api_football : une fois par jour (API_HOUR) — résultats, classements,
+                   buteurs, passeurs de toutes les ligues (endpoints encore
+                   frais sautés, voir freshness.py)
+    understat    : vérifié toutes les heures, ne tourne qu'après une journée
+                   (matchs joués depuis le dernier run réussi)
+    odds         : toutes les 2 h le jour d'un match, toutes les 12 h la veille,
+                   rien sinon → data/odds_<ligue>.json
+    backfill     : une heure après la collecte API-Football, tant que des
+                   tâches ``euro-top backfill`` restent en attente — reste du
+                   quota du jour (réserve gardée) + Understat en parallèle
+
+Un verrou (data/daemon.lock) empêche deux démons simultanés. SIGINT / SIGTERM
+→ arrêt propre (les jobs en cours finissent la ligue entamée).
+"""
+from __future__ import annotations
+
+import fcntl
+import json
+import logging
+import os
+import signal
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import func
+
+from . import telemetry
+from .config import SEASON, all_leagues, domestic_leagues
+from .db import Match, get_session, init_db
+from .scheduler import Job, Scheduler, daily_at, every
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+STATE_PATH = DATA_DIR / "daemon_state.json"
+LOCK_PATH = DATA_DIR / "daemon.lock"
+
+API_HOUR = 7                     # Collecte API-Football quotidienne (heure locale)
+UNDERSTAT_CHECK = 3600           # Secondes entre deux vérifications de journée
+ODDS_MATCHDAY = 2 * 3600         # Cotes le jour d'un match
+ODDS_EVE = 12 * 3600             # Cotes la veille
+JOB_NAMES = ("api_football", "understat", "odds", "backfill")
+
+
+class DaemonAlreadyRunning(Exception):
+    """Un autre démon détient déjà le verrou."""
+
+
+# ── Ressources partagées ──────────────────────────────────────────────────────
+
+class Resources:
+    """
+    Clients HTTP ouverts une fois pour toute la vie du démon (keep-alive).
+    Chaque job n'est exécuté que par un thread à la fois (une source = un job),
+    donc un client par source suffit.
+    """
+
+    def __init__(self):
+        self._api = None
+        self._api_session = None
+        self._odds = None
+
+    def api_football(self):
+        if self._api is None:
+            from .collectors.api_football import ApiFootballClient
+            self._api_session = get_session()
+            self._api = ApiFootballClient(self._api_session)
+        return self._api
+
+    def odds(self):
+        if self._odds is None:
+            from .collectors.odds import OddsClient
+            self._odds = OddsClient()
+        return self._odds
+
+    def close(self):
+        if self._api is not None:
+            self._api.close()
+            self._api_session.close()
+
+
+# ── Jobs ──────────────────────────────────────────────────────────────────────
+
+def _api_football_job(res: Resources, season: int):
+    def run(scheduler: Scheduler) -> str:
+        from .collectors.api_football import RateLimitError
+        client = res.api_football()
+        skipped, done = client.skipped, []
+        for lg in all_leagues():
+            if scheduler.stopping:
+                break
+            try:
+                client.fetch_fixtures(lg.id, season)
+                client.fetch_standings(lg.id, season)
+                client.fetch_top_scorers(lg.id, season)
+                client.fetch_top_assisters(lg.id, season)
+            except RateLimitError as e:
+                logger.warning(f"API-Football : {e}")
+                break
+            finally:
+                client.session.rollback()   # Session propre pour la ligue suivante
+            done.append(lg.short)
+        _forget_leagues_playing()
+        return (f"{len(done)} ligues ({', '.join(done)}), "
+                f"{client.skipped - skipped} requête(s) évitée(s)")
+    return run
+
+
+def _matches_played_since(since: date, until: date) -> bool:
+    db = get_session()
+    try:
+        return bool(db.query(func.count(Match.id)).filter(
+            Match.match_date >= since, Match.match_date < until,
+        ).scalar())
+    finally:
+        db.close()
+
+
+def _understat_when(now: datetime, last_ok: datetime | None) -> bool:
+    """Une journée s'est jouée depuis le dernier run réussi (ou premier run)."""
+    if last_ok is None:
+        return True
+    return _matches_played_since(last_ok.date(), now.date())
+
+
+def _understat_job(season: int):
+    def run(scheduler: Scheduler) -> str:
+        from .collectors.understat import load_player_xg, scrape_league_xg
+        db = get_session()
+        done, failed = [], []
+        try:
+            for lg in domestic_leagues():
+                if scheduler.stopping:
+                    break
+                try:
+                    # Les collecteurs journalisent les erreurs réseau et rendent [] / 0
+                    rows = load_player_xg(lg.understat_slug, lg.id, season, db)
+                    matches = scrape_league_xg(lg.understat_slug, lg.id, season, db)
+                    if not rows and not matches:
+                        raise RuntimeError("aucune donnée reçue")
+                    done.append(lg.short)
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Understat [{lg.short}] : {e}")
+                    failed.append(lg.short)
+        finally:
+            db.close()
+        if failed and not done:
+            # Statut error : last_ok inchangé, _understat_when relance au tick suivant
+            raise RuntimeError(f"toutes les ligues en échec ({', '.join(failed)})")
+        return f"{len(done)} ligues" + (f", échecs : {', '.join(failed)}" if failed else "")
+    return run
+
+
+def _query_leagues_playing(day: date) -> list[str]:
+    """Clés des ligues ayant un match non joué ce jour-là."""
+    by_id = {lg.id: lg.short for lg in all_leagues()}
+    db = get_session()
+    try:
+        ids = db.query(Match.league_id).filter(
+            Match.match_date == day, Match.status == "NS",
+        ).distinct().all()
+    finally:
+        db.close()
+    return [by_id[i] for (i,) in ids if i in by_id]
+
+
+# La règle des cotes est évaluée à chaque tick, sous le verrou du scheduler :
+# une requête par jour calendaire, pas une par tick. Vidé après la collecte
+# API-Football (nouveaux matchs au calendrier).
+_playing: dict[date, list[str]] = {}
+_playing_lock = threading.Lock()
+
+
+def _leagues_playing(day: date) -> list[str]:
+    """``_query_leagues_playing`` mémorisé par jour."""
+    with _playing_lock:
+        if day in _playing:
+            return _playing[day]
+    keys = _query_leagues_playing(day)
+    with _playing_lock:
+        for old in [d for d in _playing if d < day - timedelta(days=1)]:
+            del _playing[old]
+        _playing[day] = keys
+    return keys
+
+
+def _forget_leagues_playing():
+    with _playing_lock:
+        _playing.clear()
+
+
+def _odds_rule(now: datetime, last: datetime | None) -> datetime:
+    """Cadence selon la proximité des matchs : jour J, veille, sinon vérif. horaire."""
+    if last is None:
+        return now
+    if _leagues_playing(now.date()):
+        period = ODDS_MATCHDAY
+    elif _leagues_playing(now.date() + timedelta(days=1)):
+        period = ODDS_EVE
+    else:
+        period = UNDERSTAT_CHECK
+    return last + timedelta(seconds=period)
+
+
+def _odds_when(now: datetime, last_ok: datetime | None) -> bool:
+    today = now.date()
+    return bool(_leagues_playing(today) or _leagues_playing(today + timedelta(days=1)))
+
+
+def _odds_job(res: Resources):
+    def run(scheduler: Scheduler) -> str:
+        today = date.today()
+        keys = sorted(set(_query_leagues_playing(today))
+                      | set(_query_leagues_playing(today + timedelta(days=1))))
+        client = res.odds()
+        written = []
+        for key in keys:
+            if scheduler.stopping:
+                break
+            events = client.fetch_odds(key)
+            if not events:
+                continue
+            path = DATA_DIR / f"odds_{key}.json"
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({
+                "fetched_at": datetime.now().isoformat(timespec="seconds"),
+                "league": key, "events": events,
+            }, indent=2, ensure_ascii=False, default=str), encoding="utf-8")
+            os.replace(tmp, path)
+            written.append(key)
+        return (f"{', '.join(written) or 'aucune cote'} "
+                f"(quota restant : {client.quota_remaining})")
+    return run
+
+
+def _backfill_when(now: datetime, last_ok: datetime | None) -> bool:
+    from .backfill import has_pending
+    db = get_session()
+    try:
+        return has_pending(db)
+    finally:
+        db.close()
+
+
+def _backfill_job(res: Resources):
+    def run(scheduler: Scheduler) -> str:
+        from .backfill import run as run_backfill
+        summary = run_backfill(stop=lambda: scheduler.stopping, client=res.api_football())
+        return ", ".join(f"{source} : {c['done']} faites, {c['left']} restantes"
+                         for source, c in summary.items()) or "rien à faire"
+    return run
+
+
+def _flushing(func):
+    """Écrit la télémétrie des requêtes du job à la fin de chaque run."""
+    def run(scheduler: Scheduler) -> str:
+        try:
+            return func(scheduler)
+        finally:
+            telemetry.flush()
+    return run
+
+
+def build_jobs(res: Resources, season: int = SEASON, api_hour: int = API_HOUR,
+               only: list[str] | None = None) -> list[Job]:
+    jobs = [
+        Job("api_football", "api_football", _api_football_job(res, season), daily_at(api_hour)),
+        Job("understat", "understat", _understat_job(season), every(UNDERSTAT_CHECK),
+            when=_understat_when),
+        Job("odds", "odds", _odds_job(res), _odds_rule, when=_odds_when),
+        # Même source qu'api_football : client partagé, jamais en même temps
+        Job("backfill", "api_football", _backfill_job(res), daily_at((api_hour + 1) % 24),
+            when=_backfill_when),
+    ]
+    for job in jobs:
+        job.func = _flushing(job.func)
+    return [j for j in jobs if not only or j.name in only]
+
+
+# ── Processus ─────────────────────────────────────────────────────────────────
+
+def _acquire_lock():
+    DATA_DIR.mkdir(exist_ok=True)
+    fh = open(LOCK_PATH, "w")
+    try:
+        fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        fh.close()
+        raise DaemonAlreadyRunning(f"Un démon tourne déjà (verrou {LOCK_PATH})")
+    fh.write(str(os.getpid()))
+    fh.flush()
+    return fh
+
+
+def run(season: int = SEASON, api_hour: int = API_HOUR, only: list[str] | None = None,
+        tick: float | None = None):
+    """Démarre le démon au premier plan (bloquant jusqu'à SIGINT / SIGTERM)."""
+    lock = _acquire_lock()
+    init_db()
+    res = Resources()
+    scheduler = Scheduler(build_jobs(res, season, api_hour, only), STATE_PATH,
+                          **({"tick": tick} if tick else {}))
+    signal.signal(signal.SIGINT, scheduler.stop)
+    signal.signal(signal.SIGTERM, scheduler.stop)
+    try:
+        scheduler.run_forever()
+    finally:
+        res.close()
+        lock.close()
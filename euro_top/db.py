@@ -1,17 +1,22 @@
 """Base de données SQLite via SQLAlchemy (sync)."""
 from __future__ import annotations
 import json
+import os
+import unicodedata
+from dataclasses import dataclass, field
 from datetime import datetime, date
-from typing import Any
+from typing import Any, NamedTuple
 
 from sqlalchemy import (
-    create_engine, Column, Integer, String, Float,
-    DateTime, Date, Boolean, Text, UniqueConstraint,
-    func, desc, asc
+    create_engine, event, Column, Integer, String, Float,
+    DateTime, Date, Boolean, Text, UniqueConstraint, Index,
+    bindparam, case, exists, func, desc, asc, select, text, update, false, or_
 )
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
+from . import metrics
 from .config import DATABASE_URL
 
 
@@ -83,193 +88,959 @@ class Standing(Base):
     fetched_at  = Column(DateTime, default=datetime.utcnow)
 
 
+class PlayerMatch(Base):
+    """xG / xA par joueur et par match (Understat)."""
+    __tablename__ = "player_matches"
+    __table_args__ = (
+        UniqueConstraint("player_id", "league_id", "season", "match_date"),
+        Index("ix_player_matches_form", "league_id", "season", "player_id", "match_date"),
+        Index("ix_player_matches_key", "league_id", "season", "name_key"),
+    )
+    id          = Column(Integer, primary_key=True, autoincrement=True)
+    player_id   = Column(Integer, nullable=False)      # ID Understat
+    player_name = Column(String(120))
+    name_key    = Column(String(60))                   # Nom normalisé (jointure players)
+    team        = Column(String(100))
+    league_id   = Column(Integer, nullable=False)
+    season      = Column(Integer, nullable=False)
+    match_date  = Column(Date, nullable=False)
+    minutes     = Column(Integer, default=0)
+    goals       = Column(Integer, default=0)
+    assists     = Column(Integer, default=0)
+    xg          = Column(Float)
+    xa          = Column(Float)
+
+
+class TeamRating(Base):
+    """Historique Elo : une ligne par équipe et par match noté."""
+    __tablename__ = "team_ratings"
+    __table_args__ = (
+        UniqueConstraint("pool", "variant", "match_id", "team"),
+        Index("ix_team_ratings_asof", "pool", "variant", "team", "match_date"),
+    )
+    id          = Column(Integer, primary_key=True, autoincrement=True)
+    pool        = Column(String(20), nullable=False)   # ligue domestique ou "europe"
+    variant     = Column(String(10), nullable=False)   # "goals" ou "xg"
+    team        = Column(String(100), nullable=False)
+    match_id    = Column(Integer, nullable=False)
+    match_date  = Column(Date, nullable=False)
+    league_id   = Column(Integer)
+    season      = Column(Integer)
+    rating      = Column(Float, nullable=False)        # Après le match
+    delta       = Column(Float, nullable=False)
+
+
 class ApiCallLog(Base):
+    """Une requête sortante (toutes sources) — voir telemetry.py."""
     __tablename__ = "api_calls"
     id          = Column(Integer, primary_key=True, autoincrement=True)
     called_at   = Column(DateTime, default=datetime.utcnow)
+    source      = Column(String(20))    # api_football, odds, sofascore, understat (NULL = api_football)
     endpoint    = Column(String(200))
     league_id   = Column(Integer)
     season      = Column(Integer)
-    status      = Column(Integer)   # HTTP status code
+    status      = Column(Integer)   # HTTP status code (NULL = pas de réponse)
+    duration_ms = Column(Float)     # Requête, hors parsing et attentes
+    dns_ms      = Column(Float)
+    connect_ms  = Column(Float)     # 0 = connexion réutilisée
+    bytes       = Column(Integer)   # Corps de réponse
+    retries     = Column(Integer)
+    cache_hit   = Column(Boolean)
+    parse_ms    = Column(Float)     # JSON → lignes
+    error       = Column(String(60))
+
+    __table_args__ = (
+        Index("ix_api_calls_called_at", "called_at", "source"),
+    )
+
+
+class BackfillTask(Base):
+    """Point de reprise du backfill historique — voir backfill.py."""
+    __tablename__ = "backfill_tasks"
+    __table_args__ = (UniqueConstraint("source", "league_id", "season", "endpoint"),)
+    id          = Column(Integer, primary_key=True, autoincrement=True)
+    source      = Column(String(20), nullable=False)    # api_football, understat
+    league_id   = Column(Integer, nullable=False)
+    season      = Column(Integer, nullable=False)
+    endpoint    = Column(String(40), nullable=False)    # standings, fixtures, player_xg…
+    status      = Column(String(10), nullable=False, default="pending")  # pending, done, failed
+    attempts    = Column(Integer, nullable=False, default=0)
+    rows        = Column(Integer)                        # Lignes écrites (done)
+    error       = Column(String(200))                    # Dernière erreur
+    updated_at  = Column(DateTime, default=datetime.utcnow)
+
+
+class SyncState(Base):
+    """Fraîcheur par table × ligue × saison : dernière collecte, dernier changement réel."""
+    __tablename__ = "sync_state"
+    __table_args__ = (UniqueConstraint("table_name", "league_id", "season"),)
+    id          = Column(Integer, primary_key=True, autoincrement=True)
+    table_name  = Column(String(40), nullable=False)
+    league_id   = Column(Integer, nullable=False)
+    season      = Column(Integer, nullable=False)
+    checked_at  = Column(DateTime, nullable=False)      # Dernier upsert (même sans changement)
+    changed_at  = Column(DateTime)                      # Dernière ligne insérée ou modifiée
+    rows        = Column(Integer)                       # Lignes reçues au dernier upsert
+    changed     = Column(Integer)                       # … dont écrites
+
+
+class StatKey(Base):
+    """Dictionnaire des statistiques de match (clé normalisée → libellé Sofascore)."""
+    __tablename__ = "stat_keys"
+    id          = Column(Integer, primary_key=True, autoincrement=True)
+    key         = Column(String(60), nullable=False, unique=True)   # ball_possession, total_shots…
+    name        = Column(String(80))                                # Ball possession, Total shots…
+
+
+class MatchStat(Base):
+    """
+    Statistiques complètes d'un match (Sofascore), format long : une ligne
+    par match × statistique × côté. Clé primaire sans rowid (table étroite,
+    rangée par match) ; l'index par statistique couvre les agrégats par
+    équipe (jointure ``matches`` pour ligue, saison et nom d'équipe).
+    """
+    __tablename__ = "match_stats"
+    __table_args__ = (
+        Index("ix_match_stats_stat", "stat_id", "match_id", "side", "value"),
+        {"sqlite_with_rowid": False},
+    )
+    match_id    = Column(Integer, primary_key=True)      # matches.id
+    stat_id     = Column(Integer, primary_key=True)      # stat_keys.id
+    side        = Column(String(4), primary_key=True)    # home, away
+    value       = Column(Float, nullable=False)
 
 
 # ── Engine & session ──────────────────────────────────────────────────────────
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+# Créés au premier usage (get_engine) : importer ce module n'ouvre rien.
+_engine: Engine | None = None
+_session_factory: sessionmaker | None = None
+
+BUSY_TIMEOUT_MS = 30000      # Attente d'un verrou d'écriture SQLite avant « database is locked »
+
+
+def get_engine() -> Engine:
+    """Engine SQLAlchemy partagé, créé au premier appel."""
+    global _engine, _session_factory
+    if _engine is None:
+        _engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+        event.listen(_engine, "connect", _register_sql_functions)
+        if _engine.dialect.name == "sqlite":
+            event.listen(_engine, "connect", _sqlite_concurrency)
+        _session_factory = sessionmaker(bind=_engine, autocommit=False, autoflush=False)
+    return _engine
+
+
+def create_readonly_engine(pool_size: int = 4) -> Engine:
+    """
+    Engine SQLite en lecture seule (mode=ro) pour les services de lecture
+    longue durée : aucune écriture possible, connexions réutilisées par le pool.
+    """
+    url = DATABASE_URL
+    if url.startswith("sqlite:///"):
+        path = os.path.abspath(url[len("sqlite:///"):])
+        url = f"sqlite:///file:{path}?mode=ro&uri=true"
+    ro = create_engine(url, pool_size=pool_size,
+                       connect_args={"check_same_thread": False})
+    event.listen(ro, "connect", _register_sql_functions)
+    return ro
+
+
+def __getattr__(name: str):
+    # Compat : ``from euro_top.db import engine, SessionLocal``
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        get_engine()
+        return _session_factory
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def name_key(name: str | None) -> str | None:
+    """
+    Clé de jointure joueur : dernier mot du nom, minuscule, sans accents.
+    "K. Mbappé" (API-Football) et "Kylian Mbappé" (Understat) → "mbappe".
+    """
+    if not name:
+        return None
+    ascii_ = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return ascii_.lower().replace(".", " ").split()[-1] if ascii_.strip() else None
+
+
+def _register_sql_functions(dbapi_conn, _record):
+    dbapi_conn.create_function("name_key", 1, name_key, deterministic=True)
+
+
+def _sqlite_concurrency(dbapi_conn, _record):
+    """
+    Écrivains concurrents (backfill : workers Understat + thread API-Football,
+    démon) : WAL (lecteurs et écrivain ne se bloquent plus) et attente du
+    verrou d'écriture au lieu d'un échec immédiat.
+    """
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    cursor.close()
 
 
 def init_db():
-    """Crée les tables si elles n'existent pas."""
+    """Crée les tables si elles n'existent pas, complète les colonnes / index ajoutés depuis."""
+    engine = get_engine()
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns(engine)
+
+
+def _add_missing_columns(engine: Engine):
+    """Migration légère SQLite : ALTER TABLE ADD COLUMN pour les colonnes nullables ajoutées."""
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table.name})"))}
+            for col in table.columns:
+                if col.name not in existing and col.nullable:
+                    conn.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {col.name} "
+                        f"{col.type.compile(dialect=engine.dialect)}"))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
 
 
 def get_session() -> Session:
-    return SessionLocal()
+    get_engine()
+    return _session_factory()
 
 
 # ── Helpers API call counting ─────────────────────────────────────────────────
 
 def count_api_calls_today(session: Session) -> int:
+    """Requêtes API-Football du jour ayant reçu une réponse (tampon télémétrie inclus)."""
+    from .telemetry import pending
     today = date.today()
     return session.query(ApiCallLog).filter(
-        func.date(ApiCallLog.called_at) == today
-    ).count()
+        func.date(ApiCallLog.called_at) == today,
+        (ApiCallLog.source == "api_football") | ApiCallLog.source.is_(None),
+        ApiCallLog.status.isnot(None),
+    ).count() + pending("api_football")
 
 
 def log_api_call(session: Session, endpoint: str, league_id: int | None,
-                 season: int | None, status: int):
-    session.add(ApiCallLog(endpoint=endpoint, league_id=league_id,
+                 season: int | None, status: int, source: str = "api_football"):
+    session.add(ApiCallLog(source=source, endpoint=endpoint, league_id=league_id,
                            season=season, status=status))
     session.commit()
 
 
 # ── Queries ───────────────────────────────────────────────────────────────────
 
-def upsert_standings(session: Session, rows: list[dict]):
+@dataclass
+class Upserted:
+    """Bilan d'un upsert : lignes écrites (insérées ou modifiées) et lignes identiques."""
+    changed: int = 0
+    unchanged: int = 0
+    keys: list[tuple] = field(default_factory=list)   # Clés des lignes écrites
+
+    def __str__(self) -> str:
+        return f"{self.changed} écrites, {self.unchanged} identiques"
+
+
+# Colonnes ignorées pour décider si une ligne a changé (réécrites seulement avec elle)
+_VOLATILE = frozenset({"fetched_at"})
+
+
+def _upsert(session: Session, model, rows: list[dict], keys: tuple[str, ...]) -> Upserted:
+    """
+    INSERT … ON CONFLICT DO UPDATE … WHERE <une colonne diffère> RETURNING <clés>.
+
+    Une ligne identique à la base (hors ``fetched_at``) n'est pas réécrite :
+    pas de page modifiée, pas de croissance du WAL, ``fetched_at`` reste la
+    date du dernier vrai changement. Un executemany par jeu de colonnes (les
+    lignes partielles ne mettent à jour que leurs colonnes). Seule la
+    fraîcheur de la ligue × saison est notée (``sync_state``). Commit inclus.
+    """
+    if not rows:
+        return Upserted()
+    table = model.__table__
+    groups: dict[tuple, list[dict]] = {}
     for r in rows:
-        stmt = sqlite_insert(Standing).values(**r)
+        groups.setdefault(tuple(r), []).append(r)
+    written: list[tuple] = []
+    for columns, group in groups.items():
+        stmt = sqlite_insert(model)
+        values = [c for c in columns if c not in keys]
+        compared = [table.c[c].is_distinct_from(stmt.excluded[c])
+                    for c in values if c not in _VOLATILE]
         stmt = stmt.on_conflict_do_update(
-            index_elements=["league_id", "season", "team"],
-            set_={k: v for k, v in r.items() if k not in ("league_id", "season", "team")}
-        )
-        session.execute(stmt)
+            index_elements=list(keys),
+            set_={c: stmt.excluded[c] for c in values},
+            where=or_(*compared) if compared else false(),
+        ).returning(*(table.c[k] for k in keys))
+        written += [tuple(r) for r in session.execute(stmt, group)]
+    result = Upserted(len(written), len(rows) - len(written), written)
+    _touch(session, table.name, rows, keys, set(written))
     session.commit()
+    metrics.rows(table.name, result.changed, result.unchanged)
+    return result
 
 
-def upsert_players(session: Session, rows: list[dict]):
+def _touch(session: Session, table_name: str, rows: list[dict], keys: tuple[str, ...],
+           written: set[tuple]):
+    """Une ligne ``sync_state`` par ligue × saison des lignes reçues."""
+    now = datetime.utcnow()
+    scopes: dict[tuple, list[int]] = {}
     for r in rows:
-        stmt = sqlite_insert(Player).values(**r)
-        stmt = stmt.on_conflict_do_update(
-            index_elements=["api_id", "league_id", "season"],
-            set_={k: v for k, v in r.items() if k not in ("api_id", "league_id", "season")}
-        )
-        session.execute(stmt)
+        if r.get("league_id") is None or r.get("season") is None:
+            continue
+        counts = scopes.setdefault((r["league_id"], r["season"]), [0, 0])
+        counts[0] += 1
+        counts[1] += tuple(r[k] for k in keys) in written
+    if not scopes:
+        return
+    stmt = sqlite_insert(SyncState)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["table_name", "league_id", "season"],
+        set_={"checked_at": stmt.excluded.checked_at, "rows": stmt.excluded.rows,
+              "changed": stmt.excluded.changed,
+              "changed_at": func.coalesce(stmt.excluded.changed_at, SyncState.changed_at)},
+    )
+    session.execute(stmt, [
+        {"table_name": table_name, "league_id": league_id, "season": season,
+         "checked_at": now, "changed_at": now if changed else None,
+         "rows": n, "changed": changed}
+        for (league_id, season), (n, changed) in scopes.items()
+    ])
+
+
+def upsert_standings(session: Session, rows: list[dict]) -> Upserted:
+    return _upsert(session, Standing, rows, ("league_id", "season", "team"))
+
+
+def upsert_players(session: Session, rows: list[dict]) -> Upserted:
+    return _upsert(session, Player, rows, ("api_id", "league_id", "season"))
+
+
+def upsert_matches(session: Session, rows: list[dict]) -> Upserted:
+    result = _upsert(session, Match, rows, ("id",))
+
+    # Elo incrémental sur les matchs terminés nouvellement ingérés ou corrigés
+    from .ratings import update_ratings
+    changed = {key for key, in result.keys}
+    update_ratings(session, [r for r in rows if r.get("id") in changed])
+    return result
+
+
+def update_match_results(session: Session, rows: list[dict]) -> Upserted:
+    """
+    Met à jour des matchs existants (clé ``id``) ; les valeurs None sont
+    ignorées (ne pas écraser un xG déjà connu). Un match dont les valeurs
+    sont déjà en base n'est pas réécrit (``fetched_at`` inchangé).
+    """
+    table = Match.__table__
+    result = Upserted()
+    for r in rows:
+        values = {k: v for k, v in r.items() if v is not None and k != "id"}
+        if not values:
+            result.unchanged += 1
+            continue
+        stmt = (update(table)
+                .where(table.c.id == r["id"],
+                       or_(*(table.c[k].is_distinct_from(v) for k, v in values.items())))
+                .values(**values, fetched_at=datetime.utcnow()))
+        if session.execute(stmt).rowcount:
+            result.changed += 1
+            result.keys.append((r["id"],))
+        else:
+            result.unchanged += 1
+    metrics.rows("matches", result.changed, result.unchanged)
+    if not result.changed:
+        return result
     session.commit()
 
+    from .ratings import update_ratings
+    ids = [key for key, in result.keys]
+    full = session.execute(select(table).where(table.c.id.in_(ids))).mappings()
+    update_ratings(session, [dict(r) for r in full])
+    return result
 
-def upsert_matches(session: Session, rows: list[dict]):
+
+def upsert_player_matches(session: Session, rows: list[dict]) -> Upserted:
+    """Chargement en masse des lignes joueur × match (un executemany)."""
     for r in rows:
-        stmt = sqlite_insert(Match).values(**r)
-        stmt = stmt.on_conflict_do_update(
-            index_elements=["id"],
-            set_={k: v for k, v in r.items() if k != "id"}
-        )
-        session.execute(stmt)
+        r.setdefault("name_key", name_key(r.get("player_name")))
+    return _upsert(session, PlayerMatch, rows,
+                   ("player_id", "league_id", "season", "match_date"))
+
+
+def rollup_player_xg(session: Session, league_id: int, season: int) -> int:
+    """
+    Reporte les xG / xA cumulés de player_matches dans players.xg / xa.
+
+    Jointure ensembliste sur (ligue, saison, nom normalisé) ; un nom porté
+    par plusieurs joueurs Understat de la ligue reste sans xG (ambigu).
+    ``fetched_at`` avance sur les lignes modifiées (empreinte du serveur).
+    Retourne le nombre de joueurs dont les valeurs ont changé.
+    """
+    result = session.execute(text("""
+        UPDATE players SET xg = ROUND(agg.xg, 2), xa = ROUND(agg.xa, 2), fetched_at = :now
+        FROM (
+            SELECT name_key, SUM(xg) AS xg, SUM(xa) AS xa
+            FROM player_matches
+            WHERE league_id = :league_id AND season = :season
+            GROUP BY name_key
+            HAVING COUNT(DISTINCT player_id) = 1
+        ) AS agg
+        WHERE players.league_id = :league_id AND players.season = :season
+          AND agg.name_key = name_key(players.name)
+          AND (players.xg IS NOT ROUND(agg.xg, 2) OR players.xa IS NOT ROUND(agg.xa, 2))
+    """).bindparams(bindparam("now", type_=DateTime)),
+        {"league_id": league_id, "season": season, "now": datetime.utcnow()})
     session.commit()
+    return result.rowcount
 
 
-def get_standings(session: Session, league_id: int, season: int) -> list[Standing]:
-    return (
-        session.query(Standing)
-        .filter_by(league_id=league_id, season=season)
-        .order_by(asc(Standing.rank))
-        .all()
+def get_player_xg(session: Session, league_id: int, season: int,
+                  limit: int = 20, order: str = "xg") -> list[dict]:
+    """
+    xG / xA saison par joueur + valeurs par 90 minutes.
+
+    Retourne [{player_id, player_name, team, matches, minutes, goals,
+    assists, xg, xa, xg90, xa90}] trié par ``order`` (xg, xa, xg90, xa90).
+    """
+    minutes = func.sum(PlayerMatch.minutes)
+    per90 = lambda col: func.sum(col) * 90.0 / func.nullif(minutes, 0)
+    cols = {
+        "xg": func.sum(PlayerMatch.xg), "xa": func.sum(PlayerMatch.xa),
+        "xg90": per90(PlayerMatch.xg), "xa90": per90(PlayerMatch.xa),
+    }
+    stmt = (
+        select(
+            PlayerMatch.player_id,
+            func.max(PlayerMatch.player_name).label("player_name"),
+            func.max(PlayerMatch.team).label("team"),
+            func.count().label("matches"),
+            minutes.label("minutes"),
+            func.sum(PlayerMatch.goals).label("goals"),
+            func.sum(PlayerMatch.assists).label("assists"),
+            *(c.label(k) for k, c in cols.items()),
+        )
+        .where(PlayerMatch.league_id == league_id, PlayerMatch.season == season)
+        .group_by(PlayerMatch.player_id)
+        .having(minutes >= 90)
+        .order_by(cols[order].desc())
+        .limit(limit)
     )
+    return [dict(r._mapping) for r in session.execute(stmt)]
 
 
-def get_top_scorers(session: Session, league_id: int, season: int, limit: int = 20) -> list[Player]:
-    return (
-        session.query(Player)
-        .filter_by(league_id=league_id, season=season)
-        .filter(Player.goals > 0)
-        .order_by(desc(Player.goals), desc(Player.assists))
+def get_player_form(session: Session, league_id: int, season: int,
+                    last: int = 5, limit: int = 20) -> list[dict]:
+    """
+    Forme récente : xG / xA cumulés sur les ``last`` derniers matchs de chaque joueur.
+
+    Fenêtre ROW_NUMBER par joueur (index ix_player_matches_form).
+    """
+    ranked = (
+        select(
+            PlayerMatch,
+            func.row_number().over(
+                partition_by=PlayerMatch.player_id,
+                order_by=PlayerMatch.match_date.desc(),
+            ).label("rn"),
+        )
+        .where(PlayerMatch.league_id == league_id, PlayerMatch.season == season)
+        .subquery()
+    )
+    xg_xa = func.sum(ranked.c.xg) + func.sum(ranked.c.xa)
+    stmt = (
+        select(
+            ranked.c.player_id,
+            func.max(ranked.c.player_name).label("player_name"),
+            func.max(ranked.c.team).label("team"),
+            func.count().label("matches"),
+            func.sum(ranked.c.minutes).label("minutes"),
+            func.sum(ranked.c.xg).label("xg"),
+            func.sum(ranked.c.xa).label("xa"),
+            func.max(ranked.c.match_date).label("last_match"),
+        )
+        .where(ranked.c.rn <= last)
+        .group_by(ranked.c.player_id)
+        .order_by(xg_xa.desc())
         .limit(limit)
-        .all()
     )
+    return [dict(r._mapping) for r in session.execute(stmt)]
+
+
+# ── Lecture (Core) ────────────────────────────────────────────────────────────
+# Les commandes d'affichage lisent des tuples nommés depuis les builders
+# select_* de l'export (mêmes filtres, tris, arrondis) réduits aux champs du
+# tuple : ni identity map, ni état d'instance, ni chargement paresseux.
+# L'ORM ne sert qu'aux écritures.
+
+class StandingRow(NamedTuple):
+    rank: int
+    team: str
+    played: int
+    won: int
+    drawn: int
+    lost: int
+    goals_for: int
+    goals_against: int
+    goal_diff: int
+    points: int
+    form: str | None
+
+
+class PlayerRow(NamedTuple):
+    name: str | None
+    team: str | None
+    goals: int
+    assists: int
+    penalties: int
+    matches_played: int
+    minutes: int
+    xg: float | None
+    xa: float | None
+
+
+class MatchRow(NamedTuple):
+    id: int
+    match_date: date | None
+    home_team: str
+    away_team: str
+    home_goals: int | None
+    away_goals: int | None
+    home_xg: float | None
+    away_xg: float | None
+    home_km: float | None
+    away_km: float | None
+
+
+class TeamXgRow(NamedTuple):
+    team: str
+    matches: int
+    xg_for: float
+    xg_against: float
+    xg_for_avg: float
+    xg_against_avg: float
+    xg_diff: float
+
+
+class TeamDistanceRow(NamedTuple):
+    team: str
+    matches: int
+    total_km: float
+    avg_km: float
+
+
+def _rows(session: Session, row_type, stmt, model=None) -> list:
+    """
+    Exécute un builder ``select_*`` réduit aux champs de ``row_type`` (même
+    filtre, tri et limite que l'export) et convertit chaque ligne. Un champ
+    absent du builder est lu sur ``model``.
+    """
+    cols = stmt.selected_columns
+    stmt = stmt.with_only_columns(*(cols[f] if f in cols else getattr(model, f)
+                                    for f in row_type._fields))
+    return list(map(row_type._make, session.execute(stmt)))
+
+
+def get_standings(session: Session, league_id: int, season: int) -> list[StandingRow]:
+    return _rows(session, StandingRow, select_standings(league_id, season))
+
+
+def get_top_scorers(session: Session, league_id: int, season: int, limit: int = 20) -> list[PlayerRow]:
+    return _rows(session, PlayerRow, select_top_players(league_id, season, "goals", limit))
+
+
+def get_top_assisters(session: Session, league_id: int, season: int, limit: int = 20) -> list[PlayerRow]:
+    return _rows(session, PlayerRow, select_top_players(league_id, season, "assists", limit))
+
+
+def get_recent_matches(session: Session, league_id: int, season: int, limit: int = 10) -> list[MatchRow]:
+    return _rows(session, MatchRow, select_recent_matches(league_id, season, limit), Match)
+
+
+def get_matches_with_xg(session: Session, league_id: int, season: int, limit: int = 10) -> list[MatchRow]:
+    return _rows(session, MatchRow,
+                 select_recent_matches(league_id, season, limit, with_xg=True), Match)
+
+
+def get_matches_with_distance(session: Session, league_id: int, season: int, limit: int = 10) -> list[MatchRow]:
+    return _rows(session, MatchRow,
+                 select_recent_matches(league_id, season, limit, with_km=True), Match)
+
+
+def get_xg_by_team(session: Session, league_id: int, season: int) -> list[TeamXgRow]:
+    """xG agrégé par équipe pour la saison (GROUP BY SQL), trié par xG pour décroissant."""
+    return _rows(session, TeamXgRow, select_xg_by_team(league_id, season))
+
+
+def get_distance_by_team(session: Session, league_id: int, season: int, last: int = 10) -> list[TeamDistanceRow]:
+    """Distance moyenne par équipe (fenêtre des last × 20 derniers matchs)."""
+    return _rows(session, TeamDistanceRow, select_distance_by_team(league_id, season, last))
+
+
+# ── Rapport multi-ligues ──────────────────────────────────────────────────────
+
+def get_league_report(session: Session, league_ids: list[int], season: int,
+                      podium: int = 3) -> dict[int, dict]:
+    """
+    Données du rapport pour toutes les ligues en 3 requêtes ensemblistes
+    (classements, joueurs, xG), classées par ligue via ROW_NUMBER —
+    nombre de requêtes constant quel que soit le nombre de ligues.
+
+    Retourne {league_id: {standings: [{team, points, played}], top_scorer,
+    top_assister, top_xg}} ; seules les ligues ayant un classement y figurent.
+    """
+    # 1. Podium de chaque ligue
+    ranked = (
+        select(
+            Standing.league_id, Standing.team, Standing.points, Standing.played,
+            func.row_number().over(
+                partition_by=Standing.league_id,
+                order_by=(Standing.rank.asc(), Standing.id.asc()),
+            ).label("rn"),
+        )
+        .where(Standing.league_id.in_(league_ids), Standing.season == season)
+        .subquery()
+    )
+    report: dict[int, dict] = {}
+    for r in session.execute(
+        select(ranked.c.league_id, ranked.c.team, ranked.c.points, ranked.c.played)
+        .where(ranked.c.rn <= podium)
+        .order_by(ranked.c.league_id, ranked.c.rn)
+    ):
+        entry = report.setdefault(r.league_id, {
+            "standings": [], "top_scorer": None, "top_assister": None, "top_xg": None,
+        })
+        entry["standings"].append({"team": r.team, "points": r.points, "played": r.played})
+
+    # 2. Meilleur buteur et meilleur passeur (mêmes critères que get_top_*)
+    players = (
+        select(
+            Player.league_id, Player.name, Player.team, Player.goals, Player.assists,
+            func.row_number().over(
+                partition_by=Player.league_id,
+                order_by=(Player.goals.desc(), Player.assists.desc(), Player.id.asc()),
+            ).label("rn_goals"),
+            func.row_number().over(
+                partition_by=Player.league_id,
+                order_by=(Player.assists.desc(), Player.goals.desc(), Player.id.asc()),
+            ).label("rn_assists"),
+        )
+        .where(Player.league_id.in_(league_ids), Player.season == season)
+        .subquery()
+    )
+    for r in session.execute(
+        select(players).where(
+            ((players.c.rn_goals == 1) & (players.c.goals > 0))
+            | ((players.c.rn_assists == 1) & (players.c.assists > 0))
+        )
+    ):
+        entry = report.get(r.league_id)
+        if entry is None:
+            continue
+        player = {"name": r.name, "team": r.team, "goals": r.goals, "assists": r.assists}
+        if r.rn_goals == 1 and r.goals > 0:
+            entry["top_scorer"] = player
+        if r.rn_assists == 1 and r.assists > 0:
+            entry["top_assister"] = player
+
+    # 3. Équipe au plus gros xG cumulé (matchs terminés avec xG)
+    played = [Match.league_id.in_(league_ids), Match.season == season,
+              Match.status == "FT", Match.home_xg.is_not(None)]
+    sides = (
+        select(Match.league_id, Match.home_team.label("team"),
+               Match.home_xg.label("xg")).where(*played)
+        .union_all(
+            select(Match.league_id, Match.away_team.label("team"),
+                   Match.away_xg.label("xg")).where(*played)
+        )
+        .subquery()
+    )
+    teams = (
+        select(
+            sides.c.league_id, sides.c.team,
+            func.coalesce(func.sum(sides.c.xg), 0.0).label("xg_for"),
+            func.count().label("matches"),
+        )
+        .group_by(sides.c.league_id, sides.c.team)
+        .subquery()
+    )
+    top_xg = (
+        select(
+            teams,
+            func.row_number().over(
+                partition_by=teams.c.league_id,
+                order_by=(teams.c.xg_for.desc(), teams.c.team.asc()),
+            ).label("rn"),
+        )
+        .subquery()
+    )
+    for r in session.execute(select(top_xg).where(top_xg.c.rn == 1)):
+        if r.league_id in report:
+            report[r.league_id]["top_xg"] = {
+                "team": r.team, "xg_for": r.xg_for, "matches": r.matches,
+                "xg_for_avg": round(r.xg_for / r.matches, 2),
+            }
+    return report
+
+
+# ── Export en flux (Core) ─────────────────────────────────────────────────────
+# Requêtes Core pour --format json/ndjson/csv : lues par lots sur le curseur
+# (iter_rows), jamais matérialisées en objets ORM ni en liste complète.
+# league_id / season à None = toutes les ligues / saisons.
+
+STANDING_COLUMNS = ("league_id", "season", "rank", "team", "played", "won", "drawn",
+                    "lost", "goals_for", "goals_against", "goal_diff", "points", "form")
+PLAYER_COLUMNS = ("league_id", "season", "name", "team", "goals", "assists", "penalties",
+                  "matches_played", "minutes", "xg", "xa")
+MATCH_COLUMNS = ("id", "league_id", "season", "match_date", "home_team", "away_team",
+                 "home_goals", "away_goals", "home_xg", "away_xg")
+
 
+def _scope(model, league_id: int | None, season: int | None) -> list:
+    conds = []
+    if league_id is not None:
+        conds.append(model.league_id == league_id)
+    if season is not None:
+        conds.append(model.season == season)
+    return conds
 
-def get_top_assisters(session: Session, league_id: int, season: int, limit: int = 20) -> list[Player]:
+
+def _columns(model, names) -> list:
+    return [getattr(model, n) for n in names]
+
+
+def iter_rows(session: Session, stmt, batch_size: int = 1000):
+    """Itère les lignes (RowMapping) d'une requête Core, ``batch_size`` par fetch."""
+    result = session.execute(stmt, execution_options={"yield_per": batch_size})
+    yield from result.mappings()
+
+
+def select_standings(league_id: int | None, season: int | None):
     return (
-        session.query(Player)
-        .filter_by(league_id=league_id, season=season)
-        .filter(Player.assists > 0)
-        .order_by(desc(Player.assists), desc(Player.goals))
-        .limit(limit)
-        .all()
+        select(*_columns(Standing, STANDING_COLUMNS))
+        .where(*_scope(Standing, league_id, season))
+        .order_by(Standing.league_id, Standing.season, Standing.rank)
     )
 
 
-def get_recent_matches(session: Session, league_id: int, season: int, limit: int = 10) -> list[Match]:
+def select_top_players(league_id: int | None, season: int | None,
+                       by: str = "goals", limit: int | None = None):
+    """Meilleurs buteurs (by="goals") ou passeurs (by="assists") ; base de get_top_*."""
+    first, second = (Player.goals, Player.assists) if by == "goals" else (Player.assists, Player.goals)
     return (
-        session.query(Match)
-        .filter_by(league_id=league_id, season=season, status="FT")
-        .order_by(desc(Match.match_date))
+        select(*_columns(Player, PLAYER_COLUMNS))
+        .where(*_scope(Player, league_id, season), first > 0)
+        .order_by(desc(first), desc(second))
         .limit(limit)
-        .all()
     )
 
 
-def get_matches_with_xg(session: Session, league_id: int, season: int, limit: int = 10) -> list[Match]:
+def select_recent_matches(league_id: int | None, season: int | None,
+                          limit: int | None = None, with_xg: bool = False,
+                          with_km: bool = False):
+    conds = _scope(Match, league_id, season) + [Match.status == "FT"]
+    if with_xg:
+        conds.append(Match.home_xg.is_not(None))
+    if with_km:
+        conds.append(Match.home_km.is_not(None))
     return (
-        session.query(Match)
-        .filter_by(league_id=league_id, season=season, status="FT")
-        .filter(Match.home_xg != None)
+        select(*_columns(Match, MATCH_COLUMNS))
+        .where(*conds)
         .order_by(desc(Match.match_date))
         .limit(limit)
-        .all()
     )
 
 
-def get_matches_with_distance(session: Session, league_id: int, season: int, limit: int = 10) -> list[Match]:
+def _team_sides(conds: list, **cols):
+    """Une ligne par équipe et par match (domicile ∪ extérieur) ; cols = {nom: (dom, ext)}."""
+    def side(team, i):
+        return select(Match.league_id, Match.season, team.label("team"),
+                      *(pair[i].label(name) for name, pair in cols.items())).where(*conds)
+    return side(Match.home_team, 0).union_all(side(Match.away_team, 1)).subquery()
+
+
+def select_xg_by_team(league_id: int | None, season: int | None):
+    """xG par équipe × ligue × saison (tri xG pour décroissant) ; base de get_xg_by_team."""
+    conds = _scope(Match, league_id, season) + [Match.status == "FT", Match.home_xg.is_not(None)]
+    sides = _team_sides(conds, xg_for=(Match.home_xg, Match.away_xg),
+                        xg_against=(Match.away_xg, Match.home_xg))
+    xg_for = func.coalesce(func.sum(sides.c.xg_for), 0.0)
+    xg_against = func.coalesce(func.sum(sides.c.xg_against), 0.0)
+    n = func.count()
     return (
-        session.query(Match)
-        .filter_by(league_id=league_id, season=season, status="FT")
-        .filter(Match.home_km != None)
-        .order_by(desc(Match.match_date))
-        .limit(limit)
-        .all()
+        select(
+            sides.c.league_id, sides.c.season, sides.c.team,
+            n.label("matches"),
+            func.round(xg_for, 2).label("xg_for"),
+            func.round(xg_against, 2).label("xg_against"),
+            func.round(xg_for / n, 2).label("xg_for_avg"),
+            func.round(xg_against / n, 2).label("xg_against_avg"),
+            func.round(xg_for - xg_against, 2).label("xg_diff"),
+        )
+        .group_by(sides.c.league_id, sides.c.season, sides.c.team)
+        .order_by(sides.c.league_id, sides.c.season, xg_for.desc(), sides.c.team)
     )
 
 
-def get_xg_by_team(session: Session, league_id: int, season: int) -> list[dict]:
-    """Retourne le xG agrégé par équipe pour la saison."""
-    matches = (
-        session.query(Match)
-        .filter_by(league_id=league_id, season=season, status="FT")
-        .filter(Match.home_xg != None)
-        .all()
+def select_distance_by_team(league_id: int | None, season: int | None, last: int = 10):
+    """
+    Distance par équipe (base de get_distance_by_team) : fenêtre des last × 20
+    derniers matchs de chaque ligue × saison (ROW_NUMBER), même sur plusieurs ligues.
+    """
+    ranked = (
+        select(
+            Match.id,
+            func.row_number().over(
+                partition_by=(Match.league_id, Match.season),
+                order_by=desc(Match.match_date),
+            ).label("rn"),
+        )
+        .where(*_scope(Match, league_id, season), Match.status == "FT",
+               Match.home_km.is_not(None))
+        .subquery()
     )
-    teams: dict[str, dict] = {}
-    for m in matches:
-        for team, xg_for, xg_against in [
-            (m.home_team, m.home_xg, m.away_xg),
-            (m.away_team, m.away_xg, m.home_xg),
-        ]:
-            if team not in teams:
-                teams[team] = {"team": team, "xg_for": 0.0, "xg_against": 0.0, "matches": 0}
-            teams[team]["xg_for"] += xg_for or 0
-            teams[team]["xg_against"] += xg_against or 0
-            teams[team]["matches"] += 1
-    result = sorted(teams.values(), key=lambda x: x["xg_for"], reverse=True)
-    for r in result:
-        if r["matches"]:
-            r["xg_for_avg"] = round(r["xg_for"] / r["matches"], 2)
-            r["xg_against_avg"] = round(r["xg_against"] / r["matches"], 2)
-            r["xg_diff"] = round(r["xg_for"] - r["xg_against"], 2)
-    return result
+    recent = select(ranked.c.id).where(ranked.c.rn <= last * 20)
+    sides = _team_sides([Match.id.in_(recent)], km=(Match.home_km, Match.away_km))
+    total = func.coalesce(func.sum(sides.c.km), 0.0)
+    return (
+        select(
+            sides.c.league_id, sides.c.season, sides.c.team,
+            func.count().label("matches"),
+            func.round(total / func.count(), 1).label("avg_km"),
+            func.round(total, 1).label("total_km"),
+        )
+        .group_by(sides.c.league_id, sides.c.season, sides.c.team)
+        .order_by(sides.c.league_id, sides.c.season, (total / func.count()).desc(),
+                  sides.c.team)
+    )
+
+
+# ── Statistiques de match (format long) ──────────────────────────────────────
+# match_stats : une valeur numérique par match × statistique × côté ;
+# stat_keys : dictionnaire des clés. Tout ce que Sofascore renvoie est gardé,
+# une nouvelle analyse = une nouvelle requête pivot, jamais un re-fetch.
+
+def stat_key_ids(session: Session, keys, names: dict[str, str] | None = None) -> dict[str, int]:
+    """{clé: id} du dictionnaire ``stat_keys`` ; clés manquantes ajoutées (libellé ``names``)."""
+    keys = sorted(set(keys))
+    if not keys:
+        return {}
+    names = names or {}
+    stmt = sqlite_insert(StatKey)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["key"], set_={"name": stmt.excluded.name},
+        where=StatKey.name.is_(None) & stmt.excluded.name.is_not(None),
+    )
+    session.execute(stmt, [{"key": k, "name": names.get(k)} for k in keys])
+    return dict(session.execute(select(StatKey.key, StatKey.id).where(StatKey.key.in_(keys))).all())
+
 
+def upsert_match_stats(session: Session, stats: dict[int, dict],
+                       names: dict[str, str] | None = None) -> Upserted:
+    """
+    Chargement en masse des statistiques de plusieurs matchs (une journée) :
+    ``stats`` = {match_id: {"home": {clé: valeur}, "away": {...}}} (format
+    de fetch_match_stats, match_id = ``matches.id``). Valeurs non
+    numériques ignorées. Un executemany pour tout le lot.
+    """
+    values = [
+        (match_id, side, key, value)
+        for match_id, sides in stats.items()
+        for side in ("home", "away")
+        for key, value in (sides.get(side) or {}).items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    ]
+    ids = stat_key_ids(session, {key for _, _, key, _ in values}, names)
+    return _upsert(session, MatchStat, [
+        {"match_id": match_id, "stat_id": ids[key], "side": side, "value": float(value)}
+        for match_id, side, key, value in values
+    ], ("match_id", "stat_id", "side"))
 
-def get_distance_by_team(session: Session, league_id: int, season: int, last: int = 10) -> list[dict]:
-    """Retourne la distance moyenne par équipe (derniers N matchs)."""
-    matches = (
-        session.query(Match)
-        .filter_by(league_id=league_id, season=season, status="FT")
-        .filter(Match.home_km != None)
+
+def matches_with_stats(session: Session, match_ids) -> set[int]:
+    """Parmi ``match_ids``, ceux qui ont déjà leurs statistiques."""
+    match_ids = list(match_ids)
+    if not match_ids:
+        return set()
+    return set(session.scalars(
+        select(MatchStat.match_id).where(MatchStat.match_id.in_(match_ids)).distinct()
+    ))
+
+
+def missing_stats_days(session: Session, league_id: int, season: int, last: int = 10) -> list[date]:
+    """Dates des ``last`` derniers matchs terminés encore sans statistiques."""
+    recent = (
+        select(Match.match_date)
+        .where(*_scope(Match, league_id, season), Match.status == "FT",
+               Match.match_date.is_not(None),
+               ~exists().where(MatchStat.match_id == Match.id))
         .order_by(desc(Match.match_date))
-        .limit(last * 20)
-        .all()
+        .limit(last)
+        .subquery()
     )
-    teams: dict[str, dict] = {}
-    for m in matches:
-        for team, km in [(m.home_team, m.home_km), (m.away_team, m.away_km)]:
-            if team not in teams:
-                teams[team] = {"team": team, "total_km": 0.0, "matches": 0}
-            teams[team]["total_km"] += km or 0
-            teams[team]["matches"] += 1
-    result = []
-    for t in teams.values():
-        if t["matches"] > 0:
-            t["avg_km"] = round(t["total_km"] / t["matches"], 1)
-            result.append(t)
-    return sorted(result, key=lambda x: x["avg_km"], reverse=True)
+    return sorted(session.scalars(select(recent.c.match_date).distinct()))
+
+
+def select_stat_keys():
+    """Dictionnaire des statistiques : clé, libellé, nombre de matchs couverts."""
+    return (
+        select(StatKey.key, StatKey.name,
+               func.count(MatchStat.match_id.distinct()).label("matches"))
+        .outerjoin(MatchStat, MatchStat.stat_id == StatKey.id)
+        .group_by(StatKey.id)
+        .order_by(StatKey.key)
+    )
+
+
+def select_match_stats(league_id: int | None, season: int | None, keys: list[str],
+                       team: str | None = None, limit: int | None = None):
+    """
+    Pivot : une ligne par match × équipe, une colonne par clé de ``keys``
+    (None si la statistique manque pour ce match), du plus récent au plus ancien.
+    """
+    home = MatchStat.side == "home"
+    team_col = case((home, Match.home_team), else_=Match.away_team)
+    stmt = (
+        select(
+            Match.league_id, Match.season, MatchStat.match_id, Match.match_date,
+            team_col.label("team"),
+            case((home, Match.away_team), else_=Match.home_team).label("opponent"),
+            MatchStat.side,
+            *(func.max(case((StatKey.key == k, MatchStat.value))).label(k) for k in keys),
+        )
+        .join(Match, Match.id == MatchStat.match_id)
+        .join(StatKey, StatKey.id == MatchStat.stat_id)
+        .where(*_scope(Match, league_id, season), StatKey.key.in_(keys))
+        .group_by(MatchStat.match_id, MatchStat.side)
+        .order_by(desc(Match.match_date), MatchStat.match_id, MatchStat.side.desc())
+        .limit(limit)
+    )
+    if team is not None:
+        stmt = stmt.where(team_col == team)
+    return stmt
+
+
+def select_team_stats(league_id: int | None, season: int | None, keys: list[str]):
+    """Moyennes par équipe et par match de chaque clé de ``keys`` (tri ligue, saison, équipe)."""
+    per_match = select_match_stats(league_id, season, keys).order_by(None).subquery()
+    return (
+        select(
+            per_match.c.league_id, per_match.c.season, per_match.c.team,
+            func.count().label("matches"),
+            *(func.round(func.avg(per_match.c[k]), 2).label(k) for k in keys),
+        )
+        .group_by(per_match.c.league_id, per_match.c.season, per_match.c.team)
+        .order_by(per_match.c.league_id, per_match.c.season, per_match.c.team)
+    )
+
+
+def get_match_stats(session: Session, league_id: int, season: int, keys: list[str],
+                    team: str | None = None, limit: int | None = None) -> list[dict]:
+    return [dict(r) for r in session.execute(
+        select_match_stats(league_id, season, keys, team, limit)).mappings()]
+
+
+def get_team_stats(session: Session, league_id: int, season: int, keys: list[str]) -> list[dict]:
+    return [dict(r) for r in session.execute(
+        select_team_stats(league_id, season, keys)).mappings()]
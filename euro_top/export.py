@@ -0,0 +1,58 @@
+"""
+Sérialisation en flux des lignes de la CLI (--format json / ndjson / csv).
+
+Chaque ligne est écrite dès sa sortie du curseur : mémoire constante quel que
+soit le volume exporté. Les lignes sont des mappings (RowMapping ou dict) ;
+dates et datetimes sont écrites en ISO 8601.
+"""
+from __future__ import annotations
+
+import csv
+import json
+from datetime import date, datetime
+from typing import IO, Any, Iterable, Mapping
+
+FORMATS = ("table", "json", "ndjson", "csv")
+
+
+def json_default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable : {type(value).__name__}")
+
+
+def _dumps(row: Mapping) -> str:
+    return json.dumps(dict(row), default=json_default, ensure_ascii=False)
+
+
+def write_rows(rows: Iterable[Mapping], fmt: str, out: IO[str]) -> int:
+    """
+    Écrit ``rows`` sur ``out`` au format ``fmt`` (json, ndjson ou csv).
+
+    json  : tableau, un objet par ligne
+    ndjson: un objet JSON par ligne
+    csv   : en-tête = clés de la première ligne
+
+    Retourne le nombre de lignes écrites.
+    """
+    n = 0
+    if fmt == "ndjson":
+        for n, row in enumerate(rows, 1):
+            out.write(_dumps(row) + "\n")
+    elif fmt == "json":
+        out.write("[")
+        for n, row in enumerate(rows, 1):
+            out.write(("\n  " if n == 1 else ",\n  ") + _dumps(row))
+        out.write("\n]\n" if n else "]\n")
+    elif fmt == "csv":
+        writer = csv.writer(out, lineterminator="\n")
+        for n, row in enumerate(rows, 1):
+            if n == 1:
+                writer.writerow(row.keys())
+            writer.writerow(
+                v.isoformat() if isinstance(v, (date, datetime)) else v
+                for v in row.values()
+            )
+    else:
+        raise ValueError(f"Format inconnu : {fmt!r} (choix : {', '.join(FORMATS[1:])})")
+    return n
@@ -0,0 +1,166 @@
+"""
+Fraîcheur des données API-Football — une requête n'est envoyée que si elle
+peut rapporter quelque chose.
+
+    decision = check(session, "standings", league_id=61, season=2025)
+    if decision.fetch: ...           # sinon decision.reason dit pourquoi
+
+Dernier appel = dernière requête réussie (statut 200) de ``api_calls`` pour
+(endpoint, ligue, saison) ; calendrier = table ``matches`` (matchs terminés,
+et matchs à venir quand une source les a fournis).
+
+Politiques (ligue × saison × endpoint) :
+    fixtures    calendrier connu : le jour d'un match prévu depuis le dernier
+                appel, au plus toutes les MATCHDAY_INTERVAL ; sinon toutes
+                les FIXTURES_TTL
+    standings   seulement si un match s'est terminé depuis le dernier appel
+                (match récent écrit en base après lui — d'où ``fixtures`` en
+                premier dans les collectes)
+    topscorers  idem, et une fois par journée de match au plus (jamais deux
+    topassists  fois le même jour)
+    fixture_stats  une seule fois par match (statistiques définitives)
+
+Toutes : jamais appelé → appel ; saison passée déjà collectée après son
+dernier match → plus rien ; au-delà de MAX_AGE (saison en cours) → appel
+quand même (calendrier incomplet : reports, coupes).
+
+Consulté par ``ApiFootballClient`` avant chaque requête, sauf ``force``
+(``euro-top collect --force``, backfill).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, or_, select
+
+from .config import SEASON
+from .db import ApiCallLog, Match, Session
+
+PATHS = {
+    "fixtures":   "/fixtures",
+    "standings":  "/standings",
+    "topscorers": "/players/topscorers",
+    "topassists": "/players/topassists",
+}
+MATCHDAY_INTERVAL = timedelta(hours=2)   # Résultats, le jour d'un match
+FIXTURES_TTL = timedelta(hours=12)       # Résultats, sans calendrier connu
+MAX_AGE = timedelta(days=7)              # Filet de sécurité (saison en cours)
+
+
+@dataclass(frozen=True)
+class Decision:
+    fetch: bool
+    reason: str
+
+    def __bool__(self) -> bool:
+        return self.fetch
+
+
+def last_fetch(session: Session, endpoint: str, league_id: int | None = None,
+               season: int | None = None) -> datetime | None:
+    """Dernier appel réussi : ``endpoint`` = clé de PATHS ou chemin + requête exacts."""
+    C = ApiCallLog
+    conds = [or_(C.source == "api_football", C.source.is_(None)), C.status == 200]
+    if endpoint in PATHS:
+        conds += [C.endpoint.like(f"{PATHS[endpoint]}?%"),
+                  C.league_id == league_id, C.season == season]
+    else:
+        conds.append(C.endpoint == endpoint)
+    return session.scalar(select(func.max(C.called_at)).where(*conds))
+
+
+# ── Calendrier ────────────────────────────────────────────────────────────────
+
+def _scope(league_id: int, season: int) -> list:
+    return [Match.league_id == league_id, Match.season == season]
+
+
+def _finished_since(session: Session, league_id: int, season: int, since: datetime) -> int:
+    """Matchs récents terminés et écrits en base après ``since``."""
+    return session.scalar(select(func.count(Match.id)).where(
+        *_scope(league_id, season), Match.status == "FT",
+        Match.fetched_at > since,
+        Match.match_date >= since.date() - timedelta(days=1),   # pas un xG corrigé d'un vieux match
+    ))
+
+
+def _last_match_date(session: Session, league_id: int, season: int):
+    return session.scalar(select(func.max(Match.match_date)).where(*_scope(league_id, season)))
+
+
+def _scheduled(session: Session, league_id: int, season: int, since, until) -> tuple[int, int]:
+    """(matchs à venir connus, dont prévus entre ``since`` et ``until``)."""
+    pending = [*_scope(league_id, season), Match.status != "FT"]
+    known = session.scalar(select(func.count(Match.id)).where(*pending))
+    if not known:
+        return 0, 0
+    due = session.scalar(select(func.count(Match.id)).where(
+        *pending, Match.match_date >= since, Match.match_date <= until))
+    return known, due
+
+
+# ── Politiques ────────────────────────────────────────────────────────────────
+
+def _ago(delta: timedelta) -> str:
+    minutes = int(delta.total_seconds() // 60)
+    if minutes < 120:
+        return f"{minutes} min"
+    return f"{minutes // 60} h" if minutes < 48 * 60 else f"{minutes // 1440} j"
+
+
+def _fixtures(session, league_id, season, last, now) -> Decision:
+    known, due = _scheduled(session, league_id, season, last.date(), now.date())
+    if known:
+        if not due:
+            return Decision(False, "aucun match prévu depuis le dernier appel")
+        if now - last < MATCHDAY_INTERVAL:
+            return Decision(False, f"jour de match, dernier appel il y a {_ago(now - last)}")
+        return Decision(True, f"{due} match(s) prévu(s) depuis le dernier appel")
+    if now - last < FIXTURES_TTL:
+        return Decision(False, f"dernier appel il y a {_ago(now - last)}")
+    return Decision(True, f"dernier appel il y a {_ago(now - last)}")
+
+
+def _after_results(session, league_id, season, last, now) -> Decision:
+    finished = _finished_since(session, league_id, season, last)
+    if not finished:
+        return Decision(False, "aucun match terminé depuis le dernier appel")
+    return Decision(True, f"{finished} match(s) terminé(s) depuis le dernier appel")
+
+
+def _once_per_matchday(session, league_id, season, last, now) -> Decision:
+    if last.date() == now.date():
+        return Decision(False, "déjà appelé aujourd'hui (une fois par journée)")
+    return _after_results(session, league_id, season, last, now)
+
+
+POLICIES = {
+    "fixtures":   _fixtures,
+    "standings":  _after_results,
+    "topscorers": _once_per_matchday,
+    "topassists": _once_per_matchday,
+}
+
+
+def check(session: Session, endpoint: str, league_id: int, season: int,
+          now: datetime | None = None) -> Decision:
+    """Faut-il appeler ``endpoint`` (clé de POLICIES) pour cette ligue × saison ?"""
+    last = last_fetch(session, endpoint, league_id, season)
+    if last is None:
+        return Decision(True, "jamais collecté")
+    now = now or datetime.utcnow()
+    if season < SEASON:
+        ended = _last_match_date(session, league_id, season)
+        if ended is not None and last.date() > ended:
+            return Decision(False, "saison terminée, déjà collectée")
+    elif now - last > MAX_AGE:
+        return Decision(True, f"dernier appel il y a {_ago(now - last)}")
+    return POLICIES[endpoint](session, league_id, season, last, now)
+
+
+def check_fixture_stats(session: Session, fixture_id: int) -> Decision:
+    """Statistiques d'un match terminé : définitives, une seule requête."""
+    if last_fetch(session, f"/fixtures/statistics?fixture={fixture_id}") is None:
+        return Decision(True, "jamais collecté")
+    return Decision(False, "déjà collecté (statistiques définitives)")
@@ -0,0 +1,242 @@
+"""
+Suivi live d'une journée (Sofascore) — polling adaptatif + diff de snapshots.
+
+À chaque tick :
+    1. un seul appel ``scheduled-events`` (scores + statuts de la journée)
+    2. stats (xG, tirs, possession) uniquement pour les matchs en cours
+    3. diff avec le snapshot précédent → seules les lignes modifiées sont
+       ré-affichées par la CLI
+    4. un match qui passe à FT reçoit un dernier appel stats, puis n'est plus
+       interrogé ; les matchs terminés sont écrits dans ``matches`` (et leurs
+       stats complètes dans ``match_stats``) en un seul lot (flush_finished)
+
+Intervalle de polling selon l'état des matchs (le plus court l'emporte) :
+    live       : LIVE_INTERVAL
+    mi-temps   : HALFTIME_INTERVAL
+    avant-match: temps restant avant le coup d'envoi, borné à PRE_MATCH_MAX
+    terminé    : plus de polling ; tous terminés → fin du suivi
+"""
+from __future__ import annotations
+
+import logging
+import re
+import time
+import unicodedata
+from datetime import date
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+PRE, LIVE, HALFTIME, FINISHED = "pre", "live", "halftime", "finished"
+
+LIVE_INTERVAL = 30.0       # Secondes
+HALFTIME_INTERVAL = 120.0
+PRE_MATCH_MAX = 600.0
+MIN_INTERVAL = 15.0
+
+HALFTIME_CODE = 31                                  # status.code Sofascore
+DONE_STATUSES = {"finished", "postponed", "canceled", "cancelled", "interrupted"}
+
+# Champs suivis (snapshot) : événement Sofascore + stats normalisées
+STAT_FIELDS = {
+    "xg":         "expected_goals",
+    "shots":      "total_shots",
+    "possession": "ball_possession",
+}
+SNAPSHOT_FIELDS = ("phase", "status_desc", "home_goals", "away_goals",
+                   *(f"{side}_{f}" for f in STAT_FIELDS for side in ("home", "away")))
+
+
+# ── États & intervalles ───────────────────────────────────────────────────────
+
+def match_phase(event: dict) -> str:
+    status = (event.get("status") or "").lower()
+    if status in DONE_STATUSES:
+        return FINISHED
+    if event.get("status_code") == HALFTIME_CODE:
+        return HALFTIME
+    if status == "inprogress":
+        return LIVE
+    return PRE
+
+
+def next_interval(snapshots: dict[int, dict], starts: dict[int, int | None],
+                  now: float) -> float | None:
+    """Délai avant le prochain tick (None = tous les matchs sont terminés)."""
+    delays = []
+    for event_id, snap in snapshots.items():
+        phase = snap["phase"]
+        if phase == LIVE:
+            delays.append(LIVE_INTERVAL)
+        elif phase == HALFTIME:
+            delays.append(HALFTIME_INTERVAL)
+        elif phase == PRE:
+            start = starts.get(event_id)
+            wait = start - now if start else PRE_MATCH_MAX
+            delays.append(min(max(wait, MIN_INTERVAL), PRE_MATCH_MAX))
+    return min(delays) if delays else None
+
+
+# ── Snapshots & diff ──────────────────────────────────────────────────────────
+
+def make_snapshot(event: dict, stats: dict | None, previous: dict | None = None) -> dict:
+    """Snapshot d'un match ; sans nouvelles stats, on garde les dernières connues."""
+    snap = {
+        "phase": match_phase(event),
+        "status_desc": event.get("status_desc"),
+        "home_goals": event.get("home_goals"),
+        "away_goals": event.get("away_goals"),
+    }
+    for field, key in STAT_FIELDS.items():
+        for side in ("home", "away"):
+            name = f"{side}_{field}"
+            if stats:
+                snap[name] = stats.get(side, {}).get(key)
+            else:
+                snap[name] = (previous or {}).get(name)
+    return snap
+
+
+def diff_snapshots(previous: dict[int, dict], current: dict[int, dict]) -> dict[int, set[str]]:
+    """{event_id: champs modifiés} ; un match nouveau a tous ses champs modifiés."""
+    changes = {}
+    for event_id, snap in current.items():
+        before = previous.get(event_id)
+        if before is None:
+            changes[event_id] = set(SNAPSHOT_FIELDS)
+            continue
+        changed = {f for f in SNAPSHOT_FIELDS if snap.get(f) != before.get(f)}
+        if changed:
+            changes[event_id] = changed
+    return changes
+
+
+# ── Appariement avec la table matches ─────────────────────────────────────────
+
+_NOISE = {"fc", "cf", "ac", "as", "sc", "afc", "ssc", "rc", "club",
+          "de", "cd", "ud", "sv", "vfb", "vfl"}
+
+
+def team_key(name: str | None) -> str:
+    """Nom d'équipe normalisé (sans accents, ponctuation ni sigles de club)."""
+    if not name:
+        return ""
+    ascii_ = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().lower()
+    words = [w for w in re.split(r"[^a-z0-9]+", ascii_) if w and w not in _NOISE]
+    return " ".join(words)
+
+
+def _same_team(a: str, b: str) -> bool:
+    ka, kb = team_key(a), team_key(b)
+    return bool(ka and kb) and (ka == kb or ka in kb or kb in ka)
+
+
+def find_match(candidates, home_team: str, away_team: str):
+    """Ligne de ``matches`` (attributs home_team / away_team) correspondant aux équipes, ou None."""
+    return next((c for c in candidates if _same_team(c.home_team, home_team)
+                 and _same_team(c.away_team, away_team)), None)
+
+
+# ── Suivi ─────────────────────────────────────────────────────────────────────
+
+class LiveWatcher:
+    """
+    État du suivi d'une journée. ``fetch_events`` / ``fetch_stats`` sont
+    injectables (tests, serveurs locaux) ; par défaut : Sofascore.
+    """
+
+    def __init__(
+        self,
+        league_key: str,
+        league_id: int,
+        day: date,
+        fetch_events: Callable[[date, str], list[dict]] | None = None,
+        fetch_stats: Callable[[int], dict | None] | None = None,
+    ):
+        if fetch_events is None or fetch_stats is None:
+            from .collectors.sofascore import fetch_match_stats, fetch_matches_by_date
+            fetch_events = fetch_events or fetch_matches_by_date
+            fetch_stats = fetch_stats or fetch_match_stats
+        self.league_key = league_key
+        self.league_id = league_id
+        self.day = day
+        self._fetch_events = fetch_events
+        self._fetch_stats = fetch_stats
+        self.events: dict[int, dict] = {}
+        self.snapshots: dict[int, dict] = {}
+        self.starts: dict[int, int | None] = {}
+        self.pending_final: dict[int, dict] = {}   # terminés, pas encore écrits
+        self.final_stats: dict[int, dict] = {}     # … et leurs stats complètes
+        self.requests = 0
+
+    @property
+    def done(self) -> bool:
+        return bool(self.snapshots) and all(
+            s["phase"] == FINISHED for s in self.snapshots.values())
+
+    def poll(self) -> dict[int, set[str]]:
+        """Un tick : met à jour les snapshots et retourne le diff."""
+        events = self._fetch_events(self.day, self.league_key)
+        self.requests += 1
+        current = {}
+        for ev in events:
+            eid = ev["id"]
+            before = self.snapshots.get(eid)
+            if before and before["phase"] == FINISHED:
+                current[eid] = before          # plus interrogé
+                continue
+            phase = match_phase(ev)
+            played = ev.get("status") == "finished"    # ≠ reporté / annulé
+            # Stats : en cours, ou un dernier appel à la fin du match
+            stats = None
+            if phase == LIVE or played:
+                stats = self._fetch_stats(eid)
+                self.requests += 1
+            current[eid] = make_snapshot(ev, stats, before)
+            self.events[eid] = ev
+            self.starts[eid] = ev.get("start_ts")
+            if played:
+                self.pending_final[eid] = current[eid]
+                if stats:
+                    self.final_stats[eid] = stats
+        changes = diff_snapshots(self.snapshots, current)
+        self.snapshots = current
+        return changes
+
+    def interval(self, now: float | None = None) -> float | None:
+        return next_interval(self.snapshots, self.starts, time.time() if now is None else now)
+
+    def flush_finished(self, session) -> int:
+        """
+        Écrit score final + xG des matchs terminés dans ``matches``, et leurs
+        stats complètes dans ``match_stats`` (appariement par ligue, date et
+        noms d'équipes). Retourne le nombre de matchs mis à jour.
+        """
+        if not self.pending_final:
+            return 0
+        from .collectors.sofascore import numeric_stats
+        from .db import Match, update_match_results, upsert_match_stats
+        candidates = session.query(
+            Match.id, Match.home_team, Match.away_team
+        ).filter(Match.league_id == self.league_id, Match.match_date == self.day).all()
+
+        rows, stats = [], {}
+        for eid, snap in self.pending_final.items():
+            ev = self.events[eid]
+            found = find_match(candidates, ev["home_team"], ev["away_team"])
+            if found is None:
+                logger.warning(f"Live : {ev['home_team']} - {ev['away_team']} "
+                               f"absent de la table matches ({self.day})")
+                continue
+            rows.append({
+                "id": found.id, "status": "FT",
+                "home_goals": snap["home_goals"], "away_goals": snap["away_goals"],
+                "home_xg": snap["home_xg"], "away_xg": snap["away_xg"],
+            })
+            if eid in self.final_stats:
+                stats[found.id] = numeric_stats(self.final_stats[eid])
+        written = update_match_results(session, rows).changed
+        upsert_match_stats(session, stats)
+        self.pending_final.clear()
+        self.final_stats.clear()
+        return written
@@ -0,0 +1,160 @@
+"""
+Suppression de la marge bookmaker — méthodes Shin, power et odds-ratio.
+
+Toutes les fonctions travaillent par lot : ``odds`` est un tableau
+(n_events, n_outcomes) de cotes décimales, une ligne par event/bookmaker.
+Les lignes incomplètes (NaN ou cote <= 1) ressortent en NaN.
+
+Méthodes :
+    multiplicative : p_i = π_i / Σπ (normalisation proportionnelle)
+    shin           : modèle de Shin (1993), z (part d'initiés) résolu par bisection
+    power          : p_i = π_i^k, k résolu par Newton
+    odds_ratio     : odds(p_i) = odds(π_i) / c, c résolu par Newton
+
+où π_i = 1 / cote_i est la probabilité implicite brute (Σπ = 1 + marge).
+
+Référence : Clarke, Kovalchik & Ingram (2017), "Adjusting bookmaker's odds
+to allow for overround".
+"""
+from __future__ import annotations
+
+import numpy as np
+
+METHODS = ("multiplicative", "shin", "power", "odds_ratio")
+
+DEFAULT_TOL = 1e-10
+DEFAULT_MAX_ITER = 100
+
+
+class MarginError(ValueError):
+    """Méthode inconnue ou cotes invalides."""
+
+
+# ── API publique ──────────────────────────────────────────────────────────────
+
+def remove_margin(
+    odds,
+    method: str = "shin",
+    tol: float = DEFAULT_TOL,
+    max_iter: int = DEFAULT_MAX_ITER,
+) -> np.ndarray:
+    """
+    Retourne les probabilités équitables (même forme que ``odds``).
+
+    Args:
+        odds     : Cotes décimales, forme (n_outcomes,) ou (n_events, n_outcomes)
+        method   : "multiplicative", "shin", "power" ou "odds_ratio"
+        tol      : Tolérance de convergence sur |Σp - 1|
+        max_iter : Nombre max d'itérations du solveur
+    """
+    if method not in METHODS:
+        raise MarginError(
+            f"Méthode '{method}' inconnue. Méthodes valides : {', '.join(METHODS)}"
+        )
+    pi, valid, squeeze = _implied(odds)
+    solver = {
+        "multiplicative": lambda p: p / p.sum(axis=1, keepdims=True),
+        "shin":           lambda p: _shin(p, tol, max_iter)[0],
+        "power":          lambda p: _power(p, tol, max_iter)[0],
+        "odds_ratio":     lambda p: _odds_ratio(p, tol, max_iter)[0],
+    }[method]
+
+    out = np.full_like(pi, np.nan)
+    if valid.any():
+        out[valid] = solver(pi[valid])
+    return out[0] if squeeze else out
+
+
+def overround(odds) -> np.ndarray:
+    """Marge bookmaker Σ(1/cote) - 1 par ligne (NaN si ligne incomplète)."""
+    pi, valid, squeeze = _implied(odds)
+    out = np.where(valid, pi.sum(axis=1) - 1.0, np.nan)
+    return out[0] if squeeze else out
+
+
+def shin_z(odds, tol: float = DEFAULT_TOL, max_iter: int = DEFAULT_MAX_ITER) -> np.ndarray:
+    """Paramètre z de Shin (part estimée de volume « initié ») par ligne."""
+    pi, valid, squeeze = _implied(odds)
+    out = np.full(pi.shape[0], np.nan)
+    if valid.any():
+        out[valid] = _shin(pi[valid], tol, max_iter)[1]
+    return out[0] if squeeze else out
+
+
+# ── Solveurs (lignes valides uniquement) ──────────────────────────────────────
+
+def _shin(pi: np.ndarray, tol: float, max_iter: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    p_i(z) = (sqrt(z² + 4(1-z)·π_i²/Σπ) - z) / (2(1-z))
+
+    Σp_i(z) décroît strictement de sqrt(Σπ) (z=0) vers 1 : bisection
+    vectorisée sur z ∈ [0, 1), toutes lignes en parallèle.
+    """
+    booksum = pi.sum(axis=1, keepdims=True)
+    ratio = pi ** 2 / booksum
+
+    def probs(z: np.ndarray) -> np.ndarray:
+        z = z[:, None]
+        return (np.sqrt(z ** 2 + 4 * (1 - z) * ratio) - z) / (2 * (1 - z))
+
+    lo = np.zeros(pi.shape[0])
+    hi = np.full(pi.shape[0], 0.999)
+    z = lo.copy()
+    for _ in range(max_iter):
+        z = (lo + hi) / 2
+        excess = probs(z).sum(axis=1) - 1.0
+        if np.all(np.abs(excess) < tol):
+            break
+        above = excess > 0
+        lo = np.where(above, z, lo)
+        hi = np.where(above, hi, z)
+
+    # Pas de marge (ou marge négative, arbitrage) : pas d'initiés
+    z = np.where(booksum[:, 0] <= 1.0, 0.0, z)
+    p = probs(z)
+    return p / p.sum(axis=1, keepdims=True), z
+
+
+def _power(pi: np.ndarray, tol: float, max_iter: int) -> tuple[np.ndarray, np.ndarray]:
+    """p_i = π_i^k, Newton sur g(k) = Σπ_i^k - 1 (convexe, décroissante)."""
+    log_pi = np.log(pi)
+    k = np.ones(pi.shape[0])
+    for _ in range(max_iter):
+        p = np.exp(k[:, None] * log_pi)
+        g = p.sum(axis=1) - 1.0
+        if np.all(np.abs(g) < tol):
+            break
+        k = k - g / (p * log_pi).sum(axis=1)
+    p = np.exp(k[:, None] * log_pi)
+    return p / p.sum(axis=1, keepdims=True), k
+
+
+def _odds_ratio(pi: np.ndarray, tol: float, max_iter: int) -> tuple[np.ndarray, np.ndarray]:
+    """p_i = π_i / (c + π_i - c·π_i), Newton sur h(c) = Σp_i - 1."""
+    c = np.ones(pi.shape[0])
+    for _ in range(max_iter):
+        denom = c[:, None] + pi - c[:, None] * pi
+        p = pi / denom
+        h = p.sum(axis=1) - 1.0
+        if np.all(np.abs(h) < tol):
+            break
+        dh = -(pi * (1 - pi) / denom ** 2).sum(axis=1)
+        c = c - h / dh
+    p = pi / (c[:, None] + pi - c[:, None] * pi)
+    return p / p.sum(axis=1, keepdims=True), c
+
+
+# ── Helpers ───────────────────────────────────────────────────────────────────
+
+def _implied(odds) -> tuple[np.ndarray, np.ndarray, bool]:
+    """Cotes → (π 2D, masque lignes valides, entrée 1D ?)."""
+    arr = np.asarray(odds, dtype=float)
+    squeeze = arr.ndim == 1
+    if squeeze:
+        arr = arr[None, :]
+    if arr.ndim != 2 or arr.shape[1] < 2:
+        raise MarginError(f"Forme de cotes invalide : {arr.shape} (≥ 2 issues attendues)")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pi = 1.0 / arr
+    valid = np.all(np.isfinite(arr) & (arr > 1.0), axis=1)
+    return pi, valid, squeeze
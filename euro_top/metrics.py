@@ -0,0 +1,252 @@
+"""
+Métriques d'un run de collecte au format texte Prometheus.
+
+    with metrics.run("collect"):            # scripts : autour de main()
+        with metrics.stage("standings", "ligue1"):
+            ...
+
+Toujours actives : compteurs en mémoire (un dict, un verrou), alimentés par
+les points d'instrumentation existants — ``telemetry.track`` (requêtes par
+source et statut, durée), les clients API-Football / The Odds API (quota
+restant lu dans les en-têtes), les upserts de ``db`` (lignes écrites et
+identiques par table) et les boucles de collecte (durée par étape × ligue,
+échecs par ligue).
+
+Exposition, à la fin du run (``run``) :
+    EURO_TOP_METRICS_DIR   écrit ``euro_top_<job>.prom`` (atomique) pour le
+                           textfile collector de node_exporter
+    EURO_TOP_METRICS_PORT  sert ``/metrics`` en HTTP pendant le run
+                           (runs longs, scrape direct)
+
+Chaque échantillon porte le label ``task`` (nom du run) : plusieurs runs
+écrivent dans le même répertoire textfile sans collision (``job`` est
+réservé à Prometheus, qui le renommerait en ``exported_job``).
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+# nom → (type, aide)
+FAMILIES: dict[str, tuple[str, str]] = {
+    "euro_top_requests_total":
+        ("counter", "Requêtes sortantes par source et statut HTTP (error = sans réponse)"),
+    "euro_top_request_duration_seconds":
+        ("summary", "Durée des requêtes sortantes par source (hors parsing et attentes)"),
+    "euro_top_quota_remaining":
+        ("gauge", "Requêtes restantes annoncées par la source (jour API-Football, mois The Odds API)"),
+    "euro_top_requests_skipped_total":
+        ("counter", "Requêtes évitées, données encore fraîches (freshness.py), par endpoint"),
+    "euro_top_retries_total":
+        ("counter", "Nouvelles tentatives après une erreur transitoire, par source"),
+    "euro_top_circuit_rejections_total":
+        ("counter", "Appels refusés sans envoi (circuit ouvert), par source"),
+    "euro_top_rows_upserted_total":
+        ("counter", "Lignes écrites (insérées ou modifiées) par table"),
+    "euro_top_rows_unchanged_total":
+        ("counter", "Lignes reçues identiques à la base (écriture évitée) par table"),
+    "euro_top_stage_duration_seconds":
+        ("summary", "Durée des étapes de collecte par ligue"),
+    "euro_top_failures_total":
+        ("counter", "Échecs par ligue et type d'erreur"),
+    "euro_top_db_size_bytes":
+        ("gauge", "Taille du fichier SQLite (WAL compris) en fin de run"),
+    "euro_top_run_duration_seconds":
+        ("gauge", "Durée totale du run"),
+    "euro_top_run_success":
+        ("gauge", "1 si le run s'est terminé sans erreur"),
+    "euro_top_run_timestamp_seconds":
+        ("gauge", "Fin du run (epoch)"),
+}
+
+_values: dict[tuple[str, tuple], float] = {}     # (nom d'échantillon, labels) → valeur
+_lock = threading.Lock()
+_job = "euro_top"
+
+
+def _key(name: str, labels: dict) -> tuple[str, tuple]:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name: str, value: float = 1.0, **labels) -> None:
+    key = _key(name, labels)
+    with _lock:
+        _values[key] = _values.get(key, 0.0) + value
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    with _lock:
+        _values[_key(name, labels)] = float(value)
+
+
+def observe(name: str, seconds: float, **labels) -> None:
+    """Résumé : ``<name>_sum`` et ``<name>_count``."""
+    s, c = _key(f"{name}_sum", labels), _key(f"{name}_count", labels)
+    with _lock:
+        _values[s] = _values.get(s, 0.0) + seconds
+        _values[c] = _values.get(c, 0.0) + 1
+
+
+def reset() -> None:
+    with _lock:
+        _values.clear()
+
+
+# ── Points d'instrumentation ──────────────────────────────────────────────────
+
+def request(source: str, status: int | None, seconds: float) -> None:
+    inc("euro_top_requests_total", source=source, status=status or "error")
+    observe("euro_top_request_duration_seconds", seconds, source=source)
+
+
+def quota(source: str, remaining) -> None:
+    """Quota restant d'après un en-tête de réponse (ignoré s'il est absent ou invalide)."""
+    try:
+        value = int(remaining)
+    except (TypeError, ValueError):
+        return
+    if value >= 0:
+        set_gauge("euro_top_quota_remaining", value, source=source)
+
+
+def rows(table: str, count: int, unchanged: int = 0) -> None:
+    inc("euro_top_rows_upserted_total", count, table=table)
+    if unchanged:
+        inc("euro_top_rows_unchanged_total", unchanged, table=table)
+
+
+def failure(league: str, error: BaseException | str) -> None:
+    kind = error if isinstance(error, str) else type(error).__name__
+    inc("euro_top_failures_total", league=league, error=kind)
+
+
+@contextmanager
+def stage(name: str, league: str = "") -> Iterator[None]:
+    """Chronomètre une étape (durée comptée même en cas d'erreur)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe("euro_top_stage_duration_seconds", time.perf_counter() - t0,
+                stage=name, league=league)
+
+
+# ── Exposition ────────────────────────────────────────────────────────────────
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+
+def render(job: str | None = None) -> str:
+    """Toutes les métriques au format d'exposition texte Prometheus 0.0.4."""
+    job = job or _job
+    with _lock:
+        samples = sorted(_values.items())
+    by_family: dict[str, list[str]] = {}
+    for (name, labels), value in samples:
+        family = name
+        if name not in FAMILIES and name.endswith(("_sum", "_count")):
+            family = name.rsplit("_", 1)[0]
+        text = ",".join(f'{k}="{_escape(v)}"' for k, v in (("task", job), *labels))
+        by_family.setdefault(family, []).append(f"{name}{{{text}}} {value:.17g}")
+    out = []
+    for family, lines in by_family.items():
+        kind, help_ = FAMILIES.get(family, ("untyped", ""))
+        out += [f"# HELP {family} {help_}", f"# TYPE {family} {kind}", *lines]
+    return "\n".join(out) + "\n"
+
+
+def write_textfile(path: str | Path, job: str | None = None) -> Path:
+    """Écriture atomique (fichier temporaire + rename) : jamais de fichier lu à moitié."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(render(job), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def serve(port: int, host: str = "0.0.0.0"):
+    """Sert ``/metrics`` dans un thread ; retourne le serveur (``shutdown()``)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    return server
+
+
+def _db_size() -> int | None:
+    from sqlalchemy.engine import make_url
+    from .config import DATABASE_URL
+    url = make_url(DATABASE_URL)
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        return None
+    paths = [Path(url.database + suffix) for suffix in ("", "-wal")]
+    return sum(p.stat().st_size for p in paths if p.exists())
+
+
+def _exit_code(exc: BaseException) -> int:
+    """Code de sortie de SystemExit / typer.Exit ; 1 pour toute autre exception."""
+    code = getattr(exc, "exit_code", getattr(exc, "code", 1))
+    if code is None:
+        return 0
+    return code if isinstance(code, int) else 1
+
+
+@contextmanager
+def run(job: str) -> Iterator[None]:
+    """Encadre un run : durée, succès, taille de la base, puis exposition."""
+    global _job
+    _job = job
+    server = None
+    if port := os.getenv("EURO_TOP_METRICS_PORT"):
+        try:
+            server = serve(int(port))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Métriques : /metrics indisponible sur le port {port} ({e})")
+    t0 = time.perf_counter()
+    success = False
+    try:
+        yield
+        success = True
+    except BaseException as e:
+        success = _exit_code(e) == 0
+        raise
+    finally:
+        set_gauge("euro_top_run_duration_seconds", time.perf_counter() - t0)
+        set_gauge("euro_top_run_success", int(success))
+        set_gauge("euro_top_run_timestamp_seconds", time.time())
+        try:
+            if (size := _db_size()) is not None:
+                set_gauge("euro_top_db_size_bytes", size)
+        except Exception as e:
+            logger.debug(f"Métriques : taille de la base inconnue ({e})")
+        if directory := os.getenv("EURO_TOP_METRICS_DIR"):
+            try:
+                write_textfile(Path(directory) / f"euro_top_{job}.prom", job)
+            except OSError as e:
+                logger.warning(f"Métriques : écriture impossible dans {directory} ({e})")
+        if server is not None:
+            server.shutdown()
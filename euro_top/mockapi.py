@@ -0,0 +1,622 @@
+"""
+Serveurs locaux de substitution — API-Football, The Odds API, Sofascore,
+Understat — alimentés par le générateur synthétique (synthetic.py).
+
+Un seul port, un préfixe par source ; les collecteurs y pointent via les
+variables d'environnement de config.py (``euro-top mock`` les affiche) :
+
+    API_FOOTBALL_BASE  http://127.0.0.1:8799/api-football
+        /standings  /fixtures  /fixtures/statistics
+        /players/topscorers  /players/topassists
+    ODDS_API_BASE      http://127.0.0.1:8799/odds/v4
+        /sports  /sports/<clé>/odds  /sports/<clé>/scores
+    SOFASCORE_BASE     http://127.0.0.1:8799/sofascore/api/v1
+        /sport/football/scheduled-events/<AAAA-MM-JJ>  /event/<id>/statistics
+    UNDERSTAT_BASE     http://127.0.0.1:8799/understat
+        /getLeagueData/<slug>/<saison>     {dates, players}
+
+Réponses au schéma des vraies APIs (enveloppe API-Football, statuts
+Sofascore, valeurs texte Understat…) ; ``players`` Understat suit la forme
+attendue par le collecteur (dict par joueur avec ``history`` par match).
+
+Comportement réglable (MockConfig) : latence + gigue, taux d'erreurs
+aléatoires (500, 403 pour Sofascore), quotas avec leurs en-têtes —
+x-ratelimit-requests-* (API-Football, quota journalier → champ ``errors``),
+x-requests-* (The Odds API, coût = marchés × régions, 429 une fois épuisé)
+— et volume (saisons, ligues, graine). Clé API exigée comme en vrai.
+
+Le « jour courant » du jeu de données est le lendemain du dernier match
+joué : c'est la référence de ``daysOld`` (scores The Odds API).
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from functools import cached_property
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from .collectors.odds import ODDS_SPORT_KEYS
+from .collectors.sofascore import TOURNAMENT_IDS
+from .config import SEASON, all_leagues
+from .export import json_default
+from .synthetic import generate
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8799
+MAX_HEADER_BYTES = 16384
+
+PREFIXES = {
+    "API_FOOTBALL_BASE": "/api-football",
+    "ODDS_API_BASE":     "/odds/v4",
+    "SOFASCORE_BASE":    "/sofascore/api/v1",
+    "UNDERSTAT_BASE":    "/understat",
+}
+
+_REASONS = {200: "OK", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+            405: "Method Not Allowed", 422: "Unprocessable Entity",
+            429: "Too Many Requests", 500: "Internal Server Error"}
+
+
+@dataclass
+class MockConfig:
+    latency_ms: float = 0.0         # Délai ajouté à chaque réponse
+    jitter_ms: float = 0.0          # + U(0, jitter) ms
+    error_rate: float = 0.0         # Part de réponses en erreur (0–1)
+    api_football_daily: int = 100   # Quota journalier API-Football
+    odds_monthly: int = 500         # Quota mensuel The Odds API
+    seasons: int = 1
+    leagues: int = 8
+    seed: int = 42
+    last_season: int = SEASON
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, body, headers: dict | None = None):
+        super().__init__(status)
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+
+def base_urls(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> dict[str, str]:
+    """{variable d'environnement: URL de base} pour pointer les collecteurs ici."""
+    return {env: f"http://{host}:{port}{prefix}" for env, prefix in PREFIXES.items()}
+
+
+def _int(params: dict, key: str, default: int | None = None) -> int | None:
+    try:
+        return int(params[key]) if key in params else default
+    except ValueError:
+        raise HttpError(422, {"message": f"Paramètre '{key}' invalide"})
+
+
+# ── Jeu de données ────────────────────────────────────────────────────────────
+
+class MockDataset:
+    """Données synthétiques indexées par source ; construites une fois."""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        data = generate(config.seasons, config.leagues, config.seed, config.last_season)
+        self.leagues = {lg.id: lg for lg in all_leagues()[:config.leagues]}
+        self.matches = data["matches"]
+        self.by_id = {m["id"]: m for m in self.matches}
+        self.by_scope: dict[tuple[int, int], list[dict]] = {}
+        self.by_date: dict[date, list[dict]] = {}
+        for m in self.matches:
+            self.by_scope.setdefault((m["league_id"], m["season"]), []).append(m)
+            self.by_date.setdefault(m["match_date"], []).append(m)
+        self.standings: dict[tuple[int, int], list[dict]] = {}
+        for row in data["standings"]:
+            self.standings.setdefault((row["league_id"], row["season"]), []).append(row)
+        self.players: dict[tuple[int, int], list[dict]] = {}
+        for row in data["players"]:
+            self.players.setdefault((row["league_id"], row["season"]), []).append(row)
+        self.odds: dict[str, list[dict]] = {}
+        for event in data["odds_events"]:
+            self.odds.setdefault(event["sport_key"], []).append(event)
+        teams = sorted({m["home_team"] for m in self.matches} | {m["away_team"] for m in self.matches})
+        self.team_ids = {name: 1000 + i for i, name in enumerate(teams)}
+        played = [m["match_date"] for m in self.matches if m["status"] == "FT"]
+        self.today = max(played) + timedelta(days=1) if played else min(self.by_date)
+        self._understat: dict[tuple[str, int], dict] = {}
+
+    def kickoff(self, m: dict) -> datetime:
+        hour = 18 + (m["id"] % 100) % 4
+        d = m["match_date"]
+        return datetime(d.year, d.month, d.day, hour, tzinfo=timezone.utc)
+
+    def understat(self, slug: str, season: int) -> dict | None:
+        """{dates, players} d'une ligue/saison (historique joueur généré à la demande)."""
+        league = next((lg for lg in self.leagues.values() if lg.understat_slug == slug), None)
+        if not league or (league.id, season) not in self.by_scope:
+            return None
+        if (slug, season) not in self._understat:
+            self._understat[(slug, season)] = self._build_understat(league.id, season)
+        return self._understat[(slug, season)]
+
+    def _build_understat(self, league_id: int, season: int) -> dict:
+        rng = np.random.default_rng((self.config.seed, league_id, season))
+        matches = self.by_scope[(league_id, season)]
+        dates = []
+        for m in matches:
+            played = m["status"] == "FT"
+            side = lambda team: {"id": str(self.team_ids[team]), "title": team,
+                                 "short_title": team[:3].upper()}
+            dates.append({
+                "id": str(m["id"]), "isResult": played,
+                "h": side(m["home_team"]), "a": side(m["away_team"]),
+                "goals": {"h": str(m["home_goals"]) if played else None,
+                          "a": str(m["away_goals"]) if played else None},
+                "xG": {"h": str(m["home_xg"]) if played else None,
+                       "a": str(m["away_xg"]) if played else None},
+                "datetime": self.kickoff(m).strftime("%Y-%m-%d %H:%M:%S"),
+            })
+
+        team_matches: dict[str, list[dict]] = {}
+        for m in matches:
+            if m["status"] == "FT":
+                team_matches.setdefault(m["home_team"], []).append(m)
+                team_matches.setdefault(m["away_team"], []).append(m)
+        players = {}
+        for p in self.players.get((league_id, season), []):
+            played = team_matches.get(p["team"], [])
+            n = min(p["matches_played"], len(played))
+            if not n:
+                continue
+            picked = sorted(rng.choice(len(played), size=n, replace=False))
+            goals = rng.multinomial(p["goals"], np.full(n, 1 / n))
+            assists = rng.multinomial(p["assists"], np.full(n, 1 / n))
+            history = []
+            for k, idx in enumerate(picked):
+                m = played[idx]
+                history.append({
+                    "id": str(m["id"]), "date": self.kickoff(m).strftime("%Y-%m-%d %H:%M:%S"),
+                    "time": str(int(rng.integers(10, 91))),
+                    "goals": str(goals[k]), "assists": str(assists[k]),
+                    "xG": str(round(float(goals[k] * rng.uniform(0.6, 1.2) + rng.uniform(0, 0.3)), 4)),
+                    "xA": str(round(float(assists[k] * rng.uniform(0.6, 1.2) + rng.uniform(0, 0.2)), 4)),
+                })
+            players[str(p["api_id"])] = {
+                "id": str(p["api_id"]), "player_name": p["name"], "team_title": p["team"],
+                "history": history,
+            }
+        return {"dates": dates, "players": players}
+
+
+# ── Sources ───────────────────────────────────────────────────────────────────
+# Chaque handler : (chemin sous le préfixe, paramètres, en-têtes) → (corps, en-têtes)
+
+class _Quota:
+    """Compteur de quota partagé (asyncio : pas de verrou nécessaire)."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self.period = None
+
+    def reset_if(self, period):
+        if period != self.period:
+            self.period, self.used = period, 0
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.limit - self.used)
+
+
+class ApiFootball:
+    def __init__(self, data: MockDataset, config: MockConfig):
+        self.data = data
+        self.quota = _Quota(config.api_football_daily)
+
+    def _envelope(self, endpoint: str, params: dict, response: list, errors=None) -> dict:
+        return {"get": endpoint.lstrip("/"), "parameters": params, "errors": errors or [],
+                "results": len(response), "paging": {"current": 1, "total": 1},
+                "response": response}
+
+    def handle(self, path: str, params: dict, headers: dict) -> tuple[dict, dict]:
+        self.quota.reset_if(datetime.now(timezone.utc).date())
+        if not headers.get("x-apisports-key"):
+            return self._envelope(path, params, [], {
+                "token": "Error/Missing application key. Go to https://www.api-football.com/documentation-v3 to learn how to get your API application key."}), {}
+        # Le vrai service répond 200 avec un champ errors une fois le quota épuisé
+        if self.quota.remaining == 0:
+            body = self._envelope(path, params, [], {
+                "requests": "You have reached the request limit for the day, Go to https://dashboard.api-football.com to upgrade your plan."})
+        else:
+            self.quota.used += 1
+            route = self.ROUTES.get(path)
+            if not route:
+                body = self._envelope(path, params, [], {"endpoint": "This endpoint do not exist."})
+            else:
+                body = self._envelope(path, params, route(self, params))
+        return body, {"x-ratelimit-requests-limit": str(self.quota.limit),
+                      "x-ratelimit-requests-remaining": str(self.quota.remaining)}
+
+    def _scope(self, params: dict) -> tuple[int, int]:
+        return _int(params, "league", 0), _int(params, "season", SEASON)
+
+    def _league(self, league_id: int, season: int) -> dict:
+        lg = self.data.leagues.get(league_id)
+        return {"id": league_id, "name": lg.name if lg else None,
+                "country": lg.country if lg else None, "season": season}
+
+    def _team(self, name: str) -> dict:
+        return {"id": self.data.team_ids.get(name), "name": name,
+                "logo": f"https://media.api-sports.io/football/teams/{self.data.team_ids.get(name)}.png"}
+
+    def standings(self, params: dict) -> list:
+        league_id, season = self._scope(params)
+        rows = self.data.standings.get((league_id, season))
+        if not rows:
+            return []
+        table = [{
+            "rank": r["rank"], "team": self._team(r["team"]), "points": r["points"],
+            "goalsDiff": r["goal_diff"], "group": self._league(league_id, season)["name"],
+            "form": r["form"], "status": "same", "description": None,
+            "all": {"played": r["played"], "win": r["won"], "draw": r["drawn"], "lose": r["lost"],
+                    "goals": {"for": r["goals_for"], "against": r["goals_against"]}},
+        } for r in rows]
+        return [{"league": {**self._league(league_id, season), "standings": [table]}}]
+
+    def fixtures(self, params: dict) -> list:
+        league_id, season = self._scope(params)
+        rows = self.data.by_scope.get((league_id, season), [])
+        if "status" in params:
+            wanted = set(params["status"].split("-"))
+            rows = [m for m in rows if m["status"] in wanted]
+        rows = sorted(rows, key=lambda m: (m["match_date"], m["id"]))
+        last = _int(params, "last")
+        if last:
+            rows = [m for m in rows if m["status"] == "FT"][-last:]
+        out = []
+        for m in rows:
+            played = m["status"] == "FT"
+            hg, ag = m["home_goals"], m["away_goals"]
+            out.append({
+                "fixture": {"id": m["id"], "timezone": "UTC",
+                            "date": self.data.kickoff(m).isoformat(),
+                            "status": {"long": "Match Finished" if played else "Not Started",
+                                       "short": m["status"], "elapsed": 90 if played else None}},
+                "league": {**self._league(league_id, season), "round": "Regular Season"},
+                "teams": {"home": {**self._team(m["home_team"]),
+                                   "winner": (hg > ag) if played and hg != ag else None},
+                          "away": {**self._team(m["away_team"]),
+                                   "winner": (ag > hg) if played and hg != ag else None}},
+                "goals": {"home": hg, "away": ag},
+                "score": {"halftime": {"home": None, "away": None},
+                          "fulltime": {"home": hg, "away": ag}},
+            })
+        return out
+
+    def statistics(self, params: dict) -> list:
+        m = self.data.by_id.get(_int(params, "fixture", 0))
+        if not m or m["status"] != "FT":
+            return []
+        rng = random.Random(m["id"])
+        out = []
+        for team, xg, goals in ((m["home_team"], m["home_xg"], m["home_goals"]),
+                                (m["away_team"], m["away_xg"], m["away_goals"])):
+            shots = max(goals, round(xg * 8 + rng.uniform(0, 5)))
+            out.append({"team": self._team(team), "statistics": [
+                {"type": "Shots on Goal", "value": max(goals, shots // 3)},
+                {"type": "Total Shots", "value": shots},
+                {"type": "Ball Possession", "value": f"{rng.randint(35, 65)}%"},
+                {"type": "Corner Kicks", "value": rng.randint(1, 10)},
+                {"type": "expected_goals", "value": f"{xg:.2f}"},
+            ]})
+        return out
+
+    def _top(self, params: dict, key: str) -> list:
+        league_id, season = self._scope(params)
+        rows = sorted(self.data.players.get((league_id, season), []),
+                      key=lambda p: (-p[key], p["api_id"]))[:20]
+        return [{
+            "player": {"id": p["api_id"], "name": p["name"]},
+            "statistics": [{
+                "team": self._team(p["team"]), "league": self._league(league_id, season),
+                "games": {"appearences": p["matches_played"], "minutes": p["minutes"]},
+                "goals": {"total": p["goals"], "assists": p["assists"] or None},
+                "penalty": {"scored": p["penalties"]},
+            }],
+        } for p in rows]
+
+    ROUTES = {
+        "/standings": standings,
+        "/fixtures": fixtures,
+        "/fixtures/statistics": statistics,
+        "/players/topscorers": lambda self, p: self._top(p, "goals"),
+        "/players/topassists": lambda self, p: self._top(p, "assists"),
+    }
+
+
+class OddsApi:
+    def __init__(self, data: MockDataset, config: MockConfig):
+        self.data = data
+        self.quota = _Quota(config.odds_monthly)
+
+    def _charge(self, cost: int) -> dict:
+        now = datetime.now(timezone.utc)
+        self.quota.reset_if((now.year, now.month))
+        if self.quota.remaining < cost:
+            raise HttpError(429, {"message": "Usage quota has been reached.",
+                                  "error_code": "OUT_OF_USAGE_CREDITS"}, self._headers(0))
+        self.quota.used += cost
+        return self._headers(cost)
+
+    def _headers(self, cost: int) -> dict:
+        return {"x-requests-remaining": str(self.quota.remaining),
+                "x-requests-used": str(self.quota.used), "x-requests-last": str(cost)}
+
+    def handle(self, path: str, params: dict, headers: dict) -> tuple:
+        if not params.get("apiKey"):
+            raise HttpError(401, {"message": "API key is missing.", "error_code": "MISSING_KEY"})
+        parts = path.strip("/").split("/")
+        if parts == ["sports"]:
+            return self.sports(), self._headers(0)    # Gratuit, comme en vrai
+        if len(parts) == 3 and parts[0] == "sports":
+            sport_key = parts[1]
+            if sport_key not in ODDS_SPORT_KEYS.values():
+                raise HttpError(404, {"message": "Unknown sport. Check the sport key.",
+                                      "error_code": "UNKNOWN_SPORT"})
+            if parts[2] == "odds":
+                return self.odds(sport_key, params)
+            if parts[2] == "scores":
+                return self.scores(sport_key, params)
+        raise HttpError(404, {"message": "Not found"})
+
+    def sports(self) -> list:
+        titles = {key: lg.name for short, key in ODDS_SPORT_KEYS.items()
+                  for lg in self.data.leagues.values() if lg.short == short}
+        return [{"key": key, "group": "Soccer", "title": title, "description": "",
+                 "active": True, "has_outrights": False} for key, title in titles.items()]
+
+    def odds(self, sport_key: str, params: dict) -> tuple:
+        markets = params.get("markets", "h2h").split(",")
+        regions = params.get("regions", "eu").split(",")
+        books = set(params["bookmakers"].split(",")) if params.get("bookmakers") else None
+        headers = self._charge(len(markets) * len(regions))
+        stamp = datetime.combine(self.data.today, datetime.min.time()).strftime("%Y-%m-%dT%H:%M:%SZ")
+        out = []
+        for event in self.data.odds.get(sport_key, []):
+            bookmakers = [
+                {**b, "last_update": stamp,
+                 "markets": [{**mk, "last_update": stamp}
+                             for mk in b["markets"] if mk["key"] in markets]}
+                for b in event["bookmakers"] if books is None or b["key"] in books
+            ]
+            out.append({**event, "sport_title": self._title(sport_key),
+                        "bookmakers": [b for b in bookmakers if b["markets"]]})
+        return out, headers
+
+    def scores(self, sport_key: str, params: dict) -> tuple:
+        days_old = _int(params, "daysOld")
+        if days_old is not None and not 1 <= days_old <= 3:
+            raise HttpError(422, {"message": "daysOld must be between 1 and 3",
+                                  "error_code": "INVALID_SCORES_DAYS_FROM"})
+        headers = self._charge(2 if days_old else 1)
+        league = next((lg for lg in self.data.leagues.values()
+                       if ODDS_SPORT_KEYS.get(lg.short) == sport_key), None)
+        if not league:
+            return [], headers
+        since = self.data.today - timedelta(days=days_old or 0)
+        out = []
+        for m in self.data.by_scope.get((league.id, self.data.config.last_season), []):
+            completed = m["status"] == "FT"
+            if completed and not (days_old and since <= m["match_date"] <= self.data.today):
+                continue
+            out.append({
+                "id": f"{m['id']:x}", "sport_key": sport_key, "sport_title": league.name,
+                "commence_time": self.data.kickoff(m).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "completed": completed, "home_team": m["home_team"], "away_team": m["away_team"],
+                "scores": [{"name": m["home_team"], "score": str(m["home_goals"])},
+                           {"name": m["away_team"], "score": str(m["away_goals"])}]
+                if completed else None,
+                "last_update": (self.data.kickoff(m) + timedelta(hours=2)).strftime(
+                    "%Y-%m-%dT%H:%M:%SZ") if completed else None,
+            })
+        return out, headers
+
+    def _title(self, sport_key: str) -> str:
+        return next((lg.name for lg in self.data.leagues.values()
+                     if ODDS_SPORT_KEYS.get(lg.short) == sport_key), sport_key)
+
+
+class Sofascore:
+    error_status = 403      # Erreurs aléatoires : blocage anti-bot, comme en vrai
+
+    def __init__(self, data: MockDataset, config: MockConfig):
+        self.data = data
+        self.tournaments = {lg.id: (TOURNAMENT_IDS.get(lg.short), lg.name)
+                            for lg in data.leagues.values()}
+
+    def handle(self, path: str, params: dict, headers: dict) -> tuple:
+        parts = path.strip("/").split("/")
+        if parts[:3] == ["sport", "football", "scheduled-events"] and len(parts) == 4:
+            try:
+                day = date.fromisoformat(parts[3])
+            except ValueError:
+                raise HttpError(400, {"error": {"code": 400, "message": "Bad Request"}})
+            return {"events": [self._event(m) for m in self.data.by_date.get(day, [])]}, {}
+        if len(parts) == 3 and parts[0] == "event" and parts[2] == "statistics" and parts[1].isdigit():
+            m = self.data.by_id.get(int(parts[1]))
+            if m and m["status"] == "FT":
+                return self._statistics(m), {}
+        raise HttpError(404, {"error": {"code": 404, "message": "Not Found"}})
+
+    def _event(self, m: dict) -> dict:
+        ut_id, name = self.tournaments.get(m["league_id"], (None, None))
+        played = m["status"] == "FT"
+        status = ({"code": 100, "description": "Ended", "type": "finished"} if played else
+                  {"code": 0, "description": "Not started", "type": "notstarted"})
+        score = lambda goals: {"current": goals, "display": goals, "normaltime": goals} if played else {}
+        team = lambda t: {"id": self.data.team_ids[t], "name": t, "shortName": t.split()[0]}
+        return {
+            "id": m["id"], "slug": f"{m['home_team']}-{m['away_team']}".lower().replace(" ", "-"),
+            "tournament": {"name": name, "uniqueTournament": {"id": ut_id, "name": name}},
+            "season": {"year": f"{m['season'] % 100:02d}/{(m['season'] + 1) % 100:02d}"},
+            "status": status, "homeTeam": team(m["home_team"]), "awayTeam": team(m["away_team"]),
+            "homeScore": score(m["home_goals"]), "awayScore": score(m["away_goals"]),
+            "startTimestamp": int(self.data.kickoff(m).timestamp()),
+        }
+
+    def _statistics(self, m: dict) -> dict:
+        rng = random.Random(m["id"])
+        poss = rng.randint(35, 65)
+        shots = [max(m["home_goals"], round(m["home_xg"] * 8 + rng.uniform(0, 5))),
+                 max(m["away_goals"], round(m["away_xg"] * 8 + rng.uniform(0, 5)))]
+        corners = [rng.randint(1, 10) for _ in range(2)]
+        fouls = [rng.randint(6, 18) for _ in range(2)]
+        passes = [(rng.randint(250, 600), rng.randint(40, 120)) for _ in range(2)]
+        long_balls = [(rng.randint(10, 30), rng.randint(5, 25)) for _ in range(2)]
+        pct = lambda ok, missed: round(ok * 100 / (ok + missed))
+        item = lambda name, home, away: {"name": name, "home": str(home), "away": str(away),
+                                         "compareCode": 1 if home >= away else 2}
+        return {"statistics": [{"period": "ALL", "groups": [
+            {"groupName": "Match overview", "statisticsItems": [
+                item("Ball possession", f"{poss}%", f"{100 - poss}%"),
+                item("Expected goals", f"{m['home_xg']:.2f}", f"{m['away_xg']:.2f}"),
+                item("Total shots", *shots),
+                item("Corner kicks", *corners),
+                item("Fouls", *fouls),
+            ]},
+            {"groupName": "Passes", "statisticsItems": [
+                item("Accurate passes", *(f"{ok} ({pct(ok, missed)}%)" for ok, missed in passes)),
+                item("Long balls", *(f"{ok}/{ok + missed} ({pct(ok, missed)}%)"
+                                     for ok, missed in long_balls)),
+            ]},
+        ]}]}
+
+
+class Understat:
+    def __init__(self, data: MockDataset, config: MockConfig):
+        self.data = data
+
+    def handle(self, path: str, params: dict, headers: dict) -> tuple:
+        parts = path.strip("/").split("/")
+        if len(parts) == 3 and parts[0] == "getLeagueData" and parts[2].isdigit():
+            payload = self.data.understat(parts[1], int(parts[2]))
+            if payload is not None:
+                return payload, {}
+        raise HttpError(404, {"error": "Not Found"})
+
+
+# ── Service ───────────────────────────────────────────────────────────────────
+
+class MockServer:
+    """Un port pour les quatre sources ; ``stats`` compte les requêtes par source."""
+
+    def __init__(self, config: MockConfig | None = None):
+        self.config = config or MockConfig()
+        self._rng = random.Random(self.config.seed)
+        self.stats = {prefix: 0 for prefix in PREFIXES.values()}
+
+    @cached_property
+    def sources(self) -> dict:
+        data = MockDataset(self.config)
+        return {
+            PREFIXES["API_FOOTBALL_BASE"]: ApiFootball(data, self.config),
+            PREFIXES["ODDS_API_BASE"]:     OddsApi(data, self.config),
+            PREFIXES["SOFASCORE_BASE"]:    Sofascore(data, self.config),
+            PREFIXES["UNDERSTAT_BASE"]:    Understat(data, self.config),
+        }
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version == "HTTP/1.1")
+                status, body, extra = await self._respond(method, target, headers)
+                await self._send(writer, status, body, keep_alive, extra)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def _respond(self, method: str, target: str, headers: dict) -> tuple[int, object, dict]:
+        url = urlsplit(target)
+        path = unquote(url.path).rstrip("/") or "/"
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        prefix = next((p for p in PREFIXES.values() if path == p or path.startswith(p + "/")), None)
+        if method != "GET":
+            return 405, {"message": "GET only"}, {}
+        if prefix is None:
+            return 404, {"message": "Not found", "bases": list(PREFIXES.values())}, {}
+        self.stats[prefix] += 1
+
+        cfg = self.config
+        delay = cfg.latency_ms + self._rng.uniform(0, cfg.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        source = self.sources[prefix]
+        if cfg.error_rate and self._rng.random() < cfg.error_rate:
+            status = getattr(source, "error_status", 500)
+            return status, {"message": "Injected error (mock)"}, {}
+        try:
+            body, extra = source.handle(path[len(prefix):] or "/", params, headers)
+            return 200, body, extra
+        except HttpError as e:
+            return e.status, e.body, e.headers
+        except Exception:
+            logger.exception(f"Erreur mock sur {target}")
+            return 500, {"message": "Internal error"}, {}
+
+    @staticmethod
+    async def _send(writer, status: int, body, keep_alive: bool, extra: dict):
+        payload = json.dumps(body, default=json_default, ensure_ascii=False).encode()
+        head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+                "Content-Type: application/json; charset=utf-8",
+                f"Content-Length: {len(payload)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        head += [f"{k}: {v}" for k, v in extra.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+        await writer.drain()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                    ready: threading.Event | None = None):
+        self.sources    # Génération avant d'accepter des connexions
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES)
+        logger.info(f"euro-top mock → http://{host}:{port}")
+        if ready:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+
+def run(config: MockConfig | None = None, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    asyncio.run(MockServer(config).serve(host, port))
+
+
+def start_in_thread(config: MockConfig | None = None, host: str = DEFAULT_HOST,
+                    port: int = DEFAULT_PORT) -> MockServer:
+    """Lance le serveur dans un thread démon (benchmarks, scripts) ; retourne quand il écoute."""
+    server = MockServer(config)
+    ready = threading.Event()
+    threading.Thread(target=lambda: asyncio.run(server.serve(host, port, ready)),
+                     daemon=True, name="euro-top-mock").start()
+    if not ready.wait(timeout=120):
+        raise RuntimeError(f"Serveur mock non démarré sur {host}:{port}")
+    return server
@@ -0,0 +1,319 @@
+"""
+Pricing par matrice de scores — un seul calcul Poisson par match.
+
+La matrice P(domicile = i, extérieur = j) est construite une fois pour
+tous les matchs (lot vectorisé (n, G, G)) ; tous les marchés en dérivent :
+
+    h2h            1X2
+    totals         over / under (lignes .0, .5 et quarts asiatiques)
+    btts           les deux équipes marquent (oui / non)
+    spreads        handicap asiatique (point exprimé côté domicile)
+    correct_score  score exact "i-j"
+
+``compare_quotes`` confronte ensuite toutes les cotes (une ligne par
+match × bookmaker × marché × point × issue) au modèle en une seule passe :
+marge retirée par bookmaker (euro_top.margin), consensus moyen, meilleure
+cote, value et EV. Score exact : 1/cote brute (liste d'issues incomplète).
+
+Lignes avec remboursement (totals 2.0, handicap 0, quarts) : la probabilité
+retournée est la probabilité « équivalente » p* = 1 / cote équitable,
+soit (w1 + w2) / (2 - r1 - r2) sur les deux demi-mises (w = gain, r = remboursé).
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from .margin import remove_margin
+
+MAX_GOALS = 10
+
+MARKET_OUTCOMES: dict[str, tuple[str, ...]] = {
+    "h2h":     ("home", "draw", "away"),
+    "totals":  ("over", "under"),
+    "btts":    ("yes", "no"),
+    "spreads": ("home", "away"),
+}
+MARKETS = (*MARKET_OUTCOMES, "correct_score")
+
+
+# ── Matrice de scores ─────────────────────────────────────────────────────────
+
+def score_matrix(lam_home, lam_away, max_goals: int = MAX_GOALS) -> np.ndarray:
+    """
+    Matrices de scores Poisson indépendantes, forme (n, G, G) avec G = max_goals + 1.
+
+    La masse tronquée (> max_goals buts) est renormalisée.
+    """
+    lam_h = np.atleast_1d(np.asarray(lam_home, dtype=float))
+    lam_a = np.atleast_1d(np.asarray(lam_away, dtype=float))
+    ph = _poisson_pmf(lam_h, max_goals)
+    pa = _poisson_pmf(lam_a, max_goals)
+    m = ph[:, :, None] * pa[:, None, :]
+    return m / m.sum(axis=(1, 2), keepdims=True)
+
+
+class ScoreGrid:
+    """Matrices de scores + distributions dérivées (total et écart de buts)."""
+
+    def __init__(self, lam_home, lam_away, max_goals: int = MAX_GOALS):
+        self.matrix = score_matrix(lam_home, lam_away, max_goals)
+        n, g, _ = self.matrix.shape
+        self.size = g
+        i, j = np.indices((g, g))
+        # total ∈ [0, 2G-2], écart (dom - ext) ∈ [-(G-1), G-1] décalé de G-1
+        flat = self.matrix.reshape(n, -1)
+        self.total_pmf = _bincount_rows(flat, (i + j).ravel(), 2 * g - 1)
+        self.diff_pmf = _bincount_rows(flat, (i - j + g - 1).ravel(), 2 * g - 1)
+        self.total_cdf = np.cumsum(self.total_pmf, axis=1)
+        self.diff_cdf = np.cumsum(self.diff_pmf, axis=1)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    # ── Marchés (toutes les lignes du lot) ────────────────────────────────────
+
+    def h2h(self) -> np.ndarray:
+        """(n, 3) : P(1), P(X), P(2)."""
+        off = self.size - 1
+        away = self.diff_cdf[:, off - 1]
+        draw = self.diff_pmf[:, off]
+        return np.column_stack([1 - away - draw, draw, away])
+
+    def btts(self) -> np.ndarray:
+        """(n, 2) : P(oui), P(non)."""
+        m = self.matrix
+        no = m[:, 0, :].sum(axis=1) + m[:, :, 0].sum(axis=1) - m[:, 0, 0]
+        return np.column_stack([1 - no, no])
+
+    def totals(self, line: float) -> np.ndarray:
+        """(n, 2) : p* over, p* under pour une ligne de buts."""
+        idx = np.arange(len(self))
+        pt = np.full(len(self), float(line))
+        return np.column_stack([
+            self._line(self.total_cdf, self.total_pmf, 0, idx, pt, over=True)[0],
+            self._line(self.total_cdf, self.total_pmf, 0, idx, pt, over=False)[0],
+        ])
+
+    def spreads(self, line: float) -> np.ndarray:
+        """(n, 2) : p* domicile, p* extérieur pour un handicap côté domicile."""
+        idx = np.arange(len(self))
+        t = np.full(len(self), -float(line))
+        off = self.size - 1
+        return np.column_stack([
+            self._line(self.diff_cdf, self.diff_pmf, off, idx, t, over=True)[0],
+            self._line(self.diff_cdf, self.diff_pmf, off, idx, t, over=False)[0],
+        ])
+
+    def correct_score(self, home_goals: int, away_goals: int) -> np.ndarray:
+        """(n,) : P(score exact)."""
+        if max(home_goals, away_goals) >= self.size:
+            return np.zeros(len(self))
+        return self.matrix[:, home_goals, away_goals]
+
+    # ── Évaluation par cote (vectorisée) ──────────────────────────────────────
+
+    def quote_probs(
+        self,
+        event_idx: np.ndarray,
+        market: np.ndarray,
+        outcome: np.ndarray,
+        point: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Probabilité modèle p* et probabilité de remboursement pour chaque cote.
+
+        ``market`` / ``outcome`` : tableaux de chaînes ; ``point`` : ligne
+        (totals, spreads côté domicile) ou NaN. Score exact : outcome "i-j".
+        """
+        p = np.full(len(event_idx), np.nan)
+        push = np.zeros(len(event_idx))
+        off = self.size - 1
+
+        sel = market == "h2h"
+        if sel.any():
+            col = np.searchsorted(["away", "draw", "home"], outcome[sel])
+            p[sel] = self.h2h()[event_idx[sel], 2 - col]
+
+        sel = market == "btts"
+        if sel.any():
+            p[sel] = self.btts()[event_idx[sel], (outcome[sel] == "no").astype(int)]
+
+        sel = market == "totals"
+        if sel.any():
+            p[sel], push[sel] = self._line(
+                self.total_cdf, self.total_pmf, 0,
+                event_idx[sel], point[sel], over=outcome[sel] == "over",
+            )
+
+        sel = market == "spreads"
+        if sel.any():
+            p[sel], push[sel] = self._line(
+                self.diff_cdf, self.diff_pmf, off,
+                event_idx[sel], -point[sel], over=outcome[sel] == "home",
+            )
+
+        sel = np.flatnonzero(market == "correct_score")
+        for k in sel:
+            h, _, a = str(outcome[k]).partition("-")
+            if h.isdigit() and a.isdigit() and max(int(h), int(a)) < self.size:
+                p[k] = self.matrix[event_idx[k], int(h), int(a)]
+
+        return p, push
+
+    def _line(self, cdf, pmf, offset, rows, threshold, over):
+        """
+        Ligne asiatique sur une variable entière X : gagne si X > t (over)
+        ou X < t (under), remboursé si X == t ; quarts = deux demi-mises.
+        """
+        threshold = np.asarray(threshold, dtype=float)
+        quarter = np.isclose(np.mod(threshold * 4, 2), 1)
+        halves = (
+            np.where(quarter, threshold - 0.25, threshold),
+            np.where(quarter, threshold + 0.25, threshold),
+        )
+        wins, pushes = [], []
+        for t in halves:
+            is_int = np.isclose(t, np.round(t))
+            floor_t = np.floor(t + 1e-9).astype(int)
+            ceil_t = np.ceil(t - 1e-9).astype(int)
+            le_floor = _gather(cdf, rows, floor_t + offset)
+            lt_ceil = _gather(cdf, rows, ceil_t - 1 + offset)
+            eq = np.where(is_int, _gather(pmf, rows, np.round(t).astype(int) + offset, fill=0.0), 0.0)
+            wins.append(np.where(over, 1 - le_floor, lt_ceil))
+            pushes.append(eq)
+        paid = 2 - pushes[0] - pushes[1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p_star = np.where(paid > 0, (wins[0] + wins[1]) / paid, np.nan)
+        return p_star, (pushes[0] + pushes[1]) / 2
+
+
+# ── Comparaison cotes ↔ modèle ────────────────────────────────────────────────
+
+def compare_quotes(
+    grid: ScoreGrid,
+    quotes: list[tuple],
+    method: str = "shin",
+    min_value: float | None = None,
+) -> list[dict]:
+    """
+    Compare toutes les cotes au modèle en une passe.
+
+    Args:
+        grid      : ScoreGrid des matchs (index = event_idx des cotes)
+        quotes    : [(event_idx, book, market, outcome, point, price), …]
+        method    : Méthode de suppression de marge (voir euro_top.margin)
+        min_value : Seuil p_model - p_fair (fraction) ; None = tout retourner
+
+    Retourne une ligne par (match, marché, point, issue) :
+        {event_idx, market, outcome, point, p_model, p_fair,
+         best_odds, best_book, value, ev}
+    """
+    if not quotes:
+        return []
+
+    event_idx = np.fromiter((q[0] for q in quotes), dtype=int, count=len(quotes))
+    book = np.array([q[1] for q in quotes], dtype=object)
+    market = np.array([q[2] for q in quotes])
+    outcome = np.array([q[3] for q in quotes])
+    point = np.array([np.nan if q[4] is None else q[4] for q in quotes], dtype=float)
+    price = np.fromiter((q[5] for q in quotes), dtype=float, count=len(quotes))
+    point_key = np.where(np.isnan(point), 0.0, point)
+
+    # 1. Marge retirée par ligne bookmaker (match, book, marché, point)
+    line_id = _group_ids(event_idx, book.astype(str), market, point_key)
+    fair = _fair_by_line(line_id, market, outcome, price, method)
+
+    # 2. Consensus par (match, marché, point, issue)
+    gid = _group_ids(event_idx, market, point_key, outcome)
+    n_groups = gid.max() + 1
+    ok = ~np.isnan(fair)
+    fair_sum = np.bincount(gid[ok], weights=fair[ok], minlength=n_groups)
+    fair_cnt = np.bincount(gid[ok], minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_fair = np.where(fair_cnt > 0, fair_sum / np.maximum(fair_cnt, 1), np.nan)
+
+    # Meilleure cote par groupe (tri groupe ↑, cote ↓ → premier de chaque groupe)
+    order = np.lexsort((-price, gid))
+    first = order[np.r_[True, gid[order][1:] != gid[order][:-1]]]
+    best_odds = price[first]
+    best_book = book[first]
+
+    # 3. Probabilité modèle (une fois par groupe) + value / EV
+    p_model, push = grid.quote_probs(event_idx[first], market[first], outcome[first], point[first])
+    value = p_model - p_fair
+    ev = (1 - push) * (p_model * best_odds - 1)
+
+    keep = ~np.isnan(value)
+    if min_value is not None:
+        keep &= value >= min_value
+
+    return [
+        {
+            "event_idx": int(event_idx[first[g]]),
+            "market":    str(market[first[g]]),
+            "outcome":   str(outcome[first[g]]),
+            "point":     None if np.isnan(point[first[g]]) else float(point[first[g]]),
+            "p_model":   float(p_model[g]),
+            "p_fair":    float(p_fair[g]),
+            "best_odds": float(best_odds[g]),
+            "best_book": str(best_book[g]),
+            "value":     float(value[g]),
+            "ev":        float(ev[g]),
+        }
+        for g in np.flatnonzero(keep)
+    ]
+
+
+# ── Helpers ───────────────────────────────────────────────────────────────────
+
+def _poisson_pmf(lam: np.ndarray, max_goals: int) -> np.ndarray:
+    """P(X = k), k ∈ [0, max_goals], par récurrence p_k = p_{k-1}·λ/k (λ = 0 accepté)."""
+    k = np.arange(1, max_goals + 1)
+    ratios = np.cumprod(lam[:, None] / k, axis=1)
+    return np.exp(-lam)[:, None] * np.hstack([np.ones((len(lam), 1)), ratios])
+
+
+def _bincount_rows(flat: np.ndarray, bins: np.ndarray, size: int) -> np.ndarray:
+    """Somme des colonnes de ``flat`` par bin, ligne par ligne."""
+    out = np.zeros((flat.shape[0], size))
+    np.add.at(out, (slice(None), bins), flat)
+    return out
+
+
+def _gather(arr: np.ndarray, rows: np.ndarray, cols: np.ndarray, fill: float | None = None):
+    """arr[rows, cols] avec cols hors bornes → 0 (à gauche) / 1 (à droite) ou ``fill``."""
+    width = arr.shape[1]
+    out = arr[rows, np.clip(cols, 0, width - 1)]
+    low = 0.0 if fill is None else fill
+    high = 1.0 if fill is None else fill
+    return np.where(cols < 0, low, np.where(cols >= width, high, out))
+
+
+def _group_ids(*keys: np.ndarray) -> np.ndarray:
+    """Identifiant dense de groupe pour un tuple de colonnes clés."""
+    combined = np.rec.fromarrays(keys)
+    _, ids = np.unique(combined, return_inverse=True)
+    return ids.ravel()
+
+
+def _fair_by_line(line_id, market, outcome, price, method) -> np.ndarray:
+    """Probabilités sans marge par cote ; NaN si la ligne bookmaker est incomplète."""
+    fair = np.full(len(price), np.nan)
+    order = np.argsort(line_id, kind="stable")
+    sorted_ids = line_id[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    widths = np.diff(np.r_[starts, len(order)])
+
+    # Score exact : cotes rarement listées en entier → 1/cote brute (marge conservée)
+    exact = market == "correct_score"
+    fair[exact] = 1 / price[exact]
+
+    # Ligne complète : toutes les issues du marché présentes
+    expected = np.array([
+        len(MARKET_OUTCOMES.get(market[order[s]], ())) for s in starts
+    ])
+    for w in np.unique(widths[(widths == expected) & (widths >= 2)]):
+        sel = starts[(widths == w) & (expected == w)]
+        cols = order[sel[:, None] + np.arange(w)]
+        fair[cols] = remove_margin(price[cols], method=method)
+    return fair
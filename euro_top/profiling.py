@@ -0,0 +1,294 @@
+"""
+Mode profilage — CLI (``euro-top --profile <commande>``) et scripts
+(``EURO_TOP_PROFILE=1 python3 scripts/value_bets.py``).
+
+Deux profileurs :
+    cprofile  cProfile (déterministe) — temps par fonction, cumulé et propre
+    sample    échantillonneur en temps mural (SIGALRM toutes les SAMPLE_INTERVAL s,
+              pile du thread principal) — surcoût faible, voit aussi les
+              attentes réseau ; Unix uniquement
+
+SQL : écouteurs ``before_cursor_execute`` / ``after_cursor_execute`` sur
+toutes les Engine — nombre, durée et lignes de chaque requête, regroupées
+par texte normalisé (listes ``IN (?, ?, …)`` repliées) et par appelant
+(première frame hors SQLAlchemy). Même requête lancée ≥ N_PLUS_ONE fois
+depuis la même ligne → motif N+1 signalé.
+
+Résumé sur stderr à la fin (top fonctions, requêtes les plus lentes, N+1).
+Avec un répertoire de sortie : ``profile.pstats`` (cprofile) ou
+``profile.folded`` (sample, format flamegraph), et ``queries.json``
+(agrégats + journal de chaque requête) pour comparer deux runs hors ligne.
+
+Variables d'environnement (scripts, et CLI sans l'option) :
+    EURO_TOP_PROFILE      1 / cprofile / sample
+    EURO_TOP_PROFILE_OUT  répertoire de sortie (optionnel)
+"""
+from __future__ import annotations
+
+import cProfile
+import hashlib
+import io
+import json
+import os
+import pstats
+import re
+import signal
+import sys
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, TextIO
+
+MODES = ("cprofile", "sample")
+SAMPLE_INTERVAL = 0.005
+N_PLUS_ONE = 10
+TOP = 15
+
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+_SKIP_FRAMES = (f"{os.sep}sqlalchemy{os.sep}", __file__, f"{os.sep}contextlib.py")
+
+
+def normalize_sql(statement: str) -> str:
+    """Texte comparable d'une requête : espaces réduits, listes de paramètres repliées."""
+    return _IN_LIST.sub("(?, …)", _SPACES.sub(" ", statement).strip())
+
+
+def _caller() -> str:
+    """Première frame hors SQLAlchemy / profilage : « fichier:ligne fonction »."""
+    for frame in reversed(traceback.extract_stack(limit=40)):
+        if not any(part in frame.filename for part in _SKIP_FRAMES):
+            return f"{_short(frame.filename)}:{frame.lineno} {frame.name}"
+    return "?"
+
+
+def _short(path: str) -> str:
+    root = str(Path(__file__).parent.parent) + os.sep
+    return path[len(root):] if path.startswith(root) else path
+
+
+# ── SQL ───────────────────────────────────────────────────────────────────────
+
+class QueryLog:
+    """Journal des requêtes SQL exécutées pendant le profilage."""
+
+    def __init__(self):
+        self.events: list[dict] = []
+        self._t0 = time.perf_counter()
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_profile_start", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["_profile_start"].pop()
+        now = time.perf_counter()
+        self.events.append({
+            "at_ms": round((start - self._t0) * 1000, 3),
+            "ms": round((now - start) * 1000, 3),
+            "sql": normalize_sql(statement),
+            "rows": cursor.rowcount if cursor.rowcount >= 0 else None,
+            "batch": len(parameters) if executemany else 1,
+            "caller": _caller(),
+        })
+
+    def attach(self):
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        event.listen(Engine, "before_cursor_execute", self._before)
+        event.listen(Engine, "after_cursor_execute", self._after)
+
+    def detach(self):
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        event.remove(Engine, "before_cursor_execute", self._before)
+        event.remove(Engine, "after_cursor_execute", self._after)
+
+    def statements(self) -> list[dict]:
+        """Agrégats par requête normalisée, du plus coûteux au moins coûteux."""
+        groups: dict[str, dict] = {}
+        for e in self.events:
+            g = groups.setdefault(e["sql"], {
+                "id": hashlib.sha1(e["sql"].encode()).hexdigest()[:10], "sql": e["sql"],
+                "count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "callers": Counter(),
+            })
+            g["count"] += 1
+            g["total_ms"] += e["ms"]
+            g["max_ms"] = max(g["max_ms"], e["ms"])
+            g["rows"] += e["rows"] or 0
+            g["callers"][e["caller"]] += 1
+        out = sorted(groups.values(), key=lambda g: -g["total_ms"])
+        for g in out:
+            g["total_ms"] = round(g["total_ms"], 3)
+            g["callers"] = dict(g["callers"].most_common())
+        return out
+
+    def n_plus_one(self, threshold: int = N_PLUS_ONE) -> list[dict]:
+        """Même requête répétée ≥ threshold fois depuis la même ligne."""
+        found = []
+        for g in self.statements():
+            for caller, count in g["callers"].items():
+                if count >= threshold:
+                    found.append({"id": g["id"], "sql": g["sql"], "caller": caller,
+                                  "count": count})
+        return sorted(found, key=lambda f: -f["count"])
+
+
+# ── Échantillonneur ───────────────────────────────────────────────────────────
+
+class Sampler:
+    """Piles du thread principal relevées sur SIGALRM (temps mural)."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._previous = None
+
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({_short(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        self.stacks[tuple(reversed(stack))] += 1
+
+    def enable(self):
+        self._previous = signal.signal(signal.SIGALRM, self._sample)
+        signal.setitimer(signal.ITIMER_REAL, self.interval, self.interval)
+
+    def disable(self):
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, self._previous or signal.SIG_DFL)
+
+    def top(self, n: int = TOP) -> list[tuple[str, int, int]]:
+        """[(fonction, échantillons propres, échantillons cumulés)] par cumul décroissant."""
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for func in set(stack):
+                total[func] += count
+        return [(func, own[func], cum) for func, cum in total.most_common(n)]
+
+    def folded(self) -> str:
+        """Format « piles repliées » (flamegraph.pl, speedscope)."""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.items())
+
+
+# ── Session de profilage ──────────────────────────────────────────────────────
+
+class Profiler:
+    def __init__(self, mode: str = "cprofile", out_dir: str | Path | None = None,
+                 top: int = TOP, label: str = ""):
+        if mode not in MODES:
+            raise ValueError(f"Mode de profilage inconnu : {mode} ({', '.join(MODES)})")
+        self.mode = mode
+        self.out_dir = Path(out_dir) if out_dir else None
+        self.top = top
+        self.label = label
+        self.queries = QueryLog()
+        self._profiler = cProfile.Profile() if mode == "cprofile" else Sampler()
+        self._wall = 0.0
+        self._running = False
+
+    def start(self):
+        self.queries.attach()
+        self._wall = time.perf_counter()
+        self._profiler.enable()
+        self._running = True
+
+    def stop(self, report: TextIO | None = sys.stderr):
+        if not self._running:
+            return
+        self._profiler.disable()
+        self._running = False
+        self._wall = time.perf_counter() - self._wall
+        self.queries.detach()
+        if report is not None:
+            self.report(report)
+        if self.out_dir:
+            self.dump(self.out_dir)
+
+    # ── Sorties ──
+
+    def report(self, out: TextIO):
+        w = lambda line="": print(line, file=out)
+        sql_ms = sum(e["ms"] for e in self.queries.events)
+        w(f"\n── Profil {self.label or ''} ({self.mode}) : {self._wall:.2f} s, "
+          f"{len(self.queries.events)} requêtes SQL ({sql_ms:.0f} ms)")
+
+        w(f"\n  Top {self.top} fonctions (cumulé)")
+        if self.mode == "cprofile":
+            buf = io.StringIO()
+            stats = pstats.Stats(self._profiler, stream=buf)
+            stats.sort_stats("cumulative").print_stats(self.top)
+            lines = buf.getvalue().splitlines()
+            start = next((i for i, l in enumerate(lines) if l.lstrip().startswith("ncalls")), 0)
+            for line in lines[start:]:
+                if line.strip():
+                    w(f"  {line}")
+        else:
+            total = sum(self._profiler.stacks.values()) or 1
+            w(f"  {'cumul':>7} {'propre':>7}  fonction   ({total} échantillons)")
+            for func, own, cum in self._profiler.top(self.top):
+                w(f"  {cum / total:7.1%} {own / total:7.1%}  {func}")
+
+        statements = self.queries.statements()
+        if statements:
+            w("\n  Requêtes SQL les plus coûteuses")
+            w(f"  {'total ms':>9} {'n':>6} {'max ms':>8}  requête")
+            for g in statements[:self.top]:
+                w(f"  {g['total_ms']:9.1f} {g['count']:6d} {g['max_ms']:8.2f}  {g['sql'][:110]}")
+        suspects = self.queries.n_plus_one()
+        if suspects:
+            w(f"\n  ⚠️  N+1 probables (≥ {N_PLUS_ONE} exécutions depuis la même ligne)")
+            for s in suspects[:self.top]:
+                w(f"  {s['count']:6d} × {s['sql'][:80]}")
+                w(f"           ← {s['caller']}")
+        w()
+
+    def dump(self, out_dir: Path) -> list[Path]:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        if self.mode == "cprofile":
+            path = out_dir / "profile.pstats"
+            self._profiler.dump_stats(path)
+        else:
+            path = out_dir / "profile.folded"
+            path.write_text(self._profiler.folded(), encoding="utf-8")
+        written.append(path)
+        log = {
+            "label": self.label, "mode": self.mode, "wall_s": round(self._wall, 4),
+            "statements": self.queries.statements(),
+            "n_plus_one": self.queries.n_plus_one(),
+            "events": self.queries.events,
+        }
+        path = out_dir / "queries.json"
+        path.write_text(json.dumps(log, indent=1, ensure_ascii=False), encoding="utf-8")
+        written.append(path)
+        print(f"  → {', '.join(str(p) for p in written)}", file=sys.stderr)
+        return written
+
+
+def env_mode() -> str | None:
+    """Mode demandé par EURO_TOP_PROFILE (None = pas de profilage)."""
+    value = os.getenv("EURO_TOP_PROFILE", "").strip().lower()
+    if value in ("", "0", "false", "no"):
+        return None
+    return value if value in MODES else "cprofile"
+
+
+@contextmanager
+def from_env(label: str = "") -> Iterator[Profiler | None]:
+    """Profile le bloc si EURO_TOP_PROFILE est défini (scripts : ``with from_env(): main()``)."""
+    mode = env_mode()
+    if not mode:
+        yield None
+        return
+    profiler = Profiler(mode, os.getenv("EURO_TOP_PROFILE_OUT") or None,
+                        label=label or Path(sys.argv[0]).name)
+    profiler.start()
+    try:                        # sys.exit() dans le bloc : rapport quand même
+        yield profiler
+    finally:
+        profiler.stop()
@@ -0,0 +1,313 @@
+"""
+Ratings Elo des équipes — mis à jour à l'ingestion des matchs.
+
+Deux variantes :
+    goals : résultat réel (1 / ½ / 0), pondéré par l'écart de buts
+            (multiplicateur World Football Elo)
+    xg    : « résultat » = P(victoire) + ½·P(nul) d'après les xG du match
+            (matrice de scores Poisson), sans multiplicateur
+
+Pools : chaque championnat domestique a son propre pool ; CL/EL/ECL
+partagent un pool « europe » (les clubs de toutes les ligues s'y croisent).
+
+Stockage : table ``team_ratings`` (une ligne par équipe et par match),
+interrogeable à n'importe quelle date via ``get_ratings(as_of=...)``.
+
+Mise à jour incrémentale via ``update_ratings`` (appelée par
+``upsert_matches``) ; si un match arrive hors ordre chronologique,
+le pool est rejoué entièrement (``rebuild_ratings``). Le rejeu est vectorisé
+par « vagues » : matchs où aucune équipe n'apparaît deux fois, traités
+ensemble en numpy (≈ une vague par journée).
+"""
+from __future__ import annotations
+
+import logging
+from datetime import date
+
+import numpy as np
+from sqlalchemy import delete, func, insert, select
+
+from . import metrics
+from .config import LEAGUES, european_leagues
+from .db import Match, Session, TeamRating
+from .pricing import score_matrix
+
+logger = logging.getLogger(__name__)
+
+BASE_RATING = 1500.0
+K_FACTOR = 20.0
+HOME_ADVANTAGE = 60.0    # Points Elo
+SCALE = 400.0
+
+VARIANTS = ("goals", "xg")
+EUROPE_POOL = "europe"
+
+
+# ── Pools ─────────────────────────────────────────────────────────────────────
+
+def rating_pool(league_id: int) -> str:
+    """Pool de rating d'une compétition (clé courte ou "europe")."""
+    if league_id in {l.id for l in european_leagues()}:
+        return EUROPE_POOL
+    for key, league in LEAGUES.items():
+        if league.id == league_id:
+            return key
+    return str(league_id)
+
+
+def pool_league_ids(pool: str) -> list[int]:
+    return [l.id for l in LEAGUES.values() if rating_pool(l.id) == pool]
+
+
+# ── Moteur Elo vectorisé ──────────────────────────────────────────────────────
+
+def _scores(hg, ag, hxg, axg, variant: str) -> tuple[np.ndarray, np.ndarray]:
+    """(résultat W côté domicile, multiplicateur) par match."""
+    if variant == "xg":
+        m = score_matrix(hxg, axg)
+        i, j = np.indices(m.shape[1:])
+        w = (m * (i > j)).sum(axis=(1, 2)) + 0.5 * (m * (i == j)).sum(axis=(1, 2))
+        return w, np.ones(len(w))
+    gd = hg - ag
+    w = np.where(gd > 0, 1.0, np.where(gd == 0, 0.5, 0.0))
+    margin = np.abs(gd)
+    mult = np.where(margin <= 1, 1.0, np.where(margin == 2, 1.5, (11 + margin) / 8))
+    return w, mult
+
+
+def _waves(home_idx: np.ndarray, away_idx: np.ndarray) -> np.ndarray:
+    """Vague de chaque match : 1 + dernière vague de ses deux équipes."""
+    last: dict[int, int] = {}
+    waves = np.empty(len(home_idx), dtype=int)
+    for k, (h, a) in enumerate(zip(home_idx.tolist(), away_idx.tolist())):
+        w = max(last.get(h, -1), last.get(a, -1)) + 1
+        waves[k] = last[h] = last[a] = w
+    return waves
+
+
+def replay(
+    home_idx: np.ndarray,
+    away_idx: np.ndarray,
+    w: np.ndarray,
+    mult: np.ndarray,
+    ratings: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Rejoue des matchs (ordre chronologique) sur un vecteur de ratings.
+
+    Retourne (delta côté domicile, ratings finaux). ``ratings`` n'est pas modifié.
+    """
+    ratings = ratings.astype(float).copy()
+    delta = np.zeros(len(home_idx))
+    waves = _waves(home_idx, away_idx)
+    order = np.argsort(waves, kind="stable")
+    bounds = np.flatnonzero(np.r_[True, np.diff(waves[order]) > 0, True])
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        sel = order[start:end]
+        h, a = home_idx[sel], away_idx[sel]
+        expected = 1 / (1 + 10 ** ((ratings[a] - ratings[h] - HOME_ADVANTAGE) / SCALE))
+        d = K_FACTOR * mult[sel] * (w[sel] - expected)
+        ratings[h] += d
+        ratings[a] -= d
+        delta[sel] = d
+    return delta, ratings
+
+
+# ── Persistance ───────────────────────────────────────────────────────────────
+
+def _rate(session: Session, pool: str, variant: str, matches: list[dict],
+          start: dict[str, float]) -> int:
+    """Note ``matches`` (triés) à partir des ratings ``start`` et insère l'historique."""
+    teams = sorted({m["home_team"] for m in matches} | {m["away_team"] for m in matches})
+    index = {t: i for i, t in enumerate(teams)}
+    home_idx = np.array([index[m["home_team"]] for m in matches])
+    away_idx = np.array([index[m["away_team"]] for m in matches])
+    col = (lambda k: np.array([m[k] for m in matches], dtype=float))
+    w, mult = _scores(col("home_goals"), col("away_goals"),
+                      col("home_xg"), col("away_xg"), variant)
+    initial = np.array([start.get(t, BASE_RATING) for t in teams])
+
+    delta, _ = replay(home_idx, away_idx, w, mult, initial)
+
+    # Ratings après chaque match : cumul des deltas par équipe
+    team_delta = np.zeros((len(matches), 2))
+    team_delta[:, 0], team_delta[:, 1] = delta, -delta
+    flat_team = np.column_stack([home_idx, away_idx]).ravel()
+    flat_delta = team_delta.ravel()
+    order = np.argsort(flat_team, kind="stable")
+    cum = np.cumsum(flat_delta[order])
+    first = np.r_[True, flat_team[order][1:] != flat_team[order][:-1]]
+    offset = np.maximum.accumulate(np.where(first, np.arange(len(order)), 0))
+    running = np.empty(len(flat_team))
+    running[order] = initial[flat_team[order]] + cum - (cum - flat_delta[order])[offset]
+
+    rows = []
+    for k, m in enumerate(matches):
+        for side, team in ((0, m["home_team"]), (1, m["away_team"])):
+            rows.append({
+                "pool": pool, "variant": variant, "team": team,
+                "match_id": m["id"], "match_date": m["match_date"],
+                "league_id": m["league_id"], "season": m["season"],
+                "rating": round(float(running[2 * k + side]), 4),
+                "delta": round(float(flat_delta[2 * k + side]), 4),
+            })
+    session.execute(insert(TeamRating), rows)
+    metrics.rows("team_ratings", len(rows))
+    return len(matches)
+
+
+def _eligible(m: dict, variant: str) -> bool:
+    if m.get("status") != "FT" or not m.get("id") or not m.get("match_date"):
+        return False
+    if m.get("home_goals") is None or m.get("away_goals") is None:
+        return False
+    return variant != "xg" or (m.get("home_xg") is not None and m.get("away_xg") is not None)
+
+
+def update_ratings(session: Session, rows: list[dict]) -> int:
+    """
+    Met à jour les ratings avec les matchs terminés de ``rows`` non encore notés.
+
+    Un match plus ancien que le dernier match noté de son pool déclenche
+    un rejeu complet du pool (rebuild_ratings).
+    """
+    by_pool: dict[str, list[dict]] = {}
+    for r in rows:
+        if r.get("league_id") is not None:
+            by_pool.setdefault(rating_pool(r["league_id"]), []).append(r)
+
+    rated = 0
+    for pool, pool_rows in by_pool.items():
+        for variant in VARIANTS:
+            cand = [m for m in pool_rows if _eligible(m, variant)]
+            if not cand:
+                continue
+            done = set(session.scalars(
+                select(TeamRating.match_id).where(
+                    TeamRating.pool == pool, TeamRating.variant == variant,
+                    TeamRating.match_id.in_([m["id"] for m in cand]),
+                )
+            ))
+            new = sorted((m for m in cand if m["id"] not in done),
+                         key=lambda m: (m["match_date"], m["id"]))
+            if not new:
+                continue
+
+            last = session.scalar(
+                select(func.max(TeamRating.match_date))
+                .where(TeamRating.pool == pool, TeamRating.variant == variant)
+            )
+            if last and new[0]["match_date"] < last:
+                logger.info(f"Elo [{pool}/{variant}] match hors ordre → rejeu complet")
+                rated += rebuild_ratings(session, pool, variant)
+                continue
+
+            teams = {m["home_team"] for m in new} | {m["away_team"] for m in new}
+            current = {r["team"]: r["rating"] for r in
+                       get_ratings(session, pool, variant, teams=teams)}
+            rated += _rate(session, pool, variant, new, current)
+    if rated:
+        session.commit()
+    return rated
+
+
+def rebuild_ratings(session: Session, pool: str | None = None,
+                    variant: str | None = None) -> int:
+    """Efface et rejoue tout l'historique d'un pool (tous les pools si None)."""
+    pools = [pool] if pool else sorted({rating_pool(l.id) for l in LEAGUES.values()})
+    variants = [variant] if variant else list(VARIANTS)
+    total = 0
+    for p in pools:
+        cols = (Match.id, Match.league_id, Match.season, Match.match_date,
+                Match.home_team, Match.away_team, Match.home_goals,
+                Match.away_goals, Match.home_xg, Match.away_xg)
+        all_matches = [
+            {**m._asdict(), "status": "FT"} for m in session.execute(
+                select(*cols)
+                .where(Match.league_id.in_(pool_league_ids(p)), Match.status == "FT")
+                .order_by(Match.match_date, Match.id)
+            )
+        ]
+        for v in variants:
+            session.execute(delete(TeamRating).where(
+                TeamRating.pool == p, TeamRating.variant == v))
+            matches = [m for m in all_matches if _eligible(m, v)]
+            if matches:
+                total += _rate(session, p, v, matches, {})
+    session.commit()
+    logger.info(f"Elo rejoué : {total} matchs")
+    return total
+
+
+def replay_archive(pool: str, variant: str = "goals", seasons: list[int] | None = None,
+                   root=None) -> dict[str, float]:
+    """
+    Ratings finaux d'un pool rejoués depuis l'archive colonnaire (archive.py),
+    sans passer par SQLite ni écrire en base : les colonnes mappées vont
+    directement au moteur vectorisé. Retourne {équipe: rating}.
+    """
+    from .archive import ARCHIVE_DIR, read_columns
+    cols = read_columns(
+        "matches",
+        ["id", "match_date", "status", "home_team", "away_team",
+         "home_goals", "away_goals", "home_xg", "away_xg"],
+        league_ids=pool_league_ids(pool), seasons=seasons, root=root or ARCHIVE_DIR,
+    )
+    hg, ag = cols["home_goals"].astype(float), cols["away_goals"].astype(float)
+    hxg, axg = cols["home_xg"].astype(float), cols["away_xg"].astype(float)
+    ok = (cols["status"] == "FT") & ~np.isnan(hg) & ~np.isnan(ag) & ~np.isnat(cols["match_date"])
+    if variant == "xg":
+        ok &= ~np.isnan(hxg) & ~np.isnan(axg)
+    sel = np.flatnonzero(ok)
+    sel = sel[np.lexsort((cols["id"][sel], cols["match_date"][sel]))]
+    if not len(sel):
+        return {}
+
+    teams, idx = np.unique(np.concatenate([cols["home_team"][sel], cols["away_team"][sel]]),
+                           return_inverse=True)
+    home_idx, away_idx = idx[:len(sel)], idx[len(sel):]
+    w, mult = _scores(hg[sel], ag[sel], hxg[sel], axg[sel], variant)
+    _, final = replay(home_idx, away_idx, w, mult, np.full(len(teams), BASE_RATING))
+    return {str(t): round(float(r), 4) for t, r in zip(teams, final)}
+
+
+# ── Lecture ───────────────────────────────────────────────────────────────────
+
+def get_ratings(
+    session: Session,
+    pool: str,
+    variant: str = "goals",
+    as_of: date | None = None,
+    teams: set[str] | None = None,
+) -> list[dict]:
+    """
+    Rating de chaque équipe à la date ``as_of`` (incluse ; None = dernier connu).
+
+    Retourne [{team, rating, matches, last_match}] trié par rating décroissant.
+    """
+    conds = [TeamRating.pool == pool, TeamRating.variant == variant]
+    if as_of:
+        conds.append(TeamRating.match_date <= as_of)
+    if teams:
+        conds.append(TeamRating.team.in_(teams))
+    ranked = (
+        select(
+            TeamRating.team, TeamRating.rating, TeamRating.match_date,
+            func.row_number().over(
+                partition_by=TeamRating.team,
+                order_by=(TeamRating.match_date.desc(), TeamRating.id.desc()),
+            ).label("rn"),
+            func.count().over(partition_by=TeamRating.team).label("matches"),
+        )
+        .where(*conds)
+        .subquery()
+    )
+    rows = session.execute(
+        select(ranked.c.team, ranked.c.rating, ranked.c.matches, ranked.c.match_date)
+        .where(ranked.c.rn == 1)
+        .order_by(ranked.c.rating.desc())
+    )
+    return [
+        {"team": t, "rating": r, "matches": n, "last_match": d}
+        for t, r, n, d in rows
+    ]
@@ -0,0 +1,251 @@
+"""
+Reprises, backoff et disjoncteur communs aux collecteurs.
+
+    r = request(lambda: session.get(url), "sofascore", base_url)
+
+``request`` exécute une requête (ou tout appel qui renvoie une réponse
+httpx / requests, ou lève une erreur portant ``.response``) selon la
+politique de la source (POLICIES) :
+
+    Reprises   statuts ``retry`` (429, 5xx) et erreurs réseau transitoires,
+               backoff exponentiel avec gigue (moitié fixe + moitié
+               aléatoire), au plus ``attempts`` tentatives ; ``Retry-After``
+               (secondes ou date HTTP) remplace le backoff. Quota épuisé
+               (``x-ratelimit-requests-remaining`` / ``x-requests-remaining``
+               à 0) : pas de reprise, attendre ne sert à rien.
+    Cadence    ``min_interval`` entre deux envois au même hôte (politesse) ;
+               ``x-ratelimit-remaining`` à 0 (limite par minute
+               API-Football) ou ``Retry-After`` reportent l'envoi suivant.
+               Attente > ``max_wait`` : reprise abandonnée (dernière réponse
+               rendue), envoi refusé (CircuitOpenError) pour la cadence.
+    Disjoncteur  par hôte : ``threshold`` échecs consécutifs (statuts
+               ``trip`` — dont 403 pour Sofascore, qui bloque — ou erreur
+               réseau) ouvrent le circuit ; pendant ``reset_after`` s tout
+               appel lève CircuitOpenError sans rien envoyer, puis un seul
+               appel d'essai referme (succès) ou rouvre (échec) le circuit.
+
+Les tentatives sont comptées dans l'appel ``telemetry`` en cours
+(``retries``) et dans les métriques ; les attentes (cadence, backoff,
+``Retry-After``) sont exclues de sa durée.
+"""
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, TypeVar
+
+import httpx
+import requests
+
+from . import metrics
+from .telemetry import current, waiting
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+TRANSIENT = (requests.ConnectionError, requests.Timeout, httpx.TransportError)
+QUOTA_HEADERS = ("x-ratelimit-requests-remaining", "x-requests-remaining")
+MINUTE_HEADER = "x-ratelimit-remaining"
+
+
+class CircuitOpenError(Exception):
+    """Source en panne : appel refusé sans envoi."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int = 4
+    base: float = 0.5                 # Secondes (1er backoff)
+    cap: float = 20.0                 # Backoff maximal
+    max_wait: float = 60.0            # Attente maximale honorée (Retry-After, cadence)
+    min_interval: float = 0.0         # Entre deux envois au même hôte
+    retry: frozenset = frozenset({429, 500, 502, 503, 504})
+    trip: frozenset = frozenset({429, 500, 502, 503, 504})
+    threshold: int = 5                # Échecs consécutifs avant ouverture
+    reset_after: float = 60.0         # Secondes circuit ouvert avant essai
+
+    def backoff(self, attempt: int) -> float:
+        delay = min(self.cap, self.base * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+POLICIES = {
+    "api_football": RetryPolicy(min_interval=0.3),
+    "odds":         RetryPolicy(attempts=3),
+    "sofascore":    RetryPolicy(attempts=2, min_interval=0.5, threshold=3, reset_after=300.0,
+                                trip=frozenset({403, 429, 500, 502, 503, 504})),
+    "understat":    RetryPolicy(),
+}
+
+
+# ── Disjoncteur ───────────────────────────────────────────────────────────────
+
+@dataclass
+class Circuit:
+    """État d'un hôte : échecs consécutifs, réouverture, prochain envoi permis."""
+    host: str
+    failures: int = 0
+    retry_at: float | None = None     # Circuit ouvert jusqu'à (time.monotonic())
+    next_send: float = 0.0
+    probing: bool = False
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def state(self) -> str:
+        if self.retry_at is None:
+            return "closed"
+        return "half_open" if self.probing or time.monotonic() >= self.retry_at else "open"
+
+    def acquire(self, policy: RetryPolicy) -> float:
+        """Autorise un envoi ; retourne l'attente de cadence. Lève CircuitOpenError."""
+        with self._lock:
+            now = time.monotonic()
+            if self.retry_at is not None:
+                if self.probing or now < self.retry_at:
+                    raise CircuitOpenError(
+                        f"{self.host} : circuit ouvert ({self.failures} échecs consécutifs)")
+                self.probing = True
+            wait = max(0.0, self.next_send - now)
+            self.next_send = max(now, self.next_send) + policy.min_interval
+            return wait
+
+    def release(self):
+        """Rien à conclure de cet envoi (annulé, erreur côté client)."""
+        with self._lock:
+            self.probing = False
+
+    def postpone(self, seconds: float):
+        with self._lock:
+            self.next_send = max(self.next_send, time.monotonic() + seconds)
+
+    def record(self, ok: bool, policy: RetryPolicy):
+        with self._lock:
+            was_open = self.retry_at is not None
+            self.probing = False
+            if ok:
+                if was_open:
+                    logger.info(f"{self.host} : circuit refermé")
+                self.failures, self.retry_at = 0, None
+                return
+            self.failures += 1
+            if was_open or self.failures >= policy.threshold:
+                if not was_open:
+                    logger.warning(f"{self.host} : circuit ouvert après {self.failures} échecs "
+                                   f"— appels refusés pendant {policy.reset_after:.0f} s")
+                self.retry_at = time.monotonic() + policy.reset_after
+
+
+_circuits: dict[str, Circuit] = {}
+_circuits_lock = threading.Lock()
+
+
+def circuit(host: str) -> Circuit:
+    with _circuits_lock:
+        return _circuits.setdefault(host, Circuit(host))
+
+
+def available(host: str) -> bool:
+    """Faux tant que le circuit de l'hôte refuse les appels."""
+    c = _circuits.get(host)
+    return c is None or c.state != "open"
+
+
+def reset():
+    with _circuits_lock:
+        _circuits.clear()
+
+
+# ── En-têtes ──────────────────────────────────────────────────────────────────
+
+def retry_after(headers) -> float | None:
+    """``Retry-After`` en secondes (entier ou date HTTP), None si absent."""
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def quota_exhausted(headers) -> bool:
+    return any(headers.get(h) == "0" for h in QUOTA_HEADERS)
+
+
+# ── Appel ─────────────────────────────────────────────────────────────────────
+
+def request(send: Callable[[], T], source: str, host: str | None = None,
+         policy: RetryPolicy | None = None) -> T:
+    """
+    Exécute ``send`` avec reprises, cadence et disjoncteur de ``host``
+    (URL de base de la source : les serveurs mock partagent un hôte ;
+    défaut : nom de la source). Retourne la dernière réponse, même en
+    erreur HTTP : le statut reste à traiter par l'appelant.
+    """
+    policy = policy or POLICIES.get(source, RetryPolicy())
+    c = circuit(host or source)
+    for attempt in range(policy.attempts):
+        last = attempt == policy.attempts - 1
+        try:
+            wait = c.acquire(policy)
+        except CircuitOpenError:
+            metrics.inc("euro_top_circuit_rejections_total", source=source)
+            raise
+        if wait > policy.max_wait:
+            c.release()
+            raise CircuitOpenError(f"{c.host} : prochain envoi permis dans {wait:.0f} s")
+        if wait:
+            with waiting():
+                time.sleep(wait)
+
+        response, error = None, None
+        try:
+            result = send()
+            response = result if hasattr(result, "status_code") else None
+        except TRANSIENT as e:
+            error = e
+        except Exception as e:
+            response = getattr(e, "response", None)
+            if response is None or not hasattr(response, "status_code"):
+                c.release()                # erreur hors transport : rien à conclure
+                raise
+            error = e
+
+        status = response.status_code if response is not None else None
+        headers = response.headers if response is not None else {}
+        c.record(error is None if status is None else status not in policy.trip, policy)
+        if headers.get(MINUTE_HEADER) == "0":
+            c.postpone(retry_after(headers) or 60.0)
+
+        retryable = status in policy.retry if status is not None else error is not None
+        if not retryable or last or quota_exhausted(headers):
+            if error is not None:
+                raise error
+            return result
+
+        delay = retry_after(headers)
+        delay = policy.backoff(attempt) if delay is None else delay
+        if delay > policy.max_wait:
+            if error is not None:
+                raise error
+            return result
+        c.postpone(delay)
+        logger.info(f"{c.host} : {status or type(error).__name__}, nouvelle tentative "
+                    f"dans {delay:.1f} s ({attempt + 2}/{policy.attempts})")
+        metrics.inc("euro_top_retries_total", source=source)
+        if call := current():
+            call.retries += 1
+    raise AssertionError("inaccessible")
@@ -0,0 +1,197 @@
+"""
+Ordonnanceur de jobs en processus (threads) — base du démon de collecte.
+
+    Job        : nom, source, fonction, règle de déclenchement ``due``
+    Scheduler  : boucle principale ; lance chaque job dû dans un thread
+
+Protection contre les chevauchements :
+    - un job ne repart pas tant que son exécution précédente tourne
+    - une source (api_football, understat, odds…) n'exécute qu'un job à la fois
+
+Arrêt propre : ``stop()`` (SIGINT / SIGTERM dans le démon) n'ordonnance plus
+rien, attend la fin des jobs en cours — qui peuvent consulter ``stopping``
+pour s'interrompre entre deux ligues — puis écrit l'état final.
+
+L'état (file d'attente, prochain passage, durée et statut du dernier run)
+est écrit atomiquement dans un fichier JSON lu par ``euro-top daemon status``.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+TICK = 5.0   # Secondes entre deux examens de la file
+
+
+# ── Règles de déclenchement ───────────────────────────────────────────────────
+# Une règle reçoit (maintenant, dernier démarrage ou None) et retourne
+# la prochaine échéance (datetime) ; le job est dû quand elle est passée.
+
+def daily_at(hour: int, minute: int = 0) -> Callable[[datetime, datetime | None], datetime]:
+    """Une fois par jour à heure fixe (rattrapage immédiat au premier démarrage)."""
+    def rule(now: datetime, last: datetime | None) -> datetime:
+        slot = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if slot > now:
+            slot -= timedelta(days=1)
+        return slot if last is None or last < slot else slot + timedelta(days=1)
+    return rule
+
+
+def every(seconds: float) -> Callable[[datetime, datetime | None], datetime]:
+    def rule(now: datetime, last: datetime | None) -> datetime:
+        return now if last is None else last + timedelta(seconds=seconds)
+    return rule
+
+
+# ── Jobs ──────────────────────────────────────────────────────────────────────
+
+@dataclass
+class Job:
+    name: str
+    source: str
+    func: Callable[["Scheduler"], str | None]    # retourne un résumé (optionnel)
+    rule: Callable[[datetime, datetime | None], datetime]
+    # Condition métier en plus de l'échéance, reçoit (maintenant, dernier run réussi)
+    when: Callable[[datetime, datetime | None], bool] | None = None
+    running: bool = False
+    runs: int = 0
+    last_start: datetime | None = None
+    last_ok: datetime | None = None         # Début du dernier run réussi
+    last_duration: float | None = None
+    last_status: str | None = None          # ok | error | skipped
+    last_result: str | None = None
+    next_run: datetime | None = None
+
+    def due(self, now: datetime) -> bool:
+        self.next_run = self.rule(now, self.last_start)
+        if self.running or self.next_run > now:
+            return False
+        if self.when and not self.when(now, self.last_ok):
+            # Rien à faire : on repousse d'une échéance sans compter de run
+            self.last_start, self.last_status = now, "skipped"
+            self.next_run = self.rule(now, now)
+            return False
+        return True
+
+    def to_dict(self) -> dict:
+        iso = (lambda d: d.isoformat(timespec="seconds") if d else None)
+        return {
+            "name": self.name, "source": self.source, "running": self.running,
+            "runs": self.runs, "last_start": iso(self.last_start),
+            "last_ok": iso(self.last_ok),
+            "last_duration": None if self.last_duration is None else round(self.last_duration, 2),
+            "last_status": self.last_status, "last_result": self.last_result,
+            "next_run": iso(self.next_run),
+        }
+
+
+class Scheduler:
+    def __init__(self, jobs: list[Job], state_path: Path, tick: float = TICK):
+        self.jobs = jobs
+        self.state_path = state_path
+        self.tick = tick
+        self.started_at = datetime.now()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._busy_sources: set[str] = set()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, len({j.source for j in jobs})), thread_name_prefix="job")
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def stop(self, *_):
+        if not self._stop.is_set():
+            logger.info("Arrêt demandé — fin des jobs en cours…")
+        self._stop.set()
+
+    def _run(self, job: Job):
+        start = time.perf_counter()
+        try:
+            result = job.func(self)
+            status = "ok"
+        except Exception as e:
+            logger.exception(f"Job {job.name} en erreur")
+            result, status = f"{type(e).__name__}: {e}", "error"
+        with self._lock:
+            job.running = False
+            job.runs += 1
+            job.last_duration = time.perf_counter() - start
+            job.last_status, job.last_result = status, result
+            if status == "ok":
+                job.last_ok = job.last_start
+            self._busy_sources.discard(job.source)
+        logger.info(f"Job {job.name} → {status} en {job.last_duration:.1f} s"
+                    + (f" ({result})" if result else ""))
+        self.write_state()
+
+    def run_pending(self, now: datetime | None = None) -> list[str]:
+        """Lance les jobs dus dont la source est libre ; retourne leurs noms."""
+        now = now or datetime.now()
+        launched = []
+        with self._lock:
+            # Le job lancé il y a le plus longtemps passe en premier (pas de famine
+            # entre deux jobs d'une même source)
+            for job in sorted(self.jobs, key=lambda j: j.last_start or datetime.min):
+                if self.stopping or job.source in self._busy_sources or not job.due(now):
+                    continue
+                job.running, job.last_start = True, now
+                self._busy_sources.add(job.source)
+                launched.append(job.name)
+                self._pool.submit(self._run, job)
+        if launched:
+            logger.info(f"Lancés : {', '.join(launched)}")
+        self.write_state()
+        return launched
+
+    def run_forever(self):
+        logger.info(f"Démon démarré (pid {os.getpid()}) — {len(self.jobs)} jobs")
+        while not self.stopping:
+            self.run_pending()
+            self._stop.wait(self.tick)
+        self._pool.shutdown(wait=True)
+        self.write_state(stopped=True)
+        logger.info("Démon arrêté.")
+
+    def write_state(self, stopped: bool = False):
+        with self._lock:
+            state = {
+                "pid": None if stopped else os.getpid(),
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "updated_at": datetime.now().isoformat(timespec="seconds"),
+                "stopped": stopped,
+                "jobs": [j.to_dict() for j in self.jobs],
+            }
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.state_path)
+
+
+def read_state(state_path: Path) -> dict | None:
+    """État écrit par le démon ; ``alive`` indique si son processus tourne encore."""
+    try:
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    alive = False
+    if state.get("pid"):
+        try:
+            os.kill(state["pid"], 0)
+            alive = True
+        except ProcessLookupError:
+            alive = False
+        except PermissionError:     # Processus d'un autre utilisateur
+            alive = True
+    state["alive"] = alive
+    return state
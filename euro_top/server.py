@@ -0,0 +1,283 @@
+"""
+Service HTTP de lecture (asyncio, stdlib) — mêmes requêtes que la CLI, en JSON.
+
+Endpoints (GET, paramètres en query string) :
+    /standings   ?league=ligue1&season=2025
+    /scorers     ?league=pl&top=20
+    /assisters   ?league=pl&top=15
+    /xg          ?league=laliga&last=10      (xG par match)
+    /xg/teams    ?league=laliga              (xG cumulé par équipe)
+    /distance    ?league=bundesliga&last=10
+    /value-bets                              (dernier data/value_bets.json)
+    /health
+
+``league=all`` = toutes les ligues. Connexions SQLite en lecture seule (pool).
+
+Cache : chaque réponse est gardée en mémoire (octets JSON) avec l'empreinte
+de ses données — (max(fetched_at), nombre de lignes) de la table source sur
+le périmètre demandé, ou mtime du fichier pour /value-bets. L'empreinte est
+revérifiée au plus une fois par ``stamp_ttl`` secondes ; si elle change, la
+réponse est recalculée. ETag et Last-Modified en découlent, donc un GET
+conditionnel (If-None-Match / If-Modified-Since) reçoit 304 sans toucher
+à la base ni re-sérialiser. Clé = route + paramètres qu'elle lit (les autres
+sont ignorés) ; au plus CACHE_SIZE réponses, la moins récemment servie sort.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from sqlalchemy import func, select
+
+from .config import SEASON, resolve_league
+from .db import (
+    Match, Player, Standing, create_readonly_engine,
+    select_distance_by_team, select_recent_matches, select_standings,
+    select_top_players, select_xg_by_team,
+)
+from .export import json_default
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+STAMP_TTL = 1.0          # Secondes entre deux vérifications d'empreinte
+CACHE_SIZE = 256         # Réponses gardées en mémoire (LRU)
+MAX_HEADER_BYTES = 16384
+VALUE_BETS_PATH = Path(__file__).parent.parent / "data" / "value_bets.json"
+
+_REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request",
+            404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# ── Routes ────────────────────────────────────────────────────────────────────
+# Chaque route : (table source pour l'empreinte, paramètres entiers lus → défaut,
+# fabrique de requête Core)
+
+def _int(params: dict, key: str, default: int) -> int:
+    try:
+        return int(params.get(key, default))
+    except ValueError:
+        raise HttpError(400, f"Paramètre '{key}' invalide")
+
+
+def _league_id(params: dict) -> int | None:
+    raw = params.get("league")
+    if not raw:
+        raise HttpError(400, "Paramètre 'league' requis")
+    if raw.lower() == "all":
+        return None
+    league = resolve_league(raw)
+    if not league:
+        raise HttpError(400, f"Ligue inconnue : '{raw}'")
+    return league.id
+
+
+ROUTES = {
+    "/standings": (Standing, {}, lambda lid, season: select_standings(lid, season)),
+    "/scorers":   (Player, {"top": 20}, lambda lid, season, top: select_top_players(
+        lid, season, "goals", top)),
+    "/assisters": (Player, {"top": 15}, lambda lid, season, top: select_top_players(
+        lid, season, "assists", top)),
+    "/xg":        (Match, {"last": 10}, lambda lid, season, last: select_recent_matches(
+        lid, season, last, with_xg=True)),
+    "/xg/teams":  (Match, {}, lambda lid, season: select_xg_by_team(lid, season)),
+    "/distance":  (Match, {"last": 10}, lambda lid, season, last: select_distance_by_team(
+        lid, season, last)),
+}
+
+
+# ── Service ───────────────────────────────────────────────────────────────────
+
+class StatsServer:
+    """Serveur HTTP/1.1 keep-alive minimal ; une instance = un cache."""
+
+    def __init__(self, pool_size: int = 4, stamp_ttl: float = STAMP_TTL,
+                 value_bets_path: Path = VALUE_BETS_PATH, cache_size: int = CACHE_SIZE):
+        self.engine = create_readonly_engine(pool_size)
+        self.stamp_ttl = stamp_ttl
+        self.value_bets_path = value_bets_path
+        self.cache_size = cache_size
+        # clé → (empreinte, vérifiée à, corps, etag, last_modified), ordre LRU
+        self._cache: OrderedDict[tuple, tuple] = OrderedDict()
+        self.stats = {"requests": 0, "hits": 0, "misses": 0, "not_modified": 0}
+
+    # ── Données ──
+
+    def _db_stamp(self, model, league_id: int | None, season: int) -> tuple:
+        conds = [model.season == season]
+        if league_id is not None:
+            conds.append(model.league_id == league_id)
+        with self.engine.connect() as conn:
+            last, count = conn.execute(
+                select(func.max(model.fetched_at), func.count()).where(*conds)
+            ).one()
+        if isinstance(last, str):
+            last = datetime.fromisoformat(last)
+        return (last, count)
+
+    def _db_body(self, stmt) -> bytes:
+        with self.engine.connect() as conn:
+            rows = [dict(r) for r in conn.execute(stmt).mappings()]
+        return json.dumps(rows, default=json_default, ensure_ascii=False).encode()
+
+    def _file_stamp(self) -> tuple:
+        try:
+            mtime = self.value_bets_path.stat().st_mtime
+        except FileNotFoundError:
+            raise HttpError(404, "Aucun export value bets (scripts/value_bets.py --export)")
+        return (datetime.fromtimestamp(mtime, timezone.utc).replace(tzinfo=None), 0)
+
+    async def _resolve(self, path: str, params: dict) -> tuple[bytes, str, datetime | None]:
+        """Corps, ETag et Last-Modified (cache si l'empreinte n'a pas bougé)."""
+        if path == "/value-bets":
+            key = (path,)
+            stamp_fn = self._file_stamp
+            body_fn = self.value_bets_path.read_bytes
+        elif path in ROUTES:
+            model, extra, build = ROUTES[path]
+            league_id = _league_id(params)
+            season = _int(params, "season", SEASON)
+            args = {name: _int(params, name, default) for name, default in extra.items()}
+            stmt = build(league_id, season, **args)
+            key = (path, league_id, season, *args.values())
+            stamp_fn = lambda: self._db_stamp(model, league_id, season)
+            body_fn = lambda: self._db_body(stmt)
+        else:
+            raise HttpError(404, f"Route inconnue : {path}")
+
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached and now - cached[1] < self.stamp_ttl:
+            self._cache.move_to_end(key)
+            self.stats["hits"] += 1
+            return cached[2], cached[3], cached[4]
+
+        stamp = await asyncio.to_thread(stamp_fn)
+        if cached and cached[0] == stamp:
+            self._store(key, (stamp, now, *cached[2:]))
+            self.stats["hits"] += 1
+            return cached[2], cached[3], cached[4]
+
+        body = await asyncio.to_thread(body_fn)
+        etag = '"' + hashlib.sha1(repr((key, stamp)).encode()).hexdigest()[:20] + '"'
+        last_modified = stamp[0].replace(tzinfo=timezone.utc) if stamp[0] else None
+        self._store(key, (stamp, now, body, etag, last_modified))
+        self.stats["misses"] += 1
+        return body, etag, last_modified
+
+    def _store(self, key: tuple, entry: tuple):
+        """Range ``entry`` en tête du LRU ; évince au-delà de ``cache_size``."""
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    # ── HTTP ──
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._send(writer, 400, b'{"error": "En-tetes trop longs"}')
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._send(writer, 400, b'{"error": "Requete invalide"}')
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version == "HTTP/1.1")
+                await self._respond(writer, method, target, headers, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, method: str, target: str, headers: dict,
+                       keep_alive: bool):
+        self.stats["requests"] += 1
+        if method not in ("GET", "HEAD"):
+            return await self._send(writer, 405, b'{"error": "GET uniquement"}', keep_alive)
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if path == "/health":
+            body = json.dumps({"status": "ok", **self.stats}).encode()
+            return await self._send(writer, 200, body, keep_alive)
+        try:
+            body, etag, last_modified = await self._resolve(path, params)
+        except HttpError as e:
+            body = json.dumps({"error": str(e)}, ensure_ascii=False).encode()
+            return await self._send(writer, e.status, body, keep_alive)
+        except Exception:
+            logger.exception(f"Erreur sur {target}")
+            return await self._send(writer, 500, b'{"error": "Erreur interne"}', keep_alive)
+
+        extra = {"ETag": etag, "Cache-Control": "no-cache"}
+        if last_modified:
+            extra["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+        if _not_modified(headers, etag, last_modified):
+            self.stats["not_modified"] += 1
+            return await self._send(writer, 304, b"", keep_alive, extra)
+        await self._send(writer, 200, b"" if method == "HEAD" else body, keep_alive, extra,
+                         length=len(body))
+
+    @staticmethod
+    async def _send(writer, status: int, body: bytes, keep_alive: bool = False,
+                    extra: dict | None = None, length: int | None = None):
+        head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+                "Content-Type: application/json; charset=utf-8",
+                f"Content-Length: {len(body) if length is None else length}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        head += [f"{k}: {v}" for k, v in (extra or {}).items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES)
+        logger.info(f"euro-top serve → http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def _not_modified(headers: dict, etag: str, last_modified: datetime | None) -> bool:
+    """Règles RFC 9110 : If-None-Match prime sur If-Modified-Since."""
+    inm = headers.get("if-none-match")
+    if inm is not None:
+        return inm.strip() == "*" or etag in [t.strip() for t in inm.split(",")]
+    ims = headers.get("if-modified-since")
+    if ims and last_modified:
+        try:
+            return last_modified.replace(microsecond=0) <= parsedate_to_datetime(ims)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def run(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, pool_size: int = 4):
+    asyncio.run(StatsServer(pool_size).serve(host, port))
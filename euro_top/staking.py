@@ -0,0 +1,144 @@
+"""
+Répartition des mises — Kelly fractionnaire sur un ensemble de paris simultanés.
+
+Les paris d'un même match ne sont pas indépendants (1 et X s'excluent,
+over 2.5 et BTTS sont corrélés) : chaque pari est réglé sur tous les scores
+possibles de la matrice de scores (ScoreGrid), qui sert de scénarios.
+Les matchs différents sont supposés indépendants.
+
+Problème résolu (concave) :
+
+    max  Σ_f Σ_s P(s | f) · log(1 + Σ_{b ∈ f} x_b · R_b(s))
+    s.c. x_b ≥ 0,  Σ x_b ≤ cap / fraction
+
+puis mises = fraction × x (donc Σ mises ≤ cap). R_b(s) est le gain net par
+unité misée : cote - 1 si gagné, 0 si remboursé, -1 si perdu (demi-mises
+pour les quarts de ligne). Solveur : gradient projeté avec recherche
+linéaire (Armijo), entièrement vectorisé.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from .pricing import ScoreGrid
+
+DEFAULT_FRACTION = 0.25
+DEFAULT_CAP = 0.20
+
+
+# ── Scénarios ─────────────────────────────────────────────────────────────────
+
+def bet_returns(
+    grid: ScoreGrid,
+    market: list[str],
+    outcome: list[str],
+    point: list[float | None],
+    odds: list[float],
+) -> np.ndarray:
+    """
+    Gain net par unité misée pour chaque pari × score, forme (n_bets, G·G).
+
+    Les scénarios suivent l'ordre de ``grid.matrix[k].ravel()``.
+    """
+    g = grid.size
+    home, away = (a.ravel() for a in np.indices((g, g)))
+    out = np.zeros((len(market), g * g))
+    for b, (mkt, oc, pt, o) in enumerate(zip(market, outcome, point, odds)):
+        if mkt == "h2h":
+            diff = home - away
+            won = {"home": diff > 0, "draw": diff == 0, "away": diff < 0}[oc]
+            out[b] = np.where(won, o - 1, -1.0)
+        elif mkt == "btts":
+            both = (home > 0) & (away > 0)
+            out[b] = np.where(both if oc == "yes" else ~both, o - 1, -1.0)
+        elif mkt == "correct_score":
+            h, _, a = oc.partition("-")
+            out[b] = np.where((home == int(h)) & (away == int(a)), o - 1, -1.0)
+        elif mkt == "totals":
+            out[b] = _asian(home + away, pt, o, over=oc == "over")
+        elif mkt == "spreads":
+            out[b] = _asian(home - away, -pt, o, over=oc == "home")
+    return out
+
+
+def _asian(x: np.ndarray, threshold: float, odds: float, over: bool) -> np.ndarray:
+    """Gain net d'une ligne asiatique (quarts = deux demi-mises)."""
+    quarter = abs((threshold * 4) % 2 - 1) < 1e-9
+    halves = (threshold - 0.25, threshold + 0.25) if quarter else (threshold, threshold)
+    total = np.zeros(len(x))
+    for t in halves:
+        won = x > t if over else x < t
+        push = np.isclose(x, t)
+        total += np.where(won, odds - 1, np.where(push, 0.0, -1.0))
+    return total / 2
+
+
+# ── Optimiseur ────────────────────────────────────────────────────────────────
+
+def kelly_stakes(
+    returns: np.ndarray,
+    probs: np.ndarray,
+    fixture_idx: np.ndarray,
+    fraction: float = DEFAULT_FRACTION,
+    cap: float = DEFAULT_CAP,
+    tol: float = 1e-9,
+    max_iter: int = 500,
+) -> np.ndarray:
+    """
+    Mises Kelly fractionnaires (fraction de bankroll) pour des paris simultanés.
+
+    Args:
+        returns     : (n_bets, S) gain net par unité misée et par scénario
+        probs       : (n_fixtures, S) probabilité de chaque scénario par match
+        fixture_idx : (n_bets,) match de chaque pari (ligne de ``probs``)
+        fraction    : Fraction de Kelly (0.25 = quart de Kelly)
+        cap         : Exposition totale max (fraction de bankroll)
+    """
+    n_bets = returns.shape[0]
+    if n_bets == 0:
+        return np.zeros(0)
+    limit = min(cap / fraction, 0.999)
+    onehot = np.zeros((probs.shape[0], n_bets))
+    onehot[fixture_idx, np.arange(n_bets)] = 1.0
+    p_bet = probs[fixture_idx]
+
+    def wealth(x):
+        return 1.0 + onehot @ (x[:, None] * returns)
+
+    def objective(w):
+        return float((probs * np.log(w)).sum())
+
+    x = np.zeros(n_bets)
+    w = wealth(x)
+    f = objective(w)
+    step = 1.0
+    for _ in range(max_iter):
+        grad = (p_bet * returns / w[fixture_idx]).sum(axis=1)
+        while True:
+            x_new = _project_capped_simplex(x + step * grad, limit)
+            w_new = wealth(x_new)
+            if np.all(w_new > 0):
+                f_new = objective(w_new)
+                if f_new >= f + 1e-4 * grad @ (x_new - x):
+                    break
+            step /= 2
+            if step < 1e-12:
+                return fraction * x
+        moved = np.abs(x_new - x).max()
+        x, w, f = x_new, w_new, f_new
+        if moved < tol:
+            break
+        step *= 2
+    return fraction * x
+
+
+def _project_capped_simplex(v: np.ndarray, limit: float) -> np.ndarray:
+    """Projection euclidienne sur {x ≥ 0, Σx ≤ limit}."""
+    clipped = np.maximum(v, 0.0)
+    if clipped.sum() <= limit:
+        return clipped
+    u = np.sort(v)[::-1]
+    css = np.cumsum(u) - limit
+    rho = np.flatnonzero(u - css / np.arange(1, len(u) + 1) > 0)[-1]
+    theta = css[rho] / (rho + 1)
+    return np.maximum(v - theta, 0.0)
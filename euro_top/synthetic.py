@@ -0,0 +1,250 @@
+"""
+Générateur de données synthétiques déterministe — ligues, saisons, calendriers,
+xG, joueurs et cotes, au format des collecteurs (lignes prêtes pour upsert_*).
+
+    data = generate(seasons=10, leagues=8, seed=42)     # benchmarks, serveurs mock
+    data["matches"], data["standings"], data["players"], data["odds_events"]
+
+Modèle :
+    - chaque équipe a une force offensive / défensive (log-normale), qui
+      dérive légèrement d'une saison à l'autre
+    - xG d'un match = exp(attaque − défense adverse) × base, avantage domicile
+    - buts ~ Poisson(xG) ; distance parcourue ~ U(104, 118) km
+    - championnats : aller-retour à 20 équipes (38 journées) ;
+      coupes d'Europe : phase de ligue à 36 équipes (8 journées), clubs tirés
+      des championnats (mêmes noms → pool Elo « europe » réaliste)
+    - dernière saison : les LAST_ROUNDS_NS dernières journées ne sont pas
+      jouées (status NS) et reçoivent des cotes The Odds API (h2h + totals,
+      marge 4–8 %, 6 bookmakers)
+    - classements recalculés à partir des matchs joués ; joueurs : buts et
+      passes répartis (Dirichlet) entre PLAYERS_PER_TEAM joueurs par équipe
+
+Même graine + mêmes paramètres → mêmes données, à l'octet près.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from math import exp, factorial
+
+import numpy as np
+
+from .config import SEASON, all_leagues
+
+DOMESTIC_TEAMS = 20
+EUROPE_TEAMS = 36
+EUROPE_ROUNDS = 8
+PLAYERS_PER_TEAM = 25
+LAST_ROUNDS_NS = 2
+BASE_XG = 1.35
+HOME_ADVANTAGE = 0.12
+BOOKMAKERS = ("pinnacle", "betclic", "winamax", "unibet_eu", "bet365", "bwin")
+
+_PREFIX = ("Ar", "Bel", "Cor", "Dun", "El", "Fal", "Gar", "Hol", "Is", "Jor",
+           "Kel", "Lor", "Mar", "Nor", "Ol", "Par", "Quen", "Ros", "Sal", "Tor")
+_SUFFIX = ("ville", "mont", "burg", "ford", "chester", "berg", "dorf", "ano",
+           "ona", "haven", "stad", "court")
+_KIND = ("FC", "United", "Athletic", "SC", "City", "Sporting")
+
+
+def team_names(league_index: int, n: int = DOMESTIC_TEAMS) -> list[str]:
+    """Noms uniques (premier mot distinct) pour la ligue n° ``league_index``."""
+    names = []
+    for k in range(league_index * n, (league_index + 1) * n):
+        prefix, suffix = _PREFIX[k % len(_PREFIX)], _SUFFIX[(k // len(_PREFIX)) % len(_SUFFIX)]
+        names.append(f"{prefix}{suffix} {_KIND[k % len(_KIND)]}")
+    return names
+
+
+def _round_robin(teams: list[int]) -> list[list[tuple[int, int]]]:
+    """Aller-retour (méthode du cercle) : 2·(n−1) journées de n/2 matchs."""
+    n = len(teams)
+    rot = list(teams)
+    first = []
+    for r in range(n - 1):
+        pairs = [(rot[i], rot[n - 1 - i]) for i in range(n // 2)]
+        first.append([(a, b) if r % 2 == 0 else (b, a) for a, b in pairs])
+        rot = [rot[0], rot[-1], *rot[1:-1]]
+    return first + [[(b, a) for a, b in day] for day in first]
+
+
+def _poisson_1x2(lam_h: float, lam_a: float, max_goals: int = 10) -> tuple[float, float, float, float]:
+    """(P domicile, P nul, P extérieur, P plus de 2,5 buts)."""
+    ph = [exp(-lam_h) * lam_h ** k / factorial(k) for k in range(max_goals + 1)]
+    pa = [exp(-lam_a) * lam_a ** k / factorial(k) for k in range(max_goals + 1)]
+    home = draw = away = under = 0.0
+    for i, p_i in enumerate(ph):
+        for j, p_j in enumerate(pa):
+            p = p_i * p_j
+            if i > j:
+                home += p
+            elif i == j:
+                draw += p
+            else:
+                away += p
+            if i + j <= 2:
+                under += p
+    total = home + draw + away
+    return home / total, draw / total, away / total, 1 - under / total
+
+
+def _odds_event(rng: np.random.Generator, event_id: str, sport_key: str, kickoff: datetime,
+                home: str, away: str, lam_h: float, lam_a: float) -> dict:
+    p_home, p_draw, p_away, p_over = _poisson_1x2(lam_h, lam_a)
+    books = []
+    for key in BOOKMAKERS:
+        margin = 1 + rng.uniform(0.04, 0.08)
+        noise = rng.normal(1.0, 0.03, 5)
+        price = lambda p, k: round(max(1.01, 1 / (p * margin * noise[k])), 2)
+        books.append({
+            "key": key, "title": key.replace("_", " ").title(),
+            "markets": [
+                {"key": "h2h", "outcomes": [
+                    {"name": home, "price": price(p_home, 0)},
+                    {"name": away, "price": price(p_away, 1)},
+                    {"name": "Draw", "price": price(p_draw, 2)},
+                ]},
+                {"key": "totals", "outcomes": [
+                    {"name": "Over", "price": price(p_over, 3), "point": 2.5},
+                    {"name": "Under", "price": price(1 - p_over, 4), "point": 2.5},
+                ]},
+            ],
+        })
+    return {
+        "id": event_id, "sport_key": sport_key,
+        "commence_time": kickoff.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "home_team": home, "away_team": away, "bookmakers": books,
+    }
+
+
+def _standings(league_id: int, season: int, names: list[str], played: list[dict]) -> list[dict]:
+    table = {t: {"played": 0, "won": 0, "drawn": 0, "lost": 0, "goals_for": 0,
+                 "goals_against": 0, "form": ""} for t in names}
+    for m in played:
+        for team, gf, ga in ((m["home_team"], m["home_goals"], m["away_goals"]),
+                             (m["away_team"], m["away_goals"], m["home_goals"])):
+            row = table[team]
+            row["played"] += 1
+            row["goals_for"] += gf
+            row["goals_against"] += ga
+            result = "W" if gf > ga else "D" if gf == ga else "L"
+            row[{"W": "won", "D": "drawn", "L": "lost"}[result]] += 1
+            row["form"] = (row["form"] + result)[-5:]
+    ranked = sorted(table.items(), key=lambda kv: (
+        -(3 * kv[1]["won"] + kv[1]["drawn"]),
+        -(kv[1]["goals_for"] - kv[1]["goals_against"]), -kv[1]["goals_for"], kv[0]))
+    return [{
+        "league_id": league_id, "season": season, "rank": rank, "team": team,
+        "team_short": team[:20], **row,
+        "goal_diff": row["goals_for"] - row["goals_against"],
+        "points": 3 * row["won"] + row["drawn"],
+    } for rank, (team, row) in enumerate(ranked, 1)]
+
+
+def _players(rng: np.random.Generator, league_id: int, season: int, names: list[str],
+             played: list[dict], team_base: dict[str, int]) -> list[dict]:
+    goals = dict.fromkeys(names, 0)
+    games = dict.fromkeys(names, 0)
+    for m in played:
+        goals[m["home_team"]] += m["home_goals"]
+        goals[m["away_team"]] += m["away_goals"]
+        games[m["home_team"]] += 1
+        games[m["away_team"]] += 1
+    rows = []
+    for team in names:
+        shares = rng.dirichlet(np.linspace(3.0, 0.2, PLAYERS_PER_TEAM))
+        g = rng.multinomial(goals[team], shares)
+        a = rng.multinomial(int(goals[team] * 0.7), rng.permutation(shares))
+        for k in range(PLAYERS_PER_TEAM):
+            mp = int(rng.integers(0, games[team] + 1))
+            rows.append({
+                "api_id": team_base[team] + k, "league_id": league_id, "season": season,
+                "name": f"{team.split()[0][:3].upper()} Player {k:02d}", "team": team,
+                "goals": int(g[k]), "assists": int(a[k]), "matches_played": mp,
+                "minutes": mp * int(rng.integers(45, 91)), "penalties": int(rng.integers(0, 3)),
+                "xg": round(float(g[k] * rng.uniform(0.7, 1.3)), 2),
+                "xa": round(float(a[k] * rng.uniform(0.7, 1.3)), 2),
+            })
+    return rows
+
+
+def generate(seasons: int = 1, leagues: int = 8, seed: int = 42,
+             last_season: int = SEASON) -> dict[str, list[dict]]:
+    """
+    ``seasons`` saisons (jusqu'à ``last_season`` incluse) × les ``leagues``
+    premières ligues de config.LEAGUES (championnats d'abord).
+
+    Retourne {matches, standings, players, odds_events}.
+    """
+    from .collectors.odds import ODDS_SPORT_KEYS
+
+    rng = np.random.default_rng(seed)
+    selected = all_leagues()[:leagues]
+    domestic = [lg for lg in selected if lg.understat_slug]
+    european = [lg for lg in selected if not lg.understat_slug]
+    names = {lg.id: team_names(i) for i, lg in enumerate(domestic)}
+    club_pool = [t for lg in domestic for t in names[lg.id]] or team_names(0, EUROPE_TEAMS)
+    all_teams = sorted(set(club_pool))
+    attack = dict(zip(all_teams, rng.normal(0, 0.25, len(all_teams))))
+    defense = dict(zip(all_teams, rng.normal(0, 0.2, len(all_teams))))
+    team_base = {t: 100000 + 100 * i for i, t in enumerate(all_teams)}
+
+    out: dict[str, list[dict]] = {"matches": [], "standings": [], "players": [], "odds_events": []}
+    first = last_season - seasons + 1
+    for season in range(first, last_season + 1):
+        for t in all_teams:    # Dérive d'une saison à l'autre
+            attack[t] += float(rng.normal(0, 0.05))
+            defense[t] += float(rng.normal(0, 0.04))
+
+        for lg in selected:
+            if lg.understat_slug:
+                teams = names[lg.id]
+                rounds = [[(teams[h], teams[a]) for h, a in day]
+                          for day in _round_robin(list(range(len(teams))))]
+                start = date(season, 8, 10)
+            else:
+                picked = rng.choice(len(club_pool), size=min(EUROPE_TEAMS, len(club_pool)),
+                                    replace=False)
+                teams = [club_pool[i] for i in sorted(picked)]
+                rounds = []
+                for _ in range(EUROPE_ROUNDS):
+                    order = rng.permutation(len(teams))
+                    rounds.append([(teams[order[i]], teams[order[i + 1]])
+                                   for i in range(0, len(order) - 1, 2)])
+                start = date(season, 9, 16)
+
+            played = []
+            for r, day in enumerate(rounds):
+                match_date = start + timedelta(days=7 * r + (0 if lg.understat_slug else 2))
+                upcoming = season == last_season and r >= len(rounds) - LAST_ROUNDS_NS
+                for k, (home, away) in enumerate(day):
+                    lam_h = BASE_XG * exp(attack[home] - defense[away] + HOME_ADVANTAGE)
+                    lam_a = BASE_XG * exp(attack[away] - defense[home])
+                    match_id = int(lg.id * 10_000_000 + (season % 100) * 100_000 + r * 100 + k)
+                    row = {
+                        "id": match_id, "league_id": lg.id, "league_name": lg.name,
+                        "season": season, "match_date": match_date,
+                        "home_team": home, "away_team": away,
+                        "home_goals": None, "away_goals": None, "status": "NS",
+                        "home_xg": None, "away_xg": None, "home_km": None, "away_km": None,
+                    }
+                    if upcoming:
+                        sport_key = ODDS_SPORT_KEYS.get(lg.short, lg.short)
+                        kickoff = datetime(match_date.year, match_date.month, match_date.day,
+                                           18 + k % 4, tzinfo=timezone.utc)
+                        out["odds_events"].append(_odds_event(
+                            rng, f"{match_id:x}", sport_key, kickoff, home, away, lam_h, lam_a))
+                    else:
+                        hxg, axg = rng.gamma(4.0, lam_h / 4.0), rng.gamma(4.0, lam_a / 4.0)
+                        row.update({
+                            "status": "FT",
+                            "home_goals": int(rng.poisson(hxg)), "away_goals": int(rng.poisson(axg)),
+                            "home_xg": round(float(hxg), 2), "away_xg": round(float(axg), 2),
+                            "home_km": round(float(rng.uniform(104, 118)), 1),
+                            "away_km": round(float(rng.uniform(104, 118)), 1),
+                        })
+                        played.append(row)
+                    out["matches"].append(row)
+
+            out["standings"] += _standings(lg.id, season, teams, played)
+            out["players"] += _players(rng, lg.id, season, teams, played, team_base)
+    return out
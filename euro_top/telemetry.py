@@ -0,0 +1,274 @@
+"""
+Instrumentation des requêtes sortantes — toutes sources (API-Football,
+The Odds API, Sofascore, Understat), persistée par lots dans ``api_calls``.
+
+    with track("odds", "/sports/{sport}/odds", league_id=61) as call:
+        r = session.get(url)
+        call.done(r)                 # statut, octets, cache
+        with parsing():
+            data = r.json()          # temps de parsing JSON
+    ...
+    with parsing():                  # plus tard, même contexte :
+        rows = [...]                 # s'ajoute au dernier appel
+
+Mesures par appel : durée de la requête (hors parsing et hors attentes de
+cadence / backoff de ``resilience``, voir ``waiting``), résolution DNS et
+connexion TCP (0 sur une connexion réutilisée), octets de réponse, nombre
+de tentatives, réponse servie par un cache, temps de parsing JSON → lignes,
+erreur.
+
+DNS / connexion : ``socket.getaddrinfo`` et ``socket.socket.connect`` sont
+enveloppés au premier ``track`` — couvre httpx, requests et understatapi
+sans toucher aux clients ; hors d'un ``track``, coût nul (une lecture de
+ContextVar). L'appel courant vit dans une ContextVar : threads du démon
+indépendants.
+
+Chaque appel alimente aussi les compteurs de ``metrics`` (requêtes par
+source et statut, durée).
+
+Écriture : tampon mémoire vidé par ``flush()`` (fin de collecte, fin de job
+du démon), dès FLUSH_EVERY appels en tampon, et à la sortie du processus.
+Un appel reste ouvert (parsing possible) jusqu'au ``track`` suivant ou au
+``flush()`` du même contexte ; seuls les appels fermés sont écrits.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+FLUSH_EVERY = 50
+SOURCES = ("api_football", "odds", "sofascore", "understat")
+
+
+@dataclass
+class CallRecord:
+    source: str
+    endpoint: str
+    league_id: int | None = None
+    season: int | None = None
+    called_at: datetime = field(default_factory=datetime.utcnow)
+    status: int | None = None
+    duration_ms: float | None = None
+    dns_ms: float = 0.0
+    connect_ms: float = 0.0
+    bytes: int | None = None
+    retries: int = 0
+    cache_hit: bool = False
+    parse_ms: float = 0.0
+    error: str | None = None
+    wait_ms: float = field(default=0.0, repr=False)   # Déduit de duration_ms, non persisté
+    closed: bool = field(default=False, repr=False)
+
+    def done(self, response) -> None:
+        """Relève statut, taille et cache d'une réponse httpx / requests."""
+        self.status = response.status_code
+        content = getattr(response, "content", None)
+        self.bytes = len(content) if content is not None else None
+        self.cache_hit = response.status_code == 304 or bool(getattr(response, "from_cache", False))
+
+
+_current: ContextVar[CallRecord | None] = ContextVar("telemetry_call", default=None)
+_buffer: list[CallRecord] = []
+_lock = threading.Lock()
+_installed = False
+
+
+# ── Sondes socket ─────────────────────────────────────────────────────────────
+
+def _install_socket_probes() -> None:
+    global _installed
+    with _lock:
+        if _installed:
+            return
+        getaddrinfo, connect = socket.getaddrinfo, socket.socket.connect
+
+        def timed_getaddrinfo(*args, **kwargs):
+            call = _current.get()
+            if call is None or call.closed:
+                return getaddrinfo(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return getaddrinfo(*args, **kwargs)
+            finally:
+                call.dns_ms += (time.perf_counter() - t0) * 1000
+
+        def timed_connect(sock, address):
+            call = _current.get()
+            if call is None or call.closed:
+                return connect(sock, address)
+            t0 = time.perf_counter()
+            try:
+                return connect(sock, address)
+            finally:
+                call.connect_ms += (time.perf_counter() - t0) * 1000
+
+        socket.getaddrinfo = timed_getaddrinfo
+        socket.socket.connect = timed_connect
+        _installed = True
+        atexit.register(lambda: _write(_take(closed_only=False)))
+
+
+# ── API ───────────────────────────────────────────────────────────────────────
+
+@contextmanager
+def track(source: str, endpoint: str, league_id: int | None = None,
+          season: int | None = None) -> Iterator[CallRecord]:
+    """Chronomètre un appel sortant ; ``endpoint`` = gabarit sans identifiants."""
+    _install_socket_probes()
+    previous = _current.get()
+    if previous is not None:
+        previous.closed = True
+    call = CallRecord(source, endpoint, league_id, season)
+    _current.set(call)
+    with _lock:
+        _buffer.append(call)
+    t0 = time.perf_counter()
+    try:
+        yield call
+    except BaseException as e:
+        call.error = type(e).__name__
+        raise
+    finally:
+        call.duration_ms = (time.perf_counter() - t0) * 1000 - call.parse_ms - call.wait_ms
+        metrics.request(source, call.status, call.duration_ms / 1000)
+        if len(_buffer) >= FLUSH_EVERY:
+            _write(_take())
+
+
+@contextmanager
+def parsing() -> Iterator[None]:
+    """Ajoute le temps du bloc au parsing du dernier appel de ce contexte."""
+    call = _current.get()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        if call is not None and not call.closed:
+            call.parse_ms += (time.perf_counter() - t0) * 1000
+
+
+@contextmanager
+def waiting() -> Iterator[None]:
+    """Temps du bloc (attente volontaire avant envoi) exclu de la durée de l'appel en cours."""
+    call = current()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        if call is not None:
+            call.wait_ms += (time.perf_counter() - t0) * 1000
+
+
+def current() -> CallRecord | None:
+    """Appel en cours dans ce contexte (None hors ``track``)."""
+    call = _current.get()
+    return None if call is None or call.closed else call
+
+
+def pending(source: str | None = None) -> int:
+    """Appels terminés pas encore écrits (quota : compter aussi le tampon)."""
+    with _lock:
+        return sum(1 for c in _buffer if c.status is not None
+                   and (source is None or c.source == source))
+
+
+def flush() -> int:
+    """Ferme l'appel de ce contexte et écrit les appels fermés ; retourne le nombre de lignes."""
+    call = _current.get()
+    if call is not None:
+        call.closed = True
+    return _write(_take())
+
+
+def _take(closed_only: bool = True) -> list[CallRecord]:
+    with _lock:
+        batch = [c for c in _buffer if c.closed or not closed_only]
+        _buffer[:] = [c for c in _buffer if not (c.closed or not closed_only)]
+    return batch
+
+
+def _write(batch: list[CallRecord]) -> int:
+    """Insère un lot dans api_calls en une transaction."""
+    if not batch:
+        return 0
+    from sqlalchemy import insert
+    from .db import ApiCallLog, get_engine
+    rows = []
+    for c in batch:
+        row = asdict(c)
+        row.pop("closed")
+        row.pop("wait_ms")
+        for key in ("duration_ms", "dns_ms", "connect_ms", "parse_ms"):
+            if row[key] is not None:
+                row[key] = round(row[key], 3)
+        rows.append(row)
+    try:
+        with get_engine().begin() as conn:
+            conn.execute(insert(ApiCallLog), rows)
+    except Exception as e:
+        logger.warning(f"Télémétrie : {len(rows)} appel(s) non enregistré(s) ({e})")
+        return 0
+    return len(rows)
+
+
+# ── Lecture ───────────────────────────────────────────────────────────────────
+
+def _quantile(values: list[float], q: float) -> float:
+    """Quantile par interpolation linéaire (valeurs triées)."""
+    if len(values) == 1:
+        return values[0]
+    pos = (len(values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+def perf_summary(session, since: timedelta, source: str | None = None) -> list[dict]:
+    """
+    Latences par (source, endpoint) sur la fenêtre ``since`` :
+    {source, endpoint, calls, errors, p50, p90, p99, max (ms), dns, connect,
+     parse (ms, moyennes), kb (moyenne), cache_hits, retries}.
+    Les requêtes API-Football historiques (endpoint?query) sont regroupées.
+    """
+    from sqlalchemy import select
+    from .db import ApiCallLog as C
+    stmt = select(C.source, C.endpoint, C.status, C.duration_ms, C.dns_ms, C.connect_ms,
+                  C.parse_ms, C.bytes, C.cache_hit, C.retries, C.error
+                  ).where(C.called_at >= datetime.utcnow() - since)
+    if source:
+        stmt = stmt.where(C.source == source)
+    groups: dict[tuple[str, str], list] = {}
+    for r in session.execute(stmt):
+        key = (r.source or "api_football", (r.endpoint or "?").split("?")[0])
+        groups.setdefault(key, []).append(r)
+
+    out = []
+    for (src, endpoint), rows in sorted(groups.items()):
+        times = sorted(r.duration_ms for r in rows if r.duration_ms is not None)
+        mean = lambda attr: (sum(getattr(r, attr) or 0 for r in rows) / len(rows))
+        sized = [r.bytes for r in rows if r.bytes is not None]
+        out.append({
+            "source": src, "endpoint": endpoint, "calls": len(rows),
+            "errors": sum(1 for r in rows if r.error or (r.status or 0) >= 400),
+            **{name: round(_quantile(times, q), 1) if times else None
+               for name, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))},
+            "max": round(times[-1], 1) if times else None,
+            "dns": round(mean("dns_ms"), 1), "connect": round(mean("connect_ms"), 1),
+            "parse": round(mean("parse_ms"), 1),
+            "kb": round(sum(sized) / len(sized) / 1024, 1) if sized else None,
+            "cache_hits": sum(1 for r in rows if r.cache_hit),
+            "retries": sum(r.retries or 0 for r in rows),
+        })
+    return out
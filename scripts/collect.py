@@ -7,7 +7,9 @@ import argparse
 from euro_top.db import init_db, get_session, count_api_calls_today
 from euro_top.config import all_leagues, domestic_leagues, SEASON
 from euro_top.collectors.api_football import ApiFootballClient, RateLimitError
-from euro_top.collectors.understat import scrape_league_xg
+from euro_top.collectors.understat import scrape_league_xg, load_player_xg
+from euro_top import metrics
+from euro_top.telemetry import flush
 
 logging.basicConfig(
     level=logging.INFO,
@@ -22,6 +24,8 @@ def main():
     parser.add_argument("--league", default="all", help="Ligue ou 'all'")
     parser.add_argument("--season", type=int, default=SEASON)
     parser.add_argument("--xg", action="store_true", help="Collecte xG via Understat")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore la fraîcheur : appelle tous les endpoints")
     args = parser.parse_args()
 
     init_db()
@@ -40,30 +44,41 @@ def main():
             sys.exit(1)
         leagues = [lg]
 
-    client = ApiFootballClient(db)
+    client = ApiFootballClient(db, force=args.force)
 
     for lg in leagues:
         logger.info(f"=== {lg.flag} {lg.name} ===")
         try:
-            client.fetch_standings(lg.id, args.season)
-            client.fetch_fixtures(lg.id, args.season)
-            client.fetch_top_scorers(lg.id, args.season)
-            client.fetch_top_assisters(lg.id, args.season)
+            with metrics.stage("fixtures", lg.short):
+                client.fetch_fixtures(lg.id, args.season)
+            with metrics.stage("standings", lg.short):
+                client.fetch_standings(lg.id, args.season)
+            with metrics.stage("topscorers", lg.short):
+                client.fetch_top_scorers(lg.id, args.season)
+            with metrics.stage("topassists", lg.short):
+                client.fetch_top_assisters(lg.id, args.season)
 
             if args.xg and lg.understat_slug:
-                scrape_league_xg(lg.understat_slug, lg.id, args.season, db)
+                with metrics.stage("understat", lg.short):
+                    load_player_xg(lg.understat_slug, lg.id, args.season, db)
+                    scrape_league_xg(lg.understat_slug, lg.id, args.season, db)
 
         except RateLimitError as e:
+            metrics.failure(lg.short, e)
             logger.error(f"Quota atteint : {e}")
             break
         except Exception as e:
+            metrics.failure(lg.short, e)
             logger.error(f"Erreur [{lg.name}]: {e}")
             continue
 
     client.close()
     db.close()
-    logger.info("Collecte terminée.")
+    flush()
+    logger.info(f"Collecte terminée ({client.skipped} requête(s) évitée(s), données à jour).")
 
 
 if __name__ == "__main__":
-    main()
+    from euro_top.profiling import from_env
+    with from_env(), metrics.run("collect"):
+        main()
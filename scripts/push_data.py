@@ -11,6 +11,16 @@ Sortie par ligue :
   data/<league>_latest.json   dernière journée avec xG
   data/<league>_latest.csv    même dataset au format tabulaire
 
+Export incrémental : l'empreinte (sha256) du jeu de lignes canonique de
+chaque ligue est comparée à celle du dernier export (meta.rows_sha256) ;
+une ligue inchangée n'est ni réécrite ni ajoutée à git, sauf si son export
+n'a jamais été committé (git status). Les fichiers sont
+écrits atomiquement (fichier temporaire + rename) et toutes les ligues
+modifiées partent dans un seul commit. Rien à committer → aucune commande git.
+
+Durées par ligue (collecte / empreinte / écriture) affichées en fin de run,
+et ajoutées en ndjson à --timings si demandé.
+
 Le script commit + push automatiquement sur origin/master.
 """
 import sys, os
@@ -18,6 +28,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import argparse
 import csv
+import hashlib
+import io
 import json
 import logging
 import subprocess
@@ -113,6 +125,9 @@ def collect_european(league_key: str) -> list[dict]:
 
     try:
         fixtures = client.fetch_fixtures(league.id, season=2024, last=10)
+        if not fixtures and client.skipped:     # Déjà à jour : derniers matchs en base
+            from euro_top.db import iter_rows, select_recent_matches
+            fixtures = [dict(r) for r in iter_rows(db, select_recent_matches(league.id, 2024, 10))]
     except RateLimitError as e:
         logger.error(f"  Quota API atteint : {e}")
         return []
@@ -157,10 +172,36 @@ def collect_european(league_key: str) -> list[dict]:
 
 # ── Export ────────────────────────────────────────────────────────────────────
 
-def export(league_key: str, rows: list[dict]):
-    """Exporte JSON + CSV pour une ligue."""
+def rows_hash(rows: list[dict]) -> str:
+    """Empreinte du jeu de lignes (forme canonique : clés triées, JSON compact)."""
+    canonical = json.dumps(rows, sort_keys=True, separators=(",", ":"),
+                           ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def previous_hash(league_key: str) -> str | None:
+    """Empreinte du dernier export (recalculée pour les fichiers d'avant meta.rows_sha256)."""
+    path = DATA_DIR / f"{league_key}_latest.json"
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return payload.get("meta", {}).get("rows_sha256") or rows_hash(payload.get("matches", []))
+
+
+def _write_atomic(path: Path, text: str):
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def export(league_key: str, rows: list[dict], digest: str) -> list[Path]:
+    """Exporte JSON + CSV pour une ligue ; retourne les fichiers écrits."""
     if not rows:
-        return
+        return []
 
     from euro_top.config import resolve_league
     league = resolve_league(league_key)
@@ -173,6 +214,7 @@ def export(league_key: str, rows: list[dict]):
             "matches":      len(rows),
             "source_xg":    rows[0].get("source_xg", "understat"),
             "generated_at": datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "rows_sha256":  digest,
         },
         "matches": rows,
     }
@@ -180,34 +222,76 @@ def export(league_key: str, rows: list[dict]):
     json_path = DATA_DIR / f"{league_key}_latest.json"
     csv_path  = DATA_DIR / f"{league_key}_latest.csv"
 
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2, ensure_ascii=False)
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=rows[0].keys())
+    writer.writeheader()
+    writer.writerows(rows)
 
-    with open(csv_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
-        writer.writeheader()
-        writer.writerows(rows)
+    _write_atomic(json_path, json.dumps(payload, indent=2, ensure_ascii=False))
+    _write_atomic(csv_path, buf.getvalue())
 
     logger.info(f"  {flag} Exporté → {json_path.name} + {csv_path.name}")
+    return [json_path, csv_path]
+
+
+def uncommitted_exports(league_key: str) -> list[Path]:
+    """Fichiers d'export de la ligue modifiés ou non suivis par rapport à HEAD."""
+    paths = [DATA_DIR / f"{league_key}_latest.{ext}" for ext in ("json", "csv")]
+    result = subprocess.run(
+        ["git", "-C", str(REPO_DIR), "status", "--porcelain", "--",
+         *(str(p) for p in paths if p.exists())],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0 or not result.stdout.strip():
+        return []
+    return [p for p in paths if p.exists()]
+
+
+def _export_if_changed(key: str, rows: list[dict], t: dict,
+                       changed: list[str], written: list[Path]) -> str:
+    """
+    Compare l'empreinte au dernier export ; n'écrit que si elle a changé.
+    Un export inchangé mais jamais committé (--no-push, commit ou push
+    échoué) repart avec les ligues modifiées.
+    """
+    start = time.perf_counter()
+    digest = rows_hash(rows)
+    unchanged = digest == previous_hash(key)
+    t["hash"] = time.perf_counter() - start
+    if unchanged:
+        pending = uncommitted_exports(key)
+        if pending:
+            logger.info(f"  {key} inchangé mais non committé — ajouté au commit")
+            written += pending
+            changed.append(key)
+            return "pending"
+        logger.info(f"  {key} inchangé — export ignoré")
+        return "unchanged"
+
+    start = time.perf_counter()
+    written += export(key, rows, digest)
+    t["write"] = time.perf_counter() - start
+    changed.append(key)
+    return "written"
 
 
 # ── Git push ──────────────────────────────────────────────────────────────────
 
-def git_push(league_keys: list[str], generated_at: str):
-    """Commit + push les fichiers data/ modifiés."""
+def git_push(league_keys: list[str], paths: list[Path], generated_at: str):
+    """Un seul commit + push pour les fichiers des ligues modifiées."""
     logger.info("Git — commit + push…")
 
-    # S'assurer qu'on est à jour avec le remote
+    # S'assurer qu'on est à jour avec le remote (exports non committés mis de côté)
     result = subprocess.run(
-        ["git", "-C", str(REPO_DIR), "pull", "--rebase", "origin", "master"],
+        ["git", "-C", str(REPO_DIR), "pull", "--rebase", "--autostash", "origin", "master"],
         capture_output=True, text=True
     )
     if result.returncode != 0:
         logger.warning(f"  git pull: {result.stderr.strip()}")
 
-    # Ajouter les fichiers data/
+    # Ajouter uniquement les fichiers réécrits
     subprocess.run(
-        ["git", "-C", str(REPO_DIR), "add", "data/"],
+        ["git", "-C", str(REPO_DIR), "add", "--", *(str(p) for p in paths)],
         check=True
     )
 
@@ -262,6 +346,17 @@ def _print_round(flag: str, name: str, rows: list[dict]):
     print()
 
 
+def _print_timings(timings: dict[str, dict]):
+    """Récapitulatif des durées par ligue (secondes)."""
+    if not timings:
+        return
+    print(f"\n{'Ligue':<12}{'collecte':>10}{'empreinte':>11}{'écriture':>10}  statut")
+    print("-" * 52)
+    for key, t in timings.items():
+        print(f"{key:<12}{t['collect']:>10.2f}{t['hash']:>11.4f}{t['write']:>10.3f}  {t['status']}")
+    print()
+
+
 # ── Main ──────────────────────────────────────────────────────────────────────
 
 def main():
@@ -276,15 +371,23 @@ def main():
         "--no-push", action="store_true",
         help="Collecter et exporter sans git push"
     )
+    parser.add_argument(
+        "--timings", type=Path, metavar="FICHIER",
+        help="Ajoute les durées par ligue (ndjson) à ce fichier"
+    )
     args = parser.parse_args()
+    from euro_top import metrics
 
     generated_at = datetime.now(UTC).strftime("%Y-%m-%d %H:%M UTC")
     logger.info(f"=== Collecte [{' '.join(args.leagues)}] — {generated_at} ===")
 
-    collected = []
+    collected, changed, written = [], [], []
+    timings: dict[str, dict] = {}
 
     for key in args.leagues:
+        t = timings[key] = {"collect": 0.0, "hash": 0.0, "write": 0.0, "status": "error"}
         try:
+            start = time.perf_counter()
             if key in UNDERSTAT_LEAGUES:
                 rows = collect_domestic(key)
             elif key in EUROPEAN_LEAGUES:
@@ -293,28 +396,50 @@ def main():
                 logger.error(f"Ligue inconnue : {key}. "
                              "Valides : ligue1 pl laliga seriea bundesliga cl el ecl")
                 continue
+            t["collect"] = time.perf_counter() - start
 
             if rows:
-                export(key, rows)
                 collected.append(key)
+                t["status"] = _export_if_changed(key, rows, t, changed, written)
             else:
+                t["status"] = "empty"
                 logger.warning(f"  Aucune donnée pour {key} — pas d'export")
 
         except Exception as e:
+            metrics.failure(key, e)
             logger.error(f"Erreur [{key}]: {e}", exc_info=True)
             continue
+        finally:
+            for stage in ("collect", "hash", "write"):
+                if t[stage]:
+                    metrics.observe("euro_top_stage_duration_seconds", t[stage],
+                                    stage=stage, league=key)
 
         time.sleep(1)  # Politesse entre ligues
 
-    if collected and not args.no_push:
-        git_push(collected, generated_at)
-    elif not collected:
+    if not collected:
         logger.warning("Aucune ligue collectée avec succès.")
-    else:
+    elif not changed:
+        logger.info("Aucune ligue modifiée — ni écriture ni git")
+    elif args.no_push:
         logger.info("--no-push : git push ignoré")
+    else:
+        git_push(changed, written, generated_at)
+
+    _print_timings(timings)
+    if args.timings:
+        with open(args.timings, "a", encoding="utf-8") as f:
+            for key, t in timings.items():
+                f.write(json.dumps({"run": generated_at, "league": key,
+                                    **{k: round(v, 4) if isinstance(v, float) else v
+                                       for k, v in t.items()}}) + "\n")
 
-    logger.info(f"=== Terminé : {len(collected)}/{len(args.leagues)} ligues ===")
+    logger.info(f"=== Terminé : {len(collected)}/{len(args.leagues)} ligues, "
+                f"{len(changed)} modifiée(s) ===")
 
 
 if __name__ == "__main__":
-    main()
+    from euro_top import metrics
+    from euro_top.profiling import from_env
+    with from_env(), metrics.run("push_data"):
+        main()
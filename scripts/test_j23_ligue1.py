@@ -18,7 +18,6 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import json
 import csv
-import time
 import logging
 from datetime import date, datetime, timezone
 
@@ -86,7 +85,6 @@ def collect_sofascore_ids() -> dict[str, int]:
         for ev in events:
             key = f"{ev['home_team']} vs {ev['away_team']}"
             id_map[key] = ev["id"]
-        time.sleep(0.4)
 
     if blocked == len(J23_DATES) and not id_map:
         logger.warning("Sofascore /scheduled-events bloqué (403) — repli sur IDs connus")
@@ -107,7 +105,6 @@ def collect_sofascore_stats(id_map: dict[str, int]) -> dict[int, dict]:
             logger.info(f"  ✓ {key} (ID {mid})")
         else:
             logger.warning(f"  ✗ {key} (ID {mid}) — stats non disponibles")
-        time.sleep(0.5)
     return stats_map
 
 
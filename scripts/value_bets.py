@@ -12,6 +12,7 @@ Usage :
   python3 scripts/value_bets.py --league ligue1
   python3 scripts/value_bets.py --league ligue1 pl --min-value 5
   python3 scripts/value_bets.py --league ligue1 --last 10 --min-value 3 --export
+  python3 scripts/value_bets.py --league ligue1 pl --from-archive   # xG lus dans data/archive/
 
 ⚠️  Ceci est un outil d'analyse, pas un conseil de pari.
     Les marchés intègrent déjà le xG — la valeur réelle peut être faible.
@@ -26,14 +27,20 @@ from datetime import datetime, timezone
 from pathlib import Path
 from collections import defaultdict
 
+import numpy as np
+
 from rich.console import Console
 from rich.table import Table
 from rich import box
 from rich.text import Text
 
+from euro_top import metrics
 from euro_top.config import resolve_league, ODDS_API_KEY
 from euro_top.collectors.understat import fetch_league_xg
-from euro_top.collectors.odds import OddsClient, parse_h2h, implied_to_fair
+from euro_top.collectors.odds import OddsClient, parse_h2h, parse_quotes
+from euro_top.margin import METHODS as MARGIN_METHODS
+from euro_top.pricing import MARKETS, ScoreGrid, compare_quotes
+from euro_top.staking import DEFAULT_CAP, DEFAULT_FRACTION, bet_returns, kelly_stakes
 
 logging.basicConfig(
     level=logging.WARNING,  # Silencieux par défaut
@@ -100,6 +107,23 @@ def compute_team_xg_probs(
     return team_stats
 
 
+def xg_to_lambdas(
+    home_xg_for,
+    home_xg_against,
+    away_xg_for,
+    away_xg_against,
+    home_advantage: float = 0.10,
+):
+    """
+    Buts attendus (λ_home, λ_away) : attaque × défense adverse + avantage domicile.
+
+    Accepte des scalaires ou des tableaux numpy (calcul par lot).
+    """
+    lam_home = ((home_xg_for + away_xg_against) / 2) * (1 + home_advantage)
+    lam_away = ((away_xg_for + home_xg_against) / 2) * (1 - home_advantage * 0.5)
+    return lam_home, lam_away
+
+
 def xg_to_prob(
     home_xg_for: float,
     home_xg_against: float,
@@ -114,33 +138,13 @@ def xg_to_prob(
     avec un facteur d'avantage domicile.
 
     Approximation Poisson (pas un modèle précis, base de travail).
+    Pour plusieurs matchs / marchés, utiliser directement ScoreGrid.
     """
-    import math
-
-    # Lambda attendus
-    lam_home = ((home_xg_for + away_xg_against) / 2) * (1 + home_advantage)
-    lam_away = ((away_xg_for + home_xg_against) / 2) * (1 - home_advantage * 0.5)
-
-    # P(home=i buts, away=j buts) via Poisson, i,j ∈ [0..6]
-    max_goals = 7
-    p_home_win = p_draw = p_away_win = 0.0
-
-    def poisson_pmf(lam: float, k: int) -> float:
-        return (lam ** k) * math.exp(-lam) / math.factorial(k)
-
-    for i in range(max_goals):
-        for j in range(max_goals):
-            p = poisson_pmf(lam_home, i) * poisson_pmf(lam_away, j)
-            if i > j:
-                p_home_win += p
-            elif i == j:
-                p_draw += p
-            else:
-                p_away_win += p
-
-    # Normaliser (Poisson tronqué perd un peu de masse)
-    total = p_home_win + p_draw + p_away_win
-    return p_home_win / total, p_draw / total, p_away_win / total
+    lam_home, lam_away = xg_to_lambdas(
+        home_xg_for, home_xg_against, away_xg_for, away_xg_against, home_advantage,
+    )
+    p_home_win, p_draw, p_away_win = ScoreGrid(lam_home, lam_away).h2h()[0]
+    return float(p_home_win), float(p_draw), float(p_away_win)
 
 
 # ── Value bets ─────────────────────────────────────────────────────────────────
@@ -150,22 +154,29 @@ def find_value_bets(
     team_stats: dict[str, dict],
     min_value_pct: float = 3.0,
     last_n: int = 10,
+    method: str = "shin",
+    markets: list[str] | None = None,
 ) -> list[dict]:
     """
     Compare probabilités xG vs probabilités implicites des bookmakers.
 
+    Une matrice de scores par match (ScoreGrid, construite une seule fois
+    pour tous les matchs) sert à pricer tous les marchés demandés
+    (h2h, totals, btts, spreads, correct_score). Toutes les cotes sont
+    ensuite comparées en une passe vectorisée : marge retirée bookmaker
+    par bookmaker (``method``), consensus moyen, meilleure cote.
+
     Retourne la liste des value bets détectés, triés par value décroissante.
     """
-    results = []
-
+    # 1. Parsing + appariement xG
+    fixtures = []
+    quotes: list[tuple] = []
     for event in odds_events:
-        h2h = parse_h2h(event)
-        if not h2h:
+        home = event.get("home_team")
+        away = event.get("away_team")
+        if not home or not away:
             continue
 
-        home = h2h["home_team"]
-        away = h2h["away_team"]
-
         # Chercher les stats xG (fuzzy match nom)
         home_stats = _find_team(home, team_stats)
         away_stats = _find_team(away, team_stats)
@@ -174,48 +185,49 @@ def find_value_bets(
             logger.debug(f"Stats xG manquantes : {home} / {away}")
             continue
 
-        # Probabilités estimées via xG (modèle Poisson)
-        p_home, p_draw, p_away = xg_to_prob(
-            home_stats["xg_for"],  home_stats["xg_against"],
-            away_stats["xg_for"],  away_stats["xg_against"],
-        )
-
-        # Probabilités implicites des cotes (marge supprimée)
-        if not h2h.get("best_home_odds"):
+        event_quotes = parse_quotes(event, set(markets or ["h2h"]))
+        if not event_quotes:
             continue
-        fair_home, fair_draw, fair_away = implied_to_fair(
-            h2h["best_home_odds"],
-            h2h["best_draw_odds"],
-            h2h["best_away_odds"],
-        )
+        idx = len(fixtures)
+        quotes.extend((idx, *q) for q in event_quotes)
+        fixtures.append((event, parse_h2h(event) or {}, home_stats, away_stats))
+
+    if not fixtures:
+        return []
+
+    # 2. Une matrice de scores par match, tous marchés
+    lam_home, lam_away = xg_to_lambdas(
+        np.array([f[2]["xg_for"] for f in fixtures]),
+        np.array([f[2]["xg_against"] for f in fixtures]),
+        np.array([f[3]["xg_for"] for f in fixtures]),
+        np.array([f[3]["xg_against"] for f in fixtures]),
+    )
+    grid = ScoreGrid(lam_home, lam_away)
+    probs_1x2 = grid.h2h()
+
+    # 3. Comparaison de toutes les cotes en une passe
+    flagged = compare_quotes(grid, quotes, method=method, min_value=min_value_pct / 100)
+    by_event: dict[int, list[dict]] = defaultdict(list)
+    for q in flagged:
+        by_event[q["event_idx"]].append({
+            "market":     q["market"],
+            "outcome":    q["outcome"],
+            "point":      q["point"],
+            "value_pct":  round(q["value"] * 100, 2),
+            "ev":         round(q["ev"], 4),
+            "p_model":    round(q["p_model"] * 100, 1),
+            "p_implied":  round(q["p_fair"] * 100, 1),
+            "best_odds":  q["best_odds"],
+            "best_book":  q["best_book"],
+        })
 
-        # Calcul de la value pour chaque issue
-        bets = []
-        for outcome, p_model, p_fair, best_odds, best_book in [
-            ("home", p_home, fair_home, h2h["best_home_odds"], h2h["best_home_book"]),
-            ("draw", p_draw, fair_draw, h2h["best_draw_odds"], h2h["best_draw_book"]),
-            ("away", p_away, fair_away, h2h["best_away_odds"], h2h["best_away_book"]),
-        ]:
-            if not best_odds:
-                continue
-            value_pct = (p_model - p_fair) * 100
-            ev = p_model * best_odds - 1  # Espérance de valeur (mise = 1)
-
-            if value_pct >= min_value_pct:
-                bets.append({
-                    "outcome":    outcome,
-                    "value_pct":  round(value_pct, 2),
-                    "ev":         round(ev, 4),
-                    "p_model":    round(p_model * 100, 1),
-                    "p_implied":  round(p_fair * 100, 1),
-                    "best_odds":  best_odds,
-                    "best_book":  best_book,
-                })
-
-        if not bets:
-            continue
+    results = []
+    for idx, bets in by_event.items():
+        event, h2h, home_stats, away_stats = fixtures[idx]
+        p_home, p_draw, p_away = probs_1x2[idx]
+        p_home, p_draw, p_away = float(p_home), float(p_draw), float(p_away)
 
-        commence = h2h.get("commence_time", "")
+        commence = event.get("commence_time") or ""
         try:
             dt = datetime.fromisoformat(commence.replace("Z", "+00:00"))
             match_time = dt.strftime("%a %d/%m %H:%M")
@@ -223,26 +235,74 @@ def find_value_bets(
             match_time = commence[:16] if commence else "?"
 
         results.append({
-            "home":          home,
-            "away":          away,
+            "home":          event["home_team"],
+            "away":          event["away_team"],
             "match_time":    match_time,
             "home_xg_for":   home_stats["xg_for"],
             "away_xg_for":   away_stats["xg_for"],
             "p_home":        round(p_home * 100, 1),
             "p_draw":        round(p_draw * 100, 1),
             "p_away":        round(p_away * 100, 1),
+            "lam_home":      round(float(lam_home[idx]), 4),
+            "lam_away":      round(float(lam_away[idx]), 4),
             "margin_pct":    h2h.get("market_margin_pct"),
-            "books_count":   h2h.get("bookmakers_count"),
+            "margin_method": method,
+            "books_count":   len(event.get("bookmakers", [])),
             "value_bets":    sorted(bets, key=lambda b: -b["value_pct"]),
             # Toutes les cotes pour référence
-            "best_home_odds": h2h["best_home_odds"],
-            "best_draw_odds": h2h["best_draw_odds"],
-            "best_away_odds": h2h["best_away_odds"],
+            "best_home_odds": h2h.get("best_home_odds"),
+            "best_draw_odds": h2h.get("best_draw_odds"),
+            "best_away_odds": h2h.get("best_away_odds"),
         })
 
     return sorted(results, key=lambda r: -r["value_bets"][0]["value_pct"])
 
 
+def allocate_stakes(
+    results: list[dict],
+    fraction: float = DEFAULT_FRACTION,
+    cap: float = DEFAULT_CAP,
+    bankroll: float | None = None,
+) -> float:
+    """
+    Kelly fractionnaire sur tous les value bets d'une journée (toutes ligues).
+
+    Les issues d'un même match sont réglées sur la matrice de scores du
+    match (λ du modèle) : paris exclusifs ou corrélés traités ensemble.
+    Ajoute ``stake_pct`` (% de bankroll) et ``stake`` (si ``bankroll``)
+    à chaque pari ; retourne l'exposition totale en %.
+    """
+    fixtures = [r for r in results if r.get("value_bets")]
+    if not fixtures:
+        return 0.0
+
+    grid = ScoreGrid(
+        np.array([r["lam_home"] for r in fixtures]),
+        np.array([r["lam_away"] for r in fixtures]),
+    )
+    bets, fixture_idx = [], []
+    for i, r in enumerate(fixtures):
+        for bet in r["value_bets"]:
+            bets.append(bet)
+            fixture_idx.append(i)
+
+    returns = bet_returns(
+        grid,
+        [b.get("market", "h2h") for b in bets],
+        [b["outcome"] for b in bets],
+        [b.get("point") for b in bets],
+        [b["best_odds"] for b in bets],
+    )
+    probs = grid.matrix.reshape(len(fixtures), -1)
+    stakes = kelly_stakes(returns, probs, np.array(fixture_idx), fraction, cap)
+
+    for bet, stake in zip(bets, stakes):
+        bet["stake_pct"] = round(float(stake) * 100, 2)
+        if bankroll:
+            bet["stake"] = round(float(stake) * bankroll, 2)
+    return round(float(stakes.sum()) * 100, 2)
+
+
 def _find_team(name: str, stats: dict[str, dict]) -> dict | None:
     """Fuzzy match nom d'équipe entre Odds API et Understat."""
     if name in stats:
@@ -260,7 +320,12 @@ def _find_team(name: str, stats: dict[str, dict]) -> dict | None:
 
 # ── Affichage ──────────────────────────────────────────────────────────────────
 
-def print_value_table(league_key: str, results: list[dict], last_n: int):
+def print_value_table(
+    league_key: str,
+    results: list[dict],
+    last_n: int,
+    bankroll: float | None = None,
+):
     from euro_top.config import resolve_league
     league = resolve_league(league_key)
     flag = league.flag if league else ""
@@ -281,16 +346,17 @@ def print_value_table(league_key: str, results: list[dict], last_n: int):
     table = Table(box=box.SIMPLE_HEAVY, show_header=True, header_style="bold cyan")
     table.add_column("Match",       min_width=30)
     table.add_column("Date",        width=14)
-    table.add_column("Issue",       width=6)
+    table.add_column("Issue",       width=12)
     table.add_column("Cote",        width=6, justify="right")
     table.add_column("Book",        width=12)
     table.add_column("P(xG)",       width=7, justify="right")
     table.add_column("P(marché)",   width=10, justify="right")
     table.add_column("Value",       width=8, justify="right")
     table.add_column("EV",          width=7, justify="right")
+    table.add_column("Mise",        width=9, justify="right")
 
-    OUTCOME_LABELS = {"home": "1", "draw": "X", "away": "2"}
-    OUTCOME_STYLES = {"home": "green", "draw": "yellow", "away": "red"}
+    OUTCOME_STYLES = {"home": "green", "draw": "yellow", "away": "red",
+                      "over": "green", "under": "red", "yes": "green", "no": "red"}
 
     for r in results:
         match_str = f"{r['home']} — {r['away']}"
@@ -298,16 +364,23 @@ def print_value_table(league_key: str, results: list[dict], last_n: int):
             style = OUTCOME_STYLES.get(bet["outcome"], "white")
             value_str = f"[bold green]+{bet['value_pct']:.1f}%[/bold green]"
             ev_str = f"[{'green' if bet['ev'] > 0 else 'red'}]{bet['ev']:+.3f}[/]"
+            if not bet.get("stake_pct"):
+                stake_str = "[dim]—[/dim]"
+            elif bankroll:
+                stake_str = f"{bet['stake']:.2f}"
+            else:
+                stake_str = f"{bet['stake_pct']:.2f}%"
             table.add_row(
                 match_str if i == 0 else "",
                 r["match_time"] if i == 0 else "",
-                f"[{style}]{OUTCOME_LABELS[bet['outcome']]}[/{style}]",
+                f"[{style}]{_bet_label(bet)}[/{style}]",
                 f"[bold]{bet['best_odds']:.2f}[/bold]",
                 bet["best_book"],
                 f"{bet['p_model']:.1f}%",
                 f"{bet['p_implied']:.1f}%",
                 value_str,
                 ev_str,
+                stake_str,
             )
 
     console.print(table)
@@ -322,6 +395,24 @@ def print_value_table(league_key: str, results: list[dict], last_n: int):
         )
 
 
+def _bet_label(bet: dict) -> str:
+    """Libellé court d'une issue : 1 / X / 2, O2.5, U2.5, BTTS oui, AH -0.5 1, CS 2-1."""
+    market, outcome, point = bet.get("market", "h2h"), bet["outcome"], bet.get("point")
+    side = {"home": "1", "draw": "X", "away": "2"}
+    if market == "h2h":
+        return side[outcome]
+    if market == "totals":
+        return f"{'O' if outcome == 'over' else 'U'}{point:g}"
+    if market == "btts":
+        return f"BTTS {'oui' if outcome == 'yes' else 'non'}"
+    if market == "spreads":
+        line = point if outcome == "home" else -point
+        return f"AH {line:+g} {side[outcome]}"
+    if market == "correct_score":
+        return f"CS {outcome}"
+    return outcome
+
+
 # ── Main ───────────────────────────────────────────────────────────────────────
 
 def main():
@@ -340,6 +431,31 @@ def main():
         "--min-value", type=float, default=3.0,
         help="Seuil minimum de value en %% (default: 3.0)"
     )
+    parser.add_argument(
+        "--markets", nargs="+", default=["h2h"],
+        choices=MARKETS,
+        help="Marchés The Odds API à évaluer, 1 seul appel (default: h2h)"
+    )
+    parser.add_argument(
+        "--margin-method", choices=MARGIN_METHODS, default="shin",
+        help="Méthode de suppression de la marge bookmaker (default: shin)"
+    )
+    parser.add_argument(
+        "--kelly-fraction", type=float, default=DEFAULT_FRACTION,
+        help=f"Fraction de Kelly pour les mises (default: {DEFAULT_FRACTION})"
+    )
+    parser.add_argument(
+        "--bankroll-cap", type=float, default=DEFAULT_CAP * 100,
+        help=f"Exposition totale max en %% de bankroll (default: {DEFAULT_CAP * 100:g})"
+    )
+    parser.add_argument(
+        "--bankroll", type=float, default=None,
+        help="Bankroll en unités : affiche les mises en montant"
+    )
+    parser.add_argument(
+        "--from-archive", action="store_true",
+        help="xG historiques lus dans l'archive colonnaire (euro-top archive) au lieu d'Understat"
+    )
     parser.add_argument(
         "--export", action="store_true",
         help="Exporte les résultats en JSON dans data/value_bets.json"
@@ -363,26 +479,35 @@ def main():
             console.print(f"[red]Ligue inconnue : {league_key}[/red]")
             continue
 
-        # 1. xG historique via Understat (top 5 ligues uniquement)
-        if league_key in UNDERSTAT_LEAGUES:
-            console.print(
-                f"\n{league.flag} [dim]Chargement xG Understat "
-                f"[{league.name} 2025]...[/dim]"
-            )
-            matches = fetch_league_xg(league.understat_slug, season=2025)
-        else:
-            console.print(
-                f"\n{league.flag} [yellow]{league.name} : "
-                "xG Understat non dispo pour compétitions européennes — "
-                "affichage cotes uniquement[/yellow]"
-            )
-            matches = []
+        # 1. xG historique : archive locale, sinon Understat (top 5 ligues uniquement)
+        with metrics.stage("xg", league_key):
+            if args.from_archive:
+                from euro_top.archive import read_table
+                console.print(f"\n{league.flag} [dim]Chargement xG archive [{league.name} 2025]...[/dim]")
+                matches = [m for m in read_table(
+                    "matches", league_ids=[league.id], seasons=[2025],
+                    columns=["match_date", "home_team", "away_team", "home_xg", "away_xg"],
+                ).to_pylist() if m["match_date"] and m["away_xg"] is not None]
+            elif league_key in UNDERSTAT_LEAGUES:
+                console.print(
+                    f"\n{league.flag} [dim]Chargement xG Understat "
+                    f"[{league.name} 2025]...[/dim]"
+                )
+                matches = fetch_league_xg(league.understat_slug, season=2025)
+            else:
+                console.print(
+                    f"\n{league.flag} [yellow]{league.name} : "
+                    "xG Understat non dispo pour compétitions européennes — "
+                    "affichage cotes uniquement[/yellow]"
+                )
+                matches = []
 
         team_stats = compute_team_xg_probs(matches, last_n=args.last)
 
         # 2. Cotes à venir via The Odds API
         console.print(f"  [dim]Récupération cotes The Odds API...[/dim]")
-        events = client.fetch_odds(league_key, markets=["h2h"])
+        with metrics.stage("odds", league_key):
+            events = client.fetch_odds(league_key, markets=args.markets)
 
         if not events:
             console.print(f"  [yellow]Aucun match à venir trouvé pour {league.name}[/yellow]")
@@ -390,27 +515,53 @@ def main():
 
         # 3. Value bets
         if matches:
-            results = find_value_bets(events, team_stats, args.min_value, args.last)
+            results = find_value_bets(
+                events, team_stats, args.min_value, args.last,
+                method=args.margin_method, markets=args.markets,
+            )
         else:
             # Pas de xG : afficher juste les cotes disponibles
             results = []
             _print_odds_only(league_key, events)
 
-        print_value_table(league_key, results, args.last)
+        all_results[league_key] = results
 
-        if client.quota_remaining is not None:
-            console.print(
-                f"  [dim]Quota The Odds API : "
-                f"{client.quota_remaining} req restantes ce mois[/dim]\n"
-            )
+    # 4. Mises : Kelly fractionnaire sur toute la journée (toutes ligues)
+    exposure = allocate_stakes(
+        [r for results in all_results.values() for r in results],
+        fraction=args.kelly_fraction,
+        cap=args.bankroll_cap / 100,
+        bankroll=args.bankroll,
+    )
 
-        all_results[league_key] = results
+    for league_key, results in all_results.items():
+        print_value_table(league_key, results, args.last, args.bankroll)
+
+    if any(all_results.values()):
+        console.print(
+            f"  Exposition totale : [bold]{exposure:.2f}%[/bold] de la bankroll "
+            f"(Kelly × {args.kelly_fraction:g}, plafond {args.bankroll_cap:g}%)\n"
+        )
+
+    if client.quota_remaining is not None:
+        console.print(
+            f"  [dim]Quota The Odds API : "
+            f"{client.quota_remaining} req restantes ce mois[/dim]\n"
+        )
 
     if args.export and all_results:
         out = {
             "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
             "model":        f"xG Poisson (last {args.last} matches)",
             "min_value_pct": args.min_value,
+            "margin_method": args.margin_method,
+            "markets":      args.markets,
+            "staking": {
+                "kelly_fraction":   args.kelly_fraction,
+                "bankroll_cap_pct": args.bankroll_cap,
+                "bankroll":         args.bankroll,
+                "exposure_pct":     exposure,
+            },
             "leagues":      all_results,
         }
         path = DATA_DIR / "value_bets.json"
@@ -462,4 +613,6 @@ def _print_odds_only(league_key: str, events: list[dict]):
 
 
 if __name__ == "__main__":
-    main()
+    from euro_top.profiling import from_env
+    with from_env(), metrics.run("value_bets"):
+        main()
@@ -15,7 +15,12 @@ setup(
         "beautifulsoup4>=4.12",
         "lxml>=5.3",
         "python-dotenv>=1.0",
+        "numpy>=1.26",
     ],
+    extras_require={
+        "archive": ["pyarrow>=14"],
+        "analytics": ["duckdb>=1.0"],
+    },
     entry_points={
         "console_scripts": [
             "euro-top=cli.main:app",